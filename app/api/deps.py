@@ -1,39 +1,97 @@
+import logging
+import time
 from functools import lru_cache # Helps keep the same instances (singleton)
 
 from app.core.settings import settings                      # Central config
-from app.infrastructure.storage.s3_storage import S3Storage # Real AWS adapter
-from app.infrastructure.queue.sqs_queue import SQSQueue     # Real SQS adapter
 
 # Import fake in-memory implementations
+# (Adapters for other backends -- S3Storage and SQSQueue (boto3), SQLite -- are imported inside
+#  the function that picks them, so a process only loads what APP_ENV / REPO_BACKEND select.)
 from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
 from app.infrastructure.storage.in_memory_storage import InMemoryStorage
 from app.infrastructure.queue.in_memory_queue import InMemoryQueue
 
+# Async faces of the same adapters, for the async request path
+from app.infrastructure.persistence.async_documents_repo import AsyncInMemoryDocumentsRepository, AsyncThreadedDocumentsRepository
+from app.infrastructure.storage.async_storage import AsyncInMemoryStorage, AsyncS3Storage
+from app.infrastructure.queue.async_queue import AsyncInMemoryQueue, AsyncSQSQueue
+
+# Status events (pub/sub behind GET /documents/{id}/events)
+from app.infrastructure.events.status_broadcaster import StatusBroadcaster
+from app.infrastructure.events.repo_change_feed import RepoChangeFeed
+from app.infrastructure.persistence.observable_documents_repo import ObservableDocumentsRepository
+from app.infrastructure.persistence.cached_documents_repo import CachedDocumentsRepository
+
+# Processing results by content hash
+from app.infrastructure.cache.result_cache import TieredResultCache
+
 # Import service that needs them
 from app.services.document_service import DocumentService
+from app.services.async_document_service import AsyncDocumentService
+from app.services.admission import AdmissionController, BacklogMonitor, CapacityPlanner, TokenBucketLimiter
 from app.domain.ports.storage import StoragePort
+from app.domain.ports.documents_repo import DocumentsRepository
+from app.domain.ports.status_events import StatusEventsPort
+from app.domain.ports.result_cache import ResultCachePort
+
+logger = logging.getLogger(__name__)
+
+# One broadcaster per process: every repository update is published here
+@lru_cache(maxsize=1)
+def get_status_broadcaster() -> StatusBroadcaster:
+    return StatusBroadcaster()
 
 # Returns the same repository every time (so data doesn't disappear between requests)
 @lru_cache(maxsize=1)
-def get_documents_repo() -> InMemoryDocumentsRepository:
-    return InMemoryDocumentsRepository()
+def get_documents_repo() -> DocumentsRepository:
+    """
+    Returns the repository selected by REPO_BACKEND, publishing its updates to the broadcaster.
+    - memory: InMemoryDocumentsRepository (lost on restart)
+    - compact: CompactDocumentsRepository (lost on restart, a fraction of the memory per document)
+    - broker: BrokerDocumentsRepository (hosted by the local broker, shared by API and worker processes)
+    - sqlite: SQLiteDocumentsRepository at SQLITE_PATH (shared by API and worker processes)
+    With REPO_CACHE_MAX_ENTRIES > 0, get() goes through a read-through cache first.
+    """
+    if settings.REPO_BACKEND == "sqlite":
+        from app.infrastructure.persistence.sqlite_documents_repo import SQLiteDocumentsRepository
+        repo = SQLiteDocumentsRepository(settings.SQLITE_PATH)
+    elif settings.REPO_BACKEND == "memory":
+        repo = InMemoryDocumentsRepository()
+    elif settings.REPO_BACKEND == "compact":
+        from app.infrastructure.persistence.compact_documents_repo import CompactDocumentsRepository
+        repo = CompactDocumentsRepository()
+    elif settings.REPO_BACKEND == "broker":
+        from app.infrastructure.persistence.broker_documents_repo import BrokerDocumentsRepository
+        repo = BrokerDocumentsRepository(get_broker_client())
+    else:
+        raise RuntimeError(f"Unknown REPO_BACKEND: {settings.REPO_BACKEND}")
+
+    if settings.REPO_CACHE_MAX_ENTRIES > 0:
+        repo = CachedDocumentsRepository(repo, settings.REPO_CACHE_MAX_ENTRIES, settings.REPO_CACHE_TTL_SECONDS)
+
+    return ObservableDocumentsRepository(repo, get_status_broadcaster())
 
 # Returns the same storage instance every time
 @lru_cache(maxsize=1)
 def get_storage() -> StoragePort:
     """
     Returns the correct storage implementation based on APP_ENV.
-    - local: InMemoryStorage (fake URLs)
+    - local: InMemoryStorage (upload URLs point at this API's PUT /documents/{id}/content)
+    - broker: BrokerStorage (same URLs, objects held by the local broker)
     - aws: S3Storage (real presigned URLs)
     Validates bucket name when using AWS mode.
      """
     if settings.APP_ENV == "aws":
         if not settings.S3_BUCKET_NAME:
             raise RuntimeError("S3_BUCKET_NAME must be set when APP_ENV = AWS")
+        from app.infrastructure.storage.s3_storage import S3Storage # Real AWS adapter
         return S3Storage()
+    if settings.APP_ENV == "broker":
+        from app.infrastructure.storage.broker_storage import BrokerStorage
+        return BrokerStorage(get_broker_client())
 
-    # Default: local dev mode
-    return InMemoryStorage()
+    # Default: local dev mode (finished uploads are announced to the in-memory events when those are the source)
+    return InMemoryStorage(events=get_upload_events() if settings.UPLOAD_EVENTS_SOURCE == "memory" else None)
 
 # Returns the same queue instance every time
 @lru_cache(maxsize=1)
@@ -41,21 +99,173 @@ def get_queue():
     """
     Returns the correct queue implementation based on APP_ENV.
     - local: InMemoryQueue (fake URLs)
+    - broker: BrokerQueue (an InMemoryQueue inside the local broker)
     - aws: SQSQueue
     Validates bucket name when using AWS mode.
     """
     if settings.APP_ENV == "aws":
         if not settings.SQS_QUEUE_URL:
             raise RuntimeError("SQS_QUEUE_URL must be set when APP_ENV = AWS")
+        from app.infrastructure.queue.sqs_queue import SQSQueue # Real SQS adapter
         return SQSQueue()
+    if settings.APP_ENV == "broker":
+        from app.infrastructure.queue.broker_queue import BrokerQueue
+        return BrokerQueue(get_broker_client())
 
     # Default: local dev mode
     return InMemoryQueue()
 
-# Builds and returns the full service using the three pieces above
+# One pipelined connection to the local broker per process, shared by repo, queue and storage
+@lru_cache(maxsize=1)
+def get_broker_client():
+    from app.infrastructure.broker.broker_client import BrokerClient
+    return BrokerClient(settings.BROKER_SOCKET_PATH)
+
+# Storage "object created" events for the upload ingestor (python -m app.workers.run_ingestor)
+@lru_cache(maxsize=1)
+def get_upload_events():
+    """
+    Returns the event source selected by UPLOAD_EVENTS_SOURCE (empty = by APP_ENV).
+    - sqs: SQSUploadEvents (S3 event notifications in S3_EVENTS_QUEUE_URL) -- default for aws
+    - broker: BrokerUploadEvents (uploads finished in the local broker's storage) -- default for broker
+    - files: FileDropUploadEvents (notification files in UPLOAD_EVENTS_DIR) -- default for local
+    - memory: InMemoryUploadEvents (uploads finished in this process's InMemoryStorage)
+    """
+    source = settings.UPLOAD_EVENTS_SOURCE or {"aws": "sqs", "broker": "broker"}.get(settings.APP_ENV, "files")
+    if source == "sqs":
+        if not settings.S3_EVENTS_QUEUE_URL:
+            raise RuntimeError("S3_EVENTS_QUEUE_URL must be set when UPLOAD_EVENTS_SOURCE = sqs")
+        from app.infrastructure.events.sqs_upload_events import SQSUploadEvents
+        return SQSUploadEvents()
+    if source == "broker":
+        from app.infrastructure.events.broker_upload_events import BrokerUploadEvents
+        return BrokerUploadEvents(get_broker_client())
+    if source == "files":
+        from app.infrastructure.events.file_drop_upload_events import FileDropUploadEvents
+        return FileDropUploadEvents(settings.UPLOAD_EVENTS_DIR, visibility_timeout=settings.SQS_VISIBILITY_TIMEOUT)
+    if source == "memory":
+        from app.infrastructure.events.in_memory_upload_events import InMemoryUploadEvents
+        return InMemoryUploadEvents(visibility_timeout=settings.SQS_VISIBILITY_TIMEOUT)
+    raise RuntimeError(f"Unknown UPLOAD_EVENTS_SOURCE: {source}")
+
+# Result cache shared by all job slots of a worker (None when RESULT_CACHE_BACKEND=off)
+@lru_cache(maxsize=1)
+def get_result_cache() -> ResultCachePort | None:
+    if settings.RESULT_CACHE_BACKEND == "off":
+        return None
+    if settings.RESULT_CACHE_BACKEND == "sqlite":
+        from app.infrastructure.persistence.sqlite_result_cache import SQLiteResultCache
+        return TieredResultCache(settings.RESULT_CACHE_MAX_ENTRIES, SQLiteResultCache(settings.SQLITE_PATH))
+    if settings.RESULT_CACHE_BACKEND == "memory":
+        return TieredResultCache(settings.RESULT_CACHE_MAX_ENTRIES)
+    raise RuntimeError(f"Unknown RESULT_CACHE_BACKEND: {settings.RESULT_CACHE_BACKEND}")
+
+# Samples the job backlog in the background (admission control, GET /capacity)
+@lru_cache(maxsize=1)
+def get_backlog_monitor() -> BacklogMonitor:
+    return BacklogMonitor(
+        get_queue(),
+        get_documents_repo(),
+        interval=settings.BACKLOG_SAMPLE_SECONDS,
+        window=settings.BACKLOG_RATE_WINDOW_SECONDS,
+    )
+
+@lru_cache(maxsize=1)
+def get_capacity_planner() -> CapacityPlanner:
+    return CapacityPlanner.from_settings()
+
+# Admission control shared by every enqueue path in this process (None when every ADMISSION_* limit is off)
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController | None:
+    limiter = None
+    if settings.ADMISSION_CLIENT_RATE > 0:
+        limiter = TokenBucketLimiter(settings.ADMISSION_CLIENT_RATE, settings.ADMISSION_CLIENT_BURST)
+    if limiter is None and not (settings.ADMISSION_MAX_QUEUE_WAIT_SECONDS or settings.ADMISSION_MAX_BACKLOG):
+        return None
+    return AdmissionController(
+        monitor=get_backlog_monitor(),
+        limiter=limiter,
+        max_queue_wait=settings.ADMISSION_MAX_QUEUE_WAIT_SECONDS,
+        max_backlog=settings.ADMISSION_MAX_BACKLOG,
+    )
+
+# Builds and returns the full service using the pieces above
 def get_document_service() -> DocumentService:
     return DocumentService(
         repo=get_documents_repo(),
         storage=get_storage(),
         queue=get_queue(),
-    )
\ No newline at end of file
+        admission=get_admission_controller(),
+    )
+
+# ---- Async request path ----
+# Each async adapter wraps the sync singleton above, so the API, the sync service
+# and the worker all see the same documents and queue.
+
+@lru_cache(maxsize=1)
+def get_async_documents_repo():
+    repo = get_documents_repo()
+    if settings.REPO_BACKEND in ("memory", "compact"):
+        return AsyncInMemoryDocumentsRepository(repo)
+    # Anything else may block on I/O (SQLite, the broker socket): keep it off the event loop
+    return AsyncThreadedDocumentsRepository(repo, max_workers=settings.ASYNC_BLOCKING_MAX_WORKERS)
+
+@lru_cache(maxsize=1)
+def get_async_storage():
+    storage = get_storage()
+    if settings.APP_ENV == "aws":
+        return AsyncS3Storage(storage, max_workers=settings.ASYNC_BLOCKING_MAX_WORKERS)
+    if settings.APP_ENV == "broker":
+        from app.infrastructure.storage.broker_storage import AsyncBrokerStorage
+        return AsyncBrokerStorage(storage, get_broker_client())
+    return AsyncInMemoryStorage(storage)
+
+@lru_cache(maxsize=1)
+def get_async_queue():
+    queue = get_queue()
+    if settings.APP_ENV == "aws":
+        return AsyncSQSQueue(queue, max_workers=settings.ASYNC_BLOCKING_MAX_WORKERS)
+    if settings.APP_ENV == "broker":
+        from app.infrastructure.queue.broker_queue import AsyncBrokerQueue
+        return AsyncBrokerQueue(get_broker_client())
+    return AsyncInMemoryQueue(queue)
+
+# Where status watchers subscribe
+# With SQLite or the broker, workers in other processes update documents too, so a change feed polls for those
+@lru_cache(maxsize=1)
+def get_status_events() -> StatusEventsPort:
+    if settings.REPO_BACKEND in ("sqlite", "broker"):
+        return RepoChangeFeed(get_async_documents_repo(), get_status_broadcaster(), settings.EVENTS_POLL_INTERVAL)
+    return get_status_broadcaster()
+
+# Builds the async service used by the (async def) routes
+def get_async_document_service() -> AsyncDocumentService:
+    return AsyncDocumentService(
+        repo=get_async_documents_repo(),
+        storage=get_async_storage(),
+        queue=get_async_queue(),
+        events=get_status_events(),
+        admission=get_admission_controller(),
+    )
+
+# ---- Startup warm-up ----
+
+def warm_up(connect: bool = True) -> dict[str, float]:
+    """
+    Builds everything the request path uses now, so the first request doesn't pay for it.
+    In AWS mode that includes the boto3 session, the S3/SQS clients, botocore's service models
+    and (connect=True) one open connection per service. Returns seconds spent per step.
+    """
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    get_async_document_service()
+    timings["adapters"] = time.perf_counter() - started
+
+    if settings.APP_ENV == "aws":
+        for name, adapter in (("s3", get_storage()), ("sqs", get_queue())):
+            started = time.perf_counter()
+            adapter.warm_up(connect=connect)
+            timings[name] = time.perf_counter() - started
+
+    logger.info("Warm-up done: %s", ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+    return timings
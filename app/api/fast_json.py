@@ -0,0 +1,42 @@
+from dataclasses import fields
+from typing import Any, Optional
+
+from pydantic_core import to_json
+
+from app.api.schemas.documents import DocumentResponse
+from app.domain.models.document import Document
+
+# orjson is optional: without it pydantic-core encodes the dataclass (slower than orjson, still no models)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The response fields, in response order
+RESPONSE_FIELDS = tuple(DocumentResponse.model_fields)
+
+# The Document dataclass is encoded as it is (no dict, no model) as long as it has exactly
+# the response's fields in the same order. If the two ever drift apart, fall back to a dict.
+ENCODE_DATACLASS = tuple(f.name for f in fields(Document)) == RESPONSE_FIELDS
+
+
+# JSON bytes of a document, the same bytes DocumentResponse would produce
+# (UTC datetimes end in "Z", the status is its value, no spaces)
+def document_json(doc: Document) -> bytes:
+    return _dumps(doc if ENCODE_DATACLASS else _document_dict(doc))
+
+
+# JSON bytes of one page of documents (DocumentListResponse)
+def document_list_json(docs: list[Document], next_cursor: Optional[str]) -> bytes:
+    items = docs if ENCODE_DATACLASS else [_document_dict(doc) for doc in docs]
+    return _dumps({"items": items, "next_cursor": next_cursor})
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z)
+    return to_json(value)
+
+
+def _document_dict(doc: Document) -> dict[str, Any]:
+    return {name: getattr(doc, name) for name in RESPONSE_FIELDS}
@@ -0,0 +1,56 @@
+import time
+
+from app.infrastructure.metrics.app_metrics import HTTP_REQUEST_DURATION
+from app.infrastructure.profiling.sampling_profiler import SamplingProfiler
+
+
+# Times every HTTP request and records it under its route template
+#
+# Plain ASGI middleware rather than BaseHTTPMiddleware: no extra task or response
+# wrapping per request, and streaming responses (SSE) pass through untouched.
+# The route is read after the app ran, from scope["route"] which the router sets on a match.
+class MetricsMiddleware:
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500 # If the app raises before sending anything, the server answers 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(route, scope["method"], str(status)).observe(time.perf_counter() - start)
+
+
+# Samples the stack of every HTTP request and writes it out when the request was slow
+# (PROFILE_SLOW_REQUEST_SECONDS). Samples come from the event loop thread: see SamplingProfiler.
+class ProfilingMiddleware:
+
+    def __init__(self, app, profiler: SamplingProfiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with self.profiler.profile("request") as session:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                session.name = f"{scope['method']} {route}"
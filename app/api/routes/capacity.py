@@ -0,0 +1,39 @@
+import asyncio
+import math
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.deps import get_backlog_monitor, get_capacity_planner
+from app.api.schemas.capacity import CapacityResponse
+from app.services.admission import BacklogMonitor, CapacityPlanner
+
+router = APIRouter()
+
+
+# Backlog and the worker count it needs, for an autoscaler to poll
+# (numbers from the last background sample: cheap to call often)
+# The first call after startup waits for the first sample. Without a recent sample (sampler
+# stuck or failing) it answers 503 rather than an empty backlog an autoscaler would scale down on.
+@router.get("/capacity", response_model=CapacityResponse)
+async def capacity(
+        monitor: BacklogMonitor = Depends(get_backlog_monitor),
+        planner: CapacityPlanner = Depends(get_capacity_planner),
+) -> CapacityResponse:
+    snapshot = monitor.snapshot()
+    if snapshot.sampled_at is None:
+        snapshot = await asyncio.to_thread(monitor.wait_for_sample)
+    if not monitor.is_fresh(snapshot):
+        raise HTTPException(
+            status_code=503,
+            detail="Job backlog not sampled recently, retry later",
+            headers={"Retry-After": str(math.ceil(monitor.interval))},
+        )
+    return CapacityResponse(
+        queue_depth=snapshot.depth,
+        in_flight=snapshot.in_flight,
+        processing_rate=round(snapshot.processing_rate, 3),
+        arrival_rate=round(snapshot.arrival_rate, 3),
+        estimated_queue_wait_seconds=snapshot.estimated_wait,
+        recommended_workers=planner.recommended_workers(snapshot),
+        sampled_at=snapshot.sampled_at,
+    )
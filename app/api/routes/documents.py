@@ -1,26 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException # APIRouter makes a group of endpoints
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response # APIRouter makes a group of endpoints
+from fastapi.responses import StreamingResponse
 
 # Import DI, schemas, and service
-from app.api.deps import get_document_service, get_documents_repo, get_queue
+from app.api.deps import get_admission_controller, get_async_document_service
+from app.api.fast_json import document_json, document_list_json
 from app.api.schemas.documents import InitiateUploadRequest, InitiateUploadResponse, DocumentResponse, EnqueueResponse
+from app.api.schemas.documents import EnqueueBatchRequest, EnqueueBatchResponse, EnqueueBatchItem
+from app.api.schemas.documents import InitiateUploadBatchRequest, InitiateUploadBatchResponse, InitiateUploadBatchItem
+from app.api.schemas.documents import DocumentListResponse
+from app.api.schemas.documents import InitiateMultipartUploadRequest, InitiateMultipartUploadResponse, MultipartPartUrl
+from app.api.schemas.documents import MultipartPartUrlsRequest, MultipartPartUrlsResponse
+from app.api.schemas.documents import CompleteMultipartUploadRequest, AbortMultipartUploadRequest
+from app.core.settings import settings
+from app.domain.models.document import Document, DocumentStatus
 from app.domain.errors import DocumentNotFoundError
-from app.services.document_service import DocumentService
+from app.domain.ports.status_events import StatusSubscription
+from app.services.admission import AdmissionController
+from app.services.async_document_service import AsyncDocumentService
+from app.services.document_service import is_final
 from app.domain.errors import InvalidDocumentStateError
-from app.workers.processor_stub import process_job
 
 # Create the router for all document-related endpoints
+# Handlers are async: they run on the event loop and only hand blocking adapter calls
+# (boto3, SQLite) to dedicated thread pools, so concurrency isn't capped by FastAPI's threadpool
 router = APIRouter(prefix="/documents")
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Who is enqueueing, for the per-client rate limit: the ADMISSION_CLIENT_HEADER value if set, else the client's address
+def client_key(request: Request) -> str:
+    if settings.ADMISSION_CLIENT_HEADER:
+        value = request.headers.get(settings.ADMISSION_CLIENT_HEADER)
+        if value:
+            return value
+    return request.client.host if request.client else "unknown"
+
 # Actual endpoint: POST /documents/initiate-upload
 @router.post("/initiate-upload", response_model=InitiateUploadResponse)
-def initiate_upload(
+async def initiate_upload(
         request: InitiateUploadRequest,
-        service: DocumentService = Depends(get_document_service),
+        service: AsyncDocumentService = Depends(get_async_document_service),
 ) -> InitiateUploadResponse:
     # Call the real logic in the service
-    document_id, object_key, upload_url = service.initiate_upload(
+    document_id, object_key, upload_url = await service.initiate_upload(
         filename=request.filename,
         content_type=request.content_type,
+        sha256=request.sha256,
     )
 
     # Build and return the response object
@@ -30,18 +57,191 @@ def initiate_upload(
         upload_url=upload_url
     )
 
+# Start many uploads in one request (one presigning pass for the whole batch)
+# Always 200: each file gets its own upload URL or error
+@router.post("/initiate-upload-batch", response_model=InitiateUploadBatchResponse)
+async def initiate_upload_batch(
+        request: InitiateUploadBatchRequest,
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> InitiateUploadBatchResponse:
+    results = await service.initiate_upload_batch([(f.filename, f.content_type) for f in request.files])
+
+    items = [
+        InitiateUploadBatchItem(
+            filename=r.filename,
+            document_id=r.document_id,
+            object_key=r.object_key,
+            upload_url=r.upload_url,
+            error=r.error,
+        )
+        for r in results
+    ]
+    created = sum(1 for r in results if r.error is None)
+    return InitiateUploadBatchResponse(created=created, failed=len(results) - created, results=items)
+
+# Start a multipart upload for a large file: one presigned URL per part
+# Client PUTs the parts (in parallel, any order), keeps each response's ETag, then calls /multipart/complete
+@router.post("/initiate-multipart-upload", response_model=InitiateMultipartUploadResponse)
+async def initiate_multipart_upload(
+        request: InitiateMultipartUploadRequest,
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> InitiateMultipartUploadResponse:
+    result = await service.initiate_multipart_upload(
+        filename=request.filename,
+        content_type=request.content_type,
+        file_size=request.file_size,
+        part_size=request.part_size,
+    )
+    return InitiateMultipartUploadResponse(
+        document_id=result.document_id,
+        object_key=result.object_key,
+        upload_id=result.upload_id,
+        part_size=result.part_size,
+        parts=[MultipartPartUrl(part_number=n, upload_url=url) for n, url in enumerate(result.part_urls, start=1)],
+    )
+
+# Enqueue many documents in one request (sent to the queue in batches)
+# Always 200: each document gets its own job_id or error
+@router.post("/enqueue-batch", response_model=EnqueueBatchResponse)
+async def enqueue_documents_batch(
+        request: EnqueueBatchRequest,
+        client: str = Depends(client_key),
+        service: AsyncDocumentService = Depends(get_async_document_service),
+        admission: AdmissionController | None = Depends(get_admission_controller),
+) -> EnqueueBatchResponse:
+    if admission is not None:
+        admission.check_client(client, len(request.document_ids)) # 429 when over the rate
+    results = await service.enqueue_processing_batch(request.document_ids, priority=request.priority, tenant=request.tenant)
+
+    items = [
+        EnqueueBatchItem(document_id=r.document_id, job_id=r.job_id, error=r.error)
+        for r in results
+    ]
+    enqueued = sum(1 for r in results if r.ok)
+    return EnqueueBatchResponse(enqueued=enqueued, failed=len(results) - enqueued, results=items)
+
+
+# List documents, oldest update first, one page at a time
+# e.g. GET /documents?status=FAILED&updated_after=2026-01-13T10:00:00Z
+#      GET /documents?status=QUEUED&limit=1  (oldest queued document)
+@router.get("", response_model=DocumentListResponse)
+async def list_documents(
+        status: DocumentStatus | None = None,
+        updated_after: datetime | None = None,
+        limit: int = Query(50, ge=1, le=settings.LIST_MAX_LIMIT),
+        cursor: str | None = None, # next_cursor from the previous page
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> DocumentListResponse:
+    docs, next_cursor = await service.list_documents(
+        status=status,
+        updated_after=updated_after,
+        limit=limit,
+        cursor=cursor,
+    )
+    if settings.FAST_JSON_RESPONSES:
+        return _json_response(document_list_json(docs, next_cursor))
+    return DocumentListResponse(items=[_to_response(doc) for doc in docs], next_cursor=next_cursor)
+
 
 # GET a single document by ID
-@router.get("/{document_id}", response_model=DocumentResponse)
-def get_document(
+# Sends an ETag; a client that repeats it in If-None-Match gets an empty 304 until the document changes
+@router.get("/{document_id}", response_model=DocumentResponse, responses={304: {"description": "Not modified"}})
+async def get_document(
         document_id: str,
-        service: DocumentService = Depends(get_document_service),
-) -> DocumentResponse:
+        response: Response,
+        if_none_match: str | None = Header(None),
+        service: AsyncDocumentService = Depends(get_async_document_service),
+):
     try:
-        doc = service.get_document(document_id)
+        doc = await service.get_document(document_id)
     except DocumentNotFoundError:
         raise HTTPException(status_code=404, detail="Document not found")
 
+    etag = _etag(doc)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"} # Cacheable, but always revalidate
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers) # No body, nothing serialized
+
+    if settings.FAST_JSON_RESPONSES:
+        return _json_response(document_json(doc), headers)
+    response.headers.update(headers)
+    return _to_response(doc)
+
+# Every write bumps the document's version, so (id, version) names one state of a document.
+# updated_at is added so a document deleted and created again under the same id gets new tags.
+def _etag(doc: Document) -> str:
+    micros = (doc.updated_at - EPOCH) // timedelta(microseconds=1)
+    return f'"{doc.version:x}-{micros:x}"'
+
+# If-None-Match is "*" or a comma-separated list of (possibly weak, W/"...") tags
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+# Stream status changes as Server-Sent Events (text/event-stream)
+# Sends the current state first, then one "status" event per transition, and closes once the
+# status is final. Idle streams get a comment line every EVENTS_HEARTBEAT_SECONDS.
+#   curl -N http://127.0.0.1:8000/documents/<id>/events
+@router.get("/{document_id}/events")
+async def document_events(
+        document_id: str,
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> StreamingResponse:
+    # Opened before the response starts, so an unknown id is still a plain 404
+    doc, subscription = await service.watch_document(document_id)
+    return StreamingResponse(
+        _status_events(service, doc, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # No proxy buffering
+    )
+
+# Long-poll fallback for clients without SSE
+# Returns as soon as the status is no longer `since` (default: the current status) or after `timeout` seconds
+@router.get("/{document_id}/wait", response_model=DocumentResponse)
+async def wait_for_document(
+        document_id: str,
+        since: DocumentStatus | None = None,
+        timeout: float = Query(30.0, ge=0, le=settings.EVENTS_LONG_POLL_MAX_SECONDS),
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> DocumentResponse:
+    doc = await service.wait_for_status_change(document_id, since=since, timeout=timeout)
+    if settings.FAST_JSON_RESPONSES:
+        return _json_response(document_json(doc))
+    return _to_response(doc)
+
+# Body of the SSE stream; always releases the subscription (client gone, final status, or error)
+async def _status_events(service: AsyncDocumentService, doc: Document, subscription: StatusSubscription):
+    try:
+        yield "retry: 3000\n" + _sse_event(doc)
+        while not is_final(doc.status):
+            update = await subscription.next(settings.EVENTS_HEARTBEAT_SECONDS)
+            if update is None:
+                yield ": keep-alive\n\n"
+                continue
+            # Skip repeats and older versions (the same update can arrive from several sources)
+            if update.version <= doc.version:
+                continue
+            changed = update.status != doc.status
+            doc = update
+            if changed:
+                yield _sse_event(doc)
+    finally:
+        service.unwatch(subscription)
+
+def _sse_event(doc: Document) -> str:
+    data = document_json(doc).decode() if settings.FAST_JSON_RESPONSES else _to_response(doc).model_dump_json()
+    return f"event: status\ndata: {data}\n\n"
+
+# Already-encoded JSON body. Returning a Response makes FastAPI skip response_model
+# validation and serialization (response_model still documents the shape in OpenAPI).
+def _json_response(body: bytes, headers: dict[str, str] | None = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Copy a domain Document into the API response model
+def _to_response(doc: Document) -> DocumentResponse:
     return DocumentResponse(
         id=doc.id,
         filename=doc.filename,
@@ -51,16 +251,86 @@ def get_document(
         created_at=doc.created_at,
         updated_at=doc.updated_at,
         last_error=doc.last_error,
+        sha256=doc.sha256,
+        size_bytes=doc.size_bytes,
+        detected_content_type=doc.detected_content_type,
+        page_count=doc.page_count,
+        width=doc.width,
+        height=doc.height,
+        queued_at=doc.queued_at,
+        started_at=doc.started_at,
+        finished_at=doc.finished_at,
+        version=doc.version,
+    )
+
+# Fresh part URLs for an unfinished multipart upload (resume after expiry, retry a part)
+@router.post("/{document_id}/multipart/part-urls", response_model=MultipartPartUrlsResponse)
+async def multipart_part_urls(
+        document_id: str,
+        request: MultipartPartUrlsRequest,
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> MultipartPartUrlsResponse:
+    urls = await service.presign_upload_parts(document_id, request.upload_id, request.part_numbers)
+    return MultipartPartUrlsResponse(
+        parts=[MultipartPartUrl(part_number=n, upload_url=url) for n, url in zip(request.part_numbers, urls)]
+    )
+
+# Finish a multipart upload (parts in ascending order); the document can be enqueued afterwards
+@router.post("/{document_id}/multipart/complete", response_model=DocumentResponse)
+async def complete_multipart_upload(
+        document_id: str,
+        request: CompleteMultipartUploadRequest,
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> DocumentResponse:
+    doc = await service.complete_multipart_upload(
+        document_id,
+        request.upload_id,
+        [(part.part_number, part.etag) for part in request.parts],
     )
+    return _to_response(doc)
+
+# Cancel a multipart upload and free the parts uploaded so far
+@router.post("/{document_id}/multipart/abort", status_code=204)
+async def abort_multipart_upload(
+        document_id: str,
+        request: AbortMultipartUploadRequest,
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> Response:
+    await service.abort_multipart_upload(document_id, request.upload_id)
+    return Response(status_code=204)
+
+# Local stand-in for S3: the upload URL outside AWS mode points here (PUT the file as the body)
+# e.g. PUT /documents/{id}/content?sha256=... (sha256 only when the upload was initiated with one)
+@router.put("/{document_id}/content", status_code=204)
+async def upload_content(
+        document_id: str,
+        request: Request,
+        sha256: str | None = None,
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> Response:
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.UPLOAD_CONTENT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail="Content is too large")
+    await service.upload_content(document_id, bytes(body), sha256=sha256)
+    return Response(status_code=204)
 
 # Enqueue a document for background processing
+# e.g. POST /documents/{id}/enqueue?priority=bulk&tenant=acme (default: first lane, no tenant)
 @router.post("/{document_id}/enqueue", response_model=EnqueueResponse)
-def enqueue_document(
+async def enqueue_document(
         document_id: str, # From the path
-        service: DocumentService = Depends(get_document_service),
+        priority: str | None = None, # Queue lane, one of QUEUE_LANES
+        tenant: str | None = None,
+        client: str = Depends(client_key),
+        service: AsyncDocumentService = Depends(get_async_document_service),
+        admission: AdmissionController | None = Depends(get_admission_controller),
 ) -> EnqueueResponse:
+    if admission is not None:
+        admission.check_client(client) # 429 when over the rate (or the backlog is too long, from the service)
     try:
-        job_id = service.enqueue_processing(document_id)
+        job_id = await service.enqueue_processing(document_id, priority=priority, tenant=tenant)
     except DocumentNotFoundError:
         raise HTTPException(status_code=404, detail="Document not found")
     except InvalidDocumentStateError as e:
@@ -71,6 +341,8 @@ def enqueue_document(
 
 
 # DEBUG:
+# (needs get_documents_repo, get_queue from app.api.deps and process_job from app.workers.processor_stub;
+#  import them inside the handler so the API doesn't load worker code at startup)
 # ------------------------------------------------------------------------
 # @router.post("/_debug/process-next")
 # def debug_process_next() -> dict:
@@ -82,4 +354,5 @@ def enqueue_document(
 #         return {"processed": False, "reason": "queue empty"}
 #
 #     process_job(repo=repo, document_id=msg["document_id"])
+#     queue.ack(msg["receipt_handle"])
 #     return {"processed": True, "document_id": msg["document_id"]}
\ No newline at end of file
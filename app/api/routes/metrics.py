@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from app.infrastructure.metrics.app_metrics import REGISTRY
+from app.infrastructure.metrics.registry import CONTENT_TYPE
+
+router = APIRouter()
+
+# Prometheus scrape endpoint (text exposition format)
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,32 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.deps import get_async_document_service
+from app.api.schemas.stats import StageLatencyResponse, StagePercentiles
+from app.core.settings import settings
+from app.domain.models.document import DocumentStatus
+from app.services.async_document_service import AsyncDocumentService
+from app.services.document_service import FINAL_STATUSES
+
+router = APIRouter(prefix="/stats")
+
+
+# Where documents spend their time: percentiles per lifecycle stage of the documents
+# that finished in the last window_seconds (all processes: read from the repository)
+# e.g. GET /stats/stages?window_seconds=900&status=COMPLETED
+@router.get("/stages", response_model=StageLatencyResponse)
+async def stage_latency(
+        window_seconds: float = Query(3600, gt=0, le=30 * 24 * 3600),
+        status: DocumentStatus | None = None, # COMPLETED or FAILED (default: both)
+        service: AsyncDocumentService = Depends(get_async_document_service),
+) -> StageLatencyResponse:
+    if status is not None and status not in FINAL_STATUSES:
+        raise HTTPException(status_code=400, detail="status must be COMPLETED or FAILED")
+    report = await service.stage_latency(window_seconds, status=status, max_documents=settings.STAGE_STATS_MAX_DOCUMENTS)
+    return StageLatencyResponse(
+        window_seconds=window_seconds,
+        documents=report.documents,
+        truncated=report.truncated,
+        stages={stage: StagePercentiles(**asdict(latency)) for stage, latency in report.stages.items()},
+    )
@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# Response for GET /capacity
+class CapacityResponse(BaseModel):
+    queue_depth: int                  # Jobs waiting
+    in_flight: int                    # Jobs a worker has received and not finished
+    processing_rate: float            # Jobs finished per second (recent average)
+    arrival_rate: float               # Jobs enqueued per second (recent average)
+    estimated_queue_wait_seconds: Optional[float] # None = unknown (jobs waiting, none finished recently)
+    recommended_workers: int          # Worker processes needed for this load
+    sampled_at: Optional[datetime]    # None = the first sample isn't taken yet
@@ -1,11 +1,13 @@
-from pydantic import BaseModel # Helps validate and serialize data
+from pydantic import BaseModel, Field # Helps validate and serialize data
 from datetime import datetime
+from app.core.settings import settings
 from app.domain.models.document import DocumentStatus
 
 # What the client must send when asking to start an upload
 class InitiateUploadRequest(BaseModel):
     filename: str
     content_type: str
+    sha256: str | None = None # Optional hex digest of the file: enforced on upload, lets processing reuse earlier results
 
 # What the API returns after creating the document
 class InitiateUploadResponse(BaseModel):
@@ -13,6 +15,68 @@ class InitiateUploadResponse(BaseModel):
     object_key: str
     upload_url: str
 
+# One file in a batch (no sha256: batch URLs are signed in bulk without checksums)
+class InitiateUploadBatchFile(BaseModel):
+    filename: str
+    content_type: str
+
+# Request for starting many uploads at once
+class InitiateUploadBatchRequest(BaseModel):
+    files: list[InitiateUploadBatchFile] = Field(min_length=1, max_length=settings.UPLOAD_BATCH_MAX_SIZE)
+
+# Outcome for one file in a batch: upload values on success, error otherwise
+class InitiateUploadBatchItem(BaseModel):
+    filename: str
+    document_id: str | None = None
+    object_key: str | None = None
+    upload_url: str | None = None
+    error: str | None = None
+
+# Response for a batch upload, items in the same order as the request
+class InitiateUploadBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[InitiateUploadBatchItem]
+
+# Start a multipart upload: total size in bytes, and optionally the part size (default MULTIPART_PART_SIZE)
+class InitiateMultipartUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    file_size: int = Field(gt=0)
+    part_size: int | None = None
+
+# Upload link for one part (part numbers start at 1)
+class MultipartPartUrl(BaseModel):
+    part_number: int
+    upload_url: str
+
+class InitiateMultipartUploadResponse(BaseModel):
+    document_id: str
+    object_key: str
+    upload_id: str
+    part_size: int
+    parts: list[MultipartPartUrl]
+
+# Ask for fresh URLs for some parts (resume, or retry a failed part)
+class MultipartPartUrlsRequest(BaseModel):
+    upload_id: str
+    part_numbers: list[int] = Field(min_length=1, max_length=10_000)
+
+class MultipartPartUrlsResponse(BaseModel):
+    parts: list[MultipartPartUrl]
+
+# One uploaded part: its number and the ETag header returned by the part PUT
+class CompletedPart(BaseModel):
+    part_number: int
+    etag: str
+
+class CompleteMultipartUploadRequest(BaseModel):
+    upload_id: str
+    parts: list[CompletedPart] = Field(min_length=1, max_length=10_000)
+
+class AbortMultipartUploadRequest(BaseModel):
+    upload_id: str
+
 # Response model for returning full document details to the client
 class DocumentResponse(BaseModel):
     id: str
@@ -23,7 +87,42 @@ class DocumentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     last_error: str | None = None
+    # Set once processing has read the file
+    sha256: str | None = None
+    size_bytes: int | None = None
+    detected_content_type: str | None = None
+    page_count: int | None = None
+    width: int | None = None
+    height: int | None = None
+    # When it entered each stage (null = not reached yet); see the document lifecycle
+    queued_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    version: int = 1 # Bumped by every change to the document
+
+# One page of documents plus the cursor for the next page (null on the last page)
+class DocumentListResponse(BaseModel):
+    items: list[DocumentResponse]
+    next_cursor: str | None = None
 
 # Response when enqueuing a document for processing
 class EnqueueResponse(BaseModel):
     job_id: str # The ID of the queued job
+
+# Request for enqueuing many documents at once
+class EnqueueBatchRequest(BaseModel):
+    document_ids: list[str] = Field(min_length=1, max_length=settings.ENQUEUE_BATCH_MAX_SIZE)
+    priority: str | None = None # Queue lane (default: the last, lowest-priority lane)
+    tenant: str | None = None   # Who the jobs are for; tenants take turns within a lane
+
+# Outcome for one document in a batch: job_id on success, error otherwise
+class EnqueueBatchItem(BaseModel):
+    document_id: str
+    job_id: str | None = None
+    error: str | None = None
+
+# Response for a batch enqueue
+class EnqueueBatchResponse(BaseModel):
+    enqueued: int # How many documents made it onto the queue
+    failed: int   # How many did not
+    results: list[EnqueueBatchItem]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+# Seconds one lifecycle stage took, over the documents that went through it
+class StagePercentiles(BaseModel):
+    count: int
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+# Response for GET /stats/stages
+class StageLatencyResponse(BaseModel):
+    window_seconds: float
+    documents: int  # Finished documents read
+    truncated: bool # More finished in the window than STAGE_STATS_MAX_DOCUMENTS: only the oldest were read
+    stages: dict[str, StagePercentiles] # upload, queue, processing, total
@@ -7,12 +7,29 @@ def get_env(name: str, default: str | None = None) -> str:
         raise RuntimeError(f"Missing required environment variable: {name}")
     return value
 
+# Helper: parses "a:1,b:2" (or "a=x,b=y" with sep="=") into an ordered dict of strings
+def parse_pairs(value: str, sep: str = ":") -> dict[str, str]:
+    pairs = {}
+    for item in value.split(","):
+        if item.strip():
+            name, _, setting = item.partition(sep)
+            pairs[name.strip()] = setting.strip()
+    return pairs
+
 
 # Central config class - loaded once, used everywhere
 class Settings:
-    # Main toggle: "local" = in-memory fakes, "aws" = real S3/SQS
+    # Main toggle: "local" = in-memory fakes, "aws" = real S3/SQS,
+    # "broker" = in-memory fakes hosted by the local broker process, shared by API and worker processes
     APP_ENV: str = os.getenv("APP_ENV", "local") # Default to local for safety
 
+    # Unix socket of the local broker (python -m app.infrastructure.broker.broker_server),
+    # used by APP_ENV=broker (queue + storage) and REPO_BACKEND=broker (documents)
+    BROKER_SOCKET_PATH: str = os.getenv("BROKER_SOCKET_PATH", "/tmp/document-broker.sock")
+
+    # Repository the broker process hosts: "memory" or "compact"
+    BROKER_REPO_BACKEND: str = os.getenv("BROKER_REPO_BACKEND", "memory")
+
     # AWS-specific (only used if APP_ENV is "aws")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")  # Default region
 
@@ -23,9 +40,179 @@ class Settings:
     # 300 - 5 minutes - good balance between security and usability
     S3_PRESIGN_EXPIRES_IN: int = int(os.getenv("S3_PRESIGN_EXPIRES_IN", "300"))
 
+    # Multipart uploads (large files): default part size, and how long part URLs stay valid.
+    # Part URLs live longer than single-PUT URLs because a big upload takes a while.
+    MULTIPART_PART_SIZE: int = int(os.getenv("MULTIPART_PART_SIZE", str(16 * 1024 * 1024)))  # 16 MiB
+    S3_MULTIPART_PRESIGN_EXPIRES_IN: int = int(os.getenv("S3_MULTIPART_PRESIGN_EXPIRES_IN", "3600"))
+
+    # Outside AWS mode, upload URLs point at this API's PUT /documents/{id}/content (the stand-in for S3):
+    # the address clients reach the API on, and the largest body that route accepts
+    LOCAL_UPLOAD_BASE_URL: str = os.getenv("LOCAL_UPLOAD_BASE_URL", "http://127.0.0.1:8000").rstrip("/")
+    UPLOAD_CONTENT_MAX_BYTES: int = int(os.getenv("UPLOAD_CONTENT_MAX_BYTES", str(100 * 1024 * 1024)))  # 100 MiB
+
     # Your SQS queue URL (required for real queue when APP_ENV=aws)
     SQS_QUEUE_URL: str = os.getenv("SQS_QUEUE_URL", "")
 
+    # Job lanes in priority order, each with its share of worker slots ("name:weight,...").
+    # Single enqueues default to the first lane, batch enqueues to the last.
+    QUEUE_LANES: dict[str, int] = {
+        name: int(weight or 1) for name, weight in parse_pairs(os.getenv("QUEUE_LANES", "interactive:4,bulk:1")).items()
+    }
+
+    # One SQS queue per extra lane ("bulk=https://...,..."); the first lane uses SQS_QUEUE_URL.
+    # A lane without its own queue shares the first lane's queue.
+    SQS_LANE_QUEUE_URLS: dict[str, str] = parse_pairs(os.getenv("SQS_LANE_QUEUE_URLS", ""), sep="=")
+
+    # Where documents are stored: "memory" (lost on restart), "compact" (in memory, packed into
+    # columns: for millions of documents in one process), "sqlite" (durable file)
+    # or "broker" (in the local broker process, shared by API and worker processes)
+    REPO_BACKEND: str = os.getenv("REPO_BACKEND", "memory")
+
+    # SQLite database file (only used when REPO_BACKEND=sqlite)
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "documents.db")
+
+    # Read-through cache in front of repo.get (0 = off)
+    # Most useful with a slow/remote backing store; entries live at most REPO_CACHE_TTL_SECONDS,
+    # which bounds staleness for updates made by other processes
+    REPO_CACHE_MAX_ENTRIES: int = int(os.getenv("REPO_CACHE_MAX_ENTRIES", "0"))
+    REPO_CACHE_TTL_SECONDS: float = float(os.getenv("REPO_CACHE_TTL_SECONDS", "2"))
+
+    # Async request path: threads reserved for blocking adapters (boto3 SQS calls, SQLite).
+    # Sized for I/O waits, separate from FastAPI's threadpool. Also the boto3 connection pool size.
+    ASYNC_BLOCKING_MAX_WORKERS: int = int(os.getenv("ASYNC_BLOCKING_MAX_WORKERS", "64"))
+
+    # Status events (GET /documents/{id}/events and /wait)
+    # Seconds between SSE keep-alive comments on an idle stream
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+    # How often (seconds) the API looks for updates made by other processes (REPO_BACKEND=sqlite or broker)
+    EVENTS_POLL_INTERVAL: float = float(os.getenv("EVENTS_POLL_INTERVAL", "1"))
+
+    # Longest wait accepted by GET /documents/{id}/wait
+    EVENTS_LONG_POLL_MAX_SECONDS: float = float(os.getenv("EVENTS_LONG_POLL_MAX_SECONDS", "60"))
+
+    # Processing results by content hash, so re-uploaded files skip the processor
+    # "memory" = in-process LRU only, "sqlite" = LRU + a table in SQLITE_PATH shared by all workers, "off" = disabled
+    RESULT_CACHE_BACKEND: str = os.getenv("RESULT_CACHE_BACKEND", "memory")
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+
+    # Max files accepted by POST /documents/initiate-upload-batch
+    UPLOAD_BATCH_MAX_SIZE: int = int(os.getenv("UPLOAD_BATCH_MAX_SIZE", "1000"))
+
+    # Max page size for GET /documents
+    LIST_MAX_LIMIT: int = int(os.getenv("LIST_MAX_LIMIT", "500"))
+
+    # Encode document responses (GET /documents, /documents/{id}, /wait, SSE) straight from the domain
+    # object to JSON bytes (orjson if installed), skipping the pydantic response models
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+    # Most documents GET /stats/stages reads to compute its percentiles (oldest in the window first)
+    STAGE_STATS_MAX_DOCUMENTS: int = int(os.getenv("STAGE_STATS_MAX_DOCUMENTS", "10000"))
+
+    # Max document IDs accepted by POST /documents/enqueue-batch
+    ENQUEUE_BATCH_MAX_SIZE: int = int(os.getenv("ENQUEUE_BATCH_MAX_SIZE", "1000"))
+
+    # Admission control: enqueues refused with 429 + Retry-After (every limit is off at 0)
+    # Per-client token bucket: jobs per second on average, and at most this many at once after a pause.
+    # Counted per API process.
+    ADMISSION_CLIENT_RATE: float = float(os.getenv("ADMISSION_CLIENT_RATE", "0"))
+    ADMISSION_CLIENT_BURST: float = float(os.getenv("ADMISSION_CLIENT_BURST", "100"))
+
+    # Request header naming the client (e.g. an API key header set by the gateway); empty = the client's IP address
+    ADMISSION_CLIENT_HEADER: str = os.getenv("ADMISSION_CLIENT_HEADER", "")
+
+    # Refuse new jobs while one enqueued now would wait longer than this for a worker (estimated from the backlog)
+    ADMISSION_MAX_QUEUE_WAIT_SECONDS: float = float(os.getenv("ADMISSION_MAX_QUEUE_WAIT_SECONDS", "0"))
+
+    # Refuse new jobs while this many are already waiting in the queue
+    ADMISSION_MAX_BACKLOG: int = int(os.getenv("ADMISSION_MAX_BACKLOG", "0"))
+
+    # Backlog sampling (admission control and GET /capacity): seconds between samples,
+    # and the window the processing and arrival rates are averaged over
+    BACKLOG_SAMPLE_SECONDS: float = float(os.getenv("BACKLOG_SAMPLE_SECONDS", "5"))
+    BACKLOG_RATE_WINDOW_SECONDS: float = float(os.getenv("BACKLOG_RATE_WINDOW_SECONDS", "60"))
+
+    # GET /capacity: recommend enough workers that waiting jobs are started within this many seconds,
+    # between the min and max worker count
+    CAPACITY_TARGET_QUEUE_WAIT_SECONDS: float = float(os.getenv("CAPACITY_TARGET_QUEUE_WAIT_SECONDS", "30"))
+    CAPACITY_MIN_WORKERS: int = int(os.getenv("CAPACITY_MIN_WORKERS", "1"))
+    CAPACITY_MAX_WORKERS: int = int(os.getenv("CAPACITY_MAX_WORKERS", "100"))
+
+    # Worker runtime
+    # How many jobs one worker process runs at the same time
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "4"))
+
+    # "thread" for I/O-bound jobs, "process" for CPU-bound jobs
+    WORKER_POOL_MODE: str = os.getenv("WORKER_POOL_MODE", "thread")
+
+    # Extra messages pulled ahead of time so free slots never wait on the queue
+    WORKER_PREFETCH: int = int(os.getenv("WORKER_PREFETCH", "4"))
+
+    # How often (seconds) the worker logs its jobs/second
+    WORKER_REPORT_INTERVAL: float = float(os.getenv("WORKER_REPORT_INTERVAL", "10"))
+
+    # Retries: a job is delivered at most this many times (retries and worker crashes both count),
+    # then its document is FAILED and the message goes to the dead-letter queue
+    WORKER_MAX_ATTEMPTS: int = int(os.getenv("WORKER_MAX_ATTEMPTS", "5"))
+
+    # Backoff before retry n is random between 0 and min(max, base * 2^(n-1)) seconds
+    WORKER_RETRY_BASE_SECONDS: float = float(os.getenv("WORKER_RETRY_BASE_SECONDS", "2"))
+    WORKER_RETRY_MAX_SECONDS: float = float(os.getenv("WORKER_RETRY_MAX_SECONDS", "300"))
+
+    # Metrics (GET /metrics, Prometheus text format)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Port for the worker's own /metrics endpoint (0 = don't serve one)
+    WORKER_METRICS_PORT: int = int(os.getenv("WORKER_METRICS_PORT", "0"))
+
+    # Sampling profiler: jobs / requests that take at least this many seconds get their sampled stacks
+    # written to PROFILE_DIR as a flame-graph-ready .folded file (0 = off, no sampling at all)
+    PROFILE_SLOW_JOB_SECONDS: float = float(os.getenv("PROFILE_SLOW_JOB_SECONDS", "0"))
+    PROFILE_SLOW_REQUEST_SECONDS: float = float(os.getenv("PROFILE_SLOW_REQUEST_SECONDS", "0"))
+
+    # Milliseconds between two stack samples, while a profiled job or request runs
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+    # Where profiles go, and how many of the newest are kept there
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "100"))
+
+    # SQS queue depth is fetched at most once per this many seconds (one API call each time)
+    QUEUE_DEPTH_CACHE_SECONDS: float = float(os.getenv("QUEUE_DEPTH_CACHE_SECONDS", "15"))
+
+    # Build adapters/clients when the API starts instead of on the first request
+    STARTUP_WARMUP: bool = os.getenv("STARTUP_WARMUP", "false").lower() == "true"
+
+    # Warm-up also opens one connection to S3 and SQS (a HEAD on the bucket, a get_queue_attributes call)
+    STARTUP_WARMUP_CONNECT: bool = os.getenv("STARTUP_WARMUP_CONNECT", "true").lower() == "true"
+
+    # SQS consumer
+    # Long-poll wait per receive_message call (max 20)
+    SQS_WAIT_TIME_SECONDS: int = int(os.getenv("SQS_WAIT_TIME_SECONDS", "20"))
+
+    # How long a received message stays hidden from other workers (SQS and the in-memory queue).
+    # Jobs that run longer get their visibility extended by the worker heartbeat.
+    SQS_VISIBILITY_TIMEOUT: int = int(os.getenv("SQS_VISIBILITY_TIMEOUT", "60"))
+
+    # Where jobs go once they are given up on (empty = they are only deleted; the document stays FAILED)
+    SQS_DEAD_LETTER_QUEUE_URL: str = os.getenv("SQS_DEAD_LETTER_QUEUE_URL", "")
+
+    # Auto-enqueue on upload (python -m app.workers.run_ingestor)
+    # Where storage "object created" events come from: "sqs" (S3 event notifications in S3_EVENTS_QUEUE_URL),
+    # "files" (notification files dropped in UPLOAD_EVENTS_DIR), "broker" (the local broker's storage,
+    # started with --upload-events) or "memory" (this process's in-memory storage).
+    # Empty = by APP_ENV: aws -> sqs, broker -> broker, local -> files
+    UPLOAD_EVENTS_SOURCE: str = os.getenv("UPLOAD_EVENTS_SOURCE", "")
+
+    # SQS queue the bucket's s3:ObjectCreated:* notifications are sent to (not the jobs queue)
+    S3_EVENTS_QUEUE_URL: str = os.getenv("S3_EVENTS_QUEUE_URL", "")
+
+    # Directory watched when UPLOAD_EVENTS_SOURCE=files
+    UPLOAD_EVENTS_DIR: str = os.getenv("UPLOAD_EVENTS_DIR", "upload-events")
+
+    # Most events turned into jobs in one go (one queue batch)
+    UPLOAD_EVENTS_BATCH_SIZE: int = int(os.getenv("UPLOAD_EVENTS_BATCH_SIZE", "100"))
+
 # Global instance
 settings = Settings()
 
@@ -8,3 +8,14 @@ class InvalidDocumentStateError(Exception):
 # Raised when user input violates business rules (content type, filename, etc...)
 class InvalidDocumentInputError(Exception):
     pass
+
+# Raised by the processor when the uploaded bytes are not one of the allowed content types
+class UnsupportedContentError(Exception):
+    pass
+
+# Raised when a job can't be accepted right now (client over its rate, or the backlog is too long)
+# retry_after: seconds until trying again has a chance (the API sends it as Retry-After with a 429)
+class AdmissionRejectedError(Exception):
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -14,7 +14,7 @@ class DocumentStatus(str, Enum):
     FAILED = "FAILED"
 
 # A form or record for one uploaded file
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class Document:
     id: str
     filename: str
@@ -25,11 +25,63 @@ class Document:
     updated_at: datetime
     last_error: Optional[str] = None
 
+    # Filled in by the processor once the uploaded file has been read
+    sha256: Optional[str] = None                 # Hex digest of the content
+    size_bytes: Optional[int] = None
+    detected_content_type: Optional[str] = None  # Sniffed from the bytes, not what the client declared
+    page_count: Optional[int] = None             # PDFs
+    width: Optional[int] = None                  # Images, in pixels
+    height: Optional[int] = None
+
+    # When the document entered each stage (set by repo.transition). None = not reached on this trip.
+    # After a retry, queued_at stays the original enqueue (the retry counts as queue time) and
+    # started_at/finished_at are the last attempt's.
+    queued_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None  # PROCESSING
+    finished_at: Optional[datetime] = None # COMPLETED or FAILED
+
+    # Bumped by every write (1 = as created). Two reads with the same version saw the same document.
+    version: int = 1
+
     def with_status(self, new_status: DocumentStatus, error: str | None = None) -> "Document":
         from dataclasses import replace
+        now = datetime.now(timezone.utc)
         return replace(
             self,
             status=new_status,
-            updated_at=datetime.now(timezone.utc),
+            updated_at=now,
             last_error=error if error is not None else self.last_error,
-        )
\ No newline at end of file
+            **stage_timestamps(self.status, new_status, now),
+        )
+
+    # Seconds spent in each stage reached so far:
+    # upload (created -> queued), queue (queued -> started), processing (started -> finished), total (created -> finished)
+    def stage_seconds(self) -> dict[str, float]:
+        spans = {
+            "upload": (self.created_at, self.queued_at),
+            "queue": (self.queued_at, self.started_at),
+            "processing": (self.started_at, self.finished_at),
+            "total": (self.created_at, self.finished_at),
+        }
+        return {
+            stage: max((end - start).total_seconds(), 0.0)
+            for stage, (start, end) in spans.items()
+            if start is not None and end is not None
+        }
+
+
+# Stage timestamps to write when a document moves from `previous` to `status` at `now`.
+# Entering a stage sets its time and clears the later ones, so the times always describe
+# the current trip through the lifecycle. A retry (PROCESSING -> QUEUED) keeps queued_at
+# (previous=None: not known, treated as a new enqueue).
+def stage_timestamps(previous: Optional[DocumentStatus], status: DocumentStatus, now: datetime) -> dict[str, Optional[datetime]]:
+    if status == DocumentStatus.INITIATED:
+        return {"queued_at": None, "started_at": None, "finished_at": None}
+    if status == DocumentStatus.QUEUED:
+        changes = {"started_at": None, "finished_at": None}
+        if previous != DocumentStatus.PROCESSING:
+            changes["queued_at"] = now
+        return changes
+    if status == DocumentStatus.PROCESSING:
+        return {"started_at": now, "finished_at": None}
+    return {"finished_at": now}
\ No newline at end of file
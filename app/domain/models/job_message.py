@@ -0,0 +1,48 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+# The standard shape of a processing job message
+# This is what the queue carries, and what the worker will receive
+@dataclass(frozen=True)
+class JobMessage:
+    job_id: str            # Unique ID for the job
+    document_id: str       # Document ID
+    s3_key: str            # Where uploaded file lives
+    requested_at: datetime # When job was enqueued
+    receipt_handle: Optional[str] = None # Handle used to ack/extend the message lease
+    priority: Optional[str] = None       # Lane the job was received from (see QUEUE_LANES)
+    tenant: Optional[str] = None         # Who the job belongs to; tenants take turns within a lane
+    attempt: int = 1                     # Delivery number (1 = first try); retries and crashed tries both count
+
+    # Build a job from an InMemoryQueue message dict
+    @classmethod
+    def from_queue_dict(cls, raw: dict) -> "JobMessage":
+        return cls(
+            job_id=raw["job_id"],
+            document_id=raw["document_id"],
+            s3_key=raw["object_key"],
+            requested_at=raw.get("requested_at") or datetime.now(timezone.utc),
+            receipt_handle=raw.get("receipt_handle"),
+            priority=raw.get("priority"),
+            tenant=raw.get("tenant"),
+            attempt=raw.get("receive_count", 1),
+        )
+
+    # Build a job from one entry of SQS receive_message()["Messages"]
+    # Body is the JSON written by SQSQueue.enqueue_document_processing; lane is the queue it came from
+    @classmethod
+    def from_sqs_message(cls, message: dict, lane: Optional[str] = None) -> "JobMessage":
+        body = json.loads(message["Body"])
+        requested_at = body.get("requested_at")
+        return cls(
+            job_id=message["MessageId"],
+            document_id=body["document_id"],
+            s3_key=body["s3_key"],
+            requested_at=datetime.fromisoformat(requested_at) if requested_at else datetime.now(timezone.utc),
+            receipt_handle=message["ReceiptHandle"],
+            priority=lane or body.get("priority"),
+            tenant=body.get("tenant"),
+            attempt=int(message.get("Attributes", {}).get("ApproximateReceiveCount", 1)),
+        )
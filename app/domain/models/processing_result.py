@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Optional
+
+# What processing learned about one file's content
+# Depends only on the bytes, so it can be reused for any document with the same sha256
+@dataclass(frozen=True)
+class ProcessingResult:
+    sha256: str
+    size_bytes: int
+    detected_content_type: str
+    page_count: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
@@ -1,17 +1,123 @@
 # What actions does the system need to do with documents?
-#   - Save a document (Create)
+#   - Save a document (Create), or many at once (Create many)
 #   - Get a document by its id (Get)
 #   - Save changes to an existing document (Update)
+#   - Move a document to a new status, only if it is still in the status we expect (Transition)
+#   - List documents by status / last update, one page at a time (List)
+#   - Count documents in a status, e.g. finished in the last minute (Count)
 
-from typing import Protocol, Optional
-from app.domain.models.document import Document
+from datetime import datetime
+from typing import Any, Collection, Protocol, Optional
+from app.domain.models.document import Document, DocumentStatus
+
+# Position in a listing: the (updated_at, id) of the last document on the previous page
+PageKey = tuple[datetime, str]
+
+# What transition() accepts as the expected status: one status, or any of several
+ExpectedStatus = DocumentStatus | Collection[DocumentStatus]
+
+# Fields transition() may change along with the status (id, s3_key, created_at, ... never change)
+TRANSITION_FIELDS = frozenset({
+    "last_error", "sha256", "size_bytes", "detected_content_type", "page_count", "width", "height",
+})
+
+# The expected statuses as a set, and a check of the extra changes (shared by every adapter)
+def transition_args(expected_status: ExpectedStatus, changes: dict[str, Any]) -> frozenset[DocumentStatus]:
+    unknown = set(changes) - TRANSITION_FIELDS
+    if unknown:
+        raise ValueError(f"transition() can't change: {', '.join(sorted(unknown))}")
+    if isinstance(expected_status, DocumentStatus):
+        return frozenset((expected_status,))
+    return frozenset(expected_status)
+
+# transition()'s started_before condition: only a PROCESSING document is held to it,
+# and one without a started_at (stored before stage timestamps existed) can't prove its claim is fresh
+def claim_is_stale(status: DocumentStatus, started_at: Optional[datetime], started_before: Optional[datetime]) -> bool:
+    if started_before is None or status != DocumentStatus.PROCESSING:
+        return True
+    return started_at is None or started_at < started_before
 
 class DocumentsRepository(Protocol):
     def create(self, document: Document) -> Document:
         ...
 
+    def create_many(self, documents: list[Document]) -> list[Document]:
+        ...
+
     def get(self, document_id: str) -> Optional[Document]:
         ...
 
+    # Overwrites the stored document (bumping its version) and returns what was stored
     def update(self, document: Document) -> Document:
-        ...
\ No newline at end of file
+        ...
+
+    # Compare-and-set, atomically and in one call. If the document is in expected_status (or one of them):
+    #   - set new_status plus `changes` (fields from TRANSITION_FIELDS)
+    #   - bump updated_at and version
+    #   - write the stage timestamps (stage_timestamps, at the same time as updated_at)
+    #   - return the new document
+    # With started_before, a document in PROCESSING only matches if its started_at is older
+    # (a worker taking over a claim that outlived its lease, see claim_is_stale).
+    # Returns None if it doesn't exist or is in another status, i.e. someone else moved it first.
+    # Concurrent workers and API replicas rely on exactly one of them winning,
+    # so no lock is needed around get + update.
+    def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        ...
+
+    # Oldest-updated first, ordered by (updated_at, id).
+    # Only documents with updated_at > updated_after, and (updated_at, id) > after.
+    # Must cost O(page size), not O(total documents).
+    def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        ...
+
+    # How many documents are in `status`, only counting updated_at > updated_after if given.
+    # Must be an index range count (O(log n) or close), never a scan of every document.
+    def count_documents(self, status: DocumentStatus, updated_after: Optional[datetime] = None) -> int:
+        ...
+
+
+# Same contract for the async request path (implementations must never block the event loop)
+class AsyncDocumentsRepository(Protocol):
+    async def create(self, document: Document) -> Document:
+        ...
+
+    async def create_many(self, documents: list[Document]) -> list[Document]:
+        ...
+
+    async def get(self, document_id: str) -> Optional[Document]:
+        ...
+
+    async def update(self, document: Document) -> Document:
+        ...
+
+    async def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        ...
+
+    async def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        ...
@@ -1,5 +1,57 @@
-from typing import Protocol
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+# Outcome of one entry in a batch enqueue: either a job_id or an error message
+@dataclass(frozen=True)
+class EnqueueResult:
+    document_id: str
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.job_id is not None
 
 class QueuePort(Protocol):
-    def enqueue_document_processing(self, document_id: str, object_key: str) -> str:
-        ...
\ No newline at end of file
+    # Which kind of queue this is ("memory", "sqs", "broker"): the `queue` label of the queue metrics
+    name: str
+
+    # Lanes jobs can be sent to, highest priority first (priority = a lane name).
+    # Workers share their slots between lanes by weight; tenants take turns within a lane.
+    @property
+    def lanes(self) -> list[str]:
+        ...
+
+    # priority: lane name (None or unknown = first lane); tenant: who the job is for (optional)
+    def enqueue_document_processing(
+            self, document_id: str, object_key: str, priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> str:
+        ...
+
+    # jobs: (document_id, object_key) pairs, all sent with the same priority and tenant.
+    # Returns one result per job, in the same order. A failed entry must not affect the others.
+    def enqueue_document_processing_batch(
+            self, jobs: list[tuple[str, str]], priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> list[EnqueueResult]:
+        ...
+
+    # Backlog for monitoring: messages waiting, and messages received but not finished (may be approximate)
+    # In one lane, or all lanes when lane is None
+    def depth(self, lane: Optional[str] = None) -> int:
+        ...
+
+    def in_flight(self, lane: Optional[str] = None) -> int:
+        ...
+
+
+# Same contract for the async request path (implementations must never block the event loop)
+class AsyncQueuePort(Protocol):
+    async def enqueue_document_processing(
+            self, document_id: str, object_key: str, priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> str:
+        ...
+
+    async def enqueue_document_processing_batch(
+            self, jobs: list[tuple[str, str]], priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> list[EnqueueResult]:
+        ...
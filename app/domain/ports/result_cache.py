@@ -0,0 +1,14 @@
+from typing import Optional, Protocol
+
+from app.domain.models.processing_result import ProcessingResult
+
+# Processing results keyed by content hash (sha256 hex digest)
+# Implementations are called from many worker threads at once
+class ResultCachePort(Protocol):
+    # The stored result for this content, or None
+    def get(self, sha256: str) -> Optional[ProcessingResult]:
+        ...
+
+    # Stores (or replaces) the result under result.sha256
+    def put(self, result: ProcessingResult) -> None:
+        ...
@@ -0,0 +1,24 @@
+from typing import Optional, Protocol
+
+from app.domain.models.document import Document
+
+# One open watch on a document's status (e.g. one SSE connection)
+class StatusSubscription(Protocol):
+    document_id: str
+
+    # The next published version of the document, or None if nothing arrived within `timeout` seconds
+    async def next(self, timeout: float) -> Optional[Document]:
+        ...
+
+# Publish/subscribe hook for document updates
+class StatusEventsPort(Protocol):
+    # Called after every repository update, from any thread; must be cheap when nobody is subscribed
+    def publish(self, document: Document) -> None:
+        ...
+
+    # Called on the event loop that will consume the events
+    def subscribe(self, document_id: str) -> StatusSubscription:
+        ...
+
+    def unsubscribe(self, subscription: StatusSubscription) -> None:
+        ...
@@ -1,10 +1,82 @@
-from typing import Protocol
+from typing import BinaryIO, Optional, Protocol
+
+# Multipart limits every storage adapter follows (they are S3's)
+MULTIPART_MIN_PART_SIZE = 5 * 1024 ** 2       # 5 MiB, except the last part
+MULTIPART_MAX_PART_SIZE = 5 * 1024 ** 3       # 5 GiB
+MULTIPART_MAX_PARTS = 10_000
+MULTIPART_MAX_OBJECT_SIZE = 5 * 1024 ** 4     # 5 TiB
 
 class StoragePort(Protocol):
 # Given the document ID and original filename, return a safe path like "documents/123abc/resume.pdf
     def create_object_key(self, document_id: str, filename: str) -> str:
         ...
 
+# The reverse: the document ID inside a key made by create_object_key, or None if the key doesn't have that layout
+# (used to find the document a storage "object created" event is about)
+    def document_id_from_key(self, object_key: str) -> Optional[str]:
+        ...
+
 # Given that path and file type, return a temporary upload link (a long URL)
-    def create_presigned_upload_url(self, object_key: str, content_type: str) -> str:
-        ...
\ No newline at end of file
+# With sha256 (hex), the upload must carry that checksum: storage rejects other bytes and keeps the hash
+    def create_presigned_upload_url(self, object_key: str, content_type: str, sha256: Optional[str] = None) -> str:
+        ...
+
+# Same as above for many files at once: items are (object_key, content_type), URLs come back in the same order
+    def create_presigned_upload_urls(self, items: list[tuple[str, str]]) -> list[str]:
+        ...
+
+# Stores a whole object, as a PUT to the upload URL would (PUT /documents/{id}/content uses it)
+    def put_object(self, object_key: str, data: bytes) -> None:
+        ...
+
+# Multipart upload (large files, parts pushed in parallel): starts one and returns its upload_id
+    def create_multipart_upload(self, object_key: str, content_type: str) -> str:
+        ...
+
+# One upload link per part number (1-based), same order as part_numbers
+    def create_presigned_part_urls(self, object_key: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        ...
+
+# Stitches the uploaded parts into the final object; parts are (part_number, etag) in ascending order
+    def complete_multipart_upload(self, object_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        ...
+
+# Drops the upload and every part uploaded so far
+    def abort_multipart_upload(self, object_key: str, upload_id: str) -> None:
+        ...
+
+# Opens a stored object for reading (the processor reads it in chunks, never all at once)
+# Raises FileNotFoundError if nothing was uploaded under that key; close the stream when done
+    def open_object(self, object_key: str) -> BinaryIO:
+        ...
+
+# SHA-256 (hex) of a stored object if storage already knows it (no download), else None
+    def content_sha256(self, object_key: str) -> Optional[str]:
+        ...
+
+
+# Same contract for the async request path (implementations must never block the event loop)
+class AsyncStoragePort(Protocol):
+    def create_object_key(self, document_id: str, filename: str) -> str:
+        ...
+
+    async def create_presigned_upload_url(self, object_key: str, content_type: str, sha256: Optional[str] = None) -> str:
+        ...
+
+    async def create_presigned_upload_urls(self, items: list[tuple[str, str]]) -> list[str]:
+        ...
+
+    async def put_object(self, object_key: str, data: bytes) -> None:
+        ...
+
+    async def create_multipart_upload(self, object_key: str, content_type: str) -> str:
+        ...
+
+    async def create_presigned_part_urls(self, object_key: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        ...
+
+    async def complete_multipart_upload(self, object_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        ...
+
+    async def abort_multipart_upload(self, object_key: str, upload_id: str) -> None:
+        ...
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Protocol
+
+# One "object created" notification from storage (a finished PUT or multipart upload).
+# receipt is whatever the source needs to ack it (SQS receipt handle, file path, ...);
+# events that came in the same message share it.
+@dataclass(frozen=True)
+class UploadEvent:
+    object_key: str
+    receipt: Any = None
+    created_at: Optional[datetime] = None # When storage created the object, if the event says
+
+
+class UploadEventsPort(Protocol):
+    # How long the ingestor should wait in each receive_events call: a remote queue long-polls
+    # (fewer, cheaper calls), local sources return quickly so drain mode can exit soon after the last event
+    wait_seconds: int
+
+    # Waits up to wait_seconds for events, returns at most max_events.
+    # Events not acked come back after the source's visibility timeout (delivery is at-least-once).
+    def receive_events(self, max_events: int = 10, wait_seconds: int = 0) -> list[UploadEvent]:
+        ...
+
+    # Done with these events: they won't be delivered again
+    def ack_events(self, events: list[UploadEvent]) -> None:
+        ...
@@ -1,5 +1,6 @@
 from functools import lru_cache
 import boto3
+from botocore.config import Config
 
 # Import central config (bucket, region, etc.)
 from app.core.settings import settings
@@ -19,9 +20,15 @@ def get_s3_client():
     """
     Gets a reusable S3 client using the cached session.
     Region comes from settings (defaults to us-east-1 if not set).
+    Presigned URLs are always SigV4 (botocore may otherwise pick legacy SigV2 for S3).
+    The connection pool matches the async path's thread pool (multipart calls run there).
     """
     session = get_boto3_session()
-    return session.client('s3', region_name=settings.AWS_REGION)
+    return session.client(
+        's3',
+        region_name=settings.AWS_REGION,
+        config=Config(signature_version='s3v4', max_pool_connections=settings.ASYNC_BLOCKING_MAX_WORKERS),
+    )
 
 # Returns the same SQS client every time (singleton per process)
 @lru_cache(maxsize=1)
@@ -29,6 +36,11 @@ def get_sqs_client():
     """
     Gets a reusable SQS client using the cached session.
     Region comes from settings (defaults to us-east-1 if not set).
+    The connection pool matches the async path's thread pool, so those threads never queue for a connection.
     """
     session = get_boto3_session()
-    return session.client('sqs', region_name=settings.AWS_REGION)
\ No newline at end of file
+    return session.client(
+        'sqs',
+        region_name=settings.AWS_REGION,
+        config=Config(max_pool_connections=settings.ASYNC_BLOCKING_MAX_WORKERS),
+    )
\ No newline at end of file
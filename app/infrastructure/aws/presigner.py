@@ -0,0 +1,160 @@
+import hashlib
+import hmac
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import parse_qs, quote, urlsplit
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+
+# Same encoding botocore uses for query strings (RFC 3986 unreserved chars only)
+def _encode(value: str) -> str:
+    return quote(value, safe="-_.~")
+
+
+# The SigV4 signing key only changes once a day per (secret, region, service).
+# Deriving it is 4 HMACs, so cache it instead of redoing it for every URL.
+@lru_cache(maxsize=16)
+def signing_key(secret_key: str, datestamp: str, region: str, service: str) -> bytes:
+    key = hmac.new(("AWS4" + secret_key).encode(), datestamp.encode(), hashlib.sha256).digest()
+    key = hmac.new(key, region.encode(), hashlib.sha256).digest()
+    key = hmac.new(key, service.encode(), hashlib.sha256).digest()
+    return hmac.new(key, b"aws4_request", hashlib.sha256).digest()
+
+
+class S3PutPresigner:
+    """
+    Presigns many S3 PUT URLs (PutObject, or UploadPart for multipart uploads) for one
+    bucket with SigV4 query auth, without going through botocore's request pipeline for every URL.
+
+    Built from one URL botocore already presigned for this bucket (the "template"),
+    so the endpoint, addressing style and path prefix are exactly what botocore chose.
+    Produces the same URLs botocore would (same params, same order, same signature).
+    """
+
+    def __init__(
+            self,
+            template_url: str,
+            template_key: str,
+            access_key: str,
+            secret_key: str,
+            token: Optional[str],
+            region: str,
+    ) -> None:
+        parts = urlsplit(template_url)
+        encoded_key = quote(template_key, safe="/~")
+        if not parts.path.endswith(encoded_key):
+            raise ValueError("Template URL does not end with the template key")
+
+        self._scheme = parts.scheme
+        self._host = parts.netloc
+        self._path_prefix = parts.path[: len(parts.path) - len(encoded_key)]
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._token = token
+        self._region = region
+
+    # Build from a botocore URL + the credentials it was signed with
+    @classmethod
+    def from_template(cls, template_url: str, template_key: str, credentials, region: str) -> "S3PutPresigner":
+        return cls(
+            template_url=template_url,
+            template_key=template_key,
+            access_key=credentials.access_key,
+            secret_key=credentials.secret_key,
+            token=credentials.token,
+            region=region,
+        )
+
+    # Re-sign the template's own key at the template's own timestamp.
+    # If this doesn't reproduce botocore's URL exactly, the caller should not use this presigner.
+    # Pass upload_id/part_number when the template is an UploadPart URL.
+    def matches(
+            self,
+            template_url: str,
+            template_key: str,
+            content_type: Optional[str] = None,
+            upload_id: Optional[str] = None,
+            part_number: Optional[int] = None,
+    ) -> bool:
+        query = parse_qs(urlsplit(template_url).query)
+        try:
+            amz_date = query["X-Amz-Date"][0]
+            expires = int(query["X-Amz-Expires"][0])
+        except (KeyError, ValueError):
+            return False
+        if upload_id is not None:
+            url = self.presign_upload_part(template_key, upload_id, part_number, expires, amz_date=amz_date)
+        else:
+            url = self.presign_put(template_key, content_type, expires, amz_date=amz_date)
+        return url == template_url
+
+    # PutObject URL; the client must send the same Content-Type
+    def presign_put(self, object_key: str, content_type: str, expires_in: int, amz_date: Optional[str] = None) -> str:
+        return self._presign(object_key, [], [("content-type", content_type.strip())], expires_in, amz_date)
+
+    # UploadPart URL for one part of a multipart upload
+    def presign_upload_part(
+            self,
+            object_key: str,
+            upload_id: str,
+            part_number: int,
+            expires_in: int,
+            amz_date: Optional[str] = None,
+    ) -> str:
+        operation_params = [("uploadId", upload_id), ("partNumber", str(part_number))]
+        return self._presign(object_key, operation_params, [], expires_in, amz_date)
+
+    # operation_params: query params of the S3 operation itself (botocore puts them first)
+    # headers: signed headers besides host, as (lowercase name, value)
+    def _presign(
+            self,
+            object_key: str,
+            operation_params: list[tuple[str, str]],
+            headers: list[tuple[str, str]],
+            expires_in: int,
+            amz_date: Optional[str],
+    ) -> str:
+        if amz_date is None:
+            amz_date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        datestamp = amz_date[:8]
+        scope = f"{datestamp}/{self._region}/s3/aws4_request"
+
+        headers = sorted(headers + [("host", self._host)])
+        signed_headers = ";".join(name for name, _ in headers)
+
+        # Auth params in the order botocore writes them
+        params = operation_params + [
+            ("X-Amz-Algorithm", ALGORITHM),
+            ("X-Amz-Credential", f"{self._access_key}/{scope}"),
+            ("X-Amz-Date", amz_date),
+            ("X-Amz-Expires", str(expires_in)),
+            ("X-Amz-SignedHeaders", signed_headers),
+        ]
+        if self._token is not None:
+            params.append(("X-Amz-Security-Token", self._token))
+
+        path = self._path_prefix + quote(object_key, safe="/~")
+        canonical_query = "&".join(f"{_encode(k)}={_encode(v)}" for k, v in sorted(params))
+        canonical_request = "\n".join([
+            "PUT",
+            path,
+            canonical_query,
+            "".join(f"{name}:{value}\n" for name, value in headers),
+            signed_headers,
+            UNSIGNED_PAYLOAD,
+        ])
+        string_to_sign = "\n".join([
+            ALGORITHM,
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+
+        key = signing_key(self._secret_key, datestamp, self._region, "s3")
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        query = "&".join(f"{_encode(k)}={_encode(v)}" for k, v in params)
+        return f"{self._scheme}://{self._host}{path}?{query}&X-Amz-Signature={signature}"
@@ -0,0 +1,181 @@
+import itertools
+import os
+import pickle
+import socket
+import struct
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional
+
+# Every message is a 4-byte big-endian length followed by a pickled tuple:
+#   request: (request_id, target, method, args, kwargs)   target = "repo" | "queue" | "storage"
+#   reply:   (request_id, ok, result)                     result = the return value, or the exception raised
+# Pickle is only safe between processes that trust each other: the broker's socket file is
+# created readable and writable by its owner only, so only that user's processes can connect.
+HEADER = struct.Struct("!I")
+MAX_FRAME_BYTES = 1 << 30
+READ_CHUNK = 256 * 1024
+
+
+def encode_frame(message: tuple) -> bytes:
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return HEADER.pack(len(payload)) + payload
+
+
+# Splits a byte stream into messages. One recv() may carry many frames (pipelined requests),
+# and read_frames() returns all complete ones at once so they can be handled as one batch.
+class FrameReader:
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._buffer = bytearray()
+
+    # Blocks until at least one message arrived; None once the peer closed the connection
+    def read_frames(self) -> Optional[list[tuple]]:
+        while True:
+            frames = self._complete_frames()
+            if frames:
+                return frames
+            chunk = self._sock.recv(READ_CHUNK)
+            if not chunk:
+                return None
+            self._buffer += chunk
+
+    def _complete_frames(self) -> list[tuple]:
+        frames, offset, buffer = [], 0, self._buffer
+        while len(buffer) - offset >= HEADER.size:
+            (size,) = HEADER.unpack_from(buffer, offset)
+            if size > MAX_FRAME_BYTES:
+                raise ConnectionError(f"Broker frame of {size} bytes is too large")
+            end = offset + HEADER.size + size
+            if len(buffer) < end:
+                break
+            frames.append(pickle.loads(memoryview(buffer)[offset + HEADER.size:end]))
+            offset = end
+        if offset:
+            del buffer[:offset]
+        return frames
+
+
+class BrokerClient:
+    """
+    One connection to the local broker, shared by every thread (and the event loop) of a process.
+
+    Calls are pipelined: submit() sends the request and returns a Future right away, so many calls
+    from different threads are in flight on the connection at once, and a reader thread completes
+    them as replies arrive (matched by request id, in any order). Sends are batched: while one
+    caller is writing, others only append their frames, and the next write sends them all in one
+    system call. The broker does the same with its replies.
+
+    After a fork the child opens its own connection on first use (the parent's reader thread
+    doesn't exist there, and the two processes must not share one socket).
+    """
+
+    def __init__(self, path: str, connect_timeout: float = 5.0) -> None:
+        self._path = path
+        self._connect_timeout = connect_timeout
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending: dict[int, Future] = {}
+        self._outgoing: list[bytes] = []
+        self._flushing = False
+        self._sock: Optional[socket.socket] = None
+        self._pid = 0
+
+    # Sends one call and returns its Future (result or the exception the broker raised)
+    def submit(self, target: str, method: str, *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        with self._lock:
+            sock = self._connection()
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self._outgoing.append(encode_frame((request_id, target, method, args, kwargs)))
+            if self._flushing:
+                return future # The caller that is writing right now sends it along
+            self._flushing = True
+        self._flush(sock)
+        return future
+
+    # Blocking call
+    def call(self, target: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        return self.submit(target, method, *args, **kwargs).result()
+
+    def close(self) -> None:
+        sock = self._sock
+        if sock is not None:
+            self._fail(sock, ConnectionError("Broker client closed"))
+
+    # The open socket, connecting first if needed (must hold the lock)
+    def _connection(self) -> socket.socket:
+        if self._sock is not None and self._pid == os.getpid():
+            return self._sock
+        if self._sock is not None: # Inherited through fork: leave the parent's connection alone
+            self._pending, self._outgoing, self._flushing = {}, [], False
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._connect_timeout)
+        try:
+            sock.connect(self._path)
+        except OSError as e:
+            sock.close()
+            raise ConnectionError(f"Can't reach the local broker at {self._path}: {e}") from e
+        sock.settimeout(None)
+        self._sock, self._pid = sock, os.getpid()
+        threading.Thread(target=self._read_replies, args=(sock,), name="broker-client-reader", daemon=True).start()
+        return sock
+
+    # Writes everything queued so far, until nothing is left
+    def _flush(self, sock: socket.socket) -> None:
+        while True:
+            with self._lock:
+                if not self._outgoing or self._sock is not sock:
+                    self._flushing = False
+                    return
+                data = b"".join(self._outgoing)
+                self._outgoing.clear()
+            try:
+                sock.sendall(data)
+            except OSError as e:
+                self._fail(sock, ConnectionError(f"Lost the local broker connection: {e}"))
+                return
+
+    def _read_replies(self, sock: socket.socket) -> None:
+        reader = FrameReader(sock)
+        try:
+            while True:
+                frames = reader.read_frames()
+                if frames is None:
+                    break
+                for request_id, ok, result in frames:
+                    with self._lock:
+                        future = self._pending.pop(request_id, None)
+                    if future is None:
+                        continue
+                    if ok:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(result)
+        except Exception: # Connection reset, or a frame that can't be read: the stream is out of sync
+            pass
+        self._fail(sock, ConnectionError("The local broker closed the connection"))
+
+    # Drops a broken connection: every call still waiting on it fails, the next call reconnects
+    def _fail(self, sock: socket.socket, error: Exception) -> None:
+        with self._lock:
+            if self._sock is not sock:
+                return
+            self._sock = None
+            pending, self._pending = self._pending, {}
+            self._outgoing.clear()
+            self._flushing = False
+        _shutdown(sock)
+        for future in pending.values():
+            future.set_exception(error)
+
+
+# Closes a socket and wakes up a thread blocked reading it
+def _shutdown(sock: socket.socket) -> None:
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    sock.close()
@@ -0,0 +1,186 @@
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from app.core.settings import settings
+from app.infrastructure.broker.broker_client import FrameReader, encode_frame
+
+logger = logging.getLogger(__name__)
+
+# What clients may call on each hosted object (public port methods only, nothing else)
+EXPOSED_METHODS = {
+    "repo": frozenset({"create", "create_many", "get", "update", "transition", "list_documents", "count_documents"}),
+    "queue": frozenset({
+        "lanes", "enqueue_document_processing", "enqueue_document_processing_batch", "depth", "in_flight",
+        "receive_jobs", "ack_jobs", "extend_visibility", "release_jobs", "dead_letter_jobs",
+        "dead_letters", "dead_letter_depth",
+    }),
+    "storage": frozenset({
+        "create_object_key", "create_presigned_upload_url", "create_presigned_upload_urls", "put_object",
+        "read_object", "content_sha256", "create_multipart_upload", "create_presigned_part_urls",
+        "upload_part", "complete_multipart_upload", "abort_multipart_upload",
+    }),
+    "events": frozenset({"receive_events", "ack_events"}),
+}
+
+# Calls that may wait (long polling). They run on a side pool, so one waiting worker
+# doesn't hold up the other calls pipelined on the same connection.
+WAITING_METHODS = frozenset({("queue", "receive_jobs"), ("events", "receive_events")})
+
+
+class BrokerServer:
+    """
+    Serves one repository, queue and storage to many API and worker processes over a Unix socket.
+
+    One thread per connection reads whatever has arrived, runs every complete request in order
+    against the shared in-memory objects, and writes all the replies back with one send. Under
+    load, a single read carries many pipelined requests, so system calls and wake-ups are paid
+    per batch instead of per call, and the client processes use the other cores.
+    """
+
+    def __init__(self, path: str, targets: dict[str, Any], max_waiting_calls: int = 64) -> None:
+        self._path = path
+        self._targets = targets
+        self._waiting = ThreadPoolExecutor(max_workers=max_waiting_calls, thread_name_prefix="broker-wait")
+        self._stopped = threading.Event()
+        self._listener: socket.socket | None = None
+
+    # Binds the socket (owner-only permissions) and serves until stop()
+    def serve_forever(self) -> None:
+        self._listener = self._bind()
+        logger.info("Local broker listening on %s", self._path)
+        try:
+            while not self._stopped.is_set():
+                try:
+                    conn, _ = self._listener.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    if self._stopped.is_set():
+                        break
+                    raise
+                threading.Thread(target=self._serve, args=(conn,), name="broker-conn", daemon=True).start()
+        finally:
+            self._listener.close()
+            self._waiting.shutdown(wait=False, cancel_futures=True)
+            if os.path.exists(self._path):
+                os.unlink(self._path)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _bind(self) -> socket.socket:
+        if os.path.exists(self._path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self._path)
+            except OSError:
+                os.unlink(self._path) # Left behind by a broker that didn't exit cleanly
+            else:
+                raise RuntimeError(f"Another broker is already listening on {self._path}")
+            finally:
+                probe.close()
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        previous_umask = os.umask(0o177) # Socket file mode 0600: only this user's processes can connect
+        try:
+            listener.bind(self._path)
+        finally:
+            os.umask(previous_umask)
+        listener.listen(128)
+        listener.settimeout(0.5) # Wakes up now and then to notice stop()
+        return listener
+
+    def _serve(self, conn: socket.socket) -> None:
+        reader = FrameReader(conn)
+        send_lock = threading.Lock() # Replies of waiting calls are sent from the side pool
+        try:
+            while True:
+                requests = reader.read_frames()
+                if requests is None:
+                    break
+                replies = []
+                for request in requests:
+                    request_id, target, method = request[:3]
+                    if (target, method) in WAITING_METHODS:
+                        self._waiting.submit(self._reply_later, conn, send_lock, request)
+                    else:
+                        replies.append(self._execute(request))
+                if replies:
+                    with send_lock:
+                        conn.sendall(b"".join(replies))
+        except Exception: # Client went away mid-message, or sent something unreadable
+            logger.debug("Broker connection closed with an error", exc_info=True)
+        finally:
+            conn.close()
+
+    def _reply_later(self, conn: socket.socket, send_lock: threading.Lock, request: tuple) -> None:
+        reply = self._execute(request)
+        try:
+            with send_lock:
+                conn.sendall(reply)
+        except OSError:
+            pass # Client is gone
+
+    # Runs one request and returns the encoded reply (the exception goes back to the caller)
+    def _execute(self, request: tuple) -> bytes:
+        request_id, target, method, args, kwargs = request
+        try:
+            if method not in EXPOSED_METHODS.get(target, ()) or target not in self._targets:
+                raise AttributeError(f"The broker doesn't serve {target}.{method}")
+            attribute = getattr(self._targets[target], method)
+            result = attribute(*args, **kwargs) if callable(attribute) else attribute
+            return encode_frame((request_id, True, result))
+        except Exception as e:
+            try:
+                return encode_frame((request_id, False, e))
+            except Exception: # The exception itself can't be pickled
+                return encode_frame((request_id, False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local broker: one repository, queue and storage for many processes")
+    parser.add_argument("--socket", default=settings.BROKER_SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--repo", choices=["memory", "compact"], default=settings.BROKER_REPO_BACKEND)
+    parser.add_argument(
+        "--upload-events",
+        action="store_true",
+        help="Announce finished uploads to the upload ingestor (UPLOAD_EVENTS_SOURCE=broker)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # The same in-memory adapters local mode uses, only hosted here instead of in each process
+    from app.infrastructure.events.in_memory_upload_events import InMemoryUploadEvents
+    from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+    from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+    from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+    if args.repo == "compact":
+        from app.infrastructure.persistence.compact_documents_repo import CompactDocumentsRepository
+        repo = CompactDocumentsRepository()
+    else:
+        repo = InMemoryDocumentsRepository()
+
+    targets = {"repo": repo, "queue": InMemoryQueue()}
+    if args.upload_events:
+        # Kept only when an ingestor reads them: nothing else would ever drain the events
+        targets["events"] = InMemoryUploadEvents(visibility_timeout=settings.SQS_VISIBILITY_TIMEOUT)
+    targets["storage"] = InMemoryStorage(events=targets.get("events"))
+
+    server = BrokerServer(args.socket, targets)
+    signal.signal(signal.SIGINT, lambda signum, frame: server.stop())
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.stop())
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
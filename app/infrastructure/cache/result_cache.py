@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.domain.models.processing_result import ProcessingResult
+from app.domain.ports.result_cache import ResultCachePort
+
+
+# Lookup counters, so the saved work is visible (bytes_saved = content the processor didn't read)
+@dataclass
+class ResultCacheStats:
+    memory_hits: int = 0
+    persistent_hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.persistent_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.persistent_hits) / self.lookups if self.lookups else 0.0
+
+
+# Two-tier result cache: a bounded in-process LRU in front of an optional persistent tier
+#
+# - get() checks memory first, then the persistent tier; persistent hits are promoted to memory
+# - put() writes both tiers, so other worker processes (and restarts) see the result too
+# - ProcessingResult is frozen, so cached values are shared without copying
+class TieredResultCache:
+
+    def __init__(self, max_entries: int, persistent: Optional[ResultCachePort] = None) -> None:
+        self._max_entries = max_entries
+        self._persistent = persistent
+        self._entries: OrderedDict[str, ProcessingResult] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = ResultCacheStats()
+
+    def get(self, sha256: str) -> Optional[ProcessingResult]:
+        with self._lock:
+            result = self._entries.get(sha256)
+            if result is not None:
+                self._entries.move_to_end(sha256)
+                self.stats.memory_hits += 1
+                self.stats.bytes_saved += result.size_bytes
+                return result
+
+        result = self._persistent.get(sha256) if self._persistent is not None else None
+        with self._lock:
+            if result is None:
+                self.stats.misses += 1
+                return None
+            self.stats.persistent_hits += 1
+            self.stats.bytes_saved += result.size_bytes
+            self._remember(result)
+        return result
+
+    def put(self, result: ProcessingResult) -> None:
+        if self._persistent is not None:
+            self._persistent.put(result)
+        with self._lock:
+            self._remember(result)
+
+    # Caller holds the lock
+    def _remember(self, result: ProcessingResult) -> None:
+        self._entries[result.sha256] = result
+        self._entries.move_to_end(result.sha256)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
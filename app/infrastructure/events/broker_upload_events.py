@@ -0,0 +1,18 @@
+from app.domain.ports.upload_events import UploadEvent
+from app.infrastructure.broker.broker_client import BrokerClient
+
+
+# Uploads finished in the local broker's storage (broker started with --upload-events).
+# The events live in an InMemoryUploadEvents inside the broker, leased like its queue messages.
+class BrokerUploadEvents:
+    wait_seconds = 1
+
+    def __init__(self, client: BrokerClient) -> None:
+        self._client = client
+
+    # Waits inside the broker (on its side pool, so other calls on the connection keep flowing)
+    def receive_events(self, max_events: int = 10, wait_seconds: int = 0) -> list[UploadEvent]:
+        return self._client.call("events", "receive_events", max_events, wait_seconds)
+
+    def ack_events(self, events: list[UploadEvent]) -> None:
+        self._client.call("events", "ack_events", events)
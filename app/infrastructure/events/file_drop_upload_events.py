@@ -0,0 +1,99 @@
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from app.domain.ports.upload_events import UploadEvent
+from app.infrastructure.events.s3_notifications import object_created_keys
+
+logger = logging.getLogger(__name__)
+
+CLAIMED_SUFFIX = ".claimed"   # Being handled by an ingestor
+REJECTED_SUFFIX = ".rejected" # Not an S3 event notification; kept for a look, never read again
+
+
+class FileDropUploadEvents:
+    """
+    Local stand-in for S3 event notifications: a directory of `*.json` files, each holding one
+    notification in the format S3 sends to SQS (for example written by a test, a script, or a
+    webhook receiver in front of MinIO). Write each file under another name and rename it to
+    `.json`, so it is never read half-written.
+
+    Receiving renames a file to `<name>.claimed`, which is atomic, so several ingestor processes
+    can share the directory and each file goes to one of them. Acking deletes it. A claim older
+    than visibility_timeout seconds (the ingestor died) is renamed back and delivered again.
+    """
+    wait_seconds = 1
+
+    def __init__(self, directory: str, visibility_timeout: float = 30.0, poll_interval: float = 0.2) -> None:
+        self._directory = directory
+        self._visibility_timeout = visibility_timeout
+        self._poll_interval = poll_interval
+        os.makedirs(directory, exist_ok=True)
+
+    # Polls the directory every poll_interval seconds until something arrives or wait_seconds pass
+    def receive_events(self, max_events: int = 10, wait_seconds: int = 0) -> list[UploadEvent]:
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            events = self._claim(max_events)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                return events
+            time.sleep(min(self._poll_interval, remaining))
+
+    def ack_events(self, events: list[UploadEvent]) -> None:
+        for path in dict.fromkeys(event.receipt for event in events):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass # Claim ran out and another ingestor has it now
+
+    # Claims files (oldest name first) until max_events events are collected
+    def _claim(self, max_events: int) -> list[UploadEvent]:
+        with os.scandir(self._directory) as entries:
+            names = sorted(entry.name for entry in entries if entry.is_file())
+        names = sorted(names + self._reclaim_expired([name for name in names if name.endswith(CLAIMED_SUFFIX)]))
+
+        events: list[UploadEvent] = []
+        for name in names:
+            if len(events) >= max_events:
+                break
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self._directory, name)
+            claimed = path + CLAIMED_SUFFIX
+            try:
+                os.rename(path, claimed)
+                written_at = os.stat(claimed).st_mtime
+                os.utime(claimed) # From now on the mtime is when it was claimed
+                with open(claimed, encoding="utf-8") as f:
+                    body = f.read()
+            except FileNotFoundError:
+                continue # Another ingestor claimed it first
+
+            try:
+                keys = object_created_keys(body)
+            except ValueError as e:
+                logger.warning("Rejecting %s: %s", name, e)
+                os.rename(claimed, path + REJECTED_SUFFIX)
+                continue
+            if not keys:
+                os.unlink(claimed) # Nothing to do (e.g. a delete event)
+                continue
+            created_at = datetime.fromtimestamp(written_at, timezone.utc)
+            events.extend(UploadEvent(key, claimed, event_time or created_at) for key, event_time in keys)
+        return events
+
+    # Renames claims older than visibility_timeout back; returns their restored names
+    def _reclaim_expired(self, claimed_names: list[str]) -> list[str]:
+        cutoff = time.time() - self._visibility_timeout
+        restored = []
+        for name in claimed_names:
+            claimed = os.path.join(self._directory, name)
+            try:
+                if os.stat(claimed).st_mtime < cutoff:
+                    os.rename(claimed, claimed[:-len(CLAIMED_SUFFIX)])
+                    restored.append(name[:-len(CLAIMED_SUFFIX)])
+            except FileNotFoundError:
+                pass # Acked meanwhile
+        return restored
@@ -0,0 +1,67 @@
+import itertools
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.domain.ports.upload_events import UploadEvent
+
+
+# Stand-in for S3 event notifications inside one process: InMemoryStorage publishes here
+# when a PUT or multipart upload finishes. Received events are leased like SQS messages:
+# an event that isn't acked within visibility_timeout seconds is delivered again.
+class InMemoryUploadEvents:
+    wait_seconds = 1
+
+    def __init__(self, visibility_timeout: float = 30.0) -> None:
+        self._visibility_timeout = visibility_timeout
+        self._ready: deque[tuple[str, datetime]] = deque()                  # (object_key, created at)
+        self._leases: dict[int, tuple[str, datetime, float]] = {}           # receipt -> (key, created at, expires at)
+        self._receipts = itertools.count(1)
+        self._cond = threading.Condition()
+
+    # Called by storage when an object is created
+    def publish(self, object_key: str, created_at: Optional[datetime] = None) -> None:
+        with self._cond:
+            self._ready.append((object_key, created_at or datetime.now(timezone.utc)))
+            self._cond.notify()
+
+    def receive_events(self, max_events: int = 10, wait_seconds: int = 0) -> list[UploadEvent]:
+        deadline = time.monotonic() + wait_seconds
+        with self._cond:
+            while True:
+                self._requeue_expired()
+                if self._ready:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._cond.wait(remaining)
+
+            events = []
+            expires_at = time.monotonic() + self._visibility_timeout
+            while self._ready and len(events) < max_events:
+                object_key, created_at = self._ready.popleft()
+                receipt = next(self._receipts)
+                self._leases[receipt] = (object_key, created_at, expires_at)
+                events.append(UploadEvent(object_key, receipt, created_at))
+            return events
+
+    def ack_events(self, events: list[UploadEvent]) -> None:
+        with self._cond:
+            for event in events:
+                self._leases.pop(event.receipt, None)
+
+    # Events waiting to be received
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._ready)
+
+    # Leases that ran out go back to the front, oldest first
+    def _requeue_expired(self) -> None:
+        now = time.monotonic()
+        expired = [receipt for receipt, (_, _, expires_at) in self._leases.items() if expires_at <= now]
+        for receipt in reversed(expired):
+            object_key, created_at, _ = self._leases.pop(receipt)
+            self._ready.appendleft((object_key, created_at))
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.domain.models.document import Document
+from app.domain.ports.documents_repo import AsyncDocumentsRepository, PageKey
+from app.domain.ports.status_events import StatusSubscription
+from app.infrastructure.events.status_broadcaster import StatusBroadcaster
+
+logger = logging.getLogger(__name__)
+
+
+# Publishes updates written by *other* processes (e.g. workers sharing the SQLite file),
+# which never pass through this process's ObservableDocumentsRepository.
+#
+# One background task walks the (updated_at, id) index every `interval` seconds and
+# publishes the documents someone is watching. That is one range scan per interval for
+# all open streams, instead of every connection re-reading its own document.
+#
+# Wraps a StatusBroadcaster and is itself a StatusEventsPort: the first subscribe starts the task.
+class RepoChangeFeed:
+    PAGE_SIZE = 500
+
+    def __init__(self, repo: AsyncDocumentsRepository, broadcaster: StatusBroadcaster, interval: float) -> None:
+        self._repo = repo
+        self._broadcaster = broadcaster
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def publish(self, document: Document) -> None:
+        self._broadcaster.publish(document)
+
+    def subscribe(self, document_id: str) -> StatusSubscription:
+        # Started lazily because it needs the running event loop (restarted if that loop changed)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+        return self._broadcaster.subscribe(document_id)
+
+    def unsubscribe(self, subscription: StatusSubscription) -> None:
+        self._broadcaster.unsubscribe(subscription)
+
+    async def _run(self) -> None:
+        since = datetime.now(timezone.utc)
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                since = await self._poll(since)
+            except Exception:
+                logger.exception("Change feed poll failed, retrying in %.1fs", self._interval)
+
+    # Publishes watched documents updated after `since`; returns where the next poll starts
+    async def _poll(self, since: datetime) -> datetime:
+        started = datetime.now(timezone.utc)
+        watched = self._broadcaster.watched_ids()
+        if not watched:
+            return started
+
+        # Re-read one extra interval: a write stamped just before `since` may commit after the last poll.
+        # Subscribers drop versions they have already seen.
+        updated_after = since - timedelta(seconds=self._interval)
+        after: Optional[PageKey] = None
+        while True:
+            docs = await self._repo.list_documents(updated_after=updated_after, after=after, limit=self.PAGE_SIZE)
+            for doc in docs:
+                if doc.id in watched:
+                    self._broadcaster.publish(doc)
+            if len(docs) < self.PAGE_SIZE:
+                return started
+            after = (docs[-1].updated_at, docs[-1].id)
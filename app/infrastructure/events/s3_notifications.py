@@ -0,0 +1,40 @@
+import json
+from datetime import datetime
+from typing import Any, Optional
+from urllib.parse import unquote_plus
+
+
+# (object_key, event time) of every ObjectCreated record in one S3 event notification.
+# Takes the SQS message body as S3 sends it, or wrapped by SNS (S3 -> SNS topic -> SQS).
+# Other records (deletes, the s3:TestEvent sent when notifications are set up) give nothing.
+# Raises ValueError if the body isn't a notification at all.
+def object_created_keys(body: str) -> list[tuple[str, Optional[datetime]]]:
+    try:
+        notification = json.loads(body)
+        if notification.get("Type") == "Notification" and "Message" in notification:
+            notification = json.loads(notification["Message"])
+    except (json.JSONDecodeError, AttributeError, TypeError) as e:
+        raise ValueError(f"Not an S3 event notification: {e}")
+    if not isinstance(notification, dict):
+        raise ValueError("Not an S3 event notification")
+
+    keys = []
+    for record in notification.get("Records", []):
+        if not str(record.get("eventName", "")).startswith("ObjectCreated:"):
+            continue
+        try:
+            # Keys come URL-encoded, with spaces as "+"
+            key = unquote_plus(record["s3"]["object"]["key"])
+        except (KeyError, TypeError):
+            raise ValueError("S3 record without s3.object.key")
+        keys.append((key, _event_time(record.get("eventTime"))))
+    return keys
+
+
+def _event_time(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
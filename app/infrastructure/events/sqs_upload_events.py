@@ -0,0 +1,70 @@
+import logging
+
+from app.core.settings import settings
+from app.domain.ports.upload_events import UploadEvent
+from app.infrastructure.aws.client_factory import get_sqs_client
+from app.infrastructure.events.s3_notifications import object_created_keys
+
+logger = logging.getLogger(__name__)
+
+SQS_MAX_BATCH = 10        # Max messages per receive_message / entries per delete_message_batch
+SQS_MAX_WAIT_SECONDS = 20 # Max long-poll wait
+
+
+class SQSUploadEvents:
+    """
+    S3 ObjectCreated notifications delivered to an SQS queue (S3_EVENTS_QUEUE_URL).
+
+    The bucket's event notification (s3:ObjectCreated:*) sends one message per finished upload,
+    including completed multipart uploads. Messages that aren't ObjectCreated notifications
+    (such as s3:TestEvent) are deleted as soon as they are received.
+    """
+
+    # client / queue_url can be injected (e.g. LocalSQSClient for offline runs)
+    def __init__(self, client=None, queue_url: str | None = None) -> None:
+        self._client = client
+        self._queue_url = queue_url or settings.S3_EVENTS_QUEUE_URL
+        self.wait_seconds = max(0, min(settings.SQS_WAIT_TIME_SECONDS, SQS_MAX_WAIT_SECONDS)) # Long-poll
+
+    # Shared, cached boto3 client unless one was injected
+    @property
+    def client(self):
+        return self._client if self._client is not None else get_sqs_client()
+
+    def receive_events(self, max_events: int = SQS_MAX_BATCH, wait_seconds: int = SQS_MAX_WAIT_SECONDS) -> list[UploadEvent]:
+        resp = self.client.receive_message(
+            QueueUrl=self._queue_url,
+            MaxNumberOfMessages=max(1, min(max_events, SQS_MAX_BATCH)),
+            WaitTimeSeconds=max(0, min(wait_seconds, SQS_MAX_WAIT_SECONDS)),
+        )
+
+        events: list[UploadEvent] = []
+        nothing_to_do: list[str] = []
+        for message in resp.get("Messages", []):
+            try:
+                keys = object_created_keys(message["Body"])
+            except ValueError as e:
+                logger.warning("Dropping message %s from the S3 events queue: %s", message.get("MessageId"), e)
+                keys = []
+            if not keys:
+                nothing_to_do.append(message["ReceiptHandle"])
+            events.extend(UploadEvent(key, message["ReceiptHandle"], created_at) for key, created_at in keys)
+
+        if nothing_to_do:
+            self._delete(nothing_to_do)
+        return events
+
+    # One delete per message, even when it carried several records
+    def ack_events(self, events: list[UploadEvent]) -> None:
+        self._delete(list(dict.fromkeys(event.receipt for event in events)))
+
+    def _delete(self, handles: list[str]) -> None:
+        for start in range(0, len(handles), SQS_MAX_BATCH):
+            chunk = handles[start:start + SQS_MAX_BATCH]
+            resp = self.client.delete_message_batch(
+                QueueUrl=self._queue_url,
+                Entries=[{"Id": str(i), "ReceiptHandle": handle} for i, handle in enumerate(chunk)],
+            )
+            for failure in resp.get("Failed", []):
+                # The message comes back after its visibility timeout; the document is QUEUED by then, so it's skipped
+                logger.warning("Couldn't delete S3 event message: %s", failure.get("Message", failure.get("Code")))
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from collections import deque
+from dataclasses import replace
+from typing import Optional
+
+from app.domain.models.document import Document
+
+
+# One subscriber: pending documents + a future the reader sleeps on
+# No thread, task or queue object per subscriber (asyncio.Queue + wait_for cost ~3x the memory),
+# so tens of thousands of idle streams stay cheap
+class _Subscription:
+    __slots__ = ("document_id", "_loop", "_pending", "_waiter")
+
+    def __init__(self, document_id: str, loop: asyncio.AbstractEventLoop) -> None:
+        self.document_id = document_id
+        self._loop = loop
+        self._pending: deque[Document] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+
+    # Hands a document to the subscriber's loop (safe from any thread)
+    def _deliver(self, document: Document) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._push, document)
+        except RuntimeError:
+            pass # Loop already closed, nobody is listening anymore
+
+    # Runs on the subscriber's loop
+    def _push(self, document: Document) -> None:
+        self._pending.append(document)
+        _wake(self._waiter)
+
+    async def next(self, timeout: float) -> Optional[Document]:
+        if not self._pending:
+            self._waiter = self._loop.create_future()
+            timer = self._loop.call_later(timeout, _wake, self._waiter)
+            try:
+                await self._waiter
+            finally:
+                timer.cancel()
+                self._waiter = None
+        return self._pending.popleft() if self._pending else None
+
+
+def _wake(waiter: Optional[asyncio.Future]) -> None:
+    if waiter is not None and not waiter.done():
+        waiter.set_result(None)
+
+
+# In-process publish/subscribe for document updates
+#
+# publish() is called by ObservableDocumentsRepository on every update, from whatever
+# thread made it (request handler, repo executor, worker slot). Each subscriber gets
+# its copy through its own loop's call_soon_threadsafe, so subscribers never poll.
+class StatusBroadcaster:
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: dict[str, set[_Subscription]] = {}
+
+    def subscribe(self, document_id: str) -> _Subscription:
+        subscription = _Subscription(document_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(document_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: _Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.document_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.document_id]
+
+    def publish(self, document: Document) -> None:
+        # Fast path: most updates are for documents nobody is watching (dict lookup is atomic)
+        if document.id not in self._subscribers:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers.get(document.id, ()))
+
+        # Callers keep mutating their Document after update(), so subscribers get a snapshot
+        snapshot = replace(document)
+        for subscription in subscribers:
+            subscription._deliver(snapshot)
+
+    # Ids with at least one open subscription
+    def watched_ids(self) -> set[str]:
+        with self._lock:
+            return set(self._subscribers)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
@@ -0,0 +1,144 @@
+from app.domain.models.document import DocumentStatus
+from app.infrastructure.metrics.registry import CallbackGauge, Counter, Histogram, MetricsRegistry
+
+# Every metric this process exposes on /metrics
+REGISTRY = MetricsRegistry()
+
+# Jobs take seconds to minutes, not milliseconds
+JOB_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# Labelled by route template ("/documents/{document_id}"), never the raw path, so the series count stays bounded.
+# Requests per route/status are the histogram's _count.
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response is fully sent, by route template, method and status code",
+    ("route", "method", "status"),
+))
+
+# Outcomes: completed, cached (completed from the result cache), failed, missing (document gone), crashed,
+# skipped (another worker has or had the document: a duplicate delivery), retried (failed, tried again after a backoff), dead_lettered (retries used up), quarantined (kept crashing the worker)
+JOB_DURATION = REGISTRY.register(Histogram(
+    "worker_job_duration_seconds",
+    "Worker job duration by outcome",
+    ("outcome",),
+    buckets=JOB_BUCKETS,
+))
+
+# From enqueue until a worker slot starts the job (queue time + time in the worker's local buffer)
+QUEUE_WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+JOB_QUEUE_WAIT = REGISTRY.register(Histogram(
+    "worker_job_queue_wait_seconds",
+    "Time from enqueue until a worker slot started the job, by queue lane",
+    ("lane",),
+    buckets=QUEUE_WAIT_BUCKETS,
+))
+
+# Storage "object created" events handled by the upload ingestor. Outcomes: enqueued, skipped (not a document's
+# upload, or the document wasn't INITIATED anymore: a repeated event, or the client enqueued it), retried (enqueue failed)
+UPLOAD_EVENTS = REGISTRY.register(Counter(
+    "upload_events_total",
+    "Storage object-created events handled by the upload ingestor, by outcome",
+    ("outcome",),
+))
+UPLOAD_EVENT_COUNTERS = {outcome: UPLOAD_EVENTS.labels(outcome) for outcome in ("enqueued", "skipped", "retried")}
+
+# From the upload finishing (the event's time) until the ingestor enqueued its job
+UPLOAD_ENQUEUE_DELAY = REGISTRY.register(Histogram(
+    "upload_enqueue_delay_seconds",
+    "Time from an upload finishing until the ingestor enqueued its document",
+    buckets=QUEUE_WAIT_BUCKETS,
+))
+
+STATUS_TRANSITIONS = REGISTRY.register(Counter(
+    "document_status_transitions_total",
+    "Documents moved into each status (creation counts as INITIATED)",
+    ("status",),
+))
+
+# Time documents spent in each stage, observed once per document when it becomes COMPLETED or FAILED:
+# upload (created -> queued), queue (queued -> started; retries and their backoff count here), processing
+# (the last attempt) and total (created -> finished). Buckets reach an hour: uploads can take that long.
+DOCUMENT_STAGE_DURATION = REGISTRY.register(Histogram(
+    "document_stage_duration_seconds",
+    "Time finished documents spent in each lifecycle stage",
+    ("stage",),
+    buckets=QUEUE_WAIT_BUCKETS,
+))
+STAGE_DURATIONS = {stage: DOCUMENT_STAGE_DURATION.labels(stage) for stage in ("upload", "queue", "processing", "total")}
+
+# Children for fixed label values are made once here, so the hot paths skip the lookup (and they show up at 0)
+TRANSITION_COUNTERS = {status: STATUS_TRANSITIONS.labels(status.value) for status in DocumentStatus}
+
+
+# Queue backlog, read from the queue when scraped. Registering again (another queue) replaces it.
+# Labelled with the adapter's own name (QueuePort.name).
+def register_queue_depth(queue) -> None:
+    name = queue.name
+
+    def read() -> dict[tuple[str, ...], float]:
+        samples = {}
+        for lane in queue.lanes:
+            samples[(name, lane, "visible")] = queue.depth(lane)
+            samples[(name, lane, "in_flight")] = queue.in_flight(lane)
+        return samples
+
+    REGISTRY.register(CallbackGauge(
+        "queue_messages",
+        "Messages in the job queue by lane: visible (waiting) and in_flight (received, not finished)",
+        ("queue", "lane", "state"),
+        read,
+    ))
+    REGISTRY.register(CallbackGauge(
+        "queue_dead_letter_messages",
+        "Jobs the worker gave up on, waiting in the dead-letter queue",
+        ("queue",),
+        lambda: {(name,): queue.dead_letter_depth()},
+    ))
+
+
+# Jobs refused before being enqueued (429). Reasons: rate_limit (the client's token bucket),
+# queue_wait (estimated wait over ADMISSION_MAX_QUEUE_WAIT_SECONDS), backlog (over ADMISSION_MAX_BACKLOG)
+ADMISSION_REJECTIONS = REGISTRY.register(Counter(
+    "admission_rejections_total",
+    "Enqueue requests refused by admission control, by reason",
+    ("reason",),
+))
+ADMISSION_REJECTION_COUNTERS = {reason: ADMISSION_REJECTIONS.labels(reason) for reason in ("rate_limit", "queue_wait", "backlog")}
+
+# Stack profiles written by the sampling profiler (PROFILE_SLOW_JOB_SECONDS / PROFILE_SLOW_REQUEST_SECONDS), by kind: job or request
+PROFILES_WRITTEN = REGISTRY.register(Counter(
+    "profiles_written_total",
+    "Slow jobs and requests whose sampled stacks were written to PROFILE_DIR",
+    ("kind",),
+))
+
+
+# Backlog estimates and the recommended worker count (same numbers as GET /capacity), from the latest backlog sample
+def register_capacity(monitor, planner) -> None:
+
+    def rates() -> dict[tuple[str, ...], float]:
+        snapshot = monitor.snapshot()
+        return {("processed",): snapshot.processing_rate, ("arrived",): snapshot.arrival_rate}
+
+    def estimated_wait() -> dict[tuple[str, ...], float]:
+        wait = monitor.snapshot().estimated_wait
+        return {} if wait is None else {(): wait} # No sample while unknown
+
+    REGISTRY.register(CallbackGauge(
+        "backlog_jobs_per_second",
+        "Jobs finished (processed) and enqueued (arrived) per second, recent average",
+        ("rate",),
+        rates,
+    ))
+    REGISTRY.register(CallbackGauge(
+        "backlog_estimated_wait_seconds",
+        "Estimated queue wait for a job enqueued now",
+        (),
+        estimated_wait,
+    ))
+    REGISTRY.register(CallbackGauge(
+        "capacity_recommended_workers",
+        "Worker processes needed for the current load",
+        (),
+        lambda: {(): planner.recommended_workers(monitor.snapshot())},
+    ))
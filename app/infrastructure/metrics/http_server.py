@@ -0,0 +1,32 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.infrastructure.metrics.registry import CONTENT_TYPE, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+# /metrics for processes without an API (the worker), on a daemon thread
+def start_metrics_server(port: int, registry: MetricsRegistry, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass # Scrapes every few seconds would flood the worker log
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info("Serving metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
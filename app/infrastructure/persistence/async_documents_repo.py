@@ -0,0 +1,93 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Optional
+
+from app.domain.models.document import Document, DocumentStatus
+from app.domain.ports.documents_repo import DocumentsRepository, ExpectedStatus, PageKey
+
+
+# Async face of the in-memory repository
+# Every operation is a dict/index update that never waits on I/O, so it runs right on the event loop
+class AsyncInMemoryDocumentsRepository:
+
+    def __init__(self, repo: DocumentsRepository) -> None: # In-memory or compact repository (possibly wrapped)
+        self._repo = repo # Shared with the sync code (worker, DocumentService)
+
+    async def create(self, document: Document) -> Document:
+        return self._repo.create(document)
+
+    async def create_many(self, documents: list[Document]) -> list[Document]:
+        return self._repo.create_many(documents)
+
+    async def get(self, document_id: str) -> Optional[Document]:
+        return self._repo.get(document_id)
+
+    async def update(self, document: Document) -> Document:
+        return self._repo.update(document)
+
+    async def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        return self._repo.transition(document_id, expected_status, new_status, started_before, **changes)
+
+    async def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        return self._repo.list_documents(status=status, updated_after=updated_after, after=after, limit=limit)
+
+
+# Async face of a repository that blocks on I/O (e.g. SQLite)
+# Calls run on a dedicated, separately sized thread pool, so they never hold up the event loop
+# and never compete with FastAPI's own threadpool
+class AsyncThreadedDocumentsRepository:
+
+    def __init__(self, repo: DocumentsRepository, max_workers: int) -> None:
+        self._repo = repo
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="repo-io")
+
+    async def _run(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    async def create(self, document: Document) -> Document:
+        return await self._run(self._repo.create, document)
+
+    async def create_many(self, documents: list[Document]) -> list[Document]:
+        return await self._run(self._repo.create_many, documents)
+
+    async def get(self, document_id: str) -> Optional[Document]:
+        return await self._run(self._repo.get, document_id)
+
+    async def update(self, document: Document) -> Document:
+        return await self._run(self._repo.update, document)
+
+    async def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        return await self._run(self._repo.transition, document_id, expected_status, new_status, started_before, **changes)
+
+    async def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        return await self._run(
+            self._repo.list_documents, status=status, updated_after=updated_after, after=after, limit=limit
+        )
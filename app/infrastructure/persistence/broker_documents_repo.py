@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from app.domain.models.document import Document, DocumentStatus
+from app.domain.ports.documents_repo import ExpectedStatus, PageKey
+from app.infrastructure.broker.broker_client import BrokerClient
+
+
+# Repository hosted by the local broker process, so the API and every worker process see the same documents.
+# Each call is one request on the shared, pipelined broker connection; transition() stays atomic
+# because it runs inside the broker, under the hosted repository's lock.
+class BrokerDocumentsRepository:
+
+    def __init__(self, client: BrokerClient) -> None:
+        self._client = client
+
+    def create(self, document: Document) -> Document:
+        return self._client.call("repo", "create", document)
+
+    def create_many(self, documents: list[Document]) -> list[Document]:
+        return self._client.call("repo", "create_many", documents)
+
+    def get(self, document_id: str) -> Optional[Document]:
+        return self._client.call("repo", "get", document_id)
+
+    def update(self, document: Document) -> Document:
+        return self._client.call("repo", "update", document)
+
+    def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        return self._client.call("repo", "transition", document_id, expected_status, new_status, started_before, **changes)
+
+    def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        return self._client.call("repo", "list_documents", status, updated_after, after, limit)
+
+    def count_documents(self, status: DocumentStatus, updated_after: Optional[datetime] = None) -> int:
+        return self._client.call("repo", "count_documents", status, updated_after)
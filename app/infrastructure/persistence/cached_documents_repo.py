@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Optional
+
+from app.domain.models.document import Document, DocumentStatus
+from app.domain.ports.documents_repo import DocumentsRepository, ExpectedStatus, PageKey
+
+
+# Read-through cache in front of DocumentsRepository.get
+#
+# - Bounded: least recently used entries are evicted past `max_entries`
+# - TTL: an entry is re-read after `ttl` seconds, which bounds how stale it can get when
+#   another process (e.g. a worker sharing the SQLite file) updates the document
+# - Writes through this repository drop the entry, so this process never reads its own stale write
+#
+# Callers mutate the Document they get back before calling update(), so every get()
+# hands out its own copy and the cached one is never shared.
+class CachedDocumentsRepository:
+
+    def __init__(self, repo: DocumentsRepository, max_entries: int, ttl: float) -> None:
+        self._repo = repo
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Document]] = OrderedDict() # id -> (expires_at, doc)
+        self._lock = threading.Lock()
+        self._generation = 0 # Bumped on every invalidation
+        self.hits = 0
+        self.misses = 0
+
+    def create(self, document: Document) -> Document:
+        created = self._repo.create(document)
+        self._invalidate(document.id)
+        return created
+
+    def create_many(self, documents: list[Document]) -> list[Document]:
+        created = self._repo.create_many(documents)
+        with self._lock:
+            self._generation += 1
+            for document in documents:
+                self._entries.pop(document.id, None)
+        return created
+
+    def get(self, document_id: str) -> Optional[Document]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(document_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(document_id)
+                self.hits += 1
+                return replace(entry[1])
+            self.misses += 1
+            generation = self._generation
+
+        doc = self._repo.get(document_id)
+        if doc is None:
+            return None
+        with self._lock:
+            # Skip caching if a write happened while we were reading: `doc` may be the old version
+            if generation == self._generation:
+                self._entries[document_id] = (now + self._ttl, replace(doc))
+                self._entries.move_to_end(document_id)
+                if len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return doc
+
+    def update(self, document: Document) -> Document:
+        updated = self._repo.update(document)
+        self._invalidate(document.id)
+        return updated
+
+    def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        updated = self._repo.transition(document_id, expected_status, new_status, started_before, **changes)
+        self._invalidate(document_id) # Even on a miss: our cached copy may be why the caller expected the wrong status
+        return updated
+
+    def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        return self._repo.list_documents(status=status, updated_after=updated_after, after=after, limit=limit)
+
+    def _invalidate(self, document_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(document_id, None)
+
+    # Anything else (close, upsert_many, ...) goes straight to the wrapped repository
+    def __getattr__(self, name: str):
+        return getattr(self._repo, name)
@@ -0,0 +1,311 @@
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, Optional
+from app.domain.models.document import Document, DocumentStatus, stage_timestamps
+from app.domain.ports.documents_repo import ExpectedStatus, PageKey, claim_is_stale, transition_args
+from app.infrastructure.persistence.sorted_index import SortedKeyIndex
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Statuses are stored as their position in this tuple (one byte per document)
+STATUSES = tuple(DocumentStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+INT32_MAX = 2 ** 31 - 1
+INT64_MAX = 2 ** 63 - 1
+NO_DIGEST = bytes(32) # sha256 column value for "no digest" (no real SHA-256 is all zeros)
+
+# Integer fields: (column, largest value that fits). -1 means None; anything else goes to the overflow.
+INT_COLUMNS = {
+    "size_bytes": ("_size_bytes", INT64_MAX),
+    "page_count": ("_page_count", INT32_MAX),
+    "width": ("_width", INT32_MAX),
+    "height": ("_height", INT32_MAX),
+}
+# Stage timestamps: (column), int64 microseconds since the epoch, -1 means None
+TIME_COLUMNS = {
+    "queued_at": "_queued_at",
+    "started_at": "_started_at",
+    "finished_at": "_finished_at",
+}
+# String fields with few distinct values, stored as a code into the interned strings table (0 = None)
+CODE_COLUMNS = {
+    "content_type": "_content_type",
+    "detected_content_type": "_detected_content_type",
+}
+
+
+def _to_micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+# Same contract as InMemoryDocumentsRepository, for millions of documents in one process.
+#
+# Instead of one Document object per document (an object with its own dict, two datetimes,
+# an enum and a copy of every string), documents are rows in typed columns:
+#   - timestamps (stage times too) are int64 microseconds since the epoch, statuses one-byte codes
+#   - content types and s3_key prefixes are interned: a 2-byte code into a shared table
+#   - s3_key itself isn't stored when it is "<prefix><id>/<filename>" (what the storage adapters create)
+#   - sha256 is 32 raw bytes, numbers are fixed-size ints with -1 for None
+#   - rare values (last_error, or anything that doesn't fit its column) live in a small per-row overflow dict
+# A transition writes the status, updated_at and version bytes of the row in place.
+# get() and list_documents() build a fresh Document from the row, so callers never share the stored state.
+class CompactDocumentsRepository:
+    MAX_STRINGS = 65535 # Codes are 2 bytes; once the table is full, new strings go to the overflow
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()   # Every read takes it too: a row is several columns
+        self._rows: Dict[str, int] = {} # id -> row number (rows are never removed)
+
+        # One entry per row in each column
+        self._ids: list[str] = []
+        self._filenames: list[str] = []
+        self._status = array("b")
+        self._created_at = array("q")
+        self._updated_at = array("q")
+        self._version = array("q")
+        self._queued_at = array("q")
+        self._started_at = array("q")
+        self._finished_at = array("q")
+        self._content_type = array("H")
+        self._key_prefix = array("H") # 0 = s3_key is in the overflow
+        self._detected_content_type = array("H")
+        self._size_bytes = array("q")
+        self._page_count = array("i")
+        self._width = array("i")
+        self._height = array("i")
+        self._sha256 = bytearray()    # 32 bytes per row
+        self._overflow: Dict[int, Dict[str, Any]] = {} # row -> {field: value}
+
+        # Interned strings (content types, key prefixes): code -> string, string -> code
+        self._strings: list[Optional[str]] = [None]
+        self._codes: Dict[str, int] = {}
+
+        # Secondary indexes of (updated_at in microseconds, id), same order as (updated_at, id)
+        self._by_time = SortedKeyIndex()
+        self._by_status = [SortedKeyIndex() for _ in STATUSES]
+
+    # Saves a new document and returns it
+    def create(self, document: Document) -> Document:
+        with self._lock:
+            self._put(document, document.version)
+        return document
+
+    # Saves many new documents at once
+    def create_many(self, documents: list[Document]) -> list[Document]:
+        with self._lock:
+            for document in documents:
+                self._put(document, document.version)
+        return documents
+
+    # Finds and returns a document by its id, or None if not found
+    def get(self, document_id: str) -> Optional[Document]:
+        with self._lock:
+            row = self._rows.get(document_id)
+            return None if row is None else self._document(row)
+
+    # Saves changes to an existing document and returns the updated one (with its version bumped)
+    def update(self, document: Document) -> Document:
+        with self._lock:
+            return self._document(self._put(document, document.version + 1))
+
+    # Compare-and-set on the status, atomic under the lock. Only the changed columns of the row are written.
+    def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        expected = transition_args(expected_status, changes)
+        with self._lock:
+            row = self._rows.get(document_id)
+            if row is None or STATUSES[self._status[row]] not in expected:
+                return None
+            started_at = self._started_at[row]
+            if not claim_is_stale(STATUSES[self._status[row]], None if started_at == -1 else _from_micros(started_at), started_before):
+                return None
+            self._unindex(row)
+            now = datetime.now(timezone.utc)
+            previous = STATUSES[self._status[row]]
+            self._status[row] = STATUS_CODES[new_status]
+            self._updated_at[row] = micros = _to_micros(now)
+            self._version[row] += 1
+            for name, value in stage_timestamps(previous, new_status, now).items():
+                getattr(self, TIME_COLUMNS[name])[row] = -1 if value is None else micros
+            for name, value in changes.items():
+                self._set(row, name, value)
+            self._index(row)
+            return self._document(row)
+
+    # One page of documents, oldest update first
+    def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        after_key = None if after is None else (_to_micros(after[0]), after[1])
+        after_time = None if updated_after is None else _to_micros(updated_after)
+        with self._lock:
+            index = self._by_time if status is None else self._by_status[STATUS_CODES[status]]
+            keys = islice(index.iter_from(updated_after=after_time, after=after_key), limit)
+            return [self._document(self._rows[document_id]) for _, document_id in keys]
+
+    def count_documents(self, status: DocumentStatus, updated_after: Optional[datetime] = None) -> int:
+        after_time = None if updated_after is None else _to_micros(updated_after)
+        with self._lock:
+            return self._by_status[STATUS_CODES[status]].count_after(after_time)
+
+    # Writes a whole document into its row (a new row for a new id) and reindexes it. Must hold the lock.
+    def _put(self, document: Document, version: int) -> int:
+        row = self._rows.get(document.id)
+        if row is None:
+            row = self._append_row(document.id)
+        else:
+            self._unindex(row)
+
+        self._filenames[row] = document.filename
+        self._status[row] = STATUS_CODES[document.status]
+        self._created_at[row] = _to_micros(document.created_at)
+        self._updated_at[row] = _to_micros(document.updated_at)
+        self._version[row] = version
+        for name in ("content_type", "s3_key", "last_error", "sha256", "size_bytes",
+                     "detected_content_type", "page_count", "width", "height", *TIME_COLUMNS):
+            self._set(row, name, getattr(document, name))
+        self._index(row)
+        return row
+
+    # Adds an empty row for a new id
+    def _append_row(self, document_id: str) -> int:
+        row = len(self._ids)
+        self._rows[document_id] = row
+        self._ids.append(document_id)
+        self._filenames.append("")
+        for column in (self._status, self._created_at, self._updated_at, self._version,
+                       self._content_type, self._key_prefix, self._detected_content_type):
+            column.append(0)
+        for column in (self._size_bytes, self._page_count, self._width, self._height,
+                       self._queued_at, self._started_at, self._finished_at):
+            column.append(-1)
+        self._sha256 += NO_DIGEST
+        return row
+
+    # Writes one field of a row: into its column if the value fits, otherwise into the row's overflow
+    def _set(self, row: int, name: str, value: Any) -> None:
+        fits = True
+        if name in INT_COLUMNS:
+            column, largest = INT_COLUMNS[name]
+            fits = value is None or (type(value) is int and 0 <= value <= largest)
+            getattr(self, column)[row] = value if value is not None and fits else -1
+        elif name in TIME_COLUMNS:
+            micros = None if value is None else _to_micros(value)
+            fits = micros is None or micros >= 0
+            getattr(self, TIME_COLUMNS[name])[row] = micros if micros is not None and fits else -1
+        elif name in CODE_COLUMNS:
+            code = 0 if value is None else self._intern(value)
+            fits = code is not None
+            getattr(self, CODE_COLUMNS[name])[row] = code or 0
+        elif name == "s3_key":
+            code = self._key_prefix_code(row, value)
+            fits = code is not None
+            self._key_prefix[row] = code or 0
+        elif name == "sha256":
+            digest = NO_DIGEST if value is None else self._digest(value)
+            fits = digest is not None
+            self._sha256[row * 32:row * 32 + 32] = digest or NO_DIGEST
+        elif name == "last_error":
+            fits = value is None # Most documents never fail: no column for it
+
+        extra = self._overflow.get(row)
+        if not fits:
+            if extra is None:
+                extra = self._overflow[row] = {}
+            extra[name] = value
+        elif extra is not None and extra.pop(name, None) is not None and not extra:
+            del self._overflow[row]
+
+    # Code of an interned string, or None once the table is full
+    def _intern(self, value: str) -> Optional[int]:
+        code = self._codes.get(value)
+        if code is None and len(self._strings) <= self.MAX_STRINGS:
+            code = self._codes[value] = len(self._strings)
+            self._strings.append(value)
+        return code
+
+    # Code of the s3_key's prefix if the key is "<prefix><id>/<filename>", else None
+    def _key_prefix_code(self, row: int, s3_key: str) -> Optional[int]:
+        suffix = f"{self._ids[row]}/{self._filenames[row]}"
+        if not s3_key.endswith(suffix):
+            return None
+        return self._intern(s3_key[:len(s3_key) - len(suffix)])
+
+    # 32 raw bytes for a lowercase hex SHA-256, else None (kept as given in the overflow)
+    @staticmethod
+    def _digest(value: str) -> Optional[bytes]:
+        try:
+            digest = bytes.fromhex(value)
+        except (TypeError, ValueError):
+            return None
+        if len(digest) != 32 or digest == NO_DIGEST or digest.hex() != value:
+            return None
+        return digest
+
+    # Builds a Document from a row (must hold the lock)
+    def _document(self, row: int) -> Document:
+        strings = self._strings
+        document_id, filename = self._ids[row], self._filenames[row]
+        digest = self._sha256[row * 32:row * 32 + 32]
+        size_bytes, page_count = self._size_bytes[row], self._page_count[row]
+        width, height = self._width[row], self._height[row]
+        queued_at, started_at, finished_at = self._queued_at[row], self._started_at[row], self._finished_at[row]
+        updated_micros = self._updated_at[row]
+        updated_at = _from_micros(updated_micros)
+        key_prefix = strings[self._key_prefix[row]]
+
+        document = Document(
+            id=document_id,
+            filename=filename,
+            content_type=strings[self._content_type[row]],
+            s3_key=None if key_prefix is None else f"{key_prefix}{document_id}/{filename}",
+            status=STATUSES[self._status[row]],
+            created_at=_from_micros(self._created_at[row]),
+            updated_at=updated_at,
+            sha256=None if digest == NO_DIGEST else digest.hex(),
+            size_bytes=None if size_bytes < 0 else size_bytes,
+            detected_content_type=strings[self._detected_content_type[row]],
+            page_count=None if page_count < 0 else page_count,
+            width=None if width < 0 else width,
+            height=None if height < 0 else height,
+            queued_at=None if queued_at < 0 else _from_micros(queued_at),
+            started_at=None if started_at < 0 else _from_micros(started_at),
+            # Usually the same instant as updated_at (nothing changed since it finished): share the object
+            finished_at=None if finished_at < 0 else updated_at if finished_at == updated_micros else _from_micros(finished_at),
+            version=self._version[row],
+        )
+        extra = self._overflow.get(row)
+        if extra:
+            for name, value in extra.items():
+                setattr(document, name, value)
+        return document
+
+    # Index keys of a row under its current status and updated_at (must hold the lock)
+    def _index(self, row: int) -> None:
+        key = (self._updated_at[row], self._ids[row])
+        self._by_time.add(key)
+        self._by_status[self._status[row]].add(key)
+
+    def _unindex(self, row: int) -> None:
+        key = (self._updated_at[row], self._ids[row])
+        self._by_time.remove(key)
+        self._by_status[self._status[row]].remove(key)
@@ -1,24 +1,112 @@
-from typing import Dict, Optional
-from app.domain.models.document import Document
+import threading
+from dataclasses import replace
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Optional
+from app.domain.models.document import Document, DocumentStatus, stage_timestamps
+from app.domain.ports.documents_repo import ExpectedStatus, PageKey, claim_is_stale, transition_args
+from app.infrastructure.persistence.sorted_index import SortedKeyIndex
 
 # This class is a simple fake database that lives only in memory
 # Follows the exact same rules (contract) as DocumentsRepository
+#
+# Listing uses secondary indexes kept sorted by (updated_at, id) and updated on every write:
+# one over all documents and one per status. A page is a bisect + walk: O(log n + page size).
 class InMemoryDocumentsRepository:
 
     # Runs when you create the repo: starts with an empty database
     def __init__(self) -> None:
         self._docs: Dict[str, Document] = {} # Dictionary: id -> document
+        self._lock = threading.Lock()        # API and worker threads write at the same time
+
+        # Secondary indexes of (updated_at, id)
+        self._by_time = SortedKeyIndex()
+        self._by_status: Dict[DocumentStatus, SortedKeyIndex] = {status: SortedKeyIndex() for status in DocumentStatus}
+        # What each document is currently indexed under (the stored object may be mutated in place)
+        self._indexed: Dict[str, tuple[DocumentStatus, PageKey]] = {}
 
     # Saves a new document and returns it
     def create(self, document: Document) -> Document:
-        self._docs[document.id] = document
+        with self._lock:
+            self._put(document)
         return document
 
+    # Saves many new documents at once
+    def create_many(self, documents: list[Document]) -> list[Document]:
+        with self._lock:
+            for document in documents:
+                self._put(document)
+        return documents
+
     # Finds and returns a document by its id, or None if found
     def get(self, document_id: str) -> Optional[Document]:
         return self._docs.get(document_id)
 
-    # Saves changes to an existing document and returns the updated one
+    # Saves changes to an existing document and returns the updated one (with its version bumped)
     def update(self, document: Document) -> Document:
+        updated = replace(document, version=document.version + 1)
+        with self._lock:
+            self._put(updated)
+        return updated
+
+    # Compare-and-set on the status, atomic under the lock. Stores a new object, never mutates the old one.
+    def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        expected = transition_args(expected_status, changes)
+        with self._lock:
+            current = self._docs.get(document_id)
+            if current is None or current.status not in expected:
+                return None
+            if not claim_is_stale(current.status, current.started_at, started_before):
+                return None
+            now = datetime.now(timezone.utc)
+            updated = replace(
+                current,
+                status=new_status,
+                updated_at=now,
+                version=current.version + 1,
+                **stage_timestamps(current.status, new_status, now),
+                **changes,
+            )
+            self._put(updated)
+        return updated
+
+    # One page of documents, oldest update first
+    def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        with self._lock:
+            index = self._by_time if status is None else self._by_status[status]
+            keys = islice(index.iter_from(updated_after=updated_after, after=after), limit)
+            return [self._docs[document_id] for _, document_id in keys]
+
+    def count_documents(self, status: DocumentStatus, updated_after: Optional[datetime] = None) -> int:
+        with self._lock:
+            return self._by_status[status].count_after(updated_after)
+
+    # Store + reindex one document (must hold the lock)
+    def _put(self, document: Document) -> None:
+        previous = self._indexed.get(document.id)
+        key = (document.updated_at, document.id)
+        if previous is not None:
+            if previous == (document.status, key):
+                self._docs[document.id] = document
+                return
+            old_status, old_key = previous
+            self._by_time.remove(old_key)
+            self._by_status[old_status].remove(old_key)
+
         self._docs[document.id] = document
-        return document
\ No newline at end of file
+        self._by_time.add(key)
+        self._by_status[document.status].add(key)
+        self._indexed[document.id] = (document.status, key)
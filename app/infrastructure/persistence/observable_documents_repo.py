@@ -0,0 +1,73 @@
+import collections
+from datetime import datetime
+from typing import Any, Optional
+
+from app.domain.models.document import Document, DocumentStatus
+from app.domain.ports.documents_repo import DocumentsRepository, ExpectedStatus, PageKey
+from app.domain.ports.status_events import StatusEventsPort
+from app.infrastructure.metrics.app_metrics import STAGE_DURATIONS, TRANSITION_COUNTERS
+
+# Statuses a document's lifecycle ends in: its stage times are recorded then
+FINISHED_STATUSES = (DocumentStatus.COMPLETED, DocumentStatus.FAILED)
+
+
+# Wraps any repository and publishes every update to a StatusEventsPort
+# Everything that changes a status (DocumentService, the async path, process_job in the worker)
+# goes through repo.transition() or repo.update(), so this is the one place that has to fire
+# the event (and count the transition, and record the stage times of a finished document, for /metrics).
+class ObservableDocumentsRepository:
+
+    def __init__(self, repo: DocumentsRepository, events: StatusEventsPort) -> None:
+        self._repo = repo
+        self._events = events
+
+    def create(self, document: Document) -> Document:
+        created = self._repo.create(document)
+        TRANSITION_COUNTERS[document.status].inc()
+        return created
+
+    def create_many(self, documents: list[Document]) -> list[Document]:
+        created = self._repo.create_many(documents)
+        for status, count in collections.Counter(doc.status for doc in documents).items():
+            TRANSITION_COUNTERS[status].inc(count)
+        return created
+
+    def get(self, document_id: str) -> Optional[Document]:
+        return self._repo.get(document_id)
+
+    def update(self, document: Document) -> Document:
+        updated = self._repo.update(document)
+        TRANSITION_COUNTERS[updated.status].inc()
+        self._events.publish(updated)
+        return updated
+
+    # Only a transition that happened is published (a lost compare-and-set changed nothing)
+    def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        updated = self._repo.transition(document_id, expected_status, new_status, started_before, **changes)
+        if updated is not None:
+            TRANSITION_COUNTERS[updated.status].inc()
+            if updated.status in FINISHED_STATUSES:
+                for stage, seconds in updated.stage_seconds().items():
+                    STAGE_DURATIONS[stage].observe(seconds)
+            self._events.publish(updated)
+        return updated
+
+    def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        return self._repo.list_documents(status=status, updated_after=updated_after, after=after, limit=limit)
+
+    # Anything else (close, upsert_many, ...) goes straight to the wrapped repository
+    def __getattr__(self, name: str):
+        return getattr(self._repo, name)
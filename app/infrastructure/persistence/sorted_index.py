@@ -0,0 +1,94 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Iterator, Optional
+
+from app.domain.ports.documents_repo import PageKey
+
+
+# Sorted set of (updated_at, id) keys, stored as a list of small sorted blocks.
+#
+# A single flat list would make every insert/delete in the middle a memmove of the whole
+# list (slow once there are millions of keys). Blocks keep that cost bounded by the block
+# size, while lookups stay a bisect over the block maxima plus a bisect inside one block.
+class SortedKeyIndex:
+    BLOCK_SIZE = 1000
+
+    def __init__(self) -> None:
+        self._blocks: list[list[PageKey]] = []
+        self._maxes: list[PageKey] = []  # Last (largest) key of each block
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: PageKey) -> None:
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+
+        position = bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            # Larger than everything (the common case: updated_at = now) -> append to last block
+            position -= 1
+            self._blocks[position].append(key)
+            self._maxes[position] = key
+        else:
+            insort(self._blocks[position], key)
+        self._len += 1
+
+        block = self._blocks[position]
+        if len(block) > 2 * self.BLOCK_SIZE:
+            # Split an oversized block in two
+            half = len(block) // 2
+            self._blocks[position:position + 1] = [block[:half], block[half:]]
+            self._maxes[position:position + 1] = [block[half - 1], block[-1]]
+
+    def remove(self, key: PageKey) -> bool:
+        position = bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            return False
+        block = self._blocks[position]
+        i = bisect_left(block, key)
+        if i == len(block) or block[i] != key:
+            return False
+
+        del block[i]
+        self._len -= 1
+        if not block:
+            del self._blocks[position]
+            del self._maxes[position]
+        elif i == len(block):
+            self._maxes[position] = block[-1]
+        return True
+
+    # Keys in order, starting right after `after` and after `updated_after` (both exclusive)
+    def iter_from(self, updated_after: Optional[datetime] = None, after: Optional[PageKey] = None) -> Iterator[PageKey]:
+        position, i = 0, 0
+        if updated_after is not None:
+            position, i = self._locate(lambda keys: bisect_right(keys, updated_after, key=lambda k: k[0]))
+        if after is not None:
+            candidate = self._locate(lambda keys: bisect_right(keys, after))
+            position, i = max((position, i), candidate)
+
+        blocks = self._blocks
+        if position < len(blocks):
+            yield from blocks[position][i:]
+        for position in range(position + 1, len(blocks)):
+            yield from blocks[position]
+
+    # How many keys have updated_at > updated_after (all of them when None).
+    # A bisect plus the lengths of the blocks after it: cheap for recent windows, the common question.
+    def count_after(self, updated_after: Optional[datetime] = None) -> int:
+        if updated_after is None:
+            return self._len
+        position, i = self._locate(lambda keys: bisect_right(keys, updated_after, key=lambda k: k[0]))
+        return sum(len(block) for block in self._blocks[position:]) - i
+
+    # (block, offset) of the first key for which `find` says "after here"
+    def _locate(self, find) -> tuple[int, int]:
+        position = find(self._maxes)
+        if position == len(self._blocks):
+            return position, 0
+        return position, find(self._blocks[position])
@@ -0,0 +1,326 @@
+import sqlite3
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from app.domain.models.document import Document, DocumentStatus, stage_timestamps
+from app.domain.ports.documents_repo import ExpectedStatus, PageKey, transition_args
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id           TEXT PRIMARY KEY,
+    filename     TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    s3_key       TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    created_at   INTEGER NOT NULL, -- microseconds since epoch (UTC)
+    updated_at   INTEGER NOT NULL,
+    last_error   TEXT,
+    -- Filled in by the processor
+    sha256                TEXT,
+    size_bytes            INTEGER,
+    detected_content_type TEXT,
+    page_count            INTEGER,
+    width                 INTEGER,
+    height                INTEGER,
+    version               INTEGER NOT NULL DEFAULT 1, -- Bumped by every write
+    -- When the document entered each stage (microseconds, NULL = not reached)
+    queued_at             INTEGER,
+    started_at            INTEGER,
+    finished_at           INTEGER
+);
+-- Both listing orders are (updated_at, id), so id is part of the index and pages need no sort step
+CREATE INDEX IF NOT EXISTS idx_documents_status_time ON documents (status, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_documents_time ON documents (updated_at, id);
+DROP INDEX IF EXISTS idx_documents_status_updated_at;
+DROP INDEX IF EXISTS idx_documents_updated_at;
+"""
+
+# Statements are plain constants so every connection's statement cache
+# compiles each one once and reuses the prepared statement afterwards
+COLUMNS = (
+    "id, filename, content_type, s3_key, status, created_at, updated_at, last_error, "
+    "sha256, size_bytes, detected_content_type, page_count, width, height, version, "
+    "queued_at, started_at, finished_at"
+)
+INSERT_SQL = f"INSERT INTO documents ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+UPSERT_SQL = INSERT_SQL + """
+ON CONFLICT(id) DO UPDATE SET
+    filename = excluded.filename,
+    content_type = excluded.content_type,
+    s3_key = excluded.s3_key,
+    status = excluded.status,
+    created_at = excluded.created_at,
+    updated_at = excluded.updated_at,
+    last_error = excluded.last_error,
+    sha256 = excluded.sha256,
+    size_bytes = excluded.size_bytes,
+    detected_content_type = excluded.detected_content_type,
+    page_count = excluded.page_count,
+    width = excluded.width,
+    height = excluded.height,
+    version = excluded.version,
+    queued_at = excluded.queued_at,
+    started_at = excluded.started_at,
+    finished_at = excluded.finished_at
+"""
+SELECT_SQL = f"SELECT {COLUMNS} FROM documents WHERE id = ?"
+UPDATE_SQL = """
+UPDATE documents
+SET filename = ?, content_type = ?, s3_key = ?, status = ?, created_at = ?, updated_at = ?, last_error = ?,
+    sha256 = ?, size_bytes = ?, detected_content_type = ?, page_count = ?, width = ?, height = ?, version = ?,
+    queued_at = ?, started_at = ?, finished_at = ?
+WHERE id = ?
+"""
+
+# Columns added after the first release: (name, type), added to older database files on open
+ADDED_COLUMNS = [
+    ("sha256", "TEXT"),
+    ("size_bytes", "INTEGER"),
+    ("detected_content_type", "TEXT"),
+    ("page_count", "INTEGER"),
+    ("width", "INTEGER"),
+    ("height", "INTEGER"),
+    ("version", "INTEGER NOT NULL DEFAULT 1"),
+    ("queued_at", "INTEGER"),
+    ("started_at", "INTEGER"),
+    ("finished_at", "INTEGER"),
+]
+
+
+def _to_micros(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+# Same, for nullable columns
+def _to_micros_or_none(value: Optional[datetime]) -> Optional[int]:
+    return None if value is None else _to_micros(value)
+
+
+def _from_micros_or_none(value: Optional[int]) -> Optional[datetime]:
+    return None if value is None else _from_micros(value)
+
+
+def _to_row(doc: Document) -> tuple:
+    return (
+        doc.id,
+        doc.filename,
+        doc.content_type,
+        doc.s3_key,
+        doc.status.value,
+        _to_micros(doc.created_at),
+        _to_micros(doc.updated_at),
+        doc.last_error,
+        doc.sha256,
+        doc.size_bytes,
+        doc.detected_content_type,
+        doc.page_count,
+        doc.width,
+        doc.height,
+        doc.version,
+        _to_micros_or_none(doc.queued_at),
+        _to_micros_or_none(doc.started_at),
+        _to_micros_or_none(doc.finished_at),
+    )
+
+
+def _from_row(row: tuple) -> Document:
+    return Document(
+        id=row[0],
+        filename=row[1],
+        content_type=row[2],
+        s3_key=row[3],
+        status=DocumentStatus(row[4]),
+        created_at=_from_micros(row[5]),
+        updated_at=_from_micros(row[6]),
+        last_error=row[7],
+        sha256=row[8],
+        size_bytes=row[9],
+        detected_content_type=row[10],
+        page_count=row[11],
+        width=row[12],
+        height=row[13],
+        version=row[14],
+        queued_at=_from_micros_or_none(row[15]),
+        started_at=_from_micros_or_none(row[16]),
+        finished_at=_from_micros_or_none(row[17]),
+    )
+
+
+# Durable repository backed by an embedded SQLite file
+# Follows the exact same rules (contract) as DocumentsRepository
+#
+# - WAL mode: readers never block the writer and vice versa, so API reads and worker writes overlap
+# - One connection per thread, created on first use and kept for the life of the thread
+# - Indexes on (status, updated_at, id) and (updated_at, id), so listing pages are index range scans
+class SQLiteDocumentsRepository:
+
+    def __init__(self, path: str) -> None:
+        if path in ("", ":memory:"):
+            # Every thread gets its own connection, and each :memory: connection is a separate database
+            raise ValueError("SQLiteDocumentsRepository needs a file path (WAL doesn't work with :memory:)")
+
+        self._path = path
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        with self._connection() as conn:
+            self._migrate(conn)
+            conn.executescript(SCHEMA)
+
+    # Brings a database file created by an older version up to the current columns
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(documents)")}
+        if not existing:
+            return # New file, SCHEMA creates everything
+        for name, sql_type in ADDED_COLUMNS:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE documents ADD COLUMN {name} {sql_type}")
+
+    # The calling thread's connection (opened on first use)
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self._path,
+                timeout=30.0,              # Wait for the write lock instead of failing under contention
+                isolation_level=None,      # Autocommit; batches open their own transaction
+                check_same_thread=False,   # Only so close() can run from another thread
+                cached_statements=128,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL") # Durable across app crashes; fsync on checkpoint
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    # Saves a new document and returns it
+    def create(self, document: Document) -> Document:
+        self._connection().execute(INSERT_SQL, _to_row(document))
+        return document
+
+    # Saves many documents in one transaction (inserts new ones, overwrites existing ones)
+    def create_many(self, documents: list[Document]) -> list[Document]:
+        self.upsert_many(documents)
+        return documents
+
+    # Bulk insert-or-update with a single prepared statement, all in one transaction
+    def upsert_many(self, documents: Iterable[Document]) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(UPSERT_SQL, (_to_row(doc) for doc in documents))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # Finds and returns a document by its id, or None if not found
+    def get(self, document_id: str) -> Optional[Document]:
+        row = self._connection().execute(SELECT_SQL, (document_id,)).fetchone()
+        return _from_row(row) if row is not None else None
+
+    # Saves changes to an existing document and returns the updated one (with its version bumped)
+    def update(self, document: Document) -> Document:
+        updated = replace(document, version=document.version + 1)
+        row = _to_row(updated)
+        self._connection().execute(UPDATE_SQL, row[1:] + (row[0],))
+        return updated
+
+    # Compare-and-set: the WHERE clause checks the status, so of two racing callers exactly one
+    # matches the row (SQLite runs writes one at a time). The UPDATE commits within one call, so the
+    # write lock is never held while this thread waits for the GIL (UPDATE ... RETURNING would keep
+    # it until the row is fetched, which stalls every other writer when threads are busy).
+    # The new row is then read back (if another writer got in between, that later version is returned).
+    def transition(
+            self,
+            document_id: str,
+            expected_status: ExpectedStatus,
+            new_status: DocumentStatus,
+            started_before: Optional[datetime] = None,
+            **changes: Any,
+    ) -> Optional[Document]:
+        expected = sorted(status.value for status in transition_args(expected_status, changes))
+        now = datetime.now(timezone.utc)
+        # The old status is only known inside the UPDATE, so a retry (PROCESSING -> QUEUED) keeping
+        # queued_at is a CASE there. Any other move sets or clears queued_at like stage_timestamps says.
+        stamps = {name: _to_micros_or_none(value) for name, value in stage_timestamps(None, new_status, now).items()}
+        retry_keeps_queued_at = new_status == DocumentStatus.QUEUED
+        stamp_sql = ''.join(
+            ", queued_at = CASE WHEN status = 'PROCESSING' THEN queued_at ELSE ? END"
+            if name == "queued_at" and retry_keeps_queued_at else f", {name} = ?"
+            for name in stamps
+        )
+        # Few distinct shapes (one per call site), so the statement cache still reuses them
+        sql = (
+            f"UPDATE documents SET status = ?, updated_at = ?, version = version + 1{stamp_sql}"
+            f"{''.join(f', {name} = ?' for name in changes)} "
+            f"WHERE id = ? AND status IN ({', '.join('?' * len(expected))})"
+            # claim_is_stale, as SQL
+            f"{' AND (status != ? OR started_at IS NULL OR started_at < ?)' if started_before is not None else ''}"
+        )
+        params = [new_status.value, _to_micros(now), *stamps.values(), *changes.values(), document_id, *expected]
+        if started_before is not None:
+            params += [DocumentStatus.PROCESSING.value, _to_micros(started_before)]
+        conn = self._connection()
+        if conn.execute(sql, params).rowcount != 1:
+            return None
+        row = conn.execute(SELECT_SQL, (document_id,)).fetchone()
+        return _from_row(row) if row is not None else None
+
+    # One page of documents, oldest update first (walks the (status,) updated_at, id index)
+    def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            after: Optional[PageKey] = None,
+            limit: int = 50,
+    ) -> list[Document]:
+        where: list[str] = []
+        params: list = []
+        if status is not None:
+            where.append("status = ?")
+            params.append(status.value)
+        if updated_after is not None:
+            where.append("updated_at > ?")
+            params.append(_to_micros(updated_after))
+        if after is not None:
+            where.append("(updated_at, id) > (?, ?)")
+            params.extend([_to_micros(after[0]), after[1]])
+
+        sql = f"SELECT {COLUMNS} FROM documents"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY updated_at, id LIMIT ?"
+        params.append(limit)
+
+        rows = self._connection().execute(sql, params).fetchall()
+        return [_from_row(row) for row in rows]
+
+    # A range count on idx_documents_status_time
+    def count_documents(self, status: DocumentStatus, updated_after: Optional[datetime] = None) -> int:
+        if updated_after is None:
+            sql, params = "SELECT COUNT(*) FROM documents WHERE status = ?", (status.value,)
+        else:
+            sql = "SELECT COUNT(*) FROM documents WHERE status = ? AND updated_at > ?"
+            params = (status.value, _to_micros(updated_after))
+        return self._connection().execute(sql, params).fetchone()[0]
+
+    # Closes every connection this repository opened
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,78 @@
+import sqlite3
+import threading
+from typing import Optional
+
+from app.domain.models.processing_result import ProcessingResult
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processing_results (
+    sha256                TEXT PRIMARY KEY,
+    size_bytes            INTEGER NOT NULL,
+    detected_content_type TEXT NOT NULL,
+    page_count            INTEGER,
+    width                 INTEGER,
+    height                INTEGER
+) WITHOUT ROWID;
+"""
+
+COLUMNS = "sha256, size_bytes, detected_content_type, page_count, width, height"
+SELECT_SQL = f"SELECT {COLUMNS} FROM processing_results WHERE sha256 = ?"
+UPSERT_SQL = f"INSERT OR REPLACE INTO processing_results ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+# Persistent tier of the result cache: one row per distinct content, survives restarts
+# and is shared by every worker process using the same file (usually SQLITE_PATH, next to the documents table)
+class SQLiteResultCache:
+
+    def __init__(self, path: str) -> None:
+        if path in ("", ":memory:"):
+            raise ValueError("SQLiteResultCache needs a file path")
+
+        self._path = path
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._connection().executescript(SCHEMA)
+
+    # The calling thread's connection (opened on first use)
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, sha256: str) -> Optional[ProcessingResult]:
+        row = self._connection().execute(SELECT_SQL, (sha256,)).fetchone()
+        if row is None:
+            return None
+        return ProcessingResult(
+            sha256=row[0],
+            size_bytes=row[1],
+            detected_content_type=row[2],
+            page_count=row[3],
+            width=row[4],
+            height=row[5],
+        )
+
+    def put(self, result: ProcessingResult) -> None:
+        self._connection().execute(UPSERT_SQL, (
+            result.sha256,
+            result.size_bytes,
+            result.detected_content_type,
+            result.page_count,
+            result.width,
+            result.height,
+        ))
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,148 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from app.core.settings import settings
+from app.infrastructure.metrics.app_metrics import PROFILES_WRITTEN
+
+logger = logging.getLogger(__name__)
+
+# Characters kept from a job or route name in the file name
+UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+# One profiled job or request: the thread it runs on and the stacks seen there so far
+class ProfileSession:
+
+    def __init__(self, kind: str, name: str, thread_id: int) -> None:
+        self.kind = kind
+        self.name = name # May be set while running (e.g. the route, known once the router matched)
+        self.thread_id = thread_id
+        self.stacks: Counter[str] = Counter()
+        self.duration = 0.0
+
+
+class SamplingProfiler:
+    """
+    Low-overhead sampling profiler for slow jobs and slow requests.
+
+    Code runs inside `with profiler.profile("job", document_id):`. While at least one session is
+    open, a background thread reads the stack of every profiled thread each `interval` seconds
+    (sys._current_frames(): nothing is traced, the profiled code runs at full speed). When a
+    session took `slow_threshold` seconds or more, its stacks are written to
+    `<output_dir>/<kind>-<time>-<name>.folded` in collapsed-stack format (one "root;...;leaf count"
+    line per stack), which flamegraph.pl, speedscope and inferno read as is. Faster sessions are
+    dropped. Only the newest `max_files` files are kept.
+
+    A sample shows the thread, not the task: an async request is sampled on the event loop
+    thread, so requests running at the same time share samples, and time spent waiting on a
+    thread or child process shows up as that wait (the work itself isn't in the profile).
+    """
+
+    def __init__(self, interval: float = 0.005, slow_threshold: float = 1.0, output_dir: str = "profiles", max_files: int = 100) -> None:
+        self._interval = interval
+        self._slow_threshold = slow_threshold
+        self._output_dir = output_dir
+        self._max_files = max_files
+        self._sessions: set[ProfileSession] = set()
+        self._lock = threading.Lock()
+        self._active = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+
+    # Profiler for one kind of work, from the PROFILE_* settings
+    @classmethod
+    def from_settings(cls, slow_threshold: float) -> "SamplingProfiler":
+        return cls(
+            interval=max(settings.PROFILE_INTERVAL_MS, 1) / 1000,
+            slow_threshold=slow_threshold,
+            output_dir=settings.PROFILE_DIR,
+            max_files=settings.PROFILE_MAX_FILES,
+        )
+
+    # Samples the current thread while the block runs, and writes the stacks if it was slow
+    @contextmanager
+    def profile(self, kind: str, name: str = "") -> Iterator[ProfileSession]:
+        session = ProfileSession(kind, name, threading.get_ident())
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+            self._active.notify()
+        started = time.perf_counter()
+        try:
+            yield session
+        finally:
+            session.duration = time.perf_counter() - started
+            with self._lock:
+                self._sessions.discard(session)
+            if session.duration >= self._slow_threshold and session.stacks:
+                try:
+                    self._write(session)
+                except OSError:
+                    logger.exception("Couldn't write the profile of a slow %s", kind)
+
+    # Sampler thread: sleeps while nothing is profiled
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                while not self._sessions:
+                    self._active.wait()
+                sessions = list(self._sessions)
+            frames = sys._current_frames()
+            stacks: dict[int, str] = {} # One walk per thread, shared by the sessions on it
+            for session in sessions:
+                frame = frames.get(session.thread_id)
+                if frame is None or session.thread_id == me:
+                    continue
+                if session.thread_id not in stacks:
+                    stacks[session.thread_id] = collapse(frame)
+                session.stacks[stacks[session.thread_id]] += 1
+            del frames
+            time.sleep(self._interval)
+
+    def _write(self, session: ProfileSession) -> None:
+        os.makedirs(self._output_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+        name = UNSAFE_NAME.sub("_", session.name).strip("_")[:80] or "unnamed"
+        path = os.path.join(self._output_dir, f"{session.kind}-{stamp}-{name}.folded")
+        with open(path, "w") as f:
+            for stack, count in session.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        PROFILES_WRITTEN.labels(session.kind).inc()
+        logger.info(
+            "Slow %s %s took %.2fs: %d samples written to %s",
+            session.kind, session.name, session.duration, sum(session.stacks.values()), path,
+        )
+        self._prune()
+
+    # Deletes the oldest profiles beyond max_files
+    def _prune(self) -> None:
+        paths = [os.path.join(self._output_dir, n) for n in os.listdir(self._output_dir) if n.endswith(".folded")]
+        if len(paths) <= self._max_files:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self._max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass # Another process pruned it first
+
+
+# "outer (file.py:12);...;inner (file.py:34)" for a frame and its callers, root first
+def collapse(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+from app.domain.ports.queue import EnqueueResult
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+
+if TYPE_CHECKING: # Type hint only: importing SQSQueue loads boto3, which local mode never needs
+    from app.infrastructure.queue.sqs_queue import SQSQueue
+
+
+# Async face of InMemoryQueue: enqueue only appends to a deque, runs on the event loop
+class AsyncInMemoryQueue:
+
+    def __init__(self, queue: InMemoryQueue) -> None:
+        self._queue = queue # Shared with the worker
+
+    async def enqueue_document_processing(
+            self, document_id: str, object_key: str, priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> str:
+        return self._queue.enqueue_document_processing(document_id, object_key, priority, tenant)
+
+    async def enqueue_document_processing_batch(
+            self, jobs: list[tuple[str, str]], priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> list[EnqueueResult]:
+        return self._queue.enqueue_document_processing_batch(jobs, priority, tenant)
+
+
+# Async face of SQSQueue
+# boto3 is blocking, so SQS calls run on a dedicated thread pool sized for network waits
+# (ASYNC_BLOCKING_MAX_WORKERS) instead of FastAPI's shared threadpool. The event loop
+# itself never waits on the network.
+class AsyncSQSQueue:
+
+    def __init__(self, queue: SQSQueue, max_workers: int) -> None:
+        self._queue = queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sqs-io")
+
+    async def enqueue_document_processing(
+            self, document_id: str, object_key: str, priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._queue.enqueue_document_processing, document_id, object_key, priority, tenant
+        )
+
+    async def enqueue_document_processing_batch(
+            self, jobs: list[tuple[str, str]], priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> list[EnqueueResult]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._queue.enqueue_document_processing_batch, jobs, priority, tenant
+        )
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Optional
+
+from app.domain.models.job_message import JobMessage
+from app.domain.ports.queue import EnqueueResult
+from app.infrastructure.broker.broker_client import BrokerClient
+
+
+# Queue hosted by the local broker process: jobs enqueued by the API reach workers in other processes.
+# Same leases, lanes, tenants and dead letters as InMemoryQueue (it is one, inside the broker).
+class BrokerQueue:
+    name = "broker"
+
+    def __init__(self, client: BrokerClient) -> None:
+        self._client = client
+        self._lanes: Optional[list[str]] = None
+
+    # Lane names, highest priority first (fixed while the broker runs, so asked once)
+    @property
+    def lanes(self) -> list[str]:
+        if self._lanes is None:
+            self._lanes = self._client.call("queue", "lanes")
+        return list(self._lanes)
+
+    def enqueue_document_processing(
+            self, document_id: str, object_key: str, priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> str:
+        return self._client.call("queue", "enqueue_document_processing", document_id, object_key, priority, tenant)
+
+    def enqueue_document_processing_batch(
+            self, jobs: list[tuple[str, str]], priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> list[EnqueueResult]:
+        return self._client.call("queue", "enqueue_document_processing_batch", jobs, priority, tenant)
+
+    def depth(self, lane: Optional[str] = None) -> int:
+        return self._client.call("queue", "depth", lane)
+
+    def in_flight(self, lane: Optional[str] = None) -> int:
+        return self._client.call("queue", "in_flight", lane)
+
+    # Long-polls inside the broker (on its side pool, so other calls on the connection keep flowing)
+    def receive_jobs(
+            self,
+            max_messages: int = 10,
+            wait_seconds: int = 0,
+            visibility_timeout: int | None = None,
+            lane: Optional[str] = None,
+    ) -> list[JobMessage]:
+        return self._client.call("queue", "receive_jobs", max_messages, wait_seconds, visibility_timeout, lane)
+
+    def ack_jobs(self, jobs: list[JobMessage]) -> list[JobMessage]:
+        return self._client.call("queue", "ack_jobs", jobs)
+
+    def extend_visibility(self, jobs: list[JobMessage], timeout_seconds: int) -> None:
+        self._client.call("queue", "extend_visibility", jobs, timeout_seconds)
+
+    def release_jobs(self, jobs: list[JobMessage], delay_seconds: float = 0) -> None:
+        self._client.call("queue", "release_jobs", jobs, delay_seconds)
+
+    def dead_letter_jobs(self, jobs: list[JobMessage], reason: str) -> list[JobMessage]:
+        return self._client.call("queue", "dead_letter_jobs", jobs, reason)
+
+    def dead_letters(self) -> list[dict]:
+        return self._client.call("queue", "dead_letters")
+
+    def dead_letter_depth(self) -> int:
+        return self._client.call("queue", "dead_letter_depth")
+
+
+# Async face of BrokerQueue: the request is written to the broker connection and the
+# event loop awaits the reply (completed by the client's reader thread), no thread pool needed
+class AsyncBrokerQueue:
+
+    def __init__(self, client: BrokerClient) -> None:
+        self._client = client
+
+    async def enqueue_document_processing(
+            self, document_id: str, object_key: str, priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> str:
+        return await asyncio.wrap_future(
+            self._client.submit("queue", "enqueue_document_processing", document_id, object_key, priority, tenant)
+        )
+
+    async def enqueue_document_processing_batch(
+            self, jobs: list[tuple[str, str]], priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> list[EnqueueResult]:
+        return await asyncio.wrap_future(
+            self._client.submit("queue", "enqueue_document_processing_batch", jobs, priority, tenant)
+        )
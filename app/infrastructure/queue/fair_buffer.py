@@ -0,0 +1,139 @@
+import threading
+from collections import deque
+from typing import Generic, Hashable, Optional, TypeVar
+
+from app.domain.models.job_message import JobMessage
+
+T = TypeVar("T")
+
+
+# FIFO per tenant, and tenants take turns: one tenant's 50k jobs can't push another's 1 job to the back.
+# Items without a tenant (None) count as one tenant. All operations are O(1).
+class TenantQueue(Generic[T]):
+
+    def __init__(self) -> None:
+        self._by_tenant: dict[Optional[Hashable], deque[T]] = {}
+        self._turns: deque[Optional[Hashable]] = deque() # Tenants with items, next one first
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, tenant: Optional[Hashable], item: T) -> None:
+        items = self._by_tenant.get(tenant)
+        if items is None:
+            items = self._by_tenant[tenant] = deque()
+            self._turns.append(tenant)
+        items.append(item)
+        self._size += 1
+
+    # Puts an item back in front of its tenant's other items (e.g. a lease that ran out)
+    def appendleft(self, tenant: Optional[Hashable], item: T) -> None:
+        items = self._by_tenant.get(tenant)
+        if items is None:
+            items = self._by_tenant[tenant] = deque()
+            self._turns.appendleft(tenant)
+        items.appendleft(item)
+        self._size += 1
+
+    # Next item of the tenant whose turn it is; raises IndexError when empty
+    def popleft(self) -> T:
+        tenant = self._turns[0]
+        items = self._by_tenant[tenant]
+        item = items.popleft()
+        if items:
+            self._turns.rotate(-1) # This tenant goes to the back of the line
+        else:
+            del self._by_tenant[tenant]
+            self._turns.popleft()
+        self._size -= 1
+        return item
+
+
+class FairJobBuffer:
+    """
+    Jobs a worker has received and not started yet, handed to slots weighted-fair across lanes.
+
+    Stride scheduling: each lane has a "pass" that grows by 1/weight whenever one of its jobs is
+    taken, and the next job comes from the non-empty lane with the lowest pass (ties go to the
+    earlier lane). While lanes are busy, each gets slots in proportion to its weight, so bulk work
+    keeps moving without starving interactive jobs. A lane that was empty rejoins at the current
+    pass instead of its old one, so it can't save up credit while idle. Within a lane, tenants take turns.
+    """
+
+    def __init__(self, weights: dict[str, int], capacity_per_lane: int) -> None:
+        if not weights:
+            raise ValueError("At least one lane is needed")
+        self._weights = {lane: max(int(weight), 1) for lane, weight in weights.items()}
+        self._default_lane = next(iter(self._weights))
+        self._capacity = capacity_per_lane
+        self._lanes: dict[str, TenantQueue[JobMessage]] = {lane: TenantQueue() for lane in self._weights}
+        self._pass: dict[str, float] = dict.fromkeys(self._weights, 0.0)
+        self._now = 0.0      # Pass of the last job taken ("virtual time")
+        self._unfinished = 0 # Put but not task_done() yet (buffered + running)
+        self._closed = False
+        lock = threading.Lock()
+        self._cond = threading.Condition(lock)      # Slots wait here for jobs
+        self._room_cond = threading.Condition(lock) # Feeders wait here for room
+
+    @property
+    def lanes(self) -> list[str]:
+        return list(self._weights)
+
+    # The lane a job is scheduled in (jobs from lanes this buffer doesn't know go to the first one)
+    def lane_of(self, job: JobMessage) -> str:
+        return job.priority if job.priority in self._lanes else self._default_lane
+
+    # How many more jobs this lane may buffer, waiting up to `timeout` seconds for a slot to take one if it is full
+    def wait_for_room(self, lane: str, timeout: float) -> int:
+        with self._cond:
+            if len(self._lanes[lane]) >= self._capacity:
+                self._room_cond.wait(timeout)
+            return self._capacity - len(self._lanes[lane])
+
+    def put(self, job: JobMessage) -> None:
+        lane = self.lane_of(job)
+        with self._cond:
+            queue = self._lanes[lane]
+            if not queue:
+                self._pass[lane] = max(self._pass[lane], self._now)
+            queue.append(job.tenant, job)
+            self._unfinished += 1
+            self._cond.notify()
+
+    # Blocks until a job is ready; None once close() was called and nothing is left
+    def get(self) -> Optional[JobMessage]:
+        with self._cond:
+            while True:
+                lane = self._next_lane()
+                if lane is not None:
+                    self._now = self._pass[lane]
+                    self._pass[lane] += 1.0 / self._weights[lane]
+                    self._room_cond.notify_all()
+                    return self._lanes[lane].popleft()
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    # Marks a job taken with get() as finished
+    def task_done(self) -> None:
+        with self._cond:
+            self._unfinished -= 1
+
+    # No more put() calls: slots drain what is buffered, then get() returns None
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def unfinished_tasks(self) -> int:
+        with self._cond:
+            return self._unfinished
+
+    def _next_lane(self) -> Optional[str]:
+        best = None
+        for lane, queue in self._lanes.items():
+            if queue and (best is None or self._pass[lane] < self._pass[best]):
+                best = lane
+        return best
@@ -1,29 +1,272 @@
+import heapq
+import threading
+import time
 import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.settings import settings
+from app.domain.models.job_message import JobMessage
+from app.domain.ports.queue import EnqueueResult
+from app.infrastructure.queue.fair_buffer import TenantQueue
+
+
+# One queued job as the queue stores it internally
+class _Message:
+    __slots__ = ("job_id", "document_id", "object_key", "lane", "tenant", "requested_at", "receive_count")
+
+    def __init__(self, job_id: str, document_id: str, object_key: str, lane: str, tenant: Optional[str]) -> None:
+        self.job_id = job_id
+        self.document_id = document_id
+        self.object_key = object_key
+        self.lane = lane
+        self.tenant = tenant
+        self.requested_at = datetime.now(timezone.utc)
+        self.receive_count = 0
+
 
 # Fake queue that lives only in memory
 # It pretends to send jobs for background processing
+#
+# Behaves like SQS under concurrency:
+# - dequeue leases a message for `visibility_timeout` seconds instead of deleting it
+# - ack(receipt_handle) deletes it, release(receipt_handle) puts it back right away
+# - a lease that runs out puts the message back at the front of the queue
+# - dead-lettered messages are deleted and kept in a separate list (like an SQS dead-letter queue)
+# One sub-queue per lane (QUEUE_LANES); within a lane, tenants take turns.
+# All operations are O(1) (O(log n) for lease bookkeeping) and thread-safe.
 class InMemoryQueue:
+    name = "memory"
+
+    # Starts with an empty queue
+    def __init__(self, visibility_timeout: float = 30.0, lanes: Optional[list[str]] = None) -> None:
+        self._visibility_timeout = visibility_timeout
+        self._lanes = list(lanes or settings.QUEUE_LANES)
+        self._ready: dict[str, TenantQueue[_Message]] = {lane: TenantQueue() for lane in self._lanes} # Visible messages
+        self._leases: dict[str, tuple[_Message, float]] = {} # receipt handle -> (message, expires at)
+        self._expiry_heap: list[tuple[float, str]] = []     # (expires at, receipt handle), may hold stale entries
+        self._dead_letters: list[dict] = [] # Jobs given up on, oldest first
+        self._cond = threading.Condition()
 
-    # Starts with an empty list of messages
-    def __init__(self) -> None:
-        self._messages: list[dict] = []
+    # Lane names, highest priority first
+    @property
+    def lanes(self) -> list[str]:
+        return list(self._lanes)
 
     # Adds a new job to the "queue" and returns a job ID
-    def enqueue_document_processing(self, document_id: str, object_key: str) -> str:
+    # priority picks the lane (unknown or None = first lane)
+    def enqueue_document_processing(
+            self, document_id: str, object_key: str, priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> str:
         job_id = str(uuid.uuid4()) # Random unique ID for the job
-        message = {
-            "job_id": job_id,
-            "document_id": document_id,
-            "object_key": object_key,
-        }
-        self._messages.append(message) # Save it in the list
+        with self._cond:
+            self._append(_Message(job_id, document_id, object_key, self._lane(priority), tenant))
+            self._cond.notify_all() # Feeders may be waiting on different lanes
         return job_id # Give the ID back to the caller
 
+    # Adds many jobs at once; in memory nothing can fail halfway
+    def enqueue_document_processing_batch(
+            self, jobs: list[tuple[str, str]], priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> list[EnqueueResult]:
+        results = []
+        lane = self._lane(priority)
+        with self._cond:
+            for document_id, object_key in jobs:
+                message = _Message(str(uuid.uuid4()), document_id, object_key, lane, tenant)
+                self._append(message)
+                results.append(EnqueueResult(document_id=document_id, job_id=message.job_id))
+            self._cond.notify_all()
+        return results
+
+    # Gives the next job message to the worker, leased for visibility_timeout seconds
+        # Waits up to `timeout` seconds for one to arrive (0 = don't wait, None = wait forever)
+        # Returns None if nothing arrived in time
+    def dequeue(self, timeout: float | None = 0.0, visibility_timeout: float | None = None) -> dict | None:
+        batch = self.dequeue_batch(1, timeout=timeout, visibility_timeout=visibility_timeout)
+        return batch[0] if batch else None
+
+    # Same as dequeue, but takes up to max_messages in one go
+    # From one lane, or (lane=None) from all lanes in priority order
+    def dequeue_batch(
+            self,
+            max_messages: int,
+            timeout: float | None = 0.0,
+            visibility_timeout: float | None = None,
+            lane: Optional[str] = None,
+    ) -> list[dict]:
+        lease_for = self._visibility_timeout if visibility_timeout is None else visibility_timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        sources = [self._ready[lane]] if lane is not None else list(self._ready.values())
+
+        with self._cond:
+            while True:
+                self._requeue_expired()
+                if any(sources):
+                    break
+                wait_for = self._next_expiry_in()
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return []
+                    wait_for = remaining if wait_for is None else min(wait_for, remaining)
+                self._cond.wait(timeout=wait_for)
+
+            batch = []
+            expires_at = time.monotonic() + lease_for
+            for source in sources:
+                while source and len(batch) < max_messages:
+                    batch.append(self._lease(source.popleft(), expires_at))
+            return batch
+
+    # Hands out one message under a new lease (must hold the lock)
+    def _lease(self, message: _Message, expires_at: float) -> dict:
+        message.receive_count += 1
+        receipt_handle = uuid.uuid4().hex
+        self._leases[receipt_handle] = (message, expires_at)
+        heapq.heappush(self._expiry_heap, (expires_at, receipt_handle))
+        return {
+            "job_id": message.job_id,
+            "document_id": message.document_id,
+            "object_key": message.object_key,
+            "receipt_handle": receipt_handle,
+            "receive_count": message.receive_count,
+            "priority": message.lane,
+            "tenant": message.tenant,
+            "requested_at": message.requested_at,
+        }
+
+    # Deletes a leased message for good. False if the lease already ran out.
+    def ack(self, receipt_handle: str) -> bool:
+        with self._cond:
+            self._requeue_expired()
+            return self._leases.pop(receipt_handle, None) is not None
+
+    # Gives a leased message back so the next consumer gets it immediately
+    def release(self, receipt_handle: str) -> bool:
+        with self._cond:
+            self._requeue_expired()
+            lease = self._leases.pop(receipt_handle, None)
+            if lease is None:
+                return False
+            self._prepend(lease[0])
+            self._cond.notify_all()
+            return True
+
+    # Keeps a leased message hidden for `timeout` more seconds. False if the lease already ran out.
+    def extend_lease(self, receipt_handle: str, timeout: float) -> bool:
+        with self._cond:
+            self._requeue_expired()
+            lease = self._leases.get(receipt_handle)
+            if lease is None:
+                return False
+            expires_at = time.monotonic() + timeout
+            self._leases[receipt_handle] = (lease[0], expires_at)
+            heapq.heappush(self._expiry_heap, (expires_at, receipt_handle))
+            return True
+
+    # Messages waiting to be received, in one lane or (lane=None) all of them
+    def depth(self, lane: Optional[str] = None) -> int:
+        with self._cond:
+            self._requeue_expired()
+            if lane is not None:
+                return len(self._ready[lane])
+            return sum(len(ready) for ready in self._ready.values())
+
+    # Messages currently leased by consumers
+    def in_flight(self, lane: Optional[str] = None) -> int:
+        with self._cond:
+            self._requeue_expired()
+            if lane is not None:
+                return sum(1 for message, _ in self._leases.values() if message.lane == lane)
+            return len(self._leases)
+
+    # ---- Same consumer interface as SQSQueue, so the worker doesn't care which one it has ----
+
+    # Takes up to max_messages jobs, waiting up to wait_seconds for the first one
+    def receive_jobs(
+            self,
+            max_messages: int = 10,
+            wait_seconds: int = 0,
+            visibility_timeout: int | None = None,
+            lane: Optional[str] = None,
+    ) -> list[JobMessage]:
+        raws = self.dequeue_batch(max_messages, timeout=wait_seconds, visibility_timeout=visibility_timeout, lane=lane)
+        return [JobMessage.from_queue_dict(raw) for raw in raws]
+
+    # Deletes finished jobs; returns the ones whose lease had already run out
+    def ack_jobs(self, jobs: list[JobMessage]) -> list[JobMessage]:
+        return [job for job in jobs if not self.ack(job.receipt_handle)]
+
+    # Heartbeat for long-running jobs
+    def extend_visibility(self, jobs: list[JobMessage], timeout_seconds: int) -> None:
+        for job in jobs:
+            self.extend_lease(job.receipt_handle, timeout_seconds)
+
+    # Gives jobs back; each can be received again after delay_seconds (0 = right away).
+    # The retry counts as a delivery, like an SQS visibility change.
+    def release_jobs(self, jobs: list[JobMessage], delay_seconds: float = 0) -> None:
+        for job in jobs:
+            if delay_seconds > 0:
+                self.extend_lease(job.receipt_handle, delay_seconds)
+            else:
+                self.release(job.receipt_handle)
+
+    # Moves jobs to the dead-letter list; returns the ones whose lease had already run out
+    def dead_letter_jobs(self, jobs: list[JobMessage], reason: str) -> list[JobMessage]:
+        failed = []
+        with self._cond:
+            self._requeue_expired()
+            for job in jobs:
+                if self._leases.pop(job.receipt_handle, None) is None:
+                    failed.append(job)
+                    continue
+                self._dead_letters.append({
+                    "job_id": job.job_id,
+                    "document_id": job.document_id,
+                    "object_key": job.s3_key,
+                    "priority": job.priority,
+                    "tenant": job.tenant,
+                    "attempts": job.attempt,
+                    "reason": reason,
+                    "requested_at": job.requested_at,
+                    "dead_lettered_at": datetime.now(timezone.utc),
+                })
+        return failed
+
+    # Copies of the dead-lettered jobs, oldest first
+    def dead_letters(self) -> list[dict]:
+        with self._cond:
+            return [dict(entry) for entry in self._dead_letters]
+
+    def dead_letter_depth(self) -> int:
+        with self._cond:
+            return len(self._dead_letters)
+
+    # Leases that ran out go back to the front of the queue (must hold the lock)
+    def _requeue_expired(self) -> None:
+        now = time.monotonic()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, receipt_handle = heapq.heappop(heap)
+            lease = self._leases.get(receipt_handle)
+            # Skip entries made stale by ack/release/extend
+            if lease is None or lease[1] != expires_at:
+                continue
+            del self._leases[receipt_handle]
+            self._prepend(lease[0])
+
+    def _lane(self, priority: Optional[str]) -> str:
+        return priority if priority in self._ready else self._lanes[0]
+
+    def _append(self, message: _Message) -> None:
+        self._ready[message.lane].append(message.tenant, message)
+
+    # Back to the front of its lane: a redelivery shouldn't wait behind newer jobs
+    def _prepend(self, message: _Message) -> None:
+        self._ready[message.lane].appendleft(message.tenant, message)
 
-    # Gives the next job message to the worker
-        # Returns the oldest message or None if queue is empty
-        # Using pop(0) to maintain FIFO
-    def dequeue(self) -> dict | None:
-        if not self._messages:
+    # Seconds until the earliest lease could run out (None if nothing is leased)
+    def _next_expiry_in(self) -> float | None:
+        if not self._expiry_heap:
             return None
-        return self._messages.pop(0)
\ No newline at end of file
+        return max(self._expiry_heap[0][0] - time.monotonic(), 0.0)
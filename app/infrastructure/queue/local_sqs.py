@@ -0,0 +1,169 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+
+
+# One message as the fake SQS stores it
+@dataclass
+class _LocalMessage:
+    message_id: str
+    body: str
+    receive_count: int = 0
+    visible_at: float = 0.0          # monotonic time when it can be received again
+    receipt_handle: str | None = None
+
+
+# Messages of one queue URL
+@dataclass
+class _LocalQueue:
+    ready: deque = field(default_factory=deque)     # Visible messages, FIFO
+    in_flight: dict = field(default_factory=dict)   # receipt handle -> message
+
+
+class LocalSQSClient:
+    """
+    Offline stand-in for a boto3 SQS client (one queue per QueueUrl, created on first use).
+
+    Implements just the calls SQSQueue uses, with the same request/response shapes:
+    long polling, max 10 messages per receive, visibility timeouts, batch delete and
+    batch visibility changes. Thread-safe, so a worker pool can hammer it.
+    Also counts API calls so you can see how many requests a workload would cost.
+    """
+
+    def __init__(self, default_visibility_timeout: int = 30) -> None:
+        self._default_visibility = default_visibility_timeout
+        self._queues: dict[str, _LocalQueue] = {}
+        self._cond = threading.Condition()
+        self.api_calls: dict[str, int] = {}
+
+    def _count(self, name: str) -> None:
+        self.api_calls[name] = self.api_calls.get(name, 0) + 1
+
+    # Must hold the lock
+    def _queue(self, url: str) -> _LocalQueue:
+        queue = self._queues.get(url)
+        if queue is None:
+            queue = self._queues[url] = _LocalQueue()
+        return queue
+
+    def send_message(self, QueueUrl: str, MessageBody: str, **kwargs) -> dict:
+        with self._cond:
+            self._count("send_message")
+            message = _LocalMessage(message_id=str(uuid.uuid4()), body=MessageBody)
+            self._queue(QueueUrl).ready.append(message)
+            self._cond.notify_all()
+        return {"MessageId": message.message_id, "MD5OfMessageBody": hashlib.md5(MessageBody.encode()).hexdigest()}
+
+    def send_message_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        successful = []
+        with self._cond:
+            self._count("send_message_batch")
+            queue = self._queue(QueueUrl)
+            for entry in Entries:
+                message = _LocalMessage(message_id=str(uuid.uuid4()), body=entry["MessageBody"])
+                queue.ready.append(message)
+                successful.append({
+                    "Id": entry["Id"],
+                    "MessageId": message.message_id,
+                    "MD5OfMessageBody": hashlib.md5(entry["MessageBody"].encode()).hexdigest(),
+                })
+            self._cond.notify_all()
+        return {"Successful": successful, "Failed": []}
+
+    def receive_message(
+            self,
+            QueueUrl: str,
+            MaxNumberOfMessages: int = 1,
+            WaitTimeSeconds: int = 0,
+            VisibilityTimeout: int | None = None,
+            **kwargs,
+    ) -> dict:
+        visibility = self._default_visibility if VisibilityTimeout is None else VisibilityTimeout
+        deadline = time.monotonic() + WaitTimeSeconds
+
+        with self._cond:
+            self._count("receive_message")
+            queue = self._queue(QueueUrl)
+            while True:
+                self._requeue_expired(queue)
+                if queue.ready:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return {}
+                # Wake up on new messages, or when the next lease could expire
+                self._cond.wait(timeout=min(remaining, self._next_expiry_in(queue)))
+
+            messages = []
+            now = time.monotonic()
+            while queue.ready and len(messages) < MaxNumberOfMessages:
+                message = queue.ready.popleft()
+                message.receive_count += 1
+                message.visible_at = now + visibility
+                message.receipt_handle = str(uuid.uuid4())
+                queue.in_flight[message.receipt_handle] = message
+                messages.append({
+                    "MessageId": message.message_id,
+                    "ReceiptHandle": message.receipt_handle,
+                    "Body": message.body,
+                    "Attributes": {"ApproximateReceiveCount": str(message.receive_count)},
+                })
+        return {"Messages": messages}
+
+    def delete_message_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        successful, failed = [], []
+        with self._cond:
+            self._count("delete_message_batch")
+            queue = self._queue(QueueUrl)
+            for entry in Entries:
+                if queue.in_flight.pop(entry["ReceiptHandle"], None) is None:
+                    failed.append({"Id": entry["Id"], "Code": "ReceiptHandleIsInvalid",
+                                   "Message": "Receipt handle is invalid or expired", "SenderFault": True})
+                else:
+                    successful.append({"Id": entry["Id"]})
+        return {"Successful": successful, "Failed": failed}
+
+    def change_message_visibility_batch(self, QueueUrl: str, Entries: list[dict]) -> dict:
+        successful, failed = [], []
+        with self._cond:
+            self._count("change_message_visibility_batch")
+            now = time.monotonic()
+            queue = self._queue(QueueUrl)
+            for entry in Entries:
+                message = queue.in_flight.get(entry["ReceiptHandle"])
+                if message is None:
+                    failed.append({"Id": entry["Id"], "Code": "ReceiptHandleIsInvalid",
+                                   "Message": "Receipt handle is invalid or expired", "SenderFault": True})
+                    continue
+                message.visible_at = now + entry["VisibilityTimeout"]
+                successful.append({"Id": entry["Id"]})
+            self._cond.notify_all()
+        return {"Successful": successful, "Failed": failed}
+
+    def get_queue_attributes(self, QueueUrl: str, AttributeNames: list[str]) -> dict:
+        with self._cond:
+            self._count("get_queue_attributes")
+            queue = self._queue(QueueUrl)
+            self._requeue_expired(queue)
+            values = {
+                "ApproximateNumberOfMessages": len(queue.ready),
+                "ApproximateNumberOfMessagesNotVisible": len(queue.in_flight),
+            }
+        wanted = values if "All" in AttributeNames else {k: v for k, v in values.items() if k in AttributeNames}
+        return {"Attributes": {k: str(v) for k, v in wanted.items()}}
+
+    # Leases that ran out go back to the front of the queue (must hold the lock)
+    def _requeue_expired(self, queue: _LocalQueue) -> None:
+        now = time.monotonic()
+        expired = [handle for handle, m in queue.in_flight.items() if m.visible_at <= now]
+        for handle in expired:
+            queue.ready.appendleft(queue.in_flight.pop(handle))
+
+    def _next_expiry_in(self, queue: _LocalQueue) -> float:
+        if not queue.in_flight:
+            return float("inf")
+        soonest = min(m.visible_at for m in queue.in_flight.values())
+        return max(soonest - time.monotonic(), 0.0)
@@ -1,30 +1,324 @@
 import json
+import logging
+import math
+import threading
+import time
 from datetime import datetime, timezone
 
 from app.core.settings import settings
-from app.domain.ports.queue import QueuePort
+from app.domain.models.job_message import JobMessage
+from app.domain.ports.queue import EnqueueResult, QueuePort
 from app.infrastructure.aws.client_factory import get_sqs_client
 
+logger = logging.getLogger(__name__)
+
+# SQS hard limits
+SQS_MAX_BATCH = 10       # Max entries per *_batch call and per receive_message
+SQS_MAX_WAIT_SECONDS = 20 # Max long-poll wait
+SQS_MAX_VISIBILITY_TIMEOUT = 43200 # 12 hours
+
+
+# Lane -> queue URL from settings: the first lane is SQS_QUEUE_URL, others only if SQS_LANE_QUEUE_URLS has them
+def lane_queue_urls() -> dict[str, str]:
+    lanes = list(settings.QUEUE_LANES)
+    urls = {lanes[0]: settings.SQS_QUEUE_URL}
+    urls.update((lane, settings.SQS_LANE_QUEUE_URLS[lane]) for lane in lanes[1:] if lane in settings.SQS_LANE_QUEUE_URLS)
+    return urls
+
 
 class SQSQueue(QueuePort):
-    """Real AWS SQS implementation of QueuePort. Sends messages to AWS instead of storing in memory."""
-    
-    def enqueue_document_processing(self, document_id: str, object_key: str) -> str:
-        """Sends a job message to SQS and returns the MessageId as job_id."""
-        sqs = get_sqs_client()
+    """
+    Real AWS SQS implementation of QueuePort. Sends messages to AWS instead of storing in memory.
+    Every lane is its own SQS queue. A job for a lane without a queue goes to the first lane's queue.
+    The tenant is sent as MessageGroupId, so on a standard queue SQS fair queuing keeps one
+    tenant's backlog from delaying the others.
+    Jobs the worker gives up on are sent to SQS_DEAD_LETTER_QUEUE_URL (one for all lanes).
+    """
+    name = "sqs"
+
+    # client / queue_url / lane_urls / dead_letter_url can be injected (e.g. LocalSQSClient for offline runs).
+    # A single queue_url is one lane (named after the first lane in QUEUE_LANES).
+    def __init__(
+            self,
+            client=None,
+            queue_url: str | None = None,
+            lane_urls: dict[str, str] | None = None,
+            dead_letter_url: str | None = None,
+    ) -> None:
+        self._client = client
+        if lane_urls is None:
+            lane_urls = {next(iter(settings.QUEUE_LANES)): queue_url} if queue_url else lane_queue_urls()
+        self._lane_urls = dict(lane_urls)
+        self._queue_url = next(iter(self._lane_urls.values())) # Default (first lane) queue
+        self._dead_letter_url = settings.SQS_DEAD_LETTER_QUEUE_URL if dead_letter_url is None else dead_letter_url
+        self._depth_lock = threading.Lock()
+        self._depth_cache: dict[str, tuple[float, dict[str, int]]] = {} # queue URL -> (fetched at, attributes)
+
+    # Shared, cached boto3 client unless one was injected
+    @property
+    def client(self):
+        return self._client if self._client is not None else get_sqs_client()
+
+    # Lane names, highest priority first (only lanes that have their own queue)
+    @property
+    def lanes(self) -> list[str]:
+        return list(self._lane_urls)
+
+    def _url(self, lane: str | None) -> str:
+        return self._lane_urls.get(lane, self._queue_url)
+
+    def enqueue_document_processing(
+            self, document_id: str, object_key: str, priority: str | None = None, tenant: str | None = None,
+    ) -> str:
+        """Sends a job message to the priority's queue and returns the MessageId as job_id."""
+        sqs = self.client
+
+        # Send to SQS (MessageBody must be a JSON string)
+        params = {
+            "QueueUrl": self._url(priority),
+            "MessageBody": self._message_body(document_id, object_key, priority, tenant),
+        }
+        if tenant:
+            params["MessageGroupId"] = tenant
+        resp = sqs.send_message(**params)
+
+        # Return SQS MessageId as job_id (like InMemoryQueue returns UUID)
+        return resp["MessageId"]
+
+    def enqueue_document_processing_batch(
+            self, jobs: list[tuple[str, str]], priority: str | None = None, tenant: str | None = None,
+    ) -> list[EnqueueResult]:
+        """
+        Sends jobs with send_message_batch, 10 per call.
+        Each entry succeeds or fails on its own; a failed call only fails its own chunk.
+        """
+        results: list[EnqueueResult] = []
+        url = self._url(priority)
+        for start in range(0, len(jobs), SQS_MAX_BATCH):
+            chunk = jobs[start:start + SQS_MAX_BATCH]
+            entries = [
+                {"Id": str(i), "MessageBody": self._message_body(document_id, object_key, priority, tenant)}
+                for i, (document_id, object_key) in enumerate(chunk)
+            ]
+            if tenant:
+                for entry in entries:
+                    entry["MessageGroupId"] = tenant
+
+            try:
+                resp = self.client.send_message_batch(QueueUrl=url, Entries=entries)
+            except Exception as e:
+                logger.warning("send_message_batch failed for %d jobs: %s", len(chunk), e)
+                results.extend(EnqueueResult(document_id=document_id, error=str(e)) for document_id, _ in chunk)
+                continue
 
-        # Build message payload that the worker will receive
+            by_id: dict[int, EnqueueResult] = {}
+            for ok in resp.get("Successful", []):
+                i = int(ok["Id"])
+                by_id[i] = EnqueueResult(document_id=chunk[i][0], job_id=ok["MessageId"])
+            for failure in resp.get("Failed", []):
+                i = int(failure["Id"])
+                by_id[i] = EnqueueResult(
+                    document_id=chunk[i][0],
+                    error=failure.get("Message") or failure.get("Code", "SQS rejected the message"),
+                )
+
+            for i, (document_id, _) in enumerate(chunk):
+                results.append(by_id.get(i, EnqueueResult(document_id=document_id, error="No response from SQS")))
+        return results
+
+    # Build message payload that the worker will receive
+    @staticmethod
+    def _message_body(document_id: str, object_key: str, priority: str | None = None, tenant: str | None = None) -> str:
         body = {
             "document_id": document_id,
             "s3_key": object_key,
             "requested_at": datetime.now(timezone.utc).isoformat(),
         }
+        if priority:
+            body["priority"] = priority
+        if tenant:
+            body["tenant"] = tenant
+        return json.dumps(body)
 
-        # Send to SQS (MessageBody must be a JSON string)
-        resp = sqs.send_message(
-            QueueUrl=settings.SQS_QUEUE_URL,
-            MessageBody=json.dumps(body),
-        )
+    # ---- Consumer side (used by the worker) ----
 
-        # Return SQS MessageId as job_id (like InMemoryQueue returns UUID)
-        return resp["MessageId"]
+    def receive_jobs(
+            self,
+            max_messages: int = SQS_MAX_BATCH,
+            wait_seconds: int = SQS_MAX_WAIT_SECONDS,
+            visibility_timeout: int | None = None,
+            lane: str | None = None,
+    ) -> list[JobMessage]:
+        """
+        Long-polls one lane's queue (default: the first) for up to 10 messages in one call.
+        Returns an empty list if nothing arrived within wait_seconds.
+        """
+        lane = lane if lane in self._lane_urls else self.lanes[0]
+        url = self._lane_urls[lane]
+        params = {
+            "QueueUrl": url,
+            "MaxNumberOfMessages": max(1, min(max_messages, SQS_MAX_BATCH)),
+            "WaitTimeSeconds": max(0, min(wait_seconds, SQS_MAX_WAIT_SECONDS)),
+            "MessageSystemAttributeNames": ["ApproximateReceiveCount"],
+        }
+        if visibility_timeout is not None:
+            params["VisibilityTimeout"] = visibility_timeout
+
+        resp = self.client.receive_message(**params)
+
+        jobs: list[JobMessage] = []
+        for message in resp.get("Messages", []):
+            try:
+                jobs.append(JobMessage.from_sqs_message(message, lane=lane))
+            except (KeyError, ValueError) as e:
+                # Unreadable body: retrying will never fix it, so drop it right away
+                logger.error("Dropping malformed SQS message %s: %s", message.get("MessageId"), e)
+                self._delete_receipts(url, [message["ReceiptHandle"]])
+        return jobs
+
+    def ack_jobs(self, jobs: list[JobMessage]) -> list[JobMessage]:
+        """
+        Deletes finished jobs with delete_message_batch (10 per call).
+        Returns the jobs SQS refused to delete so the caller can retry.
+        """
+        failed_handles: set[str] = set()
+        for url, lane_jobs in self._by_queue(jobs).items():
+            failed_handles.update(self._delete_receipts(url, [job.receipt_handle for job in lane_jobs if job.receipt_handle]))
+        return [job for job in jobs if job.receipt_handle in failed_handles]
+
+    def extend_visibility(self, jobs: list[JobMessage], timeout_seconds: int) -> None:
+        """Heartbeat: keeps long-running jobs invisible to other workers for timeout_seconds more."""
+        for url, lane_jobs in self._by_queue(jobs).items():
+            self._change_visibility(url, [job.receipt_handle for job in lane_jobs if job.receipt_handle], timeout_seconds)
+
+    def release_jobs(self, jobs: list[JobMessage], delay_seconds: float = 0) -> None:
+        """Gives jobs back: each is received again after delay_seconds (rounded up, max 12 hours)."""
+        timeout = min(math.ceil(delay_seconds), SQS_MAX_VISIBILITY_TIMEOUT)
+        for url, lane_jobs in self._by_queue(jobs).items():
+            self._change_visibility(url, [job.receipt_handle for job in lane_jobs if job.receipt_handle], timeout)
+
+    def dead_letter_jobs(self, jobs: list[JobMessage], reason: str) -> list[JobMessage]:
+        """
+        Copies jobs to the dead-letter queue (if one is configured), then deletes them from their own queue.
+        The copy keeps the original body fields, so redriving it to the source queue gives a normal job.
+        Returns the jobs that are still in their queue (they will come back and be tried again).
+        """
+        sent = jobs
+        if self._dead_letter_url:
+            sent = []
+            for start in range(0, len(jobs), SQS_MAX_BATCH):
+                chunk = jobs[start:start + SQS_MAX_BATCH]
+                try:
+                    resp = self.client.send_message_batch(
+                        QueueUrl=self._dead_letter_url,
+                        Entries=[{"Id": str(i), "MessageBody": self._dead_letter_body(job, reason)} for i, job in enumerate(chunk)],
+                    )
+                except Exception as e:
+                    logger.warning("Could not dead-letter %d jobs: %s", len(chunk), e)
+                    continue
+                sent.extend(chunk[int(ok["Id"])] for ok in resp.get("Successful", []))
+        else:
+            logger.warning("No SQS_DEAD_LETTER_QUEUE_URL, deleting %d jobs that were given up on", len(jobs))
+
+        sent_handles = {job.receipt_handle for job in sent}
+        return [job for job in jobs if job.receipt_handle not in sent_handles] + self.ack_jobs(sent)
+
+    @staticmethod
+    def _dead_letter_body(job: JobMessage, reason: str) -> str:
+        body = {
+            "document_id": job.document_id,
+            "s3_key": job.s3_key,
+            "requested_at": job.requested_at.isoformat(),
+            "source_message_id": job.job_id,
+            "attempts": job.attempt,
+            "reason": reason,
+            "dead_lettered_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if job.priority:
+            body["priority"] = job.priority
+        if job.tenant:
+            body["tenant"] = job.tenant
+        return json.dumps(body)
+
+    # Jobs grouped by the queue they were received from (acks and visibility changes go to that queue)
+    def _by_queue(self, jobs: list[JobMessage]) -> dict[str, list[JobMessage]]:
+        grouped: dict[str, list[JobMessage]] = {}
+        for job in jobs:
+            grouped.setdefault(self._url(job.priority), []).append(job)
+        return grouped
+
+    def _change_visibility(self, url: str, handles: list[str], timeout_seconds: int) -> None:
+        for start in range(0, len(handles), SQS_MAX_BATCH):
+            chunk = handles[start:start + SQS_MAX_BATCH]
+            resp = self.client.change_message_visibility_batch(
+                QueueUrl=url,
+                Entries=[
+                    {"Id": str(i), "ReceiptHandle": handle, "VisibilityTimeout": timeout_seconds}
+                    for i, handle in enumerate(chunk)
+                ],
+            )
+            for failure in resp.get("Failed", []):
+                logger.warning("Could not extend visibility: %s", failure.get("Message"))
+
+    # Creates the client and, with connect=True, opens a pooled connection to SQS
+    # (a get_queue_attributes call, which also fills the depth cache)
+    def warm_up(self, connect: bool = True) -> None:
+        client = self.client
+        if connect:
+            try:
+                for url in self._lane_urls.values():
+                    self._queue_attributes(url)
+            except Exception as e:
+                logger.warning("SQS warm-up request failed: %s", e)
+        else:
+            client.meta.service_model.operation_model("SendMessage") # Loads the service model without a request
+
+    # ---- Backlog (same as InMemoryQueue.depth / in_flight) ----
+
+    # Messages waiting to be received (approximate, as reported by SQS), in one lane or all of them
+    def depth(self, lane: str | None = None) -> int:
+        return self._attribute("ApproximateNumberOfMessages", lane)
+
+    # Messages received by a consumer and not deleted yet
+    def in_flight(self, lane: str | None = None) -> int:
+        return self._attribute("ApproximateNumberOfMessagesNotVisible", lane)
+
+    # Messages waiting in the dead-letter queue (0 without one)
+    def dead_letter_depth(self) -> int:
+        if not self._dead_letter_url:
+            return 0
+        return self._queue_attributes(self._dead_letter_url)["ApproximateNumberOfMessages"]
+
+    def _attribute(self, name: str, lane: str | None) -> int:
+        urls = [self._url(lane)] if lane is not None else self._lane_urls.values()
+        return sum(self._queue_attributes(url)[name] for url in urls)
+
+    # One get_queue_attributes call per queue per QUEUE_DEPTH_CACHE_SECONDS, however often metrics are scraped
+    # (SQS only refreshes these numbers about once a minute anyway)
+    def _queue_attributes(self, url: str) -> dict[str, int]:
+        with self._depth_lock:
+            fetched_at, attributes = self._depth_cache.get(url, (0.0, {}))
+            if attributes and time.monotonic() - fetched_at < settings.QUEUE_DEPTH_CACHE_SECONDS:
+                return attributes
+            resp = self.client.get_queue_attributes(
+                QueueUrl=url,
+                AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"],
+            )
+            attributes = {name: int(value) for name, value in resp.get("Attributes", {}).items()}
+            attributes.setdefault("ApproximateNumberOfMessages", 0)
+            attributes.setdefault("ApproximateNumberOfMessagesNotVisible", 0)
+            self._depth_cache[url] = (time.monotonic(), attributes)
+            return attributes
+
+    # Deletes receipt handles in chunks of 10; returns the handles that failed
+    def _delete_receipts(self, url: str, handles: list[str]) -> list[str]:
+        failed: list[str] = []
+        for start in range(0, len(handles), SQS_MAX_BATCH):
+            chunk = handles[start:start + SQS_MAX_BATCH]
+            resp = self.client.delete_message_batch(
+                QueueUrl=url,
+                Entries=[{"Id": str(i), "ReceiptHandle": handle} for i, handle in enumerate(chunk)],
+            )
+            for failure in resp.get("Failed", []):
+                failed.append(chunk[int(failure["Id"])])
+        return failed
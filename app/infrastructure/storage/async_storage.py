@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+
+if TYPE_CHECKING: # Type hint only: importing S3Storage loads boto3, which local mode never needs
+    from app.infrastructure.storage.s3_storage import S3Storage
+
+
+# Async face of InMemoryStorage: just string formatting, runs on the event loop
+class AsyncInMemoryStorage:
+
+    def __init__(self, storage: InMemoryStorage) -> None:
+        self._storage = storage
+
+    def create_object_key(self, document_id: str, filename: str) -> str:
+        return self._storage.create_object_key(document_id, filename)
+
+    async def create_presigned_upload_url(self, object_key: str, content_type: str, sha256: Optional[str] = None) -> str:
+        return self._storage.create_presigned_upload_url(object_key, content_type, sha256)
+
+    async def create_presigned_upload_urls(self, items: list[tuple[str, str]]) -> list[str]:
+        return self._storage.create_presigned_upload_urls(items)
+
+    async def put_object(self, object_key: str, data: bytes) -> None:
+        self._storage.put_object(object_key, data)
+
+    async def create_multipart_upload(self, object_key: str, content_type: str) -> str:
+        return self._storage.create_multipart_upload(object_key, content_type)
+
+    async def create_presigned_part_urls(self, object_key: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        return self._storage.create_presigned_part_urls(object_key, upload_id, part_numbers)
+
+    async def complete_multipart_upload(self, object_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        self._storage.complete_multipart_upload(object_key, upload_id, parts)
+
+    async def abort_multipart_upload(self, object_key: str, upload_id: str) -> None:
+        self._storage.abort_multipart_upload(object_key, upload_id)
+
+
+# Async face of S3Storage
+# Presigning is local CPU work (no request to AWS), so once credentials are loaded it runs
+# on the event loop. The very first call may have to fetch credentials (e.g. from the
+# instance metadata endpoint), so that one goes to a thread.
+# put_object and multipart create/complete/abort are real S3 requests and run on a dedicated thread pool.
+class AsyncS3Storage:
+
+    def __init__(self, storage: S3Storage, max_workers: int) -> None:
+        self._storage = storage
+        self._credentials_loaded = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-io")
+
+    def create_object_key(self, document_id: str, filename: str) -> str:
+        return self._storage.create_object_key(document_id, filename)
+
+    async def create_presigned_upload_url(self, object_key: str, content_type: str, sha256: Optional[str] = None) -> str:
+        if not self._credentials_loaded:
+            url = await asyncio.to_thread(self._storage.create_presigned_upload_url, object_key, content_type, sha256)
+            self._credentials_loaded = True
+            return url
+        return self._storage.create_presigned_upload_url(object_key, content_type, sha256)
+
+    async def create_presigned_upload_urls(self, items: list[tuple[str, str]]) -> list[str]:
+        if not self._credentials_loaded:
+            urls = await asyncio.to_thread(self._storage.create_presigned_upload_urls, items)
+            self._credentials_loaded = True
+            return urls
+        return self._storage.create_presigned_upload_urls(items)
+
+    async def put_object(self, object_key: str, data: bytes) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._storage.put_object, object_key, data)
+
+    async def create_multipart_upload(self, object_key: str, content_type: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._storage.create_multipart_upload, object_key, content_type)
+
+    async def create_presigned_part_urls(self, object_key: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        if not self._credentials_loaded:
+            urls = await asyncio.to_thread(self._storage.create_presigned_part_urls, object_key, upload_id, part_numbers)
+            self._credentials_loaded = True
+            return urls
+        return self._storage.create_presigned_part_urls(object_key, upload_id, part_numbers)
+
+    async def complete_multipart_upload(self, object_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._storage.complete_multipart_upload, object_key, upload_id, parts)
+
+    async def abort_multipart_upload(self, object_key: str, upload_id: str) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._storage.abort_multipart_upload, object_key, upload_id)
@@ -0,0 +1,114 @@
+import asyncio
+import io
+from typing import BinaryIO, Optional
+
+from app.infrastructure.broker.broker_client import BrokerClient
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+
+# Bytes per read_object call: one pipeline read (1 MiB), far below the broker's frame limit
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+# Object storage hosted by the local broker process, so workers can read what was uploaded through another process.
+# Object keys and the fake upload URLs are plain string formatting: they are made locally, without a round trip.
+class BrokerStorage:
+
+    def __init__(self, client: BrokerClient) -> None:
+        self._client = client
+        self._names = InMemoryStorage() # Only used for key names and URLs (holds no objects)
+
+    def create_object_key(self, document_id: str, filename: str) -> str:
+        return self._names.create_object_key(document_id, filename)
+
+    def document_id_from_key(self, object_key: str) -> Optional[str]:
+        return self._names.document_id_from_key(object_key)
+
+    def create_presigned_upload_url(self, object_key: str, content_type: str, sha256: Optional[str] = None) -> str:
+        return self._names.create_presigned_upload_url(object_key, content_type, sha256)
+
+    def create_presigned_upload_urls(self, items: list[tuple[str, str]]) -> list[str]:
+        return self._names.create_presigned_upload_urls(items)
+
+    def create_presigned_part_urls(self, object_key: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        return self._names.create_presigned_part_urls(object_key, upload_id, part_numbers)
+
+    def put_object(self, object_key: str, data: bytes) -> None:
+        self._client.call("storage", "put_object", object_key, data)
+
+    # Streams the object in READ_CHUNK_SIZE ranged reads, so no reply holds the whole file
+    # The first chunk is read right away: a missing object raises FileNotFoundError here, as in the other adapters
+    def open_object(self, object_key: str) -> BinaryIO:
+        first = self._client.call("storage", "read_object", object_key, 0, READ_CHUNK_SIZE)
+        return _BrokerObjectReader(self._client, object_key, first)
+
+    def content_sha256(self, object_key: str) -> Optional[str]:
+        return self._client.call("storage", "content_sha256", object_key)
+
+    def create_multipart_upload(self, object_key: str, content_type: str) -> str:
+        return self._client.call("storage", "create_multipart_upload", object_key, content_type)
+
+    def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        return self._client.call("storage", "upload_part", upload_id, part_number, data)
+
+    def complete_multipart_upload(self, object_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        self._client.call("storage", "complete_multipart_upload", object_key, upload_id, parts)
+
+    def abort_multipart_upload(self, object_key: str, upload_id: str) -> None:
+        self._client.call("storage", "abort_multipart_upload", object_key, upload_id)
+
+
+# File-like view of an object in the broker's storage: each chunk is fetched when the previous one is used up
+class _BrokerObjectReader(io.RawIOBase):
+
+    def __init__(self, client: BrokerClient, object_key: str, first_chunk: bytes) -> None:
+        self._client = client
+        self._object_key = object_key
+        self._chunk = memoryview(first_chunk)
+        self._offset = len(first_chunk)                       # Where the next chunk starts
+        self._last = len(first_chunk) < READ_CHUNK_SIZE        # A short chunk is the end of the object
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._chunk and not self._last:
+            data = self._client.call("storage", "read_object", self._object_key, self._offset, READ_CHUNK_SIZE)
+            self._chunk = memoryview(data)
+            self._offset += len(data)
+            self._last = len(data) < READ_CHUNK_SIZE
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+
+# Async face of BrokerStorage: names and URLs are made on the event loop, uploads and multipart calls await the broker's reply
+class AsyncBrokerStorage:
+
+    def __init__(self, storage: BrokerStorage, client: BrokerClient) -> None:
+        self._storage = storage
+        self._client = client
+
+    def create_object_key(self, document_id: str, filename: str) -> str:
+        return self._storage.create_object_key(document_id, filename)
+
+    async def create_presigned_upload_url(self, object_key: str, content_type: str, sha256: Optional[str] = None) -> str:
+        return self._storage.create_presigned_upload_url(object_key, content_type, sha256)
+
+    async def create_presigned_upload_urls(self, items: list[tuple[str, str]]) -> list[str]:
+        return self._storage.create_presigned_upload_urls(items)
+
+    async def create_presigned_part_urls(self, object_key: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        return self._storage.create_presigned_part_urls(object_key, upload_id, part_numbers)
+
+    async def put_object(self, object_key: str, data: bytes) -> None:
+        await asyncio.wrap_future(self._client.submit("storage", "put_object", object_key, data))
+
+    async def create_multipart_upload(self, object_key: str, content_type: str) -> str:
+        return await asyncio.wrap_future(self._client.submit("storage", "create_multipart_upload", object_key, content_type))
+
+    async def complete_multipart_upload(self, object_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        await asyncio.wrap_future(self._client.submit("storage", "complete_multipart_upload", object_key, upload_id, parts))
+
+    async def abort_multipart_upload(self, object_key: str, upload_id: str) -> None:
+        await asyncio.wrap_future(self._client.submit("storage", "abort_multipart_upload", object_key, upload_id))
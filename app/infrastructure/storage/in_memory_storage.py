@@ -1,15 +1,132 @@
+import hashlib
+import io
+import threading
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.core.settings import settings
+from app.domain.errors import InvalidDocumentInputError
+from app.domain.ports.storage import MULTIPART_MAX_PARTS, MULTIPART_MIN_PART_SIZE
+from app.infrastructure.events.in_memory_upload_events import InMemoryUploadEvents
+
+
+# One multipart upload in progress: part number -> (etag, bytes)
+@dataclass
+class _MultipartUpload:
+    object_key: str
+    content_type: str
+    parts: dict[int, tuple[str, bytes]] = field(default_factory=dict)
+
+
 class InMemoryStorage:
 
+    # events: where to announce finished uploads (stand-in for S3 event notifications), None = nowhere
+    def __init__(self, events: Optional[InMemoryUploadEvents] = None) -> None:
+        self._events = events
+        self._objects: dict[str, bytes] = {}               # Finished objects: key -> content
+        self._checksums: dict[str, str] = {}               # key -> sha256 hex, for single PUT uploads
+        self._uploads: dict[str, _MultipartUpload] = {}    # upload_id -> upload in progress
+        self._lock = threading.Lock()
+
     # Creates a safe, predictable path where the file "would" be stored
     def create_object_key(self, document_id: str, filename: str) -> str:
         # Replace / with + to prevent path issues, remove extra spaces
         safe_name = filename.replace("/","_").strip()
         return f"documents/{document_id}/{safe_name}"
 
+    # "documents/<id>/<name>" -> "<id>"
+    def document_id_from_key(self, object_key: str) -> Optional[str]:
+        document_id, _, name = object_key.removeprefix("documents/").partition("/")
+        if not object_key.startswith("documents/") or not document_id or not name or "/" in name:
+            return None
+        return document_id
+
+    # Returns the upload URL of the API's local stand-in for S3: PUT /documents/{id}/content
+    # (nothing is signed; in the real S3 version this is a temporary signed link from AWS)
+    def create_presigned_upload_url(self, object_key: str, content_type: str, sha256: Optional[str] = None) -> str:
+        url = f"{settings.LOCAL_UPLOAD_BASE_URL}/documents/{self.document_id_from_key(object_key)}/content"
+        return url + f"?sha256={sha256}" if sha256 else url
+
+    # Many fake upload URLs at once, same order as items
+    def create_presigned_upload_urls(self, items: list[tuple[str, str]]) -> list[str]:
+        return [self.create_presigned_upload_url(object_key, content_type) for object_key, content_type in items]
+
+    # What a PUT to the single upload URL does
+    # Like S3 with a checksummed PUT, the SHA-256 is kept next to the object
+    def put_object(self, object_key: str, data: bytes) -> None:
+        self._objects[object_key] = data
+        self._checksums[object_key] = hashlib.sha256(data).hexdigest()
+        if self._events is not None:
+            self._events.publish(object_key)
+
+    def open_object(self, object_key: str) -> io.BytesIO:
+        data = self._objects.get(object_key)
+        if data is None:
+            raise FileNotFoundError(f"No uploaded object at {object_key}")
+        return io.BytesIO(data)
+
+    # Up to size bytes from offset (fewer at the end, b"" past it); the broker serves reads this way
+    def read_object(self, object_key: str, offset: int, size: int) -> bytes:
+        data = self._objects.get(object_key)
+        if data is None:
+            raise FileNotFoundError(f"No uploaded object at {object_key}")
+        return data[offset:offset + size]
+
+    # Multipart objects have no whole-object SHA-256 (S3 only keeps a checksum of part checksums)
+    def content_sha256(self, object_key: str) -> Optional[str]:
+        return self._checksums.get(object_key)
+
+    # ---- Multipart: same rules as S3, so local clients exercise the real flow ----
+
+    def create_multipart_upload(self, object_key: str, content_type: str) -> str:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = _MultipartUpload(object_key=object_key, content_type=content_type)
+        return upload_id
+
+    def create_presigned_part_urls(self, object_key: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        return [
+            f"https://example.local/upload?key={object_key}&upload_id={upload_id}&part_number={n}"
+            for n in part_numbers
+        ]
+
+    # What a PUT to a part URL does: stores the bytes and returns the part's ETag (like S3, a quoted MD5)
+    # Only the dict write is locked, so parts pushed from many threads are stored in parallel
+    def upload_part(self, upload_id: str, part_number: int, data: bytes) -> str:
+        if not 1 <= part_number <= MULTIPART_MAX_PARTS:
+            raise InvalidDocumentInputError(f"Invalid part number: {part_number}")
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                raise InvalidDocumentInputError(f"No such upload: {upload_id}")
+            upload.parts[part_number] = (etag, data)
+        return etag
+
+    def complete_multipart_upload(self, object_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None or upload.object_key != object_key:
+                raise InvalidDocumentInputError(f"No such upload: {upload_id}")
+
+            chunks = []
+            for position, (part_number, etag) in enumerate(parts):
+                stored = upload.parts.get(part_number)
+                if stored is None or stored[0].strip('"') != etag.strip('"'):
+                    raise InvalidDocumentInputError(f"Part {part_number} was not uploaded or its ETag does not match")
+                if position < len(parts) - 1 and len(stored[1]) < MULTIPART_MIN_PART_SIZE:
+                    raise InvalidDocumentInputError(f"Part {part_number} is smaller than the minimum part size")
+                chunks.append(stored[1])
 
-    # Returns a fake upload URL (just a string that looks real)
-    # In real S3 version, this will be a temporary signed link from AWS
-    def create_presigned_upload_url(self, object_key: str, content_type: str) -> str:
-        # Fake URL for local development. Real presigned URL comes with S3 later.
-        return f"https://example.local/upload?key={object_key}&content_type={content_type}"
+            del self._uploads[upload_id]
+        self._objects[object_key] = b"".join(chunks)
+        self._checksums.pop(object_key, None)
+        if self._events is not None:
+            self._events.publish(object_key)
 
+    def abort_multipart_upload(self, object_key: str, upload_id: str) -> None:
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is not None and upload.object_key == object_key:
+                del self._uploads[upload_id]
@@ -1,27 +1,216 @@
 from __future__ import annotations
 
+import base64
+import hashlib
+import logging
+from typing import BinaryIO
+
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
 from app.core.settings import settings
+from app.domain.errors import InvalidDocumentInputError
 from app.domain.ports.storage import StoragePort # Port interface
-from app.infrastructure.aws.client_factory import get_s3_client # Reused singleton client
+from app.infrastructure.aws.client_factory import get_boto3_session, get_s3_client # Reused singleton client
+from app.infrastructure.aws.presigner import S3PutPresigner
+
+logger = logging.getLogger(__name__)
+
+# S3 errors on complete/abort that mean the client sent a bad upload_id or part list
+CLIENT_MULTIPART_ERRORS = {"NoSuchUpload", "InvalidPart", "InvalidPartOrder", "EntityTooSmall"}
 
 # Real S3 implementation of the storage contract
 class S3Storage(StoragePort):
+    # session / bucket_name can be injected (benchmarks, tests); defaults come from settings
+    def __init__(self, session=None, bucket_name: str | None = None) -> None:
+        self._session = session
+        self._client = None
+        if session is not None:
+            self._client = session.client(
+                's3',
+                region_name=settings.AWS_REGION,
+                config=Config(signature_version='s3v4', max_pool_connections=settings.ASYNC_BLOCKING_MAX_WORKERS),
+            )
+        self._bucket_name = bucket_name or settings.S3_BUCKET_NAME
+
+    @property
+    def client(self):
+        return self._client if self._client is not None else get_s3_client()
+
     # Same key format as in-memory -- keeps everything consistent
     def create_object_key(self, document_id: str, filename: str) -> str:
         # Sanitization to prevent bad paths
         safe_filename = filename.strip().replace("/","_").replace("\\","_")
         return f"{document_id}/{safe_filename}"
 
+    # "<id>/<name>" -> "<id>"
+    def document_id_from_key(self, object_key: str) -> str | None:
+        document_id, _, name = object_key.partition("/")
+        if not document_id or not name or "/" in name:
+            return None
+        return document_id
+
     # Generates a real, time-limited pre-signed PUT URL
-    def create_presigned_upload_url(self, object_key: str, content_type: str) -> str:
-        s3_client = get_s3_client() # Get the shared, cached client
+    def create_presigned_upload_url(self, object_key: str, content_type: str, sha256: str | None = None) -> str:
+        s3_client = self.client # Get the shared, cached client
+
+        params = {
+            "Bucket": self._bucket_name, # Real bucket
+            "Key": object_key,                # Full path in bucket
+            "ContentType": content_type,      # Helps S3 validate
+        }
+        if sha256:
+            # Signed into the URL: the client must send x-amz-checksum-sha256, and S3 rejects other bytes
+            params["ChecksumSHA256"] = base64.b64encode(bytes.fromhex(sha256)).decode()
 
         return s3_client.generate_presigned_url(
             ClientMethod='put_object', # Want a PUT (upload) URL
+            Params=params,
+            ExpiresIn=settings.S3_PRESIGN_EXPIRES_IN,   # From settings (default 5 min)
+        )
+
+    # Generates many pre-signed PUT URLs at once
+    # botocore signs the first one; the rest reuse its endpoint, the frozen credentials
+    # and the cached SigV4 signing key instead of running the full botocore pipeline each time
+    def create_presigned_upload_urls(self, items: list[tuple[str, str]]) -> list[str]:
+        if not items:
+            return []
+
+        first_key, first_type = items[0]
+        first_url = self.create_presigned_upload_url(first_key, first_type)
+
+        presigner = self._presigner_from(first_url, first_key, first_type)
+        if presigner is None:
+            # Unexpected signer setup: stay correct and let botocore sign everything
+            return [first_url] + [self.create_presigned_upload_url(k, t) for k, t in items[1:]]
+
+        expires_in = settings.S3_PRESIGN_EXPIRES_IN
+        return [first_url] + [presigner.presign_put(k, t, expires_in) for k, t in items[1:]]
+
+    # Starts a multipart upload (one call to S3) and returns its UploadId
+    def create_multipart_upload(self, object_key: str, content_type: str) -> str:
+        response = self.client.create_multipart_upload(
+            Bucket=self._bucket_name,
+            Key=object_key,
+            ContentType=content_type, # Set once here, parts are just bytes
+        )
+        return response["UploadId"]
+
+    # One UploadPart URL per part; batched the same way as create_presigned_upload_urls
+    def create_presigned_part_urls(self, object_key: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        if not part_numbers:
+            return []
+
+        expires_in = settings.S3_MULTIPART_PRESIGN_EXPIRES_IN
+        first_url = self._presign_part(object_key, upload_id, part_numbers[0], expires_in)
+
+        presigner = self._presigner_from(first_url, object_key, upload_id=upload_id, part_number=part_numbers[0])
+        if presigner is None:
+            return [first_url] + [self._presign_part(object_key, upload_id, n, expires_in) for n in part_numbers[1:]]
+
+        return [first_url] + [presigner.presign_upload_part(object_key, upload_id, n, expires_in) for n in part_numbers[1:]]
+
+    def _presign_part(self, object_key: str, upload_id: str, part_number: int, expires_in: int) -> str:
+        return self.client.generate_presigned_url(
+            ClientMethod='upload_part',
             Params={
-                "Bucket": settings.S3_BUCKET_NAME, # Real bucket
-                "Key": object_key,                # Full path in bucket
-                "ContentType": content_type,      # Helps S3 validate
+                "Bucket": self._bucket_name,
+                "Key": object_key,
+                "UploadId": upload_id,
+                "PartNumber": part_number,
             },
-            ExpiresIn=settings.S3_PRESIGN_EXPIRES_IN,   # From settings (default 5 min)
-        )
\ No newline at end of file
+            ExpiresIn=expires_in,
+        )
+
+    def complete_multipart_upload(self, object_key: str, upload_id: str, parts: list[tuple[int, str]]) -> None:
+        try:
+            self.client.complete_multipart_upload(
+                Bucket=self._bucket_name,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": [{"PartNumber": n, "ETag": etag} for n, etag in parts]},
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in CLIENT_MULTIPART_ERRORS:
+                raise InvalidDocumentInputError(e.response["Error"].get("Message", str(e))) from e
+            raise
+
+    def abort_multipart_upload(self, object_key: str, upload_id: str) -> None:
+        try:
+            self.client.abort_multipart_upload(Bucket=self._bucket_name, Key=object_key, UploadId=upload_id)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "NoSuchUpload": # Already gone is fine
+                raise
+
+    # Uploads a whole object through this process (clients normally PUT to a presigned URL instead).
+    # Sent with its SHA-256 like a checksummed presigned PUT, so content_sha256() knows it afterwards.
+    def put_object(self, object_key: str, data: bytes) -> None:
+        self.client.put_object(
+            Bucket=self._bucket_name,
+            Key=object_key,
+            Body=data,
+            ChecksumSHA256=base64.b64encode(hashlib.sha256(data).digest()).decode(),
+        )
+
+    # Streaming body of the object: bytes arrive as the processor reads them, nothing is buffered whole
+    def open_object(self, object_key: str) -> BinaryIO:
+        try:
+            response = self.client.get_object(Bucket=self._bucket_name, Key=object_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise FileNotFoundError(f"No uploaded object at {object_key}") from e
+            raise
+        return response["Body"]
+
+    # The full-object SHA-256 S3 verified on upload, if the upload carried one (one HEAD request)
+    def content_sha256(self, object_key: str) -> str | None:
+        try:
+            response = self.client.head_object(Bucket=self._bucket_name, Key=object_key, ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        checksum = response.get("ChecksumSHA256")
+        # Multipart uploads get "<checksum of part checksums>-<parts>", which is not the content hash
+        if not checksum or "-" in checksum or response.get("ChecksumType", "FULL_OBJECT") != "FULL_OBJECT":
+            return None
+        return base64.b64decode(checksum).hex()
+
+    # Creates the client, presigns one throwaway URL (botocore loads the S3 model and signer on first use)
+    # and, with connect=True, opens a pooled connection with a HEAD on the bucket
+    def warm_up(self, connect: bool = True) -> None:
+        self.create_presigned_upload_url("warm-up/warm-up", "application/pdf")
+        if connect:
+            try:
+                self.client.head_bucket(Bucket=self._bucket_name)
+            except Exception as e: # e.g. no s3:ListBucket permission; the connection is still open
+                logger.warning("S3 warm-up request failed: %s", e)
+
+    def _presigner_from(
+            self,
+            template_url: str,
+            template_key: str,
+            content_type: str | None = None,
+            upload_id: str | None = None,
+            part_number: int | None = None,
+    ) -> S3PutPresigner | None:
+        session = self._session or get_boto3_session()
+        credentials = session.get_credentials()
+        if credentials is None or "X-Amz-Signature=" not in template_url:
+            return None
+
+        try:
+            presigner = S3PutPresigner.from_template(
+                template_url,
+                template_key,
+                credentials.get_frozen_credentials(),
+                region=self.client.meta.region_name,
+            )
+        except ValueError:
+            return None
+
+        # Only trust the fast path if it reproduces botocore's URL bit for bit
+        if not presigner.matches(template_url, template_key, content_type, upload_id=upload_id, part_number=part_number):
+            logger.warning("Batch presigner does not match botocore output, falling back to per-URL signing")
+            return None
+        return presigner
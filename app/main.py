@@ -1,11 +1,33 @@
+import asyncio
+import math
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
 # Our domain errors that the service raises
 from app.domain.errors import DocumentNotFoundError, InvalidDocumentStateError, InvalidDocumentInputError
+from app.domain.errors import AdmissionRejectedError
 
+from app.api.deps import get_backlog_monitor, get_capacity_planner, get_queue, warm_up
+from app.api.middleware import MetricsMiddleware, ProfilingMiddleware
+from app.api.routes.capacity import router as capacity_router
 from app.api.routes.documents import router as documents_router
-app = FastAPI(title="Document Processing API")
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.stats import router as stats_router
+from app.core.settings import settings
+from app.infrastructure.metrics.app_metrics import register_capacity, register_queue_depth
+from app.infrastructure.profiling.sampling_profiler import SamplingProfiler
+
+# Runs once when the server starts (not at import, so importing the app stays cheap)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.STARTUP_WARMUP:
+        # Blocking work (boto3 client creation, network round trips): keep it off the event loop
+        await asyncio.to_thread(warm_up, settings.STARTUP_WARMUP_CONNECT)
+    yield
+
+app = FastAPI(title="Document Processing API", lifespan=lifespan)
 
 # Global handler for when document doesn't exist
 @app.exception_handler(DocumentNotFoundError)
@@ -32,5 +54,27 @@ async def invalid_input_handler(request: Request, exc: InvalidDocumentInputError
         content={"detail":str(exc)},
     )
 
+# Admission control refused the job: 429 Too Many Requests, Retry-After in whole seconds
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejectedError) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail":str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
+app.include_router(documents_router)
+app.include_router(capacity_router)
+app.include_router(stats_router)
+
+# Stack profiles of slow requests in PROFILE_DIR (off unless PROFILE_SLOW_REQUEST_SECONDS is set)
+if settings.PROFILE_SLOW_REQUEST_SECONDS > 0:
+    app.add_middleware(ProfilingMiddleware, profiler=SamplingProfiler.from_settings(settings.PROFILE_SLOW_REQUEST_SECONDS))
 
-app.include_router(documents_router)
\ No newline at end of file
+# Latency/count per route + GET /metrics (METRICS_ENABLED=false turns both off)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+    register_queue_depth(get_queue())
+    register_capacity(get_backlog_monitor(), get_capacity_planner())
\ No newline at end of file
@@ -0,0 +1,272 @@
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.settings import settings
+from app.domain.errors import AdmissionRejectedError
+from app.domain.models.document import DocumentStatus
+from app.domain.ports.documents_repo import DocumentsRepository
+from app.domain.ports.queue import QueuePort
+from app.infrastructure.metrics.app_metrics import ADMISSION_REJECTION_COUNTERS
+
+logger = logging.getLogger(__name__)
+
+# Documents that left the queue for good: how many got here recently is the processing rate
+FINISHED_STATUSES = (DocumentStatus.COMPLETED, DocumentStatus.FAILED)
+
+# A snapshot older than this many sample intervals is ignored (the sampler is stuck or failing)
+STALE_AFTER_INTERVALS = 3
+
+# Longest Retry-After ever sent
+MAX_RETRY_AFTER_SECONDS = 300.0
+
+# Longest a caller waits for the first sample after startup (wait_for_sample)
+FIRST_SAMPLE_TIMEOUT_SECONDS = 10.0
+
+
+class TokenBucketLimiter:
+    """
+    One token bucket per client: on average `rate` jobs per second, and up to `burst` at once
+    after being idle. A request needs one token to get in and then pays one token per job, so a
+    big batch leaves the bucket in debt and the client's next requests wait until it's paid back
+    (a batch of 500 costs the same as 500 single enqueues, and is never refused forever).
+
+    Only the max_clients most recently seen clients are kept; a forgotten client starts over with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 100_000) -> None:
+        self._rate = rate
+        self._burst = max(burst, 1.0)
+        self._max_clients = max_clients
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict() # client -> (tokens, monotonic time)
+        self._lock = threading.Lock()
+
+    # Takes `jobs` tokens from the client's bucket. Returns 0 if it got in, else seconds until it would.
+    def acquire(self, client: str, jobs: int = 1) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self._burst, now))
+            tokens = min(self._burst, tokens + (now - updated) * self._rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= jobs
+            else:
+                wait = (1 - tokens) / self._rate
+            self._buckets[client] = (tokens, now) # Most recently seen last
+            if len(self._buckets) > self._max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# The job backlog at one moment, and how fast it moves
+@dataclass(frozen=True)
+class BacklogSnapshot:
+    depth: int = 0               # Jobs waiting in the queue (all lanes)
+    in_flight: int = 0           # Jobs received by a worker, not finished yet
+    processing_rate: float = 0.0 # Jobs finished per second (COMPLETED + FAILED documents), recent average
+    arrival_rate: float = 0.0    # Jobs enqueued per second: processing rate + how fast the backlog grew
+    sampled_at: Optional[datetime] = None # None = not sampled yet
+
+    # Seconds a job enqueued now waits for a worker if the queue keeps draining at the current rate
+    # (None = unknown: jobs are waiting but none finished recently)
+    @property
+    def estimated_wait(self) -> Optional[float]:
+        if self.depth == 0:
+            return 0.0
+        if self.processing_rate <= 0:
+            return None
+        return self.depth / self.processing_rate
+
+
+class BacklogMonitor:
+    """
+    Samples the job backlog every `interval` seconds in a background thread, so admission checks
+    and GET /capacity read the latest numbers without calling the queue or the repository.
+
+    Queue depth and in-flight count come from the queue. The processing rate is the number of
+    documents that became COMPLETED or FAILED in the last `window` seconds (two indexed counts in
+    the repository), so it includes every worker process, not only ones this process knows about.
+    The arrival rate is the processing rate plus how fast depth + in-flight grew over the same window.
+    """
+
+    def __init__(self, queue: QueuePort, repo: DocumentsRepository, interval: float = 5.0, window: float = 60.0) -> None:
+        self._queue = queue
+        self._repo = repo
+        self._interval = interval
+        self._window = window
+        self._history: deque[tuple[float, int]] = deque() # (monotonic time, depth + in_flight) per sample
+        self._started: Optional[tuple[float, datetime]] = None # First sample: (monotonic, wall clock)
+        self._snapshot = BacklogSnapshot()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._sampled = threading.Event() # Set once the first sample is in
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    # Latest sample (never blocks); the first call starts the sampler thread
+    def snapshot(self) -> BacklogSnapshot:
+        if self._thread is None:
+            self.start()
+        return self._snapshot
+
+    # Latest sample, waiting up to `timeout` seconds for the first one (blocks: call it off the event loop)
+    def wait_for_sample(self, timeout: float = FIRST_SAMPLE_TIMEOUT_SECONDS) -> BacklogSnapshot:
+        self.snapshot()
+        self._sampled.wait(timeout)
+        return self._snapshot
+
+    # True while a snapshot is recent enough to act on
+    def is_fresh(self, snapshot: BacklogSnapshot) -> bool:
+        if snapshot.sampled_at is None:
+            return False
+        age = (datetime.now(timezone.utc) - snapshot.sampled_at).total_seconds()
+        return age <= self._interval * STALE_AFTER_INTERVALS
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="backlog-monitor", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("Couldn't sample the job backlog")
+            self._stopped.wait(self._interval)
+
+    # Reads the queue and the repository once and replaces the snapshot
+    def sample(self) -> BacklogSnapshot:
+        now, wall = time.monotonic(), datetime.now(timezone.utc)
+        depth, in_flight = self._queue.depth(), self._queue.in_flight()
+        if self._started is None:
+            self._started = (now, wall)
+
+        # Only count what finished since the first sample, so a fresh process doesn't average over time it didn't watch
+        since = max(wall - timedelta(seconds=self._window), self._started[1])
+        finished = sum(self._repo.count_documents(status, updated_after=since) for status in FINISHED_STATUSES)
+        elapsed = (wall - since).total_seconds()
+
+        with self._lock:
+            self._history.append((now, depth + in_flight))
+            # Keep one sample at or past the window's start, to measure growth over the whole window
+            while len(self._history) > 2 and now - self._history[1][0] >= self._window:
+                self._history.popleft()
+            first_at, first_backlog = self._history[0]
+
+        processing_rate = finished / elapsed if elapsed > 0 else 0.0
+        arrival_rate = processing_rate
+        if now > first_at:
+            arrival_rate = max(processing_rate + (depth + in_flight - first_backlog) / (now - first_at), 0.0)
+
+        self._snapshot = BacklogSnapshot(depth, in_flight, processing_rate, arrival_rate, wall)
+        self._sampled.set()
+        return self._snapshot
+
+
+@dataclass(frozen=True)
+class CapacityPlanner:
+    """
+    How many worker processes the current load needs (GET /capacity, for an autoscaler).
+
+    Needed throughput: keep up with arrivals, plus drain what's already waiting within target_wait.
+    Throughput of one worker comes from Little's law: each job a worker holds (a slot or a
+    prefetched message) finishes processing_rate / in_flight jobs per second, and a worker holds
+    up to leases_per_worker of them. Without a recent rate (nothing finished yet) it asks for one
+    more worker than are busy right now while jobs are waiting.
+    """
+    target_wait: float = 30.0
+    leases_per_worker: int = 8 # WORKER_CONCURRENCY + WORKER_PREFETCH
+    min_workers: int = 1
+    max_workers: int = 100
+
+    @classmethod
+    def from_settings(cls) -> "CapacityPlanner":
+        return cls(
+            target_wait=max(settings.CAPACITY_TARGET_QUEUE_WAIT_SECONDS, 1.0),
+            leases_per_worker=max(settings.WORKER_CONCURRENCY + settings.WORKER_PREFETCH, 1),
+            min_workers=settings.CAPACITY_MIN_WORKERS,
+            max_workers=max(settings.CAPACITY_MAX_WORKERS, settings.CAPACITY_MIN_WORKERS),
+        )
+
+    def recommended_workers(self, snapshot: BacklogSnapshot) -> int:
+        busy = math.ceil(snapshot.in_flight / self.leases_per_worker)
+        if snapshot.processing_rate > 0 and snapshot.in_flight > 0:
+            per_worker = snapshot.processing_rate / snapshot.in_flight * self.leases_per_worker
+            needed = snapshot.arrival_rate + snapshot.depth / self.target_wait
+            workers = math.ceil(needed / per_worker)
+        else:
+            workers = busy + 1 if snapshot.depth > 0 else busy
+        return min(max(workers, self.min_workers), self.max_workers)
+
+
+class AdmissionController:
+    """
+    Decides whether new jobs are accepted, before anything is written (a refusal raises
+    AdmissionRejectedError, which the API turns into 429 + Retry-After).
+
+    - check_client: the client's token bucket (limiter), called by the API routes
+    - check_backlog: refuses while the estimated queue wait is over max_queue_wait seconds, or
+      the queue already holds max_backlog jobs; called by the services for every enqueue path
+
+    Both are off when not configured. Without a fresh backlog sample, jobs are accepted.
+    """
+
+    def __init__(
+            self,
+            monitor: Optional[BacklogMonitor] = None,
+            limiter: Optional[TokenBucketLimiter] = None,
+            max_queue_wait: float = 0.0, # 0 = no limit
+            max_backlog: int = 0,        # 0 = no limit
+    ) -> None:
+        self._monitor = monitor
+        self._limiter = limiter
+        self._max_queue_wait = max_queue_wait
+        self._max_backlog = max_backlog
+
+    # Raises AdmissionRejectedError if the client is over its rate; jobs = documents in the request
+    def check_client(self, client: str, jobs: int = 1) -> None:
+        if self._limiter is None:
+            return
+        wait = self._limiter.acquire(client, jobs)
+        if wait > 0:
+            self._reject("rate_limit", f"Too many jobs from this client, retry in {math.ceil(wait)}s", wait)
+
+    # Raises AdmissionRejectedError while the backlog is too long for more jobs
+    def check_backlog(self) -> None:
+        if self._monitor is None or not (self._max_queue_wait or self._max_backlog):
+            return
+        snapshot = self._monitor.snapshot()
+        if not self._monitor.is_fresh(snapshot):
+            return
+
+        rate = snapshot.processing_rate
+        # (a request that finds room gets in whole, so a batch may overshoot max_backlog once)
+        if self._max_backlog and snapshot.depth >= self._max_backlog:
+            excess = snapshot.depth - self._max_backlog + 1
+            wait = excess / rate if rate > 0 else self._monitor.interval
+            self._reject("backlog", f"Job queue is full ({snapshot.depth} waiting)", wait)
+
+        estimated = snapshot.estimated_wait
+        if self._max_queue_wait and estimated is not None and estimated > self._max_queue_wait:
+            self._reject(
+                "queue_wait",
+                f"Job queue is too long (about {estimated:.0f}s wait), retry later",
+                estimated - self._max_queue_wait,
+            )
+
+    def _reject(self, reason: str, message: str, retry_after: float) -> None:
+        ADMISSION_REJECTION_COUNTERS[reason].inc()
+        raise AdmissionRejectedError(message, min(max(retry_after, 1.0), MAX_RETRY_AFTER_SECONDS))
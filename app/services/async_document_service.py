@@ -0,0 +1,305 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.domain.errors import DocumentNotFoundError, InvalidDocumentInputError
+from app.domain.models.document import Document, DocumentStatus
+from app.domain.ports.documents_repo import AsyncDocumentsRepository
+from app.domain.ports.queue import AsyncQueuePort, EnqueueResult
+from app.domain.ports.status_events import StatusEventsPort, StatusSubscription
+from app.domain.ports.storage import AsyncStoragePort
+from app.core.settings import settings
+from app.domain.ports.storage import MULTIPART_MAX_PARTS
+from app.services.admission import AdmissionController
+from app.services.document_service import (
+    FINAL_STATUSES,
+    MultipartUploadResult,
+    STAGE_STATS_PAGE_SIZE,
+    StageLatencyReport,
+    UploadResult,
+    as_utc,
+    decode_cursor,
+    encode_cursor,
+    ENQUEUE_FROM,
+    ensure_upload_open,
+    is_final,
+    new_document,
+    normalize_sha256,
+    normalize_tenant,
+    plan_parts,
+    resolve_priority,
+    summarize_stages,
+    transition_error,
+    validate_parts,
+    validate_upload_input,
+    verify_content,
+)
+
+# Same use cases as DocumentService, on async ports, for the async request path.
+# The business rules themselves live in document_service and are shared by both.
+class AsyncDocumentService:
+    _repo: AsyncDocumentsRepository
+    _storage: AsyncStoragePort
+    _queue: AsyncQueuePort
+    _events: Optional[StatusEventsPort]
+    _admission: Optional[AdmissionController]
+
+    def __init__(
+            self,
+            repo: AsyncDocumentsRepository,
+            storage: AsyncStoragePort,
+            queue: AsyncQueuePort,
+            events: Optional[StatusEventsPort] = None, # Only needed for watch/wait
+            admission: Optional[AdmissionController] = None, # Checked before any enqueue
+    ) -> None:
+        self._repo = repo
+        self._storage = storage
+        self._queue = queue
+        self._events = events
+        self._admission = admission
+        self._part_size = settings.MULTIPART_PART_SIZE
+
+# Starts a new upload
+    # Returns: (document_id, object_key, upload_url)
+    async def initiate_upload(self, filename: str, content_type: str, sha256: Optional[str] = None) -> tuple[str, str, str]:
+        safe_filename = validate_upload_input(filename, content_type)
+        sha256 = normalize_sha256(sha256)
+
+        document_id = str(uuid.uuid4())
+        object_key = self._storage.create_object_key(document_id=document_id, filename=safe_filename)
+        upload_url = await self._storage.create_presigned_upload_url(object_key=object_key, content_type=content_type, sha256=sha256)
+
+        await self._repo.create(new_document(document_id, safe_filename, content_type, object_key, datetime.now(timezone.utc)))
+        return document_id, object_key, upload_url
+
+# Starts many uploads in one call (see DocumentService.initiate_upload_batch)
+    async def initiate_upload_batch(self, files: list[tuple[str, str]]) -> list[UploadResult]:
+        results: dict[int, UploadResult] = {}
+        accepted: list[tuple[int, str, str, str]] = [] # (position, document_id, safe_filename, content_type)
+
+        for position, (filename, content_type) in enumerate(files):
+            try:
+                safe_filename = validate_upload_input(filename, content_type)
+            except InvalidDocumentInputError as e:
+                results[position] = UploadResult(filename=filename, error=str(e))
+                continue
+            accepted.append((position, str(uuid.uuid4()), safe_filename, content_type))
+
+        object_keys = [
+            self._storage.create_object_key(document_id=document_id, filename=safe_filename)
+            for _, document_id, safe_filename, _ in accepted
+        ]
+        upload_urls = await self._storage.create_presigned_upload_urls(
+            [(object_key, content_type) for object_key, (_, _, _, content_type) in zip(object_keys, accepted)]
+        )
+
+        now = datetime.now(timezone.utc)
+        docs = []
+        for (position, document_id, safe_filename, content_type), object_key, upload_url in zip(accepted, object_keys, upload_urls):
+            docs.append(new_document(document_id, safe_filename, content_type, object_key, now))
+            results[position] = UploadResult(
+                filename=safe_filename,
+                document_id=document_id,
+                object_key=object_key,
+                upload_url=upload_url,
+            )
+        await self._repo.create_many(docs)
+
+        return [results[position] for position in range(len(files))]
+
+# Starts a multipart upload (see DocumentService.initiate_multipart_upload)
+    async def initiate_multipart_upload(
+            self,
+            filename: str,
+            content_type: str,
+            file_size: int,
+            part_size: Optional[int] = None,
+    ) -> MultipartUploadResult:
+        safe_filename = validate_upload_input(filename, content_type)
+        part_size, part_count = plan_parts(file_size, part_size, self._part_size)
+
+        document_id = str(uuid.uuid4())
+        object_key = self._storage.create_object_key(document_id=document_id, filename=safe_filename)
+        upload_id = await self._storage.create_multipart_upload(object_key=object_key, content_type=content_type)
+        part_urls = await self._storage.create_presigned_part_urls(object_key, upload_id, list(range(1, part_count + 1)))
+
+        await self._repo.create(new_document(document_id, safe_filename, content_type, object_key, datetime.now(timezone.utc)))
+        return MultipartUploadResult(document_id, object_key, upload_id, part_size, part_urls)
+
+# Fresh URLs for some parts (resume / retry)
+    async def presign_upload_parts(self, document_id: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        doc = await self.get_document(document_id)
+        ensure_upload_open(doc)
+        if any(not 1 <= n <= MULTIPART_MAX_PARTS for n in part_numbers):
+            raise InvalidDocumentInputError(f"Part numbers must be between 1 and {MULTIPART_MAX_PARTS}")
+        return await self._storage.create_presigned_part_urls(doc.s3_key, upload_id, part_numbers)
+
+# Finishes a multipart upload; parts are (part_number, etag)
+    async def complete_multipart_upload(self, document_id: str, upload_id: str, parts: list[tuple[int, str]]) -> Document:
+        doc = await self.get_document(document_id)
+        ensure_upload_open(doc)
+        validate_parts(parts)
+        await self._storage.complete_multipart_upload(doc.s3_key, upload_id, parts)
+        return doc
+
+# Cancels a multipart upload
+    async def abort_multipart_upload(self, document_id: str, upload_id: str) -> None:
+        doc = await self.get_document(document_id)
+        ensure_upload_open(doc)
+        await self._storage.abort_multipart_upload(doc.s3_key, upload_id)
+
+# Stores the uploaded bytes as the document's object (see DocumentService.upload_content)
+    # Hashing a large body is CPU work, so the check runs on a thread
+    async def upload_content(self, document_id: str, data: bytes, sha256: Optional[str] = None) -> None:
+        doc = await self.get_document(document_id)
+        ensure_upload_open(doc)
+        if sha256 is not None:
+            await asyncio.to_thread(verify_content, data, sha256)
+        await self._storage.put_object(doc.s3_key, data)
+
+# Retrieves a document by ID, DocumentNotFoundError if missing
+    async def get_document(self, document_id: str) -> Document:
+        doc = await self._repo.get(document_id)
+        if doc is None:
+            raise DocumentNotFoundError(f'Document with id {document_id} not found')
+        return doc
+
+# One page of documents + cursor for the next page (see DocumentService.list_documents)
+    async def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            limit: int = 50,
+            cursor: Optional[str] = None,
+    ) -> tuple[list[Document], Optional[str]]:
+        docs = await self._repo.list_documents(
+            status=status,
+            updated_after=as_utc(updated_after),
+            after=decode_cursor(cursor) if cursor else None,
+            limit=limit + 1,
+        )
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1])
+        return docs, next_cursor
+
+# Stage latency percentiles of recently finished documents (see DocumentService.stage_latency)
+    async def stage_latency(
+            self, window_seconds: float, status: Optional[DocumentStatus] = None, max_documents: int = 10_000,
+    ) -> StageLatencyReport:
+        since = datetime.now(timezone.utc) - timedelta(seconds=window_seconds)
+        docs: list[Document] = []
+        truncated = False
+        for final_status in ([status] if status else sorted(FINAL_STATUSES)):
+            after = None
+            while not truncated:
+                limit = min(STAGE_STATS_PAGE_SIZE, max_documents - len(docs) + 1) # One extra: is there more?
+                page = await self._repo.list_documents(status=final_status, updated_after=since, after=after, limit=limit)
+                if len(docs) + len(page) > max_documents:
+                    page, truncated = page[:max_documents - len(docs)], True
+                docs.extend(page)
+                if truncated or len(page) < limit:
+                    break
+                after = (page[-1].updated_at, page[-1].id)
+        return summarize_stages(docs, truncated)
+
+# Moves a document INITIATED -> QUEUED and sends the job; returns the job_id
+    async def enqueue_processing(self, document_id: str, priority: Optional[str] = None, tenant: Optional[str] = None) -> str:
+        priority = resolve_priority(priority)
+        tenant = normalize_tenant(tenant)
+        self._admit()
+
+        doc = await self._repo.transition(document_id, ENQUEUE_FROM, DocumentStatus.QUEUED)
+        if doc is None:
+            raise transition_error(await self._repo.get(document_id), document_id, DocumentStatus.QUEUED)
+
+        return await self._queue.enqueue_document_processing(
+            document_id=document_id, object_key=doc.s3_key, priority=priority, tenant=tenant,
+        )
+
+# Enqueues many documents in one go (see DocumentService.enqueue_processing_batch)
+    async def enqueue_processing_batch(
+            self, document_ids: list[str], priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> list[EnqueueResult]:
+        priority = resolve_priority(priority, batch=True)
+        tenant = normalize_tenant(tenant)
+        self._admit()
+        results: dict[int, EnqueueResult] = {}
+        accepted: list[tuple[int, Document, DocumentStatus]] = [] # (position, doc, status before)
+
+        for position, document_id in enumerate(document_ids):
+            for previous_status in ENQUEUE_FROM:
+                doc = await self._repo.transition(document_id, previous_status, DocumentStatus.QUEUED)
+                if doc is not None:
+                    accepted.append((position, doc, previous_status))
+                    break
+            else:
+                error = transition_error(await self._repo.get(document_id), document_id, DocumentStatus.QUEUED)
+                message = "Document not found" if isinstance(error, DocumentNotFoundError) else str(error)
+                results[position] = EnqueueResult(document_id=document_id, error=message)
+
+        sent = await self._queue.enqueue_document_processing_batch(
+            [(doc.id, doc.s3_key) for _, doc, _ in accepted], priority=priority, tenant=tenant,
+        ) if accepted else []
+
+        for (position, doc, previous_status), result in zip(accepted, sent):
+            if not result.ok:
+                await self._repo.transition(doc.id, DocumentStatus.QUEUED, previous_status)
+            results[position] = result
+
+        return [results[position] for position in range(len(document_ids))]
+
+# Opens a watch on one document: its current state + a subscription for every update after it
+    # Subscribes before reading, so an update can't slip in between the read and the subscribe
+    # (it may arrive twice instead; callers drop versions that aren't newer than what they have)
+    async def watch_document(self, document_id: str) -> tuple[Document, StatusSubscription]:
+        if self._events is None:
+            raise RuntimeError("AsyncDocumentService was built without status events")
+
+        subscription = self._events.subscribe(document_id)
+        try:
+            doc = await self.get_document(document_id)
+        except BaseException:
+            self._events.unsubscribe(subscription)
+            raise
+        return doc, subscription
+
+# Closes a watch opened by watch_document
+    def unwatch(self, subscription: StatusSubscription) -> None:
+        self._events.unsubscribe(subscription)
+
+# Long-poll: returns as soon as the status differs from `since` (default: the current status),
+    # the document reaches a final status, or `timeout` seconds pass (then returns it unchanged)
+    async def wait_for_status_change(
+            self,
+            document_id: str,
+            since: Optional[DocumentStatus] = None,
+            timeout: float = 30.0,
+    ) -> Document:
+        doc, subscription = await self.watch_document(document_id)
+        try:
+            if since is None:
+                since = doc.status
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while doc.status == since and not is_final(doc.status):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                update = await subscription.next(remaining)
+                if update is None:
+                    break
+                if update.version > doc.version:
+                    doc = update
+            return doc
+        finally:
+            self.unwatch(subscription)
+
+    # Raises AdmissionRejectedError while the job backlog is too long to take more
+    # (reads the monitor's last sample: no I/O, fine on the event loop)
+    def _admit(self) -> None:
+        if self._admission is not None:
+            self._admission.check_backlog()
@@ -1,25 +1,48 @@
 # print(">>> Loading document_service.py")
 
 from app.domain.ports.documents_repo import DocumentsRepository
-from app.domain.ports.storage import StoragePort
-from app.domain.ports.queue import QueuePort
+from app.domain.ports.storage import (
+    MULTIPART_MAX_OBJECT_SIZE,
+    MULTIPART_MAX_PART_SIZE,
+    MULTIPART_MAX_PARTS,
+    MULTIPART_MIN_PART_SIZE,
+    StoragePort,
+)
+from app.domain.ports.queue import EnqueueResult, QueuePort
 from app.domain.models.document import Document, DocumentStatus
 from app.domain.errors import DocumentNotFoundError, InvalidDocumentStateError
 
 from app.domain.errors import InvalidDocumentInputError
+from app.core.settings import settings
+from app.services.admission import AdmissionController
 
+import base64
+import binascii
+import hashlib
+import math
 import uuid
-from datetime import datetime, timezone
-from typing import Dict, Set
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Set
 
 ALLOWED_TRANSITIONS: dict[DocumentStatus, set[DocumentStatus]] = {
     DocumentStatus.INITIATED: {DocumentStatus.QUEUED},
     DocumentStatus.QUEUED: {DocumentStatus.PROCESSING},
-    DocumentStatus.PROCESSING: {DocumentStatus.COMPLETED, DocumentStatus.FAILED},
+    DocumentStatus.PROCESSING: {
+        DocumentStatus.COMPLETED,
+        DocumentStatus.FAILED,
+        DocumentStatus.QUEUED, # Failed attempt, the worker retries it after a backoff
+    },
     DocumentStatus.COMPLETED: set(), # Terminal State
-    DocumentStatus.FAILED: set(), # Terminal State
+    DocumentStatus.FAILED: {DocumentStatus.QUEUED}, # Retry by enqueueing again (e.g. after the job was dead-lettered)
 }
 
+# Statuses a client may enqueue a document from, most common first (PROCESSING -> QUEUED is only for worker retries)
+ENQUEUE_FROM = (DocumentStatus.INITIATED, DocumentStatus.FAILED)
+
+# Statuses nothing will move a document out of by itself (FAILED only changes if someone enqueues it again)
+FINAL_STATUSES = {DocumentStatus.COMPLETED, DocumentStatus.FAILED}
+
 # Types of content allowed for processing
 ALLOWED_CONTENT_TYPES = {
     "application/pdf",
@@ -27,30 +50,244 @@ ALLOWED_CONTENT_TYPES = {
     "image/jpeg",
 }
 
+# Outcome of one file in a batch upload: the three upload values, or an error
+@dataclass(frozen=True)
+class UploadResult:
+    filename: str
+    document_id: Optional[str] = None
+    object_key: Optional[str] = None
+    upload_url: Optional[str] = None
+    error: Optional[str] = None
+
+# A started multipart upload: part_urls[i] uploads part i + 1 (each part_size bytes, the last one may be smaller)
+@dataclass(frozen=True)
+class MultipartUploadResult:
+    document_id: str
+    object_key: str
+    upload_id: str
+    part_size: int
+    part_urls: list[str]
+
+# Outcome of one storage "object created" event in enqueue_uploaded: the document was enqueued (job_id),
+# there was nothing to do (skipped, with the reason), or enqueueing failed (error: handle the event again later)
+@dataclass(frozen=True)
+class IngestResult:
+    object_key: str
+    document_id: Optional[str] = None
+    job_id: Optional[str] = None
+    skipped: Optional[str] = None
+    error: Optional[str] = None
+
+# Latency of one lifecycle stage (seconds) over the documents that went through it
+@dataclass(frozen=True)
+class StageLatency:
+    count: int
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+# Stage percentiles of the documents that finished in a time window (see Document.stage_seconds for the stages).
+# truncated: the window held more than the documents read, so only the oldest part of it is covered.
+@dataclass(frozen=True)
+class StageLatencyReport:
+    documents: int
+    truncated: bool
+    stages: Dict[str, StageLatency]
+
+# Documents read per repository call when collecting stage latencies
+STAGE_STATS_PAGE_SIZE = 500
+
+# ---- Business rules shared by DocumentService and AsyncDocumentService ----
+
+def ensure_transition(current: DocumentStatus, target: DocumentStatus) -> None:
+    """
+    Checks if moving from 'current' status to 'target' is allowed.
+    Raises InvalidDocumentStateError if not.
+    This keeps all transition rules in one place.
+    """
+    allowed = ALLOWED_TRANSITIONS.get(current, set()) # Get allowed next statuses
+    if target not in allowed:
+        raise InvalidDocumentStateError(
+            f"Invalid status transition: {current} -> {target}"
+        )
+
+# The error for a transition() that returned None: the document is gone, or in a status it can't move from.
+# `doc` is a fresh read, only made on this failure path.
+def transition_error(doc: Optional[Document], document_id: str, target: DocumentStatus) -> Exception:
+    if doc is None:
+        return DocumentNotFoundError(f'Document not found: {document_id}')
+    return InvalidDocumentStateError(f"Invalid status transition: {doc.status} -> {target}")
+
+# True once a document won't change status by itself anymore (nothing left to wait for)
+def is_final(status: DocumentStatus) -> bool:
+    return status in FINAL_STATUSES
+
+# Business rules for a new upload; returns the sanitized filename
+def validate_upload_input(filename: str, content_type: str) -> str:
+    # 1. Whitelist content types
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise InvalidDocumentInputError(f"Unsupported content type: {content_type}")
+
+    # 2. Sanitize filename -- remove dangerous characters and trim
+    safe_filename = filename.strip().replace("/","_").replace("\\", "_")
+    if not safe_filename:
+        raise InvalidDocumentInputError("Filename cannot be empty after sanitization")
+    return safe_filename
+
+# A client-declared content hash: 64 hex chars, normalized to lowercase (None = not declared)
+def normalize_sha256(sha256: Optional[str]) -> Optional[str]:
+    if sha256 is None:
+        return None
+    value = sha256.strip().lower()
+    if len(value) != 64 or any(c not in "0123456789abcdef" for c in value):
+        raise InvalidDocumentInputError("sha256 must be 64 hexadecimal characters")
+    return value
+
+# The lane a job goes to: one of QUEUE_LANES, or (not given) the first lane for a single
+# enqueue and the last for a batch, so bulk work doesn't get ahead of interactive uploads
+def resolve_priority(priority: Optional[str], batch: bool = False) -> str:
+    lanes = list(settings.QUEUE_LANES)
+    if priority is None:
+        return lanes[-1] if batch else lanes[0]
+    if priority not in settings.QUEUE_LANES:
+        raise InvalidDocumentInputError(f"Unknown priority: {priority} (expected one of: {', '.join(lanes)})")
+    return priority
+
+# Who a job is for (also the SQS MessageGroupId): 1-128 printable ASCII characters, None = no tenant
+def normalize_tenant(tenant: Optional[str]) -> Optional[str]:
+    if tenant is None:
+        return None
+    value = tenant.strip()
+    if not value or len(value) > 128 or any(not 33 <= ord(c) <= 126 for c in value):
+        raise InvalidDocumentInputError("tenant must be 1-128 printable ASCII characters without spaces")
+    return value
+
+# Splits a file into parts: returns (part_size, part_count)
+# Without a part_size the default is used, grown if needed to stay within the max part count
+def plan_parts(file_size: int, part_size: Optional[int], default_part_size: int) -> tuple[int, int]:
+    if file_size <= 0 or file_size > MULTIPART_MAX_OBJECT_SIZE:
+        raise InvalidDocumentInputError(f"file_size must be between 1 and {MULTIPART_MAX_OBJECT_SIZE} bytes")
+
+    if part_size is None:
+        part_size = max(default_part_size, math.ceil(file_size / MULTIPART_MAX_PARTS), MULTIPART_MIN_PART_SIZE)
+        part_size = min(part_size, MULTIPART_MAX_PART_SIZE)
+    elif not MULTIPART_MIN_PART_SIZE <= part_size <= MULTIPART_MAX_PART_SIZE:
+        raise InvalidDocumentInputError(
+            f"part_size must be between {MULTIPART_MIN_PART_SIZE} and {MULTIPART_MAX_PART_SIZE} bytes"
+        )
+
+    part_count = math.ceil(file_size / part_size)
+    if part_count > MULTIPART_MAX_PARTS:
+        raise InvalidDocumentInputError(f"part_size too small: {part_count} parts (max {MULTIPART_MAX_PARTS})")
+    return part_size, part_count
+
+# Parts sent to "complete": ascending, unique, in range, each with an ETag
+def validate_parts(parts: list[tuple[int, str]]) -> None:
+    if not parts:
+        raise InvalidDocumentInputError("At least one part is required")
+    previous = 0
+    for part_number, etag in parts:
+        if not previous < part_number <= MULTIPART_MAX_PARTS:
+            raise InvalidDocumentInputError("Part numbers must be ascending, unique and between 1 and 10000")
+        if not etag:
+            raise InvalidDocumentInputError(f"Missing ETag for part {part_number}")
+        previous = part_number
+
+# Parts can only be uploaded/completed/aborted before the document is enqueued
+def ensure_upload_open(doc: Document) -> None:
+    if doc.status != DocumentStatus.INITIATED:
+        raise InvalidDocumentStateError(f"Upload is closed: document is {doc.status.value}")
+
+# With the sha256 an upload URL carries, other bytes are refused (like S3 does for a checksummed PUT)
+def verify_content(data: bytes, sha256: Optional[str]) -> None:
+    expected = normalize_sha256(sha256)
+    if expected is not None and hashlib.sha256(data).hexdigest() != expected:
+        raise InvalidDocumentInputError("Content does not match the sha256 of the upload")
+
+# A fresh document in INITIATED state
+def new_document(document_id: str, filename: str, content_type: str, object_key: str, now: datetime) -> Document:
+    return Document(
+        id=document_id,
+        filename=filename,
+        content_type=content_type,
+        s3_key=object_key,
+        status=DocumentStatus.INITIATED,
+        created_at=now,
+        updated_at=now,
+        last_error=None,
+    )
+
+# Cursor = the (updated_at, id) of the last document on the page, base64url-encoded
+def encode_cursor(doc: Document) -> str:
+    raw = f"{doc.updated_at.isoformat()}|{doc.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        updated_at, document_id = raw.split("|", 1)
+        return datetime.fromisoformat(updated_at), document_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidDocumentInputError("Invalid cursor")
+
+# Nearest-rank percentile (q in 0..100) of sorted values
+def percentile(values: list[float], q: float) -> float:
+    return values[max(math.ceil(q / 100 * len(values)) - 1, 0)]
+
+# Percentiles per stage over finished documents
+def summarize_stages(docs: list[Document], truncated: bool = False) -> StageLatencyReport:
+    samples: Dict[str, list[float]] = {}
+    for doc in docs:
+        for stage, seconds in doc.stage_seconds().items():
+            samples.setdefault(stage, []).append(seconds)
+
+    stages = {}
+    for stage, values in samples.items():
+        values.sort()
+        stages[stage] = StageLatency(
+            count=len(values),
+            p50=percentile(values, 50),
+            p90=percentile(values, 90),
+            p99=percentile(values, 99),
+            max=values[-1],
+        )
+    return StageLatencyReport(documents=len(docs), truncated=truncated, stages=stages)
+
+# Naive times from query strings are UTC
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
 class DocumentService:
     _repo: DocumentsRepository
     _storage: StoragePort
     _queue: QueuePort
+    _admission: Optional[AdmissionController]
 
-    def __init__(self, repo: DocumentsRepository, storage: StoragePort,queue: QueuePort) -> None:
+    # admission (optional): checked before any enqueue, may refuse it with AdmissionRejectedError
+    def __init__(
+            self,
+            repo: DocumentsRepository,
+            storage: StoragePort,
+            queue: QueuePort,
+            admission: Optional[AdmissionController] = None,
+    ) -> None:
 #       print(">>> DocumentService __init__ called")  # TEMPORARY DEBUG LINE
         self._repo = repo
         self._storage = storage
         self._queue = queue
+        self._admission = admission
+        self._part_size = settings.MULTIPART_PART_SIZE
 
 # Main method for starting a new upload
     # Returns: (document_id, object_key, upload_url)
-    def initiate_upload(self, filename: str, content_type: str) -> tuple[str, str, str]:
+    # sha256 (optional, hex): the upload must match it, and processing can be skipped for content seen before
+    def initiate_upload(self, filename: str, content_type: str, sha256: Optional[str] = None) -> tuple[str, str, str]:
         # ---- Input Validation & Sanitization (Business Rules) ----
-
-        # 1. Whitelist content types
-        if content_type not in ALLOWED_CONTENT_TYPES:
-            raise InvalidDocumentInputError(f"Unsupported content type: {content_type}")
-
-        # 2. Sanitize filename -- remove dangerous characters and trim
-        safe_filename = filename.strip().replace("/","_").replace("\\", "_")
-        if not safe_filename:
-            raise InvalidDocumentInputError("Filename cannot be empty after sanitization")
+        safe_filename = validate_upload_input(filename, content_type)
+        sha256 = normalize_sha256(sha256)
 
         # ---- Rest of logic (using safe_filename) ----
 
@@ -66,7 +303,8 @@ class DocumentService:
         # 3. Ask storage for a temporary upload link
         upload_url = self._storage.create_presigned_upload_url(
             object_key = object_key,
-            content_type = content_type
+            content_type = content_type,
+            sha256 = sha256,
         )
 
         # 4. Create the Document object in INITIATED state
@@ -88,6 +326,97 @@ class DocumentService:
         # 5. Return the three values the API needs to send back to the user
         return document_id, object_key, upload_url
 
+# Starts many uploads in one call
+    # files: (filename, content_type) pairs. Invalid files get an error, the rest still go through.
+    # All URLs are presigned in one storage call so the adapter can share signing work.
+    def initiate_upload_batch(self, files: list[tuple[str, str]]) -> list[UploadResult]:
+        results: dict[int, UploadResult] = {}
+        accepted: list[tuple[int, str, str, str]] = [] # (position, document_id, safe_filename, content_type)
+
+        # 1. Validate every file on its own
+        for position, (filename, content_type) in enumerate(files):
+            try:
+                safe_filename = validate_upload_input(filename, content_type)
+            except InvalidDocumentInputError as e:
+                results[position] = UploadResult(filename=filename, error=str(e))
+                continue
+            accepted.append((position, str(uuid.uuid4()), safe_filename, content_type))
+
+        # 2. Keys, then all upload links in one go
+        object_keys = [
+            self._storage.create_object_key(document_id=document_id, filename=safe_filename)
+            for _, document_id, safe_filename, _ in accepted
+        ]
+        upload_urls = self._storage.create_presigned_upload_urls(
+            [(object_key, content_type) for object_key, (_, _, _, content_type) in zip(object_keys, accepted)]
+        )
+
+        # 3. Save the documents in INITIATED state, in one repository call
+        now = datetime.now(timezone.utc)
+        docs = []
+        for (position, document_id, safe_filename, content_type), object_key, upload_url in zip(accepted, object_keys, upload_urls):
+            docs.append(new_document(document_id, safe_filename, content_type, object_key, now))
+            results[position] = UploadResult(
+                filename=safe_filename,
+                document_id=document_id,
+                object_key=object_key,
+                upload_url=upload_url,
+            )
+        self._repo.create_many(docs)
+
+        return [results[position] for position in range(len(files))]
+
+# Starts a multipart upload for a large file
+    # Creates the document (INITIATED) and returns one presigned URL per part, so the
+    # client can push parts in parallel and retry a single part instead of the whole file
+    def initiate_multipart_upload(
+            self,
+            filename: str,
+            content_type: str,
+            file_size: int,
+            part_size: Optional[int] = None,
+    ) -> MultipartUploadResult:
+        safe_filename = validate_upload_input(filename, content_type)
+        part_size, part_count = plan_parts(file_size, part_size, self._part_size)
+
+        document_id = str(uuid.uuid4())
+        object_key = self._storage.create_object_key(document_id=document_id, filename=safe_filename)
+        upload_id = self._storage.create_multipart_upload(object_key=object_key, content_type=content_type)
+        part_urls = self._storage.create_presigned_part_urls(object_key, upload_id, list(range(1, part_count + 1)))
+
+        self._repo.create(new_document(document_id, safe_filename, content_type, object_key, datetime.now(timezone.utc)))
+        return MultipartUploadResult(document_id, object_key, upload_id, part_size, part_urls)
+
+# Fresh URLs for some parts (resume after the first ones expired, or retry a failed part)
+    def presign_upload_parts(self, document_id: str, upload_id: str, part_numbers: list[int]) -> list[str]:
+        doc = self.get_document(document_id)
+        ensure_upload_open(doc)
+        if any(not 1 <= n <= MULTIPART_MAX_PARTS for n in part_numbers):
+            raise InvalidDocumentInputError(f"Part numbers must be between 1 and {MULTIPART_MAX_PARTS}")
+        return self._storage.create_presigned_part_urls(doc.s3_key, upload_id, part_numbers)
+
+# Finishes a multipart upload; parts are (part_number, etag) as returned by each part PUT
+    def complete_multipart_upload(self, document_id: str, upload_id: str, parts: list[tuple[int, str]]) -> Document:
+        doc = self.get_document(document_id)
+        ensure_upload_open(doc)
+        validate_parts(parts)
+        self._storage.complete_multipart_upload(doc.s3_key, upload_id, parts)
+        return doc
+
+# Cancels a multipart upload (storage drops the parts uploaded so far)
+    def abort_multipart_upload(self, document_id: str, upload_id: str) -> None:
+        doc = self.get_document(document_id)
+        ensure_upload_open(doc)
+        self._storage.abort_multipart_upload(doc.s3_key, upload_id)
+
+# Stores the uploaded bytes as the document's object (what a PUT to the upload URL does)
+    # Only while the upload is open; sha256 is the one the upload URL carries, if any
+    def upload_content(self, document_id: str, data: bytes, sha256: Optional[str] = None) -> None:
+        doc = self.get_document(document_id)
+        ensure_upload_open(doc)
+        verify_content(data, sha256)
+        self._storage.put_object(doc.s3_key, data)
+
 # Retrieves a document by ID
     # Raises DocumentNotFoundError if it doesn't exist (API will turn this into 404)
     def get_document(self, document_id: str) -> Document:
@@ -96,40 +425,162 @@ class DocumentService:
             raise DocumentNotFoundError(f'Document with id {document_id} not found')
         return doc
 
+# Lists documents one page at a time, oldest update first
+    # Returns the page and an opaque cursor for the next page (None when this is the last one)
+    def list_documents(
+            self,
+            status: Optional[DocumentStatus] = None,
+            updated_after: Optional[datetime] = None,
+            limit: int = 50,
+            cursor: Optional[str] = None,
+    ) -> tuple[list[Document], Optional[str]]:
+        # Ask for one extra document to know whether another page exists
+        docs = self._repo.list_documents(
+            status=status,
+            updated_after=as_utc(updated_after),
+            after=decode_cursor(cursor) if cursor else None,
+            limit=limit + 1,
+        )
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1])
+        return docs, next_cursor
+
+# Stage latency percentiles of documents that finished (COMPLETED and FAILED, or only `status`) in the last window_seconds
+    # Reads at most max_documents, oldest first, a page at a time
+    def stage_latency(
+            self, window_seconds: float, status: Optional[DocumentStatus] = None, max_documents: int = 10_000,
+    ) -> StageLatencyReport:
+        since = datetime.now(timezone.utc) - timedelta(seconds=window_seconds)
+        docs: list[Document] = []
+        truncated = False
+        for final_status in ([status] if status else sorted(FINAL_STATUSES)):
+            after = None
+            while not truncated:
+                limit = min(STAGE_STATS_PAGE_SIZE, max_documents - len(docs) + 1) # One extra: is there more?
+                page = self._repo.list_documents(status=final_status, updated_after=since, after=after, limit=limit)
+                if len(docs) + len(page) > max_documents:
+                    page, truncated = page[:max_documents - len(docs)], True
+                docs.extend(page)
+                if truncated or len(page) < limit:
+                    break
+                after = (page[-1].updated_at, page[-1].id)
+        return summarize_stages(docs, truncated)
+
 # Enqueues a document for background processing
     # Only allowed when status is INITIATED
     # Updates status to QUEUED and returns the job_id from the queue
-    def enqueue_processing(self, document_id: str) -> str:
-        # 1. Get the document or raise 404
-        doc = self._repo.get(document_id)
-        if doc is None:
-            raise DocumentNotFoundError(f'Document not found: {document_id}')
-
-        # 2. Check if transition to QUEUED is allowed FROM CURRENT STATUS
-        # This runs BEFORE we change anything
-        self._ensure_transition(doc.status, DocumentStatus.QUEUED)
+    # priority picks the queue lane, tenant is who the job is for (see resolve_priority / normalize_tenant)
+    def enqueue_processing(self, document_id: str, priority: Optional[str] = None, tenant: Optional[str] = None) -> str:
+        priority = resolve_priority(priority)
+        tenant = normalize_tenant(tenant)
+        self._admit()
 
-        # 3. Only now do we update the status (transition is confirmed valid)
-        doc.status = DocumentStatus.QUEUED
-        doc.updated_at = datetime.now(timezone.utc)
-        self._repo.update(doc)
+        # 1. Move it to QUEUED only if it is still INITIATED (or FAILED), in one atomic repo call.
+        # Two replicas enqueueing the same document at once: exactly one wins, the other gets a 409.
+        doc = self._repo.transition(document_id, ENQUEUE_FROM, DocumentStatus.QUEUED)
+        if doc is None:
+            # 2. Lost: read it again only to tell "not found" (404) from "wrong status" (409)
+            raise transition_error(self._repo.get(document_id), document_id, DocumentStatus.QUEUED)
 
-        # 4. Enqueue the actual job
+        # 3. Enqueue the actual job
         job_id = self._queue.enqueue_document_processing(
             document_id = document_id,
-            object_key=doc.s3_key
+            object_key=doc.s3_key,
+            priority=priority,
+            tenant=tenant,
         )
 
         return job_id
 
-    def _ensure_transition(self, current: DocumentStatus, target: DocumentStatus) -> None:
-        """
-        Checks if moving from 'current' status to 'target' is allowed.
-        Raises InvalidDocumentStateError if not.
-        This keeps all transition rules in one place.
-        """
-        allowed = ALLOWED_TRANSITIONS.get(current, set()) # Get allowed next statuses
-        if target not in allowed:
-            raise InvalidDocumentStateError(
-                f"Invalid status transition: {current} -> {target}"
-            )
+# Enqueues many documents in one go
+    # Every document is validated on its own; bad IDs get an error instead of failing the batch.
+    # Returns one EnqueueResult per requested ID, in request order.
+    # The whole batch goes to one lane (by default the last one) for one tenant.
+    def enqueue_processing_batch(
+            self, document_ids: list[str], priority: Optional[str] = None, tenant: Optional[str] = None,
+    ) -> list[EnqueueResult]:
+        priority = resolve_priority(priority, batch=True)
+        tenant = normalize_tenant(tenant)
+        self._admit()
+        results: dict[int, EnqueueResult] = {}
+        accepted: list[tuple[int, Document, DocumentStatus]] = [] # (position, doc, status before)
+
+        # 1. Move every document that can be enqueued to QUEUED (one compare-and-set each, from the
+        # most likely status first, so the status it came from is known for step 3)
+        for position, document_id in enumerate(document_ids):
+            for previous_status in ENQUEUE_FROM:
+                doc = self._repo.transition(document_id, previous_status, DocumentStatus.QUEUED)
+                if doc is not None:
+                    accepted.append((position, doc, previous_status))
+                    break
+            else:
+                error = transition_error(self._repo.get(document_id), document_id, DocumentStatus.QUEUED)
+                message = "Document not found" if isinstance(error, DocumentNotFoundError) else str(error)
+                results[position] = EnqueueResult(document_id=document_id, error=message)
+
+        # 2. Send all accepted jobs in as few queue calls as possible
+        sent = self._queue.enqueue_document_processing_batch(
+            [(doc.id, doc.s3_key) for _, doc, _ in accepted], priority=priority, tenant=tenant,
+        ) if accepted else []
+
+        # 3. Only the entries the queue rejected go back to their old status
+        for (position, doc, previous_status), result in zip(accepted, sent):
+            if not result.ok:
+                self._repo.transition(doc.id, DocumentStatus.QUEUED, previous_status)
+            results[position] = result
+
+        return [results[position] for position in range(len(document_ids))]
+
+    # Enqueues documents whose upload finished, from storage "object created" events (no client call needed)
+    # Each key is mapped back to its document through the storage key layout. Only INITIATED documents
+    # move to QUEUED, so repeated events and documents the client already enqueued are skipped.
+    # (A presigned URL only writes its own key, so a key carrying a document's ID is that document's upload.)
+    # All jobs go out in one queue batch, to the first lane: like a single enqueue, someone is waiting on it.
+    def enqueue_uploaded(self, object_keys: list[str]) -> list[IngestResult]:
+        priority = resolve_priority(None)
+        self._admit()
+        results: dict[int, IngestResult] = {}
+        accepted: list[tuple[int, Document]] = [] # (position, doc)
+        seen: set[str] = set()
+
+        # 1. Key -> document ID, then INITIATED -> QUEUED (one compare-and-set each)
+        for position, object_key in enumerate(object_keys):
+            document_id = self._storage.document_id_from_key(object_key)
+            if document_id is None:
+                results[position] = IngestResult(object_key, skipped="Not a document upload")
+                continue
+            if document_id in seen:
+                results[position] = IngestResult(object_key, document_id, skipped="Repeated event")
+                continue
+            seen.add(document_id)
+
+            doc = self._repo.transition(document_id, DocumentStatus.INITIATED, DocumentStatus.QUEUED)
+            if doc is None:
+                current = self._repo.get(document_id)
+                reason = "Document not found" if current is None else f"Document is {current.status.value}"
+                results[position] = IngestResult(object_key, document_id, skipped=reason)
+            else:
+                accepted.append((position, doc))
+
+        # 2. All jobs in as few queue calls as possible
+        sent = self._queue.enqueue_document_processing_batch(
+            [(doc.id, doc.s3_key) for _, doc in accepted], priority=priority,
+        ) if accepted else []
+
+        # 3. Rejected entries go back to INITIATED, so the event can be handled again
+        for (position, doc), result in zip(accepted, sent):
+            if result.ok:
+                results[position] = IngestResult(object_keys[position], doc.id, job_id=result.job_id)
+            else:
+                self._repo.transition(doc.id, DocumentStatus.QUEUED, DocumentStatus.INITIATED)
+                results[position] = IngestResult(object_keys[position], doc.id, error=result.error)
+
+        return [results[position] for position in range(len(object_keys))]
+
+    # Raises AdmissionRejectedError while the job backlog is too long to take more
+    def _admit(self) -> None:
+        if self._admission is not None:
+            self._admission.check_backlog()
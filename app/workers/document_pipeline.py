@@ -0,0 +1,138 @@
+import hashlib
+import mmap
+import tempfile
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import BinaryIO, Iterator, Optional
+
+from app.domain.errors import UnsupportedContentError
+from app.domain.models.processing_result import ProcessingResult
+from app.services.document_service import ALLOWED_CONTENT_TYPES
+from app.workers.pdf_inspect import View, count_pages
+
+CHUNK_SIZE = 1024 * 1024        # Bytes per read from storage
+SPOOL_MAX_SIZE = 8 * 1024 ** 2  # Files needing random access stay in memory up to this, then go to a temp file
+SNIFF_SIZE = 1024               # PDF headers may sit anywhere in the first 1 KiB
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+# Content types whose metadata is not in the first few bytes (the rest is read from the head alone)
+RANDOM_ACCESS_TYPES = {"application/pdf", "image/jpeg"}
+
+# JPEG start-of-frame markers (they carry the dimensions); C4, C8 and CC are other segments
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+# The real content type, from magic bytes (never from the filename or what the client declared)
+def sniff_content_type(head: bytes) -> Optional[str]:
+    if head.startswith(PNG_SIGNATURE):
+        return "image/png"
+    if head.startswith(JPEG_SIGNATURE):
+        return "image/jpeg"
+    if b"%PDF-" in head[:SNIFF_SIZE]:
+        return "application/pdf"
+    return None
+
+
+def process_stream(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> ProcessingResult:
+    """
+    Reads a file once, front to back, in `chunk_size` reads.
+
+    Every chunk goes through SHA-256 as it arrives. The first bytes decide the content type,
+    and unsupported files stop right there. PNG dimensions come from the header; PDFs and
+    JPEGs need to look further in, so they are spooled (memory up to SPOOL_MAX_SIZE, then a
+    temp file that is mmap'd). Memory use is bounded by chunk_size + SPOOL_MAX_SIZE
+    whatever the file size.
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    # Collect the head first: reads may come back shorter than asked
+    head = b""
+    while len(head) < SNIFF_SIZE:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        head += chunk
+
+    content_type = sniff_content_type(head)
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        raise UnsupportedContentError("File content is not a PDF, PNG or JPEG")
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) if content_type in RANDOM_ACCESS_TYPES else None
+    try:
+        chunk = head
+        while chunk:
+            digest.update(chunk)
+            size += len(chunk)
+            if spool is not None:
+                spool.write(chunk)
+            chunk = stream.read(chunk_size)
+
+        result = ProcessingResult(sha256=digest.hexdigest(), size_bytes=size, detected_content_type=content_type)
+        if content_type == "image/png":
+            width, height = png_dimensions(head)
+            return replace(result, width=width, height=height)
+
+        with _random_access(spool, size) as view:
+            if content_type == "application/pdf":
+                return replace(result, page_count=count_pages(view))
+            width, height = jpeg_dimensions(view)
+            return replace(result, width=width, height=height)
+    finally:
+        if spool is not None:
+            spool.close()
+
+
+# Small spools are read back as bytes; big ones are on disk already, so map them instead of reading them in
+@contextmanager
+def _random_access(spool, size: int) -> Iterator[View]:
+    if size == 0:
+        yield b""
+        return
+    if size <= SPOOL_MAX_SIZE:
+        spool.seek(0)
+        yield spool.read()
+        return
+    spool.flush()
+    view = mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield view
+    finally:
+        view.close()
+
+
+# Width and height from the IHDR chunk, which always comes first
+def png_dimensions(head: bytes) -> tuple[Optional[int], Optional[int]]:
+    if len(head) < 24 or head[12:16] != b"IHDR":
+        return None, None
+    return int.from_bytes(head[16:20], "big"), int.from_bytes(head[20:24], "big")
+
+
+# Walks the marker segments up to the first start-of-frame (EXIF thumbnails etc. come before it)
+def jpeg_dimensions(view: View) -> tuple[Optional[int], Optional[int]]:
+    pos = 2
+    end = len(view)
+    while pos + 4 <= end:
+        if view[pos] != 0xFF:
+            return None, None
+        marker = view[pos + 1]
+        if marker == 0xFF: # Fill byte
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8: # Markers without a length
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA): # End of image / start of scan: no frame header before the data
+            return None, None
+
+        length = int.from_bytes(view[pos + 2:pos + 4], "big")
+        if marker in JPEG_SOF_MARKERS:
+            if pos + 9 > end:
+                return None, None
+            height = int.from_bytes(view[pos + 5:pos + 7], "big")
+            width = int.from_bytes(view[pos + 7:pos + 9], "big")
+            return width, height
+        pos += 2 + length
+    return None, None
@@ -0,0 +1,274 @@
+import re
+import zlib
+from typing import Optional, Union
+import mmap
+
+# Anything we can slice, search and regex: bytes for small files, mmap for spooled temp files
+View = Union[bytes, mmap.mmap]
+
+TAIL_SIZE = 4096                 # startxref lives in the last few hundred bytes
+MAX_DICT_SIZE = 1024 * 1024      # Give up on a dictionary longer than this
+SCAN_WINDOW = 4 * 1024 * 1024    # Fallback scan reads this much at a time
+
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+_BRACKETS = re.compile(rb"<<|>>")
+_OBJ_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+_STREAM_KEYWORD = re.compile(rb"stream\r?\n")
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+
+# xref entry kinds: (FREE,), (IN_FILE, offset), (IN_OBJSTM, objstm number, index)
+FREE, IN_FILE, IN_OBJSTM = 0, 1, 2
+
+
+class PdfStructureError(ValueError):
+    pass
+
+
+def count_pages(view: View) -> Optional[int]:
+    """
+    Page count of a PDF held in a random-access view.
+
+    Reads the cross-reference data from the end of the file (classic tables and
+    compressed xref streams, following /Prev for incrementally updated files), then
+    only the catalog and the root page tree node: /Count there is the page count.
+    Touches a handful of small regions no matter how large the file is.
+    Falls back to counting page objects if the structure can't be followed.
+    """
+    try:
+        return _count_from_page_tree(view)
+    except (PdfStructureError, ValueError, IndexError, KeyError, zlib.error):
+        return _count_page_objects(view)
+
+
+def _count_from_page_tree(view: View) -> int:
+    tail_start = max(0, len(view) - TAIL_SIZE)
+    matches = list(_STARTXREF.finditer(view, tail_start))
+    if not matches:
+        raise PdfStructureError("startxref not found")
+
+    xref: dict[int, tuple] = {}
+    root = None
+    offset: Optional[int] = int(matches[-1].group(1))
+    seen: set[int] = set()
+    while offset is not None and offset not in seen:
+        seen.add(offset)
+        trailer, prev = _read_xref_section(view, offset, xref)
+        if root is None:
+            root = _ref(trailer, b"Root")
+        # Hybrid files keep part of the xref in a stream next to the classic table
+        hybrid = _int(trailer, b"XRefStm")
+        if hybrid is not None and hybrid not in seen:
+            seen.add(hybrid)
+            _read_xref_section(view, hybrid, xref)
+        offset = prev
+
+    if root is None:
+        raise PdfStructureError("No /Root in trailer")
+    resolver = _Resolver(view, xref)
+    catalog = resolver.object(root)
+    pages = resolver.object(_ref(catalog, b"Pages"))
+    count = _int(pages, b"Count")
+    if count is None:
+        raise PdfStructureError("No /Count in the page tree root")
+    return count
+
+
+# Last resort: count "/Type /Page" objects, a window at a time (misses pages inside object streams)
+def _count_page_objects(view: View) -> Optional[int]:
+    overlap = 32
+    count = 0
+    start = 0
+    while start < len(view):
+        end = min(len(view), start + SCAN_WINDOW)
+        window = bytes(view[max(0, start - overlap):end])
+        # Only count matches that start inside this window (the overlap was searched last time)
+        skip = min(overlap, start)
+        count += sum(1 for m in _PAGE_OBJECT.finditer(window) if m.start() >= skip)
+        start = end
+    return count or None
+
+
+# Reads one xref section into `xref` (entries already known from newer sections win)
+# Returns (trailer dictionary, offset of the previous section or None)
+def _read_xref_section(view: View, offset: int, xref: dict[int, tuple]) -> tuple[bytes, Optional[int]]:
+    if view[offset:offset + 4] == b"xref":
+        return _read_xref_table(view, offset, xref)
+    return _read_xref_stream(view, offset, xref)
+
+
+def _read_xref_table(view: View, offset: int, xref: dict[int, tuple]) -> tuple[bytes, Optional[int]]:
+    trailer_at = view.find(b"trailer", offset)
+    if trailer_at < 0:
+        raise PdfStructureError("xref table without trailer")
+
+    tokens = bytes(view[offset + 4:trailer_at]).split()
+    i = 0
+    while i < len(tokens):
+        start, count = int(tokens[i]), int(tokens[i + 1])
+        i += 2
+        for number in range(start, start + count):
+            entry_offset, kind = int(tokens[i]), tokens[i + 2]
+            i += 3
+            xref.setdefault(number, (IN_FILE, entry_offset) if kind == b"n" else (FREE,))
+
+    trailer = _dict_at(view, trailer_at)
+    return trailer, _int(trailer, b"Prev")
+
+
+def _read_xref_stream(view: View, offset: int, xref: dict[int, tuple]) -> tuple[bytes, Optional[int]]:
+    header = _OBJ_HEADER.match(view, offset)
+    if header is None:
+        raise PdfStructureError("xref offset does not point at an xref table or stream")
+    stream_dict, data = _stream_object(view, header.end(), length_resolver=None)
+
+    widths = [int(w) for w in _array(stream_dict, b"W")]
+    index = [int(v) for v in _array(stream_dict, b"Index")] or [0, _int(stream_dict, b"Size")]
+    row_size = sum(widths)
+
+    pos = 0
+    for start, count in zip(index[0::2], index[1::2]):
+        for number in range(start, start + count):
+            fields = []
+            for width in widths:
+                fields.append(int.from_bytes(data[pos:pos + width], "big") if width else None)
+                pos += width
+            kind = fields[0] if widths[0] else IN_FILE
+            if kind == IN_FILE:
+                xref.setdefault(number, (IN_FILE, fields[1]))
+            elif kind == IN_OBJSTM:
+                xref.setdefault(number, (IN_OBJSTM, fields[1], fields[2]))
+            else:
+                xref.setdefault(number, (FREE,))
+        if pos > len(data) + row_size:
+            raise PdfStructureError("xref stream shorter than its /Index")
+
+    return stream_dict, _int(stream_dict, b"Prev")
+
+
+# Reads objects through the xref, including objects packed in compressed object streams
+class _Resolver:
+
+    def __init__(self, view: View, xref: dict[int, tuple]) -> None:
+        self._view = view
+        self._xref = xref
+        self._objstm_cache: dict[int, tuple[bytes, list[int]]] = {}
+
+    # The object's bytes, starting at its dictionary (streams: just the dictionary)
+    def object(self, number: int) -> bytes:
+        entry = self._xref.get(number)
+        if entry is None or entry[0] == FREE:
+            raise PdfStructureError(f"Object {number} not in xref")
+
+        if entry[0] == IN_FILE:
+            header = _OBJ_HEADER.match(self._view, entry[1])
+            if header is None or int(header.group(1)) != number:
+                raise PdfStructureError(f"Object {number} not at its xref offset")
+            return _dict_at(self._view, header.end())
+
+        data, offsets = self._objstm(entry[1])
+        index = entry[2]
+        end = offsets[index + 1] if index + 1 < len(offsets) else len(data)
+        return data[offsets[index]:end]
+
+    # Decompressed object stream + where each object starts in it
+    def _objstm(self, number: int) -> tuple[bytes, list[int]]:
+        if number not in self._objstm_cache:
+            entry = self._xref.get(number)
+            if entry is None or entry[0] != IN_FILE:
+                raise PdfStructureError(f"Object stream {number} not in xref")
+            header = _OBJ_HEADER.match(self._view, entry[1])
+            stream_dict, data = _stream_object(self._view, header.end(), length_resolver=self._int_object)
+
+            count, first = _int(stream_dict, b"N"), _int(stream_dict, b"First")
+            pairs = data[:first].split()
+            offsets = [first + int(pairs[2 * i + 1]) for i in range(count)]
+            self._objstm_cache[number] = (data, offsets)
+        return self._objstm_cache[number]
+
+    # An indirect integer (e.g. "/Length 12 0 R")
+    def _int_object(self, number: int) -> int:
+        entry = self._xref[number]
+        header = _OBJ_HEADER.match(self._view, entry[1])
+        return int(bytes(self._view[header.end():header.end() + 32]).split()[0])
+
+
+# Parses "<< ... >> stream ... endstream" starting at `pos`; returns (dictionary, decoded data)
+def _stream_object(view: View, pos: int, length_resolver) -> tuple[bytes, bytes]:
+    stream_dict = _dict_at(view, pos)
+    dict_end = view.find(b">>", view.find(b"<<", pos) + len(stream_dict) - 2)
+    keyword = _STREAM_KEYWORD.search(view, dict_end, dict_end + 64)
+    if keyword is None:
+        raise PdfStructureError("Stream keyword not found")
+    data_start = keyword.end()
+
+    length = _int(stream_dict, b"Length")
+    length_ref = _ref(stream_dict, b"Length")
+    if length_ref is not None and length_resolver is not None:
+        length = length_resolver(length_ref)
+    if length is None:
+        length = view.find(b"endstream", data_start) - data_start
+    data = bytes(view[data_start:data_start + length])
+
+    if b"/FlateDecode" in stream_dict:
+        data = zlib.decompress(data)
+        predictor = _int(stream_dict, b"Predictor")
+        if predictor is not None and predictor >= 10:
+            data = _undo_png_predictor(data, _int(stream_dict, b"Columns") or 1)
+    elif b"/Filter" in stream_dict:
+        raise PdfStructureError("Unsupported stream filter")
+    return stream_dict, data
+
+
+# xref streams are usually Flate + PNG "Up" predictor; each row starts with its filter type byte
+def _undo_png_predictor(data: bytes, columns: int) -> bytes:
+    row_size = columns + 1
+    previous = bytearray(columns)
+    out = bytearray()
+    for start in range(0, len(data) - row_size + 1, row_size):
+        kind = data[start]
+        row = bytearray(data[start + 1:start + row_size])
+        for i in range(columns):
+            left = row[i - 1] if i else 0
+            up = previous[i]
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + (left + up) // 2) & 0xFF
+            elif kind == 4:
+                up_left = previous[i - 1] if i else 0
+                p = left + up - up_left
+                pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+                row[i] = (row[i] + (left if pa <= pb and pa <= pc else up if pb <= pc else up_left)) & 0xFF
+        out += row
+        previous = row
+    return bytes(out)
+
+
+# The "<< ... >>" dictionary starting at or after `pos` (nested dictionaries included)
+def _dict_at(view: View, pos: int) -> bytes:
+    start = view.find(b"<<", pos)
+    if start < 0:
+        raise PdfStructureError("Dictionary not found")
+    depth = 0
+    for m in _BRACKETS.finditer(view, start, min(len(view), start + MAX_DICT_SIZE)):
+        depth += 1 if m.group() == b"<<" else -1
+        if depth == 0:
+            return bytes(view[start:m.end()])
+    raise PdfStructureError("Unterminated dictionary")
+
+
+def _ref(d: bytes, key: bytes) -> Optional[int]:
+    m = re.search(rb"/" + key + rb"\s+(\d+)\s+\d+\s+R", d)
+    return int(m.group(1)) if m else None
+
+
+def _int(d: bytes, key: bytes) -> Optional[int]:
+    m = re.search(rb"/" + key + rb"\s+(\d+)(?!\s+\d+\s+R)", d)
+    return int(m.group(1)) if m else None
+
+
+def _array(d: bytes, key: bytes) -> list[bytes]:
+    m = re.search(rb"/" + key + rb"\s*\[([^\]]*)\]", d)
+    return m.group(1).split() if m else []
@@ -1,19 +1,124 @@
 import time
-from datetime import datetime, timezone
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
 
 from app.domain.models.document import DocumentStatus
+from app.domain.models.processing_result import ProcessingResult
 from app.domain.ports.documents_repo import DocumentsRepository
+from app.domain.ports.result_cache import ResultCachePort
+from app.domain.ports.storage import StoragePort
+from app.infrastructure.metrics.app_metrics import JOB_DURATION
+from app.workers.document_pipeline import process_stream
+from app.workers.retry_policy import RetryPolicy
+
+# Signature of something that can run the document work somewhere else
+# (e.g. in a process pool): runner(fn, *args) -> result
+Runner = Callable[..., ProcessingResult]
+
+# Storage to use when the caller didn't pass one (same singleton as the API)
+def _default_storage() -> StoragePort:
+    from app.api.deps import get_storage
+    return get_storage()
+
+# The actual work for one document: stream the uploaded object through the pipeline
+# Kept free of any repo access so it can be shipped to a child process.
+# A child process gets no storage object (clients don't pickle), so it builds its own from settings.
+def process_document(document_id: str, s3_key: str, storage: Optional[StoragePort] = None) -> ProcessingResult:
+    storage = storage or _default_storage()
+    with closing(storage.open_object(s3_key)) as stream:
+        return process_stream(stream)
+
+# A result for content processed before, when storage already knows the object's hash (no download)
+def _cached_result(cache: ResultCachePort, storage: Optional[StoragePort], s3_key: str) -> Optional[ProcessingResult]:
+    sha256 = (storage or _default_storage()).content_sha256(s3_key)
+    return cache.get(sha256) if sha256 else None
+
+# Fields a finished job writes along with COMPLETED (and clears the error of an earlier failed attempt)
+def _result_fields(result: ProcessingResult) -> dict:
+    return {
+        "last_error": None,
+        "sha256": result.sha256,
+        "size_bytes": result.size_bytes,
+        "detected_content_type": result.detected_content_type,
+        "page_count": result.page_count,
+        "width": result.width,
+        "height": result.height,
+    }
 
 # Process to take job, and process it
 # Updates status as it goes
-def process_job(repo: DocumentsRepository, document_id: str) -> None:
-    doc = repo.get(document_id)
+# With a cache, content seen before completes from the cached result without running the processor
+#
+# Every status change is one compare-and-set (repo.transition), so two workers holding the same
+# message (SQS delivers at least once) can't both process it: only one moves it QUEUED -> PROCESSING,
+# the other returns "skipped". A redelivery (attempt > 1) may also take over a document left in
+# PROCESSING, but only once its claim is older than visibility_timeout: then the previous holder
+# crashed or lost its lease. A younger claim may still be running, so the redelivery is "deferred"
+# (the caller hands the job back until the claim could be stale, instead of acking it and leaving
+# a crashed claim stuck). Without a visibility_timeout nothing proves a claim stale, so only QUEUED
+# documents are claimed.
+#
+# attempt is the job's delivery number. With a retry_policy, a failure that may go away on its own
+# puts the document back to QUEUED ("retried": the caller redelivers the job after a backoff) until
+# the attempts run out ("dead_lettered": FAILED, and the caller moves the message to the dead-letter queue).
+# Without one, or for errors that can't get better (unsupported content), it is FAILED right away ("failed").
+# Returns the outcome: completed, cached, retried, failed, dead_lettered, deferred, skipped or missing
+def process_job(
+        repo: DocumentsRepository,
+        document_id: str,
+        runner: Optional[Runner] = None,
+        storage: Optional[StoragePort] = None,
+        cache: Optional[ResultCachePort] = None,
+        attempt: int = 1,
+        retry_policy: Optional[RetryPolicy] = None,
+        visibility_timeout: Optional[float] = None,
+) -> str:
+    started = time.perf_counter()
+    if attempt > 1 and visibility_timeout:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=visibility_timeout)
+        doc = repo.transition(
+            document_id, (DocumentStatus.QUEUED, DocumentStatus.PROCESSING), DocumentStatus.PROCESSING,
+            started_before=stale_before,
+        )
+    else:
+        doc = repo.transition(document_id, DocumentStatus.QUEUED, DocumentStatus.PROCESSING)
     if doc is None:
-        return
+        # Someone else has it (or finished it); only now is it worth a read to tell why
+        current = repo.get(document_id)
+        if current is None:
+            outcome = "missing"
+        elif attempt > 1 and current.status == DocumentStatus.PROCESSING:
+            outcome = "deferred"
+        else:
+            outcome = "skipped"
+        JOB_DURATION.labels(outcome).observe(time.perf_counter() - started)
+        return outcome
 
     try:
-        repo.update(doc.with_status(DocumentStatus.PROCESSING))
-        time.sleep(1)
-        repo.update(doc.with_status(DocumentStatus.COMPLETED))
+        result = _cached_result(cache, storage, doc.s3_key) if cache is not None else None
+        outcome = "cached"
+        if result is None:
+            if runner is None:
+                result = process_document(doc.id, doc.s3_key, storage)
+            else:
+                result = runner(process_document, doc.id, doc.s3_key)
+            if cache is not None:
+                cache.put(result)
+            outcome = "completed"
+        if repo.transition(doc.id, DocumentStatus.PROCESSING, DocumentStatus.COMPLETED, **_result_fields(result)) is None:
+            outcome = "skipped" # Another worker took over after our lease ran out, and its result counts
     except Exception as e:
-        repo.update(doc.with_status(DocumentStatus.FAILED, error=str(e)))
\ No newline at end of file
+        if retry_policy is None or not retry_policy.retryable(e):
+            repo.transition(doc.id, DocumentStatus.PROCESSING, DocumentStatus.FAILED, last_error=str(e))
+            outcome = "failed"
+        elif retry_policy.should_retry(attempt, e):
+            error = f"Attempt {attempt} of {retry_policy.max_attempts} failed, retrying: {e}"
+            repo.transition(doc.id, DocumentStatus.PROCESSING, DocumentStatus.QUEUED, last_error=error)
+            outcome = "retried"
+        else:
+            error = f"Gave up after attempt {attempt}: {e}"
+            repo.transition(doc.id, DocumentStatus.PROCESSING, DocumentStatus.FAILED, last_error=error)
+            outcome = "dead_lettered"
+    JOB_DURATION.labels(outcome).observe(time.perf_counter() - started)
+    return outcome
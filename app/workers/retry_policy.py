@@ -0,0 +1,51 @@
+import random
+from dataclasses import dataclass
+
+from app.core.settings import settings
+from app.domain.errors import UnsupportedContentError
+
+# Errors that fail the same way every time: retrying only wastes a slot
+# A missing object (FileNotFoundError, or KeyError from a dict-backed store) stays missing:
+# the file was never uploaded, so the job fails at once instead of being retried until dead-lettered
+PERMANENT_ERRORS: tuple[type[BaseException], ...] = (UnsupportedContentError, FileNotFoundError, KeyError)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How often a failing job is tried again, and how long to wait in between.
+
+    attempt is the delivery number of the job (1 = first try). Retries use exponential
+    backoff with "full jitter": a random delay between 0 and base * 2^(attempt-1), capped
+    at max_delay. The randomness spreads out jobs that failed together (e.g. while S3
+    was unreachable), so they don't all hit the recovering service at the same moment.
+    """
+    max_attempts: int = 5
+    base_delay: float = 2.0
+    max_delay: float = 300.0
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=max(settings.WORKER_MAX_ATTEMPTS, 1),
+            base_delay=settings.WORKER_RETRY_BASE_SECONDS,
+            max_delay=settings.WORKER_RETRY_MAX_SECONDS,
+        )
+
+    # False for errors that would fail the same way on every attempt
+    @staticmethod
+    def retryable(error: BaseException) -> bool:
+        return not isinstance(error, PERMANENT_ERRORS)
+
+    # True if a job that failed on this attempt should be tried again
+    def should_retry(self, attempt: int, error: BaseException) -> bool:
+        return attempt < self.max_attempts and self.retryable(error)
+
+    # True once a job has been delivered more often than allowed (it keeps crashing the worker)
+    def exhausted(self, attempt: int) -> bool:
+        return attempt > self.max_attempts
+
+    # Seconds to wait before the next delivery of a job that failed on this attempt
+    def delay(self, attempt: int) -> float:
+        ceiling = min(self.max_delay, self.base_delay * 2 ** min(max(attempt - 1, 0), 32))
+        return random.uniform(0, ceiling)
@@ -0,0 +1,57 @@
+import argparse
+import logging
+import signal
+
+# Same DI as the API: the same repository, storage and queue, plus the upload event source
+from app.api.deps import get_document_service, get_queue, get_upload_events
+from app.core.settings import settings
+from app.infrastructure.metrics.app_metrics import REGISTRY, register_queue_depth
+from app.infrastructure.metrics.http_server import start_metrics_server
+
+from app.workers.upload_ingestor import UploadIngestor
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Upload ingestor: enqueues documents as soon as their upload finishes")
+    parser.add_argument("--batch-size", type=int, default=settings.UPLOAD_EVENTS_BATCH_SIZE)
+    parser.add_argument(
+        "--forever",
+        action="store_true",
+        help="Keep waiting for new uploads instead of exiting once no event arrives",
+    )
+    return parser.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    events = get_upload_events()
+    service = get_document_service()
+
+    # Events handled/skipped/retried and upload -> enqueue delay on http://<host>:WORKER_METRICS_PORT/metrics
+    if settings.WORKER_METRICS_PORT:
+        register_queue_depth(get_queue())
+        start_metrics_server(settings.WORKER_METRICS_PORT, REGISTRY)
+
+    ingestor = UploadIngestor(
+        events=events,
+        service=service,
+        batch_size=args.batch_size,
+        wait_seconds=events.wait_seconds, # SQS long-polls for up to 20s; the local sources wait 1s
+        report_interval=settings.WORKER_REPORT_INTERVAL,
+    )
+
+    # Ctrl+C / SIGTERM: finish the batch in hand, then stop
+    def _graceful_stop(signum, frame) -> None:
+        logging.getLogger(__name__).info("Received signal %s, finishing the current batch...", signum)
+        ingestor.stop()
+
+    signal.signal(signal.SIGINT, _graceful_stop)
+    signal.signal(signal.SIGTERM, _graceful_stop)
+
+    # Local: handle what has arrived and exit (or keep waiting with --forever)
+    # AWS: always keep consuming, like the worker
+    ingestor.run(drain=not (args.forever or settings.APP_ENV == "aws"))
+
+# Allow this file to be run directly
+if __name__ == "__main__":
+    main()
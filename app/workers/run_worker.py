@@ -1,37 +1,80 @@
-from datetime import datetime, timezone
+import argparse
+import logging
+import signal
 
 # Same DI as the API to get in-memory repo and queue
-from app.api.deps import get_documents_repo, get_queue
+from app.api.deps import get_documents_repo, get_queue, get_result_cache, get_storage
+from app.core.settings import settings
+from app.infrastructure.metrics.app_metrics import REGISTRY, register_queue_depth
+from app.infrastructure.metrics.http_server import start_metrics_server
+from app.infrastructure.profiling.sampling_profiler import SamplingProfiler
 
-# Typed job message and processor
-from app.workers.job_message import JobMessage
-from app.workers.processor_stub import process_job
+# Pool that runs several jobs at once
+from app.workers.retry_policy import RetryPolicy
+from app.workers.worker_pool import WorkerPool
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Document processing worker")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--mode", choices=["thread", "process"], default=settings.WORKER_POOL_MODE)
+    parser.add_argument("--prefetch", type=int, default=settings.WORKER_PREFETCH)
+    parser.add_argument(
+        "--forever",
+        action="store_true",
+        help="Keep polling for new jobs instead of exiting once the queue is empty",
+    )
+    args = parser.parse_args()
+    # Process children would each get a new, empty in-memory storage and never see the uploads
+    if args.mode == "process" and settings.APP_ENV == "local":
+        parser.error("--mode process needs shared storage: use APP_ENV=broker or APP_ENV=aws")
+    return args
 
 def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     # Get the same in-memory repository and queue used by the API
     # This allows the worker to see queued jobs and update document state
     repo = get_documents_repo()
     queue = get_queue()
 
-    raw = queue.dequeue()
+    # Job durations/outcomes, status transitions and queue depth on http://<host>:WORKER_METRICS_PORT/metrics
+    if settings.WORKER_METRICS_PORT:
+        register_queue_depth(queue)
+        start_metrics_server(settings.WORKER_METRICS_PORT, REGISTRY)
+
+    # All queues lease messages; SQS long-polls for up to 20s, in-memory (and the broker) wait 1s so drain mode exits quickly
+    use_sqs = settings.APP_ENV == "aws"
+
+    pool = WorkerPool(
+        repo=repo,
+        queue=queue,
+        concurrency=args.concurrency,
+        mode=args.mode,
+        prefetch=args.prefetch,
+        report_interval=settings.WORKER_REPORT_INTERVAL,
+        wait_seconds=settings.SQS_WAIT_TIME_SECONDS if use_sqs else 1,
+        visibility_timeout=settings.SQS_VISIBILITY_TIMEOUT,
+        storage=get_storage(),
+        cache=get_result_cache(),
+        lane_weights=settings.QUEUE_LANES,
+        retry_policy=RetryPolicy.from_settings(),
+        # Stack profiles of slow jobs in PROFILE_DIR (off unless PROFILE_SLOW_JOB_SECONDS is set)
+        profiler=SamplingProfiler.from_settings(settings.PROFILE_SLOW_JOB_SECONDS) if settings.PROFILE_SLOW_JOB_SECONDS > 0 else None,
+    )
 
-    # Keep processing jobs until the queue is empty
-    while raw is not None:
-        # Convert the raw queue message into a structured job object
-        msg = JobMessage(
-            job_id=raw["job_id"],
-            document_id=raw["document_id"],
-            s3_key=raw["object_key"],
-            requested_at=datetime.now(timezone.utc),
-        )
+    # Ctrl+C / SIGTERM: stop pulling new jobs, let in-flight ones finish
+    def _graceful_stop(signum, frame) -> None:
+        logging.getLogger(__name__).info("Received signal %s, finishing in-flight jobs...", signum)
+        pool.stop()
 
-        # Process the document associated with this job
-        # This simulates background work and updates document status
-        process_job(repo=repo, document_id=msg.document_id)
+    signal.signal(signal.SIGINT, _graceful_stop)
+    signal.signal(signal.SIGTERM, _graceful_stop)
 
-        # Move onto the next job in the queue
-        raw = queue.dequeue()
+    # Local: keep processing jobs until the queue is empty (or forever)
+    # AWS: always keep consuming, like any long-running SQS consumer
+    pool.run(drain=not (args.forever or use_sqs))
 
 # Allow this file to be run directly as a worker script
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
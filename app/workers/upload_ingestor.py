@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.domain.errors import AdmissionRejectedError
+from app.domain.ports.upload_events import UploadEvent, UploadEventsPort
+from app.infrastructure.metrics.app_metrics import UPLOAD_ENQUEUE_DELAY, UPLOAD_EVENT_COUNTERS
+from app.services.document_service import DocumentService
+
+logger = logging.getLogger(__name__)
+
+
+# Running totals for one ingestor
+@dataclass
+class IngestStats:
+    started_at: float = field(default_factory=time.monotonic)
+    enqueued: int = 0
+    skipped: int = 0 # Not a document's upload, or the document had been enqueued already
+    retried: int = 0 # Enqueueing failed; the event is left for the source to deliver again
+    delay_seconds_max: float = 0.0 # Longest upload -> enqueue delay seen
+
+
+class UploadIngestor:
+    """
+    Turns storage "object created" events into queued jobs, so a finished upload starts
+    processing without the client calling POST /documents/{id}/enqueue.
+
+    Events are collected into batches of up to batch_size: the first receive waits up to
+    wait_seconds, then more are taken while they are already there. A batch is one
+    DocumentService.enqueue_uploaded call (one compare-and-set per document, one queue batch).
+    Handled events are acked; an event whose enqueue failed is not, so it comes back.
+    When admission control refuses the batch (backlog too long), nothing is acked and the
+    ingestor pauses for the Retry-After it was given: the events wait in the source, not the job queue.
+    """
+
+    def __init__(
+            self,
+            events: UploadEventsPort,
+            service: DocumentService,
+            batch_size: int = 100,
+            wait_seconds: int = 1,
+            report_interval: float = 10.0,
+    ) -> None:
+        self._events = events
+        self._service = service
+        self._batch_size = batch_size
+        self._wait_seconds = wait_seconds
+        self._report_interval = report_interval
+        self._stopped = threading.Event()
+        self.stats = IngestStats()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    # Handles batches until stop(); with drain=True, also stops once no event arrives within wait_seconds
+    def run(self, drain: bool = False) -> IngestStats:
+        last_report = time.monotonic()
+        while not self._stopped.is_set():
+            if not self.ingest_once() and drain:
+                break
+            if time.monotonic() - last_report >= self._report_interval:
+                self._report()
+                last_report = time.monotonic()
+        self._report(final=True)
+        return self.stats
+
+    # Receives and handles one batch; returns how many events it had
+    def ingest_once(self) -> int:
+        events = self._receive_batch()
+        if not events:
+            return 0
+
+        try:
+            results = self._service.enqueue_uploaded([event.object_key for event in events])
+        except AdmissionRejectedError as e:
+            logger.warning("Job backlog too long, pausing uploads for %.0fs: %s", e.retry_after, e)
+            self._count("retried", len(events))
+            self._stopped.wait(e.retry_after)
+            return len(events)
+        except Exception:
+            # Repository or queue unreachable: nothing is acked, every event comes back
+            logger.exception("Couldn't enqueue %d uploads, they will be delivered again", len(events))
+            self._count("retried", len(events))
+            return len(events)
+
+        # An event shares its receipt with the other records of the same message: ack none of them if one must come back
+        retry_receipts = {event.receipt for event, result in zip(events, results) if result.error}
+        self._events.ack_events([event for event in events if event.receipt not in retry_receipts])
+
+        now = datetime.now(timezone.utc)
+        for event, result in zip(events, results):
+            if result.job_id:
+                self._count("enqueued")
+                if event.created_at is not None:
+                    delay = max((now - event.created_at).total_seconds(), 0.0)
+                    UPLOAD_ENQUEUE_DELAY.observe(delay)
+                    self.stats.delay_seconds_max = max(self.stats.delay_seconds_max, delay)
+            elif result.error:
+                logger.warning("Couldn't enqueue %s (will retry): %s", result.object_key, result.error)
+                self._count("retried")
+            else:
+                logger.debug("Skipped %s: %s", result.object_key, result.skipped)
+                self._count("skipped")
+        return len(events)
+
+    def _receive_batch(self) -> list[UploadEvent]:
+        events = self._events.receive_events(max_events=self._batch_size, wait_seconds=self._wait_seconds)
+        while events and len(events) < self._batch_size:
+            more = self._events.receive_events(max_events=self._batch_size - len(events), wait_seconds=0)
+            if not more:
+                break
+            events.extend(more)
+        return events
+
+    def _count(self, outcome: str, amount: int = 1) -> None:
+        setattr(self.stats, outcome, getattr(self.stats, outcome) + amount)
+        UPLOAD_EVENT_COUNTERS[outcome].inc(amount)
+
+    def _report(self, final: bool = False) -> None:
+        stats = self.stats
+        logger.info(
+            "%s: %d uploads enqueued, %d events skipped, %d retried, longest upload -> enqueue %.2fs",
+            "Ingestor finished" if final else "Ingestor progress",
+            stats.enqueued,
+            stats.skipped,
+            stats.retried,
+            stats.delay_seconds_max,
+        )
@@ -0,0 +1,415 @@
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.domain.models.document import DocumentStatus
+from app.domain.models.job_message import JobMessage
+from app.domain.ports.documents_repo import DocumentsRepository
+from app.domain.ports.result_cache import ResultCachePort
+from app.domain.ports.storage import StoragePort
+from app.infrastructure.metrics.app_metrics import JOB_DURATION, JOB_QUEUE_WAIT
+from app.infrastructure.profiling.sampling_profiler import SamplingProfiler
+from app.infrastructure.queue.fair_buffer import FairJobBuffer
+from app.workers.processor_stub import process_job
+from app.workers.retry_policy import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+POOL_MODES = {"thread", "process"}
+
+
+# Jobs started from one lane and how long they had waited (enqueue -> slot)
+@dataclass
+class LaneStats:
+    started: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        return self.wait_seconds_total / self.started if self.started else 0.0
+
+
+# Running totals for one pool, used for the jobs/second report
+@dataclass
+class WorkerStats:
+    started_at: float = field(default_factory=time.monotonic)
+    processed: int = 0
+    failed: int = 0        # Crashed (the exception escaped process_job)
+    retried: int = 0       # Sent back to the queue to be tried again after a backoff
+    dead_lettered: int = 0 # Given up on: retries used up, or kept crashing
+    lanes: dict[str, LaneStats] = field(default_factory=dict)
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.monotonic() - self.started_at, 1e-9)
+
+    @property
+    def jobs_per_second(self) -> float:
+        return self.processed / self.elapsed
+
+
+class WorkerPool:
+    """
+    Runs queued jobs on a fixed number of concurrent slots.
+
+    One feeder thread per queue lane pulls messages in batches into a small local buffer
+    (up to concurrency + prefetch jobs per lane), and `concurrency` slot threads take jobs
+    from it. The buffer hands out jobs weighted-fair across lanes (lane_weights) and
+    round-robin across tenants, so a bulk backlog can't starve interactive jobs.
+    A housekeeping thread acks finished jobs in batches and extends the visibility of
+    jobs that are still buffered or running, so long jobs are not redelivered elsewhere.
+    A failed or crashed job goes back to the queue, hidden for a backoff (retry_policy), and
+    is dead-lettered once it has been delivered max_attempts times, so a poison message
+    stops taking slots away from healthy jobs.
+    - thread mode: the slot threads do the work themselves (good for I/O-bound jobs)
+    - process mode: the slots hand the CPU-bound part to a process pool of the same size,
+      while status updates stay in this process
+    """
+
+    def __init__(
+            self,
+            repo: DocumentsRepository,
+            queue,
+            concurrency: int = 4,
+            mode: str = "thread",
+            prefetch: int = 4,
+            poll_interval: float = 0.1,
+            report_interval: float = 10.0,
+            wait_seconds: int = 0,
+            visibility_timeout: Optional[int] = None,
+            ack_interval: float = 1.0,
+            storage: Optional[StoragePort] = None,
+            cache: Optional[ResultCachePort] = None,
+            lane_weights: Optional[dict[str, int]] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            profiler: Optional[SamplingProfiler] = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if mode not in POOL_MODES:
+            raise ValueError(f"Unknown worker pool mode: {mode}")
+
+        self._repo = repo
+        self._queue = queue
+        self._concurrency = concurrency
+        self._mode = mode
+        self._poll_interval = poll_interval
+        self._report_interval = report_interval
+        self._wait_seconds = wait_seconds
+        self._visibility_timeout = visibility_timeout
+        self._ack_interval = ack_interval
+        self._storage = storage # Where thread-mode slots read uploads from (process mode children open their own)
+        self._cache = cache     # Results by content hash, checked here in the parent so every slot shares it
+        self._retry_policy = retry_policy or RetryPolicy.from_settings()
+        self._profiler = profiler # Writes the sampled stacks of slow jobs (None = jobs aren't sampled)
+
+        # Jobs waiting for a free slot, per lane. Bounded so we never pull far ahead of what we can run.
+        # Lanes the weights don't mention get weight 1.
+        self._lane_weights = {lane: (lane_weights or {}).get(lane, 1) for lane in queue.lanes}
+        self._buffer_per_lane = concurrency + max(prefetch, 0)
+        self._buffer = FairJobBuffer(self._lane_weights, self._buffer_per_lane)
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.stats = WorkerStats()
+
+        # Messages we hold a lease on (buffered or running): job_id -> (job, lease expiry)
+        # and finished messages waiting to be deleted in one batch call
+        self._lease_lock = threading.Lock()
+        self._leases: dict[str, tuple[JobMessage, float]] = {}
+        self._pending_acks: list[JobMessage] = []
+        self._retry_until = 0.0 # When the last retry this pool scheduled becomes visible again (drain waits for it)
+
+    # Ask the pool to stop taking new messages. In-flight and already-prefetched jobs still finish.
+    def stop(self) -> None:
+        self._stop.set()
+
+    # Runs until stop() is called, or (with drain=True) until the queue is empty and all jobs are done
+    def run(self, drain: bool = False) -> WorkerStats:
+        self.stats = WorkerStats()
+        self._buffer = FairJobBuffer(self._lane_weights, self._buffer_per_lane)
+        self._retry_until = 0.0
+        process_pool: Optional[Executor] = None
+        if self._mode == "process":
+            process_pool = ProcessPoolExecutor(max_workers=self._concurrency)
+
+        housekeeping_done = threading.Event()
+        housekeeping = threading.Thread(
+            target=self._housekeeping_loop, args=(housekeeping_done,), name="worker-housekeeping", daemon=True
+        )
+        housekeeping.start()
+
+        slots = ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix="worker-slot")
+        feeders: list[threading.Thread] = []
+        errors: list[BaseException] = []
+        try:
+            for _ in range(self._concurrency):
+                slots.submit(self._slot_loop, process_pool)
+
+            for lane in self._lane_weights:
+                feeder = threading.Thread(
+                    target=self._feed_lane, args=(lane, drain, errors), name=f"worker-feeder-{lane}", daemon=True
+                )
+                feeder.start()
+                feeders.append(feeder)
+            self._wait_for_feeders(feeders)
+        finally:
+            if any(feeder.is_alive() for feeder in feeders): # Interrupted: stop pulling before closing the buffer
+                self._stop.set()
+                for feeder in feeders:
+                    feeder.join()
+            # Slots finish what is buffered, then exit
+            self._buffer.close()
+            slots.shutdown(wait=True)
+            if process_pool is not None:
+                process_pool.shutdown(wait=True)
+
+            housekeeping_done.set()
+            housekeeping.join()
+            self._flush_acks()
+
+        if errors:
+            raise errors[0] # A feeder failed (e.g. the queue is unreachable): the worker stops, like before
+        self._report(final=True)
+        return self.stats
+
+    # Logs progress every report_interval until every feeder is done
+    def _wait_for_feeders(self, feeders: list[threading.Thread]) -> None:
+        last_report = time.monotonic()
+        for feeder in feeders:
+            while feeder.is_alive():
+                feeder.join(timeout=min(self._report_interval, 1.0))
+                if time.monotonic() - last_report >= self._report_interval:
+                    self._report()
+                    last_report = time.monotonic()
+
+    def _feed_lane(self, lane: str, drain: bool, errors: list[BaseException]) -> None:
+        try:
+            self._feed(lane, drain)
+        except BaseException as e:
+            logger.exception("Feeder for lane %s failed", lane)
+            errors.append(e)
+            self._stop.set()
+
+    # Pulls one lane's messages into the local buffer while that lane has room
+    def _feed(self, lane: str, drain: bool) -> None:
+        while not self._stop.is_set():
+            room = self._buffer.wait_for_room(lane, timeout=self._poll_interval)
+            if room <= 0:
+                continue
+
+            # One call fetches a whole batch (up to 10 for SQS), long-polling if configured
+            jobs = self._queue.receive_jobs(
+                max_messages=min(room, 10),
+                wait_seconds=self._wait_seconds,
+                visibility_timeout=self._visibility_timeout,
+                lane=lane,
+            )
+            if not jobs:
+                # Nothing buffered, nothing running and no retry still waiting out its backoff -> all work is done
+                if drain and self._buffer.unfinished_tasks == 0 and time.monotonic() >= self._retry_until:
+                    return
+                if self._wait_seconds == 0:
+                    time.sleep(self._poll_interval)
+                continue
+
+            with self._lease_lock:
+                expires = time.monotonic() + (self._visibility_timeout or 0)
+                for job in jobs:
+                    self._leases[job.job_id] = (job, expires)
+            for job in jobs:
+                self._buffer.put(job)
+
+    # One slot: take a job, run it, repeat until the buffer is closed and empty
+    def _slot_loop(self, process_pool: Optional[Executor]) -> None:
+        runner = None
+        if process_pool is not None:
+            runner = lambda fn, *args: process_pool.submit(fn, *args).result()
+
+        while True:
+            job = self._buffer.get()
+            if job is None:
+                return
+            try:
+                self._record_wait(job)
+                self._run_job(job, runner)
+            finally:
+                self._buffer.task_done()
+
+    # How long the job waited between enqueue and a free slot, per lane
+    def _record_wait(self, job: JobMessage) -> None:
+        lane = self._buffer.lane_of(job)
+        wait = max((datetime.now(timezone.utc) - job.requested_at).total_seconds(), 0.0)
+        JOB_QUEUE_WAIT.labels(lane).observe(wait)
+        with self._stats_lock:
+            stats = self.stats.lanes.setdefault(lane, LaneStats())
+            stats.started += 1
+            stats.wait_seconds_total += wait
+            stats.wait_seconds_max = max(stats.wait_seconds_max, wait)
+
+    def _run_job(self, job: JobMessage, runner) -> None:
+        started = time.perf_counter()
+        if self._retry_policy.exhausted(job.attempt):
+            # Delivered more often than allowed without ever finishing: it keeps crashing the worker
+            JOB_DURATION.labels("quarantined").observe(0.0)
+            self._quarantine(job)
+            return
+
+        try:
+            if self._profiler is None:
+                outcome = self._process(job, runner)
+            else:
+                with self._profiler.profile("job", job.document_id):
+                    outcome = self._process(job, runner)
+        except Exception:
+            JOB_DURATION.labels("crashed").observe(time.perf_counter() - started)
+            # process_job records failures on the document itself; this only guards the slot.
+            # The message is not acked: it comes back after a backoff, and counts as an attempt.
+            logger.exception("Job %s crashed (attempt %d)", job.job_id, job.attempt)
+            self._retry_later(job)
+            with self._stats_lock:
+                self.stats.failed += 1
+            return
+
+        if outcome == "retried":
+            self._retry_later(job)
+            with self._stats_lock:
+                self.stats.retried += 1
+            return
+        if outcome == "deferred":
+            # Another claim on the document is too recent to take over: try again once it could have expired
+            self._retry_later(job, delay=self._visibility_timeout)
+            return
+        if outcome == "dead_lettered":
+            self._dead_letter(job, f"Failed {job.attempt} times")
+            return
+
+        with self._lease_lock:
+            self._leases.pop(job.job_id, None)
+            self._pending_acks.append(job)
+        with self._stats_lock:
+            self.stats.processed += 1
+
+    def _process(self, job: JobMessage, runner) -> str:
+        return process_job(
+            repo=self._repo,
+            document_id=job.document_id,
+            runner=runner,
+            storage=self._storage,
+            cache=self._cache,
+            attempt=job.attempt,
+            retry_policy=self._retry_policy,
+            visibility_timeout=self._visibility_timeout,
+        )
+
+    # Hands the job back to the queue, hidden until its backoff (or the given delay) is over
+    def _retry_later(self, job: JobMessage, delay: Optional[float] = None) -> None:
+        delay = delay or self._retry_policy.delay(job.attempt)
+        with self._lease_lock:
+            self._leases.pop(job.job_id, None) # No more heartbeats, or they would cut the backoff short
+            # Rounded up: SQS only hides messages for whole seconds
+            self._retry_until = max(self._retry_until, time.monotonic() + math.ceil(delay))
+        try:
+            self._queue.release_jobs([job], delay)
+        except Exception:
+            # The lease runs out on its own; the job just comes back later than planned
+            logger.exception("Could not schedule a retry for job %s", job.job_id)
+
+    # Gives up on a job that never finished: its document is FAILED and the message is dead-lettered
+    def _quarantine(self, job: JobMessage) -> None:
+        reason = f"Delivered {job.attempt} times without finishing (crashed the worker every time)"
+        logger.error("Quarantining job %s for document %s: %s", job.job_id, job.document_id, reason)
+        try:
+            self._repo.transition(
+                job.document_id, (DocumentStatus.QUEUED, DocumentStatus.PROCESSING), DocumentStatus.FAILED, last_error=reason,
+            )
+        except Exception:
+            logger.exception("Could not mark document %s as failed", job.document_id)
+        self._dead_letter(job, reason)
+
+    def _dead_letter(self, job: JobMessage, reason: str) -> None:
+        with self._lease_lock:
+            self._leases.pop(job.job_id, None)
+        try:
+            failed = self._queue.dead_letter_jobs([job], reason)
+        except Exception:
+            logger.exception("Could not dead-letter job %s", job.job_id)
+            failed = [job]
+        if failed:
+            # Still in the queue: it comes back once its lease runs out and is quarantined then
+            logger.warning("Job %s is still queued, it was not dead-lettered", job.job_id)
+        with self._stats_lock:
+            self.stats.dead_lettered += 1
+
+    # Background loop: batch acks + visibility heartbeats
+    def _housekeeping_loop(self, done: threading.Event) -> None:
+        while not done.wait(self._ack_interval):
+            try:
+                self._flush_acks()
+                self._extend_leases()
+            except Exception:
+                logger.exception("Worker housekeeping failed")
+
+    # Deletes every finished message in as few calls as possible
+    def _flush_acks(self) -> None:
+        with self._lease_lock:
+            batch, self._pending_acks = self._pending_acks, []
+        if not batch:
+            return
+        failed = self._queue.ack_jobs(batch)
+        if failed:
+            # The lease ran out before we acked; the job may run again elsewhere
+            logger.warning("Could not ack %d finished jobs", len(failed))
+
+    # Re-hides leased messages that are within a third of their visibility timeout of reappearing
+    def _extend_leases(self) -> None:
+        if not self._visibility_timeout:
+            return
+
+        now = time.monotonic()
+        threshold = now + self._visibility_timeout / 3
+        with self._lease_lock:
+            expiring = [job for job, expires in self._leases.values() if expires <= threshold]
+            for job in expiring:
+                self._leases[job.job_id] = (job, now + self._visibility_timeout)
+        if expiring:
+            self._queue.extend_visibility(expiring, self._visibility_timeout)
+
+    def _report(self, final: bool = False) -> None:
+        stats = self.stats
+        logger.info(
+            "%s: %d jobs done, %d crashed, %d retried, %d dead-lettered, %.2f jobs/s over %.1fs (%s mode, %d slots)",
+            "Worker finished" if final else "Worker progress",
+            stats.processed,
+            stats.failed,
+            stats.retried,
+            stats.dead_lettered,
+            stats.jobs_per_second,
+            stats.elapsed,
+            self._mode,
+            self._concurrency,
+        )
+        for lane, lane_stats in stats.lanes.items():
+            logger.info(
+                "Lane %s (weight %d): %d jobs started, queue wait avg %.2fs, max %.2fs",
+                lane,
+                self._lane_weights.get(lane, 1),
+                lane_stats.started,
+                lane_stats.average_wait,
+                lane_stats.wait_seconds_max,
+            )
+        cache_stats = getattr(self._cache, "stats", None)
+        if cache_stats is not None and cache_stats.lookups:
+            logger.info(
+                "Result cache: %.1f%% hit rate (%d memory + %d persistent hits, %d misses), %.1f MB not re-processed",
+                cache_stats.hit_rate * 100,
+                cache_stats.memory_hits,
+                cache_stats.persistent_hits,
+                cache_stats.misses,
+                cache_stats.bytes_saved / 1024 ** 2,
+            )
@@ -0,0 +1,149 @@
+"""
+Queue wait and 429s under a load spike: no admission control vs backlog-aware and per-client limits.
+
+--clients quiet clients together enqueue --base-rate jobs/s for --seconds; for --spike-seconds in the
+middle, one more ("noisy") client adds --spike-rate jobs/s. --workers worker threads run the jobs
+(sleep --job-ms each), so capacity is workers * 1000 / job-ms jobs/s. Arrivals don't slow down when
+refused (a 429 is counted, the job is dropped). Modes: "off" (everything is queued), "backlog"
+(refuse while the estimated queue wait is over --max-wait), "client" (token bucket of
+--client-rate jobs/s per client), "both". Reported per kind of client: jobs queued, jobs refused,
+queue wait p50/p99/max (enqueue -> a worker starts it); the deepest backlog; and the highest worker
+count the capacity planner recommended during the run.
+
+    python -m benchmarks.admission_control --workers 4 --job-ms 20 --base-rate 120 --spike-rate 400 --max-wait 1
+"""
+import argparse
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.domain.errors import AdmissionRejectedError
+from app.domain.models.document import DocumentStatus
+from app.domain.models.job_message import JobMessage
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.services.admission import AdmissionController, BacklogMonitor, CapacityPlanner, TokenBucketLimiter
+from app.services.document_service import DocumentService
+
+TICK_SECONDS = 0.005
+
+
+# Worker threads: take one job, sleep, mark the document COMPLETED (what the monitor counts)
+def run_workers(args, repo, queue, waits: dict, stopped: threading.Event) -> list[threading.Thread]:
+
+    def work() -> None:
+        while not stopped.is_set():
+            raws = queue.dequeue_batch(1, timeout=0.05)
+            if not raws:
+                continue
+            job = JobMessage.from_queue_dict(raws[0])
+            waits[job.document_id] = (datetime.now(timezone.utc) - job.requested_at).total_seconds()
+            time.sleep(args.job_ms / 1000)
+            repo.transition(job.document_id, DocumentStatus.QUEUED, DocumentStatus.PROCESSING)
+            repo.transition(job.document_id, DocumentStatus.PROCESSING, DocumentStatus.COMPLETED)
+            queue.ack(job.receipt_handle)
+
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(args.workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def run(mode: str, args) -> dict:
+    repo, queue = InMemoryDocumentsRepository(), InMemoryQueue()
+    monitor = BacklogMonitor(queue, repo, interval=args.sample_seconds, window=args.window_seconds)
+    planner = CapacityPlanner(target_wait=args.max_wait, leases_per_worker=1, min_workers=1, max_workers=1000)
+    admission = AdmissionController(
+        monitor=monitor,
+        limiter=TokenBucketLimiter(args.client_rate, args.client_rate) if mode in ("client", "both") else None,
+        max_queue_wait=args.max_wait if mode in ("backlog", "both") else 0.0,
+    )
+    service = DocumentService(repo, InMemoryStorage(), queue, admission=admission)
+    monitor.start()
+
+    waits: dict[str, float] = {}
+    stopped = threading.Event()
+    workers = run_workers(args, repo, queue, waits, stopped)
+
+    kinds: dict[str, str] = {} # document_id -> "quiet" / "noisy"
+    refused = {"quiet": 0, "noisy": 0}
+    deepest, recommended = 0, 0
+    spike_start = (args.seconds - args.spike_seconds) / 2
+    due = {f"quiet-{n}": 0.0 for n in range(args.clients)}
+    due["noisy"] = 0.0
+
+    started = time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < args.seconds:
+        spiking = spike_start <= elapsed < spike_start + args.spike_seconds
+        for client in due:
+            rate = args.base_rate / args.clients if client != "noisy" else (args.spike_rate if spiking else 0.0)
+            due[client] += rate * TICK_SECONDS
+            kind = "noisy" if client == "noisy" else "quiet"
+            while due[client] >= 1:
+                due[client] -= 1
+                document_id, _, _ = service.initiate_upload(f"{client}.pdf", "application/pdf")
+                try:
+                    admission.check_client(client) # What the enqueue route does before the service
+                    service.enqueue_processing(document_id)
+                    kinds[document_id] = kind
+                except AdmissionRejectedError:
+                    refused[kind] += 1
+        snapshot = monitor.snapshot()
+        deepest = max(deepest, queue.depth())
+        recommended = max(recommended, planner.recommended_workers(snapshot))
+        time.sleep(max(started + elapsed + TICK_SECONDS - time.perf_counter(), 0))
+
+    # Let the workers finish what was accepted (bounded)
+    deadline = time.monotonic() + 120
+    while len(waits) < len(kinds) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stopped.set()
+    monitor.stop()
+    for thread in workers:
+        thread.join()
+
+    result = {"deepest": deepest, "recommended": recommended}
+    for kind in ("quiet", "noisy"):
+        samples = sorted(waits[i] * 1000 for i, k in kinds.items() if k == kind and i in waits)
+        result[kind] = {
+            "queued": sum(1 for k in kinds.values() if k == kind),
+            "refused": refused[kind],
+            "p50": statistics.median(samples) if samples else 0.0,
+            "p99": samples[max(int(len(samples) * 0.99) - 1, 0)] if samples else 0.0,
+            "max": samples[-1] if samples else 0.0,
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=12)
+    parser.add_argument("--clients", type=int, default=4, help="Quiet clients sharing --base-rate")
+    parser.add_argument("--base-rate", type=float, default=120, help="Jobs/s from the quiet clients together")
+    parser.add_argument("--spike-rate", type=float, default=400, help="Jobs/s from the noisy client during the spike")
+    parser.add_argument("--spike-seconds", type=float, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--job-ms", type=float, default=20)
+    parser.add_argument("--max-wait", type=float, default=1.0, help="ADMISSION_MAX_QUEUE_WAIT_SECONDS (and the planner's target)")
+    parser.add_argument("--client-rate", type=float, default=60, help="ADMISSION_CLIENT_RATE (burst = one second of it)")
+    parser.add_argument("--sample-seconds", type=float, default=0.2, help="BACKLOG_SAMPLE_SECONDS")
+    parser.add_argument("--window-seconds", type=float, default=2.0, help="BACKLOG_RATE_WINDOW_SECONDS")
+    parser.add_argument("--modes", nargs="+", choices=["off", "backlog", "client", "both"], default=["off", "backlog", "client", "both"])
+    args = parser.parse_args()
+
+    print(f"capacity {args.workers * 1000 / args.job_ms:.0f} jobs/s, load {args.base_rate:.0f} jobs/s + {args.spike_rate:.0f} jobs/s for {args.spike_seconds:.0f}s")
+    print(f"{'mode':<8} {'client':<6} {'queued':>7} {'refused':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'deepest':>8} {'rec. workers':>13}")
+    for mode in args.modes:
+        r = run(mode, args)
+        for kind in ("quiet", "noisy"):
+            k = r[kind]
+            print(
+                f"{mode:<8} {kind:<6} {k['queued']:>7} {k['refused']:>8} {k['p50']:>8.1f} {k['p99']:>8.1f} {k['max']:>8.1f}"
+                f" {r['deepest']:>8} {r['recommended']:>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Requests/s and p99 latency at high concurrency: async routes vs the old threadpool path.
+
+Fires POST /documents/{id}/enqueue at the app through httpx's in-process ASGI transport.
+The queue is SQSQueue on a LocalSQSClient that sleeps --latency-ms per call, standing in
+for the SQS round trip. The "threadpool" app is the previous shape of the route (sync def
++ DocumentService), so every request holds one of FastAPI's threadpool threads (40 by default)
+for the whole network wait. The "async" app is the real router on AsyncDocumentService.
+
+    python -m benchmarks.async_load --requests 2000 --concurrency 500 --latency-ms 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI
+
+from app.api import deps
+from app.domain.models.document import Document, DocumentStatus
+from app.infrastructure.persistence.async_documents_repo import AsyncInMemoryDocumentsRepository
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.async_queue import AsyncSQSQueue
+from app.infrastructure.queue.local_sqs import LocalSQSClient
+from app.infrastructure.queue.sqs_queue import SQSQueue
+from app.infrastructure.storage.async_storage import AsyncInMemoryStorage
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.main import app as async_app
+from app.services.async_document_service import AsyncDocumentService
+from app.services.document_service import DocumentService
+
+
+# LocalSQSClient with a fixed network delay on every send
+class SlowSQSClient(LocalSQSClient):
+
+    def __init__(self, latency: float) -> None:
+        super().__init__()
+        self._latency = latency
+
+    def send_message(self, **kwargs) -> dict:
+        time.sleep(self._latency)
+        return super().send_message(**kwargs)
+
+
+def make_repo(count: int) -> tuple[InMemoryDocumentsRepository, list[str]]:
+    repo = InMemoryDocumentsRepository()
+    now = datetime.now(timezone.utc)
+    docs = [
+        Document(
+            id=str(uuid.uuid4()),
+            filename=f"scan-{i}.pdf",
+            content_type="application/pdf",
+            s3_key=f"documents/{i}/scan-{i}.pdf",
+            status=DocumentStatus.INITIATED,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+    repo.create_many(docs)
+    return repo, [d.id for d in docs]
+
+
+# The enqueue route as it was before the async path: sync def, run on FastAPI's threadpool
+def threadpool_app(service: DocumentService) -> FastAPI:
+    router = APIRouter(prefix="/documents")
+
+    @router.post("/{document_id}/enqueue")
+    def enqueue_document(document_id: str, svc: DocumentService = Depends(lambda: service)):
+        return {"document_id": document_id, "job_id": svc.enqueue_processing(document_id)}
+
+    legacy = FastAPI()
+    legacy.include_router(router)
+    return legacy
+
+
+async def fire(app, ids: list[str], concurrency: int) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+    limiter = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(document_id: str) -> None:
+            async with limiter:
+                start = time.perf_counter()
+                response = await client.post(f"/documents/{document_id}/enqueue")
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(document_id) for document_id in ids))
+        return time.perf_counter() - start, latencies
+
+
+def report(label: str, seconds: float, latencies: list[float]) -> None:
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{label:<12} {len(latencies):>6} req  {len(latencies) / seconds:>8.0f} req/s  "
+        f"p50 {p50 * 1000:8.1f} ms  p99 {p99 * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    repo, ids = make_repo(args.requests)
+    queue = SQSQueue(client=SlowSQSClient(latency), queue_url="local")
+    service = DocumentService(repo=repo, storage=InMemoryStorage(), queue=queue)
+    seconds, latencies = asyncio.run(fire(threadpool_app(service), ids, args.concurrency))
+    report("threadpool", seconds, latencies)
+
+    repo, ids = make_repo(args.requests)
+    queue = SQSQueue(client=SlowSQSClient(latency), queue_url="local")
+    service = AsyncDocumentService(
+        repo=AsyncInMemoryDocumentsRepository(repo),
+        storage=AsyncInMemoryStorage(InMemoryStorage()),
+        queue=AsyncSQSQueue(queue, max_workers=args.concurrency),
+    )
+    async_app.dependency_overrides[deps.get_async_document_service] = lambda: service
+    try:
+        seconds, latencies = asyncio.run(fire(async_app, ids, args.concurrency))
+    finally:
+        async_app.dependency_overrides.clear()
+    report("async", seconds, latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Cold start: import time of the API and latency of its first request, against a budget.
+
+Every run is a fresh interpreter that imports app.main, optionally runs the startup warm-up
+(without network calls), then sends POST /documents/initiate-upload twice in-process. The
+first request pays for whatever startup left undone (boto3 clients, botocore's S3 model,
+building the middleware stack); the second shows the steady state. --env aws uses fake
+credentials, so nothing leaves the machine. Exit code 1 if a median is over its budget.
+
+    python -m benchmarks.cold_start --env local aws --warm-up --import-budget-ms 800 --first-request-budget-ms 100
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+AWS_ENV = {
+    "APP_ENV": "aws",
+    "S3_BUCKET_NAME": "benchmark-bucket",
+    "SQS_QUEUE_URL": "https://sqs.us-east-1.amazonaws.com/123456789012/benchmark",
+    "AWS_ACCESS_KEY_ID": "AKIAEXAMPLEEXAMPLE00",
+    "AWS_SECRET_ACCESS_KEY": "benchmark-secret-key-not-real-0000000000",
+    "AWS_DEFAULT_REGION": "us-east-1",
+}
+
+# Runs in the child interpreter; prints one JSON line
+CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter() - started
+
+import httpx
+from app.api.deps import warm_up
+
+async def main():
+    warm = None
+    if {warm_up!r}:
+        started = time.perf_counter()
+        warm_up(connect=False)
+        warm = time.perf_counter() - started
+    latencies = []
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(2):
+            started = time.perf_counter()
+            response = await client.post("/documents/initiate-upload", json={{"filename": "a.pdf", "content_type": "application/pdf"}})
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+    print(json.dumps({{"import": imported, "warm_up": warm, "first": latencies[0], "second": latencies[1]}}))
+
+asyncio.run(main())
+"""
+
+
+def child_env(env: str) -> dict:
+    environ = dict(os.environ, PYTHONDONTWRITEBYTECODE="0")
+    environ["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), environ.get("PYTHONPATH")]))
+    if env == "aws":
+        environ.update(AWS_ENV)
+    else:
+        environ["APP_ENV"] = "local"
+    return environ
+
+
+def run_once(env: str, warm_up: bool) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(warm_up=warm_up)],
+        env=child_env(env), capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+# Heaviest imports by cumulative time, from python -X importtime (top-level packages only)
+def heaviest_imports(env: str, top: int) -> list[tuple[str, float]]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=child_env(env), capture_output=True, text=True, check=True,
+    ).stderr
+    totals: dict[str, float] = {}
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", line)
+        if match and len(match.group(2)) <= 2: # Direct imports of app.main's dependencies and app.main itself
+            totals[match.group(3)] = max(totals.get(match.group(3), 0.0), int(match.group(1)) / 1000)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def ms(value) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--env", nargs="+", choices=["local", "aws"], default=["local", "aws"])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per setup; medians are reported")
+    parser.add_argument("--warm-up", action="store_true", help="Also measure with the startup warm-up (connect=False)")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest imports to list per env")
+    parser.add_argument("--import-budget-ms", type=float, default=None)
+    parser.add_argument("--first-request-budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'env':<6} {'warm-up':<8} {'import ms':>10} {'warm-up ms':>11} {'1st request ms':>15} {'2nd request ms':>15}")
+    for env in args.env:
+        for warm_up in ([False, True] if args.warm_up else [False]):
+            runs = [run_once(env, warm_up) for _ in range(args.runs)]
+            median = {
+                key: statistics.median(r[key] for r in runs) if runs[0][key] is not None else None
+                for key in runs[0]
+            }
+            print(
+                f"{env:<6} {'on' if warm_up else 'off':<8} {ms(median['import']):>10} {ms(median['warm_up']):>11} "
+                f"{ms(median['first']):>15} {ms(median['second']):>15}"
+            )
+            if args.import_budget_ms is not None and median["import"] * 1000 > args.import_budget_ms:
+                over_budget.append(f"{env}: import {ms(median['import'])} ms > {args.import_budget_ms:g} ms")
+            if args.first_request_budget_ms is not None and median["first"] * 1000 > args.first_request_budget_ms:
+                over_budget.append(
+                    f"{env} (warm-up {'on' if warm_up else 'off'}): first request {ms(median['first'])} ms "
+                    f"> {args.first_request_budget_ms:g} ms"
+                )
+
+    for env in args.env:
+        print(f"\nHeaviest imports ({env}, cumulative ms, python -X importtime):")
+        for module, took in heaviest_imports(env, args.top):
+            print(f"  {module:<48} {took:>8.1f}")
+
+    if over_budget:
+        print("\nOVER BUDGET:")
+        for line in over_budget:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
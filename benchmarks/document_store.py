@@ -0,0 +1,135 @@
+"""
+Bytes per document and operations per second: dict of Document objects vs the compact column store.
+
+Loads --documents documents the way the API and worker leave them: fresh id, filename, declared
+content type and object key per document, and --completed-share of them processed (sha256, size,
+detected type, page count). Memory is the Python heap the repository holds (tracemalloc), per
+document. Then times, on the loaded repository: creates, get() by id, full QUEUED -> PROCESSING ->
+COMPLETED transitions with result fields, and listing pages of 50 by status.
+
+    python -m benchmarks.document_store --documents 200000
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+from app.domain.models.document import DocumentStatus
+from app.infrastructure.persistence.compact_documents_repo import CompactDocumentsRepository
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.services.document_service import new_document
+
+REPOS = {"memory": InMemoryDocumentsRepository, "compact": CompactDocumentsRepository}
+CONTENT_TYPES = ["application/pdf", "image/png", "image/jpeg"]
+
+
+# A new string object with the same text, like a value parsed from a request body
+def fresh_copy(value: str) -> str:
+    return value.encode().decode()
+
+
+# A document as initiate-upload creates it
+def make_document(rng: random.Random, now: datetime):
+    document_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    content_type = fresh_copy(rng.choice(CONTENT_TYPES))
+    filename = f"scan-{rng.randrange(10 ** 6)}.{content_type.rsplit('/', 1)[1]}"
+    return new_document(document_id, filename, content_type, f"documents/{document_id}/{filename}", now)
+
+
+def result_fields(rng: random.Random, content_type: str) -> dict:
+    return {
+        "last_error": None,
+        "sha256": rng.getrandbits(256).to_bytes(32, "big").hex(),
+        "size_bytes": rng.randrange(10 ** 4, 10 ** 8),
+        "detected_content_type": fresh_copy(content_type),
+        "page_count": rng.randrange(1, 500) if content_type == "application/pdf" else None,
+    }
+
+
+# Creates the documents and processes a share of them, returns (repo, ids, bytes held)
+def load(name: str, args) -> tuple[object, list[str], int]:
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        repo = REPOS[name]()
+        ids = []
+        for _ in range(args.documents):
+            document = make_document(rng, now)
+            repo.create(document)
+            ids.append(document.id)
+            repo.transition(document.id, DocumentStatus.INITIATED, DocumentStatus.QUEUED)
+            if rng.random() < args.completed_share:
+                repo.transition(document.id, DocumentStatus.QUEUED, DocumentStatus.PROCESSING)
+                repo.transition(
+                    document.id, DocumentStatus.PROCESSING, DocumentStatus.COMPLETED,
+                    **result_fields(rng, document.content_type),
+                )
+        del document
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    # The ids list is the benchmark's, not the repository's (the strings in it are shared with the repository)
+    return repo, ids, held - sys.getsizeof(ids)
+
+
+def per_second(count: int, action) -> float:
+    started = time.perf_counter()
+    for i in range(count):
+        action(i)
+    return count / (time.perf_counter() - started)
+
+
+def run(name: str, args) -> dict:
+    repo, ids, held = load(name, args)
+    rng = random.Random(args.seed + 1)
+    now = datetime.now(timezone.utc)
+    picks = [rng.choice(ids) for _ in range(args.ops)]
+    fresh = [make_document(rng, now) for _ in range(args.ops)]
+
+    def cycle(i: int) -> None:
+        document = repo.transition(fresh[i].id, DocumentStatus.QUEUED, DocumentStatus.PROCESSING)
+        repo.transition(
+            document.id, DocumentStatus.PROCESSING, DocumentStatus.COMPLETED,
+            **result_fields(rng, document.content_type),
+        )
+
+    creates = per_second(args.ops, lambda i: repo.create(fresh[i]))
+    for document in fresh:
+        repo.transition(document.id, DocumentStatus.INITIATED, DocumentStatus.QUEUED)
+    return {
+        "bytes_per_document": held / len(ids),
+        "creates": creates,
+        "gets": per_second(args.ops, lambda i: repo.get(picks[i])),
+        "transitions": 2 * per_second(args.ops, cycle),
+        "pages": per_second(args.ops // 10, lambda i: repo.list_documents(status=DocumentStatus.COMPLETED, limit=50)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200_000)
+    parser.add_argument("--completed-share", type=float, default=0.8, help="Share of documents already processed")
+    parser.add_argument("--ops", type=int, default=20_000, help="Operations per timed measurement")
+    parser.add_argument("--repos", nargs="+", choices=list(REPOS), default=list(REPOS))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'repo':<8} {'bytes/doc':>10} {'MB per 1M':>10} {'creates/s':>10} {'gets/s':>10} {'transitions/s':>14} {'pages/s':>9}")
+    for name in args.repos:
+        r = run(name, args)
+        print(
+            f"{name:<8} {r['bytes_per_document']:>10.0f} {r['bytes_per_document'] * 10 ** 6 / 1024 ** 2:>10.0f} "
+            f"{r['creates']:>10.0f} {r['gets']:>10.0f} {r['transitions']:>14.0f} {r['pages']:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Queue wait of interactive jobs under a bulk backlog: one FIFO lane vs weighted-fair lanes.
+
+One tenant enqueues --bulk-jobs jobs in a single batch and a second, small tenant queues
+--small-jobs more behind it. Meanwhile interactive single uploads arrive every
+--interval-ms. Jobs are simulated (sleep --job-ms), so only the scheduling is measured.
+"fifo" is the old behaviour, one lane in arrival order. "lanes" uses QUEUE_LANES-style
+lanes (interactive:4, bulk:1) with tenants taking turns. Reported: the wait from enqueue
+until a worker slot starts the job, per kind of job.
+
+    python -m benchmarks.lane_fairness --bulk-jobs 5000 --small-jobs 50 --job-ms 5 --concurrency 8
+"""
+import argparse
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.domain.models.job_message import JobMessage
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.workers.worker_pool import WorkerPool
+
+LANE_WEIGHTS = {"interactive": 4, "bulk": 1}
+
+
+# WorkerPool whose jobs just sleep, recording how long each one waited to start
+class SimulatedWorkerPool(WorkerPool):
+
+    def __init__(self, *args, job_seconds: float, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.job_seconds = job_seconds
+        self.waits: list[tuple[str, float]] = [] # (kind, seconds)
+
+    def _run_job(self, job: JobMessage, runner) -> None:
+        wait = (datetime.now(timezone.utc) - job.requested_at).total_seconds()
+        self.waits.append((job.document_id.split("-")[0], wait)) # list.append is atomic
+        time.sleep(self.job_seconds)
+        with self._lease_lock:
+            self._leases.pop(job.job_id, None)
+            self._pending_acks.append(job)
+
+
+def run(mode: str, args) -> dict[str, list[float]]:
+    fair = mode == "lanes"
+    queue = InMemoryQueue(lanes=list(LANE_WEIGHTS) if fair else ["default"])
+    bulk = "bulk" if fair else None
+
+    queue.enqueue_document_processing_batch(
+        [(f"bulk-{i}", "k") for i in range(args.bulk_jobs)], priority=bulk, tenant="big-import" if fair else None
+    )
+    queue.enqueue_document_processing_batch(
+        [(f"small-{i}", "k") for i in range(args.small_jobs)], priority=bulk, tenant="small-co" if fair else None
+    )
+
+    def interactive() -> None:
+        for i in range(args.interactive_jobs):
+            queue.enqueue_document_processing(
+                f"interactive-{i}", "k", priority="interactive" if fair else None, tenant=f"user-{i % 10}" if fair else None
+            )
+            time.sleep(args.interval_ms / 1000)
+
+    pool = SimulatedWorkerPool(
+        repo=InMemoryDocumentsRepository(),
+        queue=queue,
+        concurrency=args.concurrency,
+        wait_seconds=1, # Block on the queue instead of sleeping between polls
+        report_interval=3600,
+        lane_weights=LANE_WEIGHTS if fair else None,
+        job_seconds=args.job_ms / 1000,
+    )
+    producer = threading.Thread(target=interactive)
+    producer.start()
+    pool.run(drain=True)
+    producer.join()
+
+    waits: dict[str, list[float]] = {}
+    for kind, wait in pool.waits:
+        waits.setdefault(kind, []).append(wait)
+    return waits
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bulk-jobs", type=int, default=5000)
+    parser.add_argument("--small-jobs", type=int, default=50, help="Second bulk tenant, queued behind the first")
+    parser.add_argument("--interactive-jobs", type=int, default=50)
+    parser.add_argument("--interval-ms", type=float, default=20, help="Gap between interactive uploads")
+    parser.add_argument("--job-ms", type=float, default=5, help="Simulated time per job")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--modes", nargs="+", choices=["fifo", "lanes"], default=["fifo", "lanes"])
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'jobs':<12} {'count':>6} {'wait p50 ms':>12} {'wait p99 ms':>12} {'wait max ms':>12}")
+    for mode in args.modes:
+        for kind, waits in run(mode, args).items():
+            print(
+                f"{mode:<6} {kind:<12} {len(waits):>6} {statistics.median(waits) * 1000:>12.1f} "
+                f"{percentile(waits, 99) * 1000:>12.1f} {max(waits) * 1000:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
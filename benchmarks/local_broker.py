@@ -0,0 +1,179 @@
+"""
+Calls per second through the local broker: one call at a time vs pipelined, across client processes.
+
+Starts a broker (python -m app.infrastructure.broker.broker_server) on a temporary socket and
+loads --documents documents into it. Then, for --seconds each:
+
+- sequential:  one thread, waiting for every reply before sending the next call (round-trip latency)
+- pipelined:   one thread keeping --window calls in flight on the connection
+- processes:   --processes client processes x --threads threads, each thread one call at a time
+               (threads of a process share one connection, so their calls pipeline and batch)
+- jobs:        one process enqueues, --processes worker processes receive + ack in batches of 10
+
+The calls are repo.get() on random documents. Client processes only scale past one core when the
+machine has more than one (the broker itself is one process).
+
+    python -m benchmarks.local_broker --processes 1 2 4 --threads 8 --seconds 3
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+from app.infrastructure.broker.broker_client import BrokerClient
+from app.infrastructure.persistence.broker_documents_repo import BrokerDocumentsRepository
+from app.infrastructure.queue.broker_queue import BrokerQueue
+from app.services.document_service import new_document
+
+
+def start_broker(path: str) -> subprocess.Popen:
+    broker = subprocess.Popen(
+        [sys.executable, "-m", "app.infrastructure.broker.broker_server", "--socket", path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while not os.path.exists(path):
+        if time.monotonic() > deadline or broker.poll() is not None:
+            raise RuntimeError("Broker didn't start")
+        time.sleep(0.05)
+    return broker
+
+
+def load_documents(client: BrokerClient, count: int) -> list[str]:
+    repo = BrokerDocumentsRepository(client)
+    now = datetime.now(timezone.utc)
+    ids = []
+    for start in range(0, count, 1000):
+        documents = []
+        for _ in range(min(1000, count - start)):
+            document_id = str(uuid.uuid4())
+            documents.append(new_document(document_id, "scan.pdf", "application/pdf", f"documents/{document_id}/scan.pdf", now))
+            ids.append(document_id)
+        repo.create_many(documents)
+    return ids
+
+
+def sequential(path: str, ids: list[str], seconds: float) -> float:
+    repo = BrokerDocumentsRepository(BrokerClient(path))
+    rng, calls, deadline = random.Random(1), 0, time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        repo.get(rng.choice(ids))
+        calls += 1
+    return calls / (time.perf_counter() - started)
+
+
+def pipelined(path: str, ids: list[str], seconds: float, window: int) -> float:
+    client = BrokerClient(path)
+    rng, calls, in_flight = random.Random(2), 0, deque()
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        while len(in_flight) < window:
+            in_flight.append(client.submit("repo", "get", rng.choice(ids)))
+        in_flight.popleft().result()
+        calls += 1
+    for future in in_flight:
+        future.result()
+    return calls / (time.perf_counter() - started)
+
+
+# One client process: `threads` threads doing gets until the deadline; puts its call count on `results`
+def client_process(path: str, ids: list[str], threads: int, deadline: float, results) -> None:
+    repo = BrokerDocumentsRepository(BrokerClient(path))
+    counts = [0] * threads
+
+    def loop(n: int) -> None:
+        rng = random.Random(n)
+        while time.time() < deadline:
+            repo.get(rng.choice(ids))
+            counts[n] += 1
+
+    workers = [threading.Thread(target=loop, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put(sum(counts))
+
+
+def processes(path: str, ids: list[str], count: int, threads: int, seconds: float) -> float:
+    results = multiprocessing.Queue()
+    deadline = time.time() + 1 + seconds # 1s to start the processes
+    clients = [
+        multiprocessing.Process(target=client_process, args=(path, ids, threads, deadline, results))
+        for _ in range(count)
+    ]
+    for client in clients:
+        client.start()
+    total = sum(results.get() for _ in clients)
+    for client in clients:
+        client.join()
+    return total / seconds
+
+
+# One worker process: receive + ack until `stop_after` jobs were handled in total
+def job_worker(path: str, handled, stop_after: int) -> None:
+    queue = BrokerQueue(BrokerClient(path))
+    while handled.value < stop_after:
+        jobs = queue.receive_jobs(max_messages=10, wait_seconds=0)
+        if jobs:
+            queue.ack_jobs(jobs)
+            with handled.get_lock():
+                handled.value += len(jobs)
+        else:
+            time.sleep(0.001)
+
+
+def jobs(path: str, count: int, workers: int) -> float:
+    queue = BrokerQueue(BrokerClient(path))
+    handled = multiprocessing.Value("i", 0)
+    consumers = [multiprocessing.Process(target=job_worker, args=(path, handled, count)) for _ in range(workers)]
+    started = time.perf_counter()
+    for consumer in consumers:
+        consumer.start()
+    for start in range(0, count, 100):
+        queue.enqueue_document_processing_batch([(f"doc-{i}", f"key-{i}") for i in range(start, min(start + 100, count))])
+    for consumer in consumers:
+        consumer.join()
+    return count / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20_000)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--window", type=int, default=32, help="Calls in flight in the pipelined run")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=8, help="Threads per client process")
+    parser.add_argument("--jobs", type=int, default=20_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="broker-bench-"), "broker.sock")
+    broker = start_broker(path)
+    try:
+        ids = load_documents(BrokerClient(path), args.documents)
+        print(f"{os.cpu_count()} CPU(s)")
+        print(f"{'sequential':<28} {sequential(path, ids, args.seconds):>10.0f} calls/s")
+        print(f"{f'pipelined (window {args.window})':<28} {pipelined(path, ids, args.seconds, args.window):>10.0f} calls/s")
+        for count in args.processes:
+            label = f"{count} process(es) x {args.threads} threads"
+            print(f"{label:<28} {processes(path, ids, count, args.threads, args.seconds):>10.0f} calls/s")
+        for count in args.processes:
+            label = f"jobs, {count} worker process(es)"
+            print(f"{label:<28} {jobs(path, args.jobs, count):>10.0f} jobs/s (enqueue + receive + ack)")
+    finally:
+        broker.terminate()
+        broker.wait()
+
+
+if __name__ == "__main__":
+    main()
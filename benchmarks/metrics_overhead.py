@@ -0,0 +1,80 @@
+"""
+Cost of the metrics instrumentation: per-call overhead and request throughput with it on and off.
+
+Times the raw recording calls (histogram observe, counter inc, a /metrics render), then
+fires GET /documents/{id} through httpx's in-process ASGI transport at two copies of the
+document routes: one behind MetricsMiddleware and one without.
+
+    python -m benchmarks.metrics_overhead --requests 5000 --calls 1000000
+"""
+import argparse
+import asyncio
+import time
+import timeit
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.deps import get_document_service
+from app.api.middleware import MetricsMiddleware
+from app.api.routes.documents import router as documents_router
+from app.infrastructure.metrics.app_metrics import REGISTRY
+from app.infrastructure.metrics.registry import Counter, Histogram
+
+
+def per_call_ns(stmt, calls: int) -> float:
+    return min(timeit.repeat(stmt, number=calls, repeat=3)) / calls * 1e9
+
+
+def bench_calls(calls: int) -> None:
+    histogram = Histogram("bench_seconds", "bench", ("route", "method", "status"))
+    counter = Counter("bench_total", "bench", ("status",))
+    child = counter.labels("COMPLETED")
+
+    print(f"histogram.labels(...).observe  {per_call_ns(lambda: histogram.labels('/documents/{document_id}', 'GET', '200').observe(0.012), calls):8.0f} ns")
+    print(f"counter child .inc()           {per_call_ns(child.inc, calls):8.0f} ns")
+    print(f"render /metrics                {per_call_ns(REGISTRY.render, 1000) / 1000:8.1f} us")
+
+
+def make_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(documents_router)
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def fire(app: FastAPI, document_id: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    limiter = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one() -> None:
+            async with limiter:
+                (await client.get(f"/documents/{document_id}")).raise_for_status()
+
+        await asyncio.gather(*(one() for _ in range(200))) # Warm-up
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    bench_calls(args.calls)
+
+    document_id, _, _ = get_document_service().initiate_upload("bench.pdf", "application/pdf")
+    results = {}
+    for label, instrumented in (("off", False), ("on", True), ("off", False), ("on", True)):
+        rate = asyncio.run(fire(make_app(instrumented), document_id, args.requests, args.concurrency))
+        results[label] = max(results.get(label, 0.0), rate) # Best of two runs each
+    print(f"GET /documents/{{id}}  metrics off {results['off']:8.0f} req/s | on {results['on']:8.0f} req/s "
+          f"| overhead {(1 - results['on'] / results['off']) * 100:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
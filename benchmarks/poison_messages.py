@@ -0,0 +1,135 @@
+"""
+Throughput of healthy jobs while poison messages keep crashing the worker: unbounded vs bounded retries.
+
+--healthy-jobs jobs succeed, --flaky-jobs fail their first two attempts with a transient error,
+and --poison-jobs crash the worker on every delivery. Every job holds a slot for --job-ms.
+"unbounded" redelivers a crashed job right away forever, like a message without a retry
+limit. "bounded" uses a RetryPolicy (max attempts, exponential backoff with jitter) and
+dead-letters what keeps failing. Each mode runs for --seconds. Reported: healthy jobs done
+per second, how much slot time poison messages took, and whether flaky jobs recovered.
+
+    python -m benchmarks.poison_messages --poison-jobs 16 --concurrency 8 --seconds 5
+"""
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.domain.models.document import Document, DocumentStatus
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.workers.retry_policy import RetryPolicy
+from app.workers.worker_pool import WorkerPool
+
+PDF = b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n"
+
+
+# Reading an object takes job_seconds; "flaky" objects time out on their first two reads
+class SlowStorage(InMemoryStorage):
+
+    def __init__(self, job_seconds: float) -> None:
+        super().__init__()
+        self.job_seconds = job_seconds
+        self._reads: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def open_object(self, object_key: str):
+        time.sleep(self.job_seconds)
+        with self._lock:
+            reads = self._reads[object_key] = self._reads.get(object_key, 0) + 1
+        if object_key.startswith("flaky") and reads <= 2:
+            raise ConnectionError("Read timed out")
+        return super().open_object(object_key)
+
+
+# Poison documents take a slot for job_seconds and then crash the job outside process_job's error handling
+# (the claim is the first thing process_job does with a document)
+class PoisonRepository(InMemoryDocumentsRepository):
+
+    def __init__(self, job_seconds: float) -> None:
+        super().__init__()
+        self.job_seconds = job_seconds
+        self.poison_deliveries = 0
+
+    def transition(self, document_id: str, expected_status, new_status: DocumentStatus, **changes):
+        if document_id.startswith("poison") and new_status == DocumentStatus.PROCESSING:
+            self.poison_deliveries += 1
+            time.sleep(self.job_seconds)
+            raise MemoryError("Worker ran out of memory on this document")
+        return super().transition(document_id, expected_status, new_status, **changes)
+
+
+def run(mode: str, args) -> dict:
+    job_seconds = args.job_ms / 1000
+    repo, storage, queue = PoisonRepository(job_seconds), SlowStorage(job_seconds), InMemoryQueue(lanes=["default"])
+    now = datetime.now(timezone.utc)
+    kinds = [("poison", args.poison_jobs), ("flaky", args.flaky_jobs), ("healthy", args.healthy_jobs)]
+    for kind, count in kinds:
+        for i in range(count):
+            key = f"{kind}-{i}"
+            repo.create(Document(
+                id=key, filename=f"{key}.pdf", content_type="application/pdf", s3_key=key,
+                status=DocumentStatus.QUEUED, created_at=now, updated_at=now,
+            ))
+            storage.put_object(key, PDF)
+            queue.enqueue_document_processing(key, key)
+
+    if mode == "unbounded":
+        policy = RetryPolicy(max_attempts=10 ** 9, base_delay=0.0, max_delay=0.0)
+    else:
+        policy = RetryPolicy(max_attempts=args.max_attempts, base_delay=args.base_ms / 1000, max_delay=args.max_ms / 1000)
+    pool = WorkerPool(
+        repo=repo, queue=queue, concurrency=args.concurrency, wait_seconds=0, poll_interval=0.01,
+        report_interval=3600, visibility_timeout=60, ack_interval=0.1, storage=storage, retry_policy=policy,
+    )
+
+    timer = threading.Timer(args.seconds, pool.stop)
+    timer.start()
+    started = time.perf_counter()
+    stats = pool.run()
+    elapsed = time.perf_counter() - started
+    timer.cancel()
+
+    def done(kind: str) -> int:
+        return sum(
+            1 for i in range(dict(kinds)[kind])
+            if repo.get(f"{kind}-{i}").status == DocumentStatus.COMPLETED
+        )
+
+    return {
+        "healthy_per_second": done("healthy") / elapsed,
+        "poison_deliveries": repo.poison_deliveries,
+        "poison_slot_share": repo.poison_deliveries * job_seconds / (elapsed * args.concurrency),
+        "flaky_recovered": done("flaky"),
+        "dead_lettered": stats.dead_lettered,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--healthy-jobs", type=int, default=20000)
+    parser.add_argument("--flaky-jobs", type=int, default=20)
+    parser.add_argument("--poison-jobs", type=int, default=16)
+    parser.add_argument("--job-ms", type=float, default=2, help="Simulated time per delivery")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5, help="How long each mode runs")
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--base-ms", type=float, default=50, help="Backoff base for the bounded mode")
+    parser.add_argument("--max-ms", type=float, default=1000, help="Backoff cap for the bounded mode")
+    parser.add_argument("--modes", nargs="+", choices=["unbounded", "bounded"], default=["unbounded", "bounded"])
+    args = parser.parse_args()
+    logging.getLogger("app.workers").setLevel(logging.CRITICAL) # Every poison delivery logs a crash
+
+    print(f"{'mode':<10} {'healthy/s':>10} {'poison deliveries':>18} {'slot time on poison':>20} {'flaky recovered':>16} {'dead-lettered':>14}")
+    for mode in args.modes:
+        r = run(mode, args)
+        print(
+            f"{mode:<10} {r['healthy_per_second']:>10.0f} {r['poison_deliveries']:>18} {r['poison_slot_share']:>19.0%} "
+            f"{r['flaky_recovered']:>10}/{args.flaky_jobs:<5} {r['dead_lettered']:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Presigned upload URLs per second: single-file path vs batch path.
+
+Runs fully offline: S3Storage gets a boto3 session with fake credentials
+(presigning is local CPU work, no AWS call is made).
+
+    python -m benchmarks.presign_upload --count 500
+"""
+import argparse
+import time
+
+import boto3
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.infrastructure.persistence.async_documents_repo import AsyncInMemoryDocumentsRepository
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.async_queue import AsyncInMemoryQueue
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.storage.async_storage import AsyncS3Storage
+from app.infrastructure.storage.s3_storage import S3Storage
+from app.main import app
+from app.services.async_document_service import AsyncDocumentService
+
+
+def fake_storage() -> S3Storage:
+    session = boto3.Session(
+        aws_access_key_id="AKIDEXAMPLE",
+        aws_secret_access_key="wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY",
+        region_name="us-east-1",
+    )
+    return S3Storage(session=session, bucket_name="benchmark-bucket")
+
+
+def report(label: str, count: int, seconds: float) -> None:
+    print(f"{label:<40} {count:>6} URLs  {seconds * 1000:9.1f} ms  {count / seconds:10.0f} URLs/s")
+
+
+def bench_storage(count: int) -> None:
+    storage = fake_storage()
+    items = [(f"doc-{i}/scan-{i}.pdf", "application/pdf") for i in range(count)]
+
+    # Warm up both paths (client creation, endpoint resolution, credential lookup)
+    storage.create_presigned_upload_url(*items[0])
+    storage.create_presigned_upload_urls(items[:2])
+
+    start = time.perf_counter()
+    for object_key, content_type in items:
+        storage.create_presigned_upload_url(object_key, content_type)
+    report("storage: create_presigned_upload_url x N", count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    storage.create_presigned_upload_urls(items)
+    report("storage: create_presigned_upload_urls", count, time.perf_counter() - start)
+
+
+def bench_api(count: int) -> None:
+    service = AsyncDocumentService(
+        repo=AsyncInMemoryDocumentsRepository(InMemoryDocumentsRepository()),
+        storage=AsyncS3Storage(fake_storage(), max_workers=4),
+        queue=AsyncInMemoryQueue(InMemoryQueue()),
+    )
+    app.dependency_overrides[deps.get_async_document_service] = lambda: service
+    client = TestClient(app)
+    files = [{"filename": f"scan-{i}.pdf", "content_type": "application/pdf"} for i in range(count)]
+
+    try:
+        client.post("/documents/initiate-upload", json=files[0])
+
+        start = time.perf_counter()
+        for f in files:
+            client.post("/documents/initiate-upload", json=f).raise_for_status()
+        report("api: POST /initiate-upload x N", count, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        client.post("/documents/initiate-upload-batch", json={"files": files}).raise_for_status()
+        report("api: POST /initiate-upload-batch", count, time.perf_counter() - start)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args()
+
+    bench_storage(args.count)
+    bench_api(args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Processor throughput (MB/s per core) and peak memory for growing file sizes.
+
+Feeds synthetic PDF / PNG / JPEG files through the processing pipeline. The files are
+generated while they are read, so the benchmark itself holds no more than one block,
+and the reported peak RSS is the pipeline's own. Sizes run smallest first: ru_maxrss is
+a high-water mark, so a flat column means memory does not grow with the file.
+
+    python -m benchmarks.processor_throughput --sizes 16 256 1024 --types pdf png jpeg
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+from typing import Iterator
+
+from app.workers.document_pipeline import process_stream
+
+BLOCK = os.urandom(1024 * 1024) # Filler; SHA-256 speed doesn't depend on the bytes anyway
+PAGES = 12
+
+
+# A read()-able stream over a generator of byte blocks
+class GeneratedStream:
+
+    def __init__(self, blocks: Iterator[bytes]) -> None:
+        self._blocks = blocks
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            self._buffer += block
+        if size < 0:
+            size = len(self._buffer)
+        out, self._buffer = self._buffer[:size], self._buffer[size:]
+        return out
+
+
+def _filler(size: int) -> Iterator[bytes]:
+    while size > 0:
+        block = BLOCK[:size]
+        size -= len(block)
+        yield block
+
+
+# A valid PDF: catalog, page tree with PAGES pages, one big content stream, classic xref table
+def pdf_blocks(size: int) -> Iterator[bytes]:
+    offsets: list[int] = []
+    position = 0
+
+    def emit(data: bytes) -> bytes:
+        nonlocal position
+        position += len(data)
+        return data
+
+    def start_object(body: bytes) -> bytes:
+        offsets.append(position)
+        return emit(body)
+
+    yield emit(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    kids = b" ".join(b"%d 0 R" % (4 + i) for i in range(PAGES))
+    yield start_object(b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+    yield start_object(b"2 0 obj\n<< /Type /Pages /Kids [" + kids + b"] /Count %d >>\nendobj\n" % PAGES)
+
+    stream_size = max(0, size - 2048 - 100 * PAGES)
+    yield start_object(b"3 0 obj\n<< /Length %d >>\nstream\n" % stream_size)
+    for block in _filler(stream_size):
+        yield emit(block)
+    yield emit(b"\nendstream\nendobj\n")
+
+    for i in range(PAGES):
+        yield start_object(b"%d 0 obj\n<< /Type /Page /Parent 2 0 R /Contents 3 0 R >>\nendobj\n" % (4 + i))
+
+    xref_at = position
+    entries = b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    yield emit(b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1) + entries)
+    yield emit(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref_at))
+
+
+def png_blocks(size: int) -> Iterator[bytes]:
+    ihdr = b"IHDR" + (4000).to_bytes(4, "big") + (3000).to_bytes(4, "big") + b"\x08\x02\x00\x00\x00"
+    yield b"\x89PNG\r\n\x1a\n" + (13).to_bytes(4, "big") + ihdr + b"\x00\x00\x00\x00"
+    yield from _filler(size - 33)
+
+
+def jpeg_blocks(size: int) -> Iterator[bytes]:
+    app0 = b"\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    sof0 = b"\xff\xc0\x00\x11\x08" + (3000).to_bytes(2, "big") + (4000).to_bytes(2, "big") + b"\x03" + b"\x00" * 9
+    yield b"\xff\xd8" + app0 + sof0 + b"\xff\xda\x00\x08\x01\x01\x00\x00\x3f\x00"
+    yield from _filler(size - 2 - len(app0) - len(sof0) - 10)
+
+
+GENERATORS = {"pdf": pdf_blocks, "png": png_blocks, "jpeg": jpeg_blocks}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KiB on Linux
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 256, 1024], help="File sizes in MB")
+    parser.add_argument("--types", nargs="+", choices=sorted(GENERATORS), default=["pdf", "png", "jpeg"])
+    args = parser.parse_args()
+
+    print(f"{'type':<5} {'size MB':>8} {'wall MB/s':>10} {'MB/s per core':>14} {'peak RSS MB':>12}  result")
+    for kind in args.types:
+        for size_mb in sorted(args.sizes):
+            size = size_mb * 1024 * 1024
+            stream = GeneratedStream(GENERATORS[kind](size))
+
+            wall, cpu = time.perf_counter(), time.process_time()
+            result = process_stream(stream)
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+            mb = result.size_bytes / 1024 ** 2
+            print(
+                f"{kind:<5} {mb:>8.0f} {mb / wall:>10.0f} {mb / max(cpu, 1e-9):>14.0f} {peak_rss_mb():>12.1f}  "
+                f"pages={result.page_count} {result.width}x{result.height}"
+            )
+
+
+if __name__ == "__main__":
+    main()
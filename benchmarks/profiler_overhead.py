@@ -0,0 +1,92 @@
+"""
+Cost of the sampling profiler: jobs/s with it off, sampling every job, and writing every job's profile.
+
+--threads threads each run --jobs / --threads CPU-bound jobs of about --job-ms each (pure Python
+loops, so the sampler competes with them for the GIL). Modes: "off" (no profiler), "sampling"
+(every job is sampled but none is slow enough to be written: the normal case) and "writing"
+(threshold 0: every job's stacks are written to a temporary PROFILE_DIR). Reported: jobs/s,
+slowdown against "off", stack samples per job and profiles written.
+
+    python -m benchmarks.profiler_overhead --jobs 400 --threads 4 --job-ms 20 --interval-ms 5
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from app.infrastructure.profiling.sampling_profiler import SamplingProfiler
+
+
+# Busy loop standing in for processing; calibrated so one call takes about job_ms alone
+def work(rounds: int) -> int:
+    total = 0
+    for n in range(rounds):
+        total += n % 7
+    return total
+
+
+def calibrate(job_ms: float) -> int:
+    rounds = 100_000
+    started = time.perf_counter()
+    work(rounds)
+    return max(int(rounds * job_ms / 1000 / (time.perf_counter() - started)), 1)
+
+
+def run(mode: str, rounds: int, args) -> dict:
+    output_dir = tempfile.mkdtemp(prefix="profiles-")
+    profiler = None
+    if mode != "off":
+        threshold = 0.0 if mode == "writing" else float("inf")
+        profiler = SamplingProfiler(args.interval_ms / 1000, threshold, output_dir, max_files=args.jobs)
+    samples = [0]
+    lock = threading.Lock()
+
+    def worker(jobs: int) -> None:
+        for n in range(jobs):
+            if profiler is None:
+                work(rounds)
+                continue
+            with profiler.profile("job", f"job-{n}") as session:
+                work(rounds)
+            with lock:
+                samples[0] += sum(session.stacks.values())
+
+    per_thread = args.jobs // args.threads
+    threads = [threading.Thread(target=worker, args=(per_thread,)) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    written = len(os.listdir(output_dir))
+    for name in os.listdir(output_dir):
+        os.remove(os.path.join(output_dir, name))
+    os.rmdir(output_dir)
+    jobs = per_thread * args.threads
+    return {"jobs_per_second": jobs / elapsed, "samples_per_job": samples[0] / jobs, "written": written}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--job-ms", type=float, default=20)
+    parser.add_argument("--interval-ms", type=float, default=5, help="PROFILE_INTERVAL_MS")
+    parser.add_argument("--modes", nargs="+", choices=["off", "sampling", "writing"], default=["off", "sampling", "writing"])
+    args = parser.parse_args()
+
+    rounds = calibrate(args.job_ms)
+    baseline = None
+    print(f"{'mode':<9} {'jobs/s':>8} {'slowdown':>9} {'samples/job':>12} {'written':>8}")
+    for mode in args.modes:
+        r = run(mode, rounds, args)
+        baseline = baseline or r["jobs_per_second"]
+        slowdown = (baseline / r["jobs_per_second"] - 1) * 100
+        print(f"{mode:<9} {r['jobs_per_second']:>8.1f} {slowdown:>8.1f}% {r['samples_per_job']:>12.1f} {r['written']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Repository read/write throughput under concurrent API + worker load.
+
+"API" threads do random gets, "worker" threads do status changes, both at once,
+against the in-memory and the SQLite repository. Also times bulk upserts.
+A status change is get + update (two calls, the old way) or one transition()
+compare-and-set. The claim race has --writers threads all try to move the same
+QUEUED documents to PROCESSING, like workers sharing a queue that delivers twice:
+every document should be claimed exactly once.
+
+    python -m benchmarks.repo_throughput --documents 20000 --readers 8 --writers 4 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from app.domain.models.document import Document, DocumentStatus
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.persistence.sqlite_documents_repo import SQLiteDocumentsRepository
+
+WRITE_STATUSES = [DocumentStatus.QUEUED, DocumentStatus.PROCESSING, DocumentStatus.COMPLETED]
+ALL_STATUSES = tuple(DocumentStatus)
+
+
+def make_documents(count: int) -> list[Document]:
+    now = datetime.now(timezone.utc)
+    return [
+        Document(
+            id=str(uuid.uuid4()),
+            filename=f"scan-{i}.pdf",
+            content_type="application/pdf",
+            s3_key=f"documents/{i}/scan-{i}.pdf",
+            status=DocumentStatus.INITIATED,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def run_mixed(repo, ids: list[str], readers: int, writers: int, seconds: float, write_mode: str) -> tuple[int, int]:
+    stop = threading.Event()
+    reads = [0] * readers
+    writes = [0] * writers
+
+    def reader(slot: int) -> None:
+        rng = random.Random(slot)
+        while not stop.is_set():
+            repo.get(rng.choice(ids))
+            reads[slot] += 1
+
+    def writer(slot: int) -> None:
+        rng = random.Random(1000 + slot)
+        while not stop.is_set():
+            if write_mode == "update":
+                doc = repo.get(rng.choice(ids))
+                repo.update(doc.with_status(rng.choice(WRITE_STATUSES)))
+            else:
+                repo.transition(rng.choice(ids), ALL_STATUSES, rng.choice(WRITE_STATUSES))
+            writes[slot] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return sum(reads), sum(writes)
+
+
+# Every writer tries to claim every document (QUEUED -> PROCESSING); returns claims per document
+def run_claim_race(repo, ids: list[str], writers: int, write_mode: str) -> list[int]:
+    claims = dict.fromkeys(ids, 0)
+    lock = threading.Lock()
+    start = threading.Barrier(writers)
+
+    def writer(slot: int) -> None:
+        order = list(ids)
+        random.Random(slot).shuffle(order)
+        start.wait()
+        for document_id in order:
+            if write_mode == "update":
+                doc = repo.get(document_id)
+                claimed = doc.status == DocumentStatus.QUEUED
+                if claimed:
+                    repo.update(doc.with_status(DocumentStatus.PROCESSING))
+            else:
+                claimed = repo.transition(document_id, DocumentStatus.QUEUED, DocumentStatus.PROCESSING) is not None
+            if claimed:
+                with lock:
+                    claims[document_id] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return list(claims.values())
+
+
+def bench(name: str, make_repo, args) -> None:
+    for write_mode in args.write_modes:
+        repo = make_repo()
+        try:
+            docs = make_documents(args.documents)
+            start = time.perf_counter()
+            repo.create_many(docs)
+            bulk = time.perf_counter() - start
+
+            reads, writes = run_mixed(repo, [d.id for d in docs], args.readers, args.writers, args.seconds, write_mode)
+
+            race_docs = [replace(doc, id=f"race-{doc.id}", status=DocumentStatus.QUEUED) for doc in docs[:args.race_documents]]
+            repo.create_many(race_docs)
+            claims = run_claim_race(repo, [d.id for d in race_docs], args.writers, write_mode)
+        finally:
+            close = getattr(repo, "close", None)
+            if close is not None:
+                close()
+
+        print(
+            f"{name:<8} {write_mode:<10} bulk insert {args.documents / bulk:>10.0f} docs/s | "
+            f"reads {reads / args.seconds:>10.0f}/s | status changes {writes / args.seconds:>9.0f}/s | "
+            f"claim race: {sum(c > 1 for c in claims)} of {len(claims)} claimed twice "
+            f"({args.readers} readers, {args.writers} writers)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-modes", nargs="+", choices=["update", "transition"], default=["update", "transition"])
+    parser.add_argument("--race-documents", type=int, default=5000, help="Documents in the claim race")
+    args = parser.parse_args()
+
+    bench("memory", InMemoryDocumentsRepository, args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = iter(range(len(args.write_modes)))
+        bench("sqlite", lambda: SQLiteDocumentsRepository(os.path.join(tmp, f"bench-{next(paths)}.db")), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Serialization cost per document response: pydantic response models vs the fast JSON path.
+
+Encodes a processed document (and a page of --page-size documents) --count times per encoder:
+
+- response_model:   DocumentResponse built from the Document, validated again against the
+                    response model and dumped by pydantic-core (what FastAPI does for a route
+                    with response_model)
+- jsonable_encoder: DocumentResponse + fastapi.encoders.jsonable_encoder + json.dumps (older
+                    FastAPI versions, and routes with a custom response class)
+- fast_pydantic:    app.api.fast_json without orjson (pydantic_core.to_json on the dataclass)
+- fast_orjson:      app.api.fast_json with orjson (the dataclass encoded directly)
+
+Then times --requests sequential GET /documents/{id} through the app (httpx ASGI transport)
+with FAST_JSON_RESPONSES off and on.
+
+    python -m benchmarks.serialization --count 20000 --requests 3000
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api import deps
+from app.api import fast_json
+from app.api.routes.documents import _to_response
+from app.api.schemas.documents import DocumentListResponse, DocumentResponse
+from app.core.settings import settings
+from app.domain.models.document import Document, DocumentStatus
+from app.infrastructure.persistence.async_documents_repo import AsyncInMemoryDocumentsRepository
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.async_queue import AsyncInMemoryQueue
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.storage.async_storage import AsyncInMemoryStorage
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.main import app
+from app.services.async_document_service import AsyncDocumentService
+
+DOCUMENT_ADAPTER = TypeAdapter(DocumentResponse)
+LIST_ADAPTER = TypeAdapter(DocumentListResponse)
+
+
+# A document the way the worker leaves it: every field set
+def processed_document() -> Document:
+    now = datetime.now(timezone.utc)
+    document_id = str(uuid.uuid4())
+    return Document(
+        id=document_id, filename="scan-2026-01.pdf", content_type="application/pdf",
+        s3_key=f"documents/{document_id}/scan-2026-01.pdf", status=DocumentStatus.COMPLETED,
+        created_at=now, updated_at=now, sha256="ab" * 32, size_bytes=1_234_567,
+        detected_content_type="application/pdf", page_count=12,
+    )
+
+
+def encode_response_model(doc: Document) -> bytes:
+    return DOCUMENT_ADAPTER.dump_json(DOCUMENT_ADAPTER.validate_python(_to_response(doc)))
+
+
+def encode_jsonable(doc: Document) -> bytes:
+    return json.dumps(jsonable_encoder(_to_response(doc)), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encode_page_response_model(docs: list[Document]) -> bytes:
+    page = DocumentListResponse(items=[_to_response(doc) for doc in docs], next_cursor="abc")
+    return LIST_ADAPTER.dump_json(LIST_ADAPTER.validate_python(page))
+
+
+def encode_page_jsonable(docs: list[Document]) -> bytes:
+    page = DocumentListResponse(items=[_to_response(doc) for doc in docs], next_cursor="abc")
+    return json.dumps(jsonable_encoder(page), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encode_page_fast(docs: list[Document]) -> bytes:
+    return fast_json.document_list_json(docs, "abc")
+
+
+def micros_per_call(encode, value, count: int) -> float:
+    encode(value) # Warm-up
+    start = time.perf_counter()
+    for _ in range(count):
+        encode(value)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+# Times the fast path as if orjson were not installed
+def micros_without_orjson(encode, value, count: int) -> float:
+    module, fast_json.orjson = fast_json.orjson, None
+    try:
+        return micros_per_call(encode, value, count)
+    finally:
+        fast_json.orjson = module
+
+
+async def micros_per_request(doc: Document, count: int, fast_responses: bool) -> float:
+    repo = InMemoryDocumentsRepository()
+    repo.create(doc)
+    service = AsyncDocumentService(
+        repo=AsyncInMemoryDocumentsRepository(repo),
+        storage=AsyncInMemoryStorage(InMemoryStorage()),
+        queue=AsyncInMemoryQueue(InMemoryQueue()),
+    )
+    app.dependency_overrides[deps.get_async_document_service] = lambda: service
+    previous, settings.FAST_JSON_RESPONSES = settings.FAST_JSON_RESPONSES, fast_responses
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            (await client.get(f"/documents/{doc.id}")).raise_for_status() # Warm-up
+            start = time.perf_counter()
+            for _ in range(count):
+                (await client.get(f"/documents/{doc.id}")).raise_for_status()
+            return (time.perf_counter() - start) / count * 1e6
+    finally:
+        settings.FAST_JSON_RESPONSES = previous
+        app.dependency_overrides.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000, help="Encodes per measurement")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=3000, help="GET /documents/{id} per mode (0 to skip)")
+    args = parser.parse_args()
+
+    doc = processed_document()
+    page = [processed_document() for _ in range(args.page_size)]
+    page_count = max(args.count // args.page_size, 100)
+    encoders = {
+        "response_model": (micros_per_call, encode_response_model, encode_page_response_model),
+        "jsonable_encoder": (micros_per_call, encode_jsonable, encode_page_jsonable),
+        "fast_pydantic": (micros_without_orjson, fast_json.document_json, encode_page_fast),
+    }
+    if fast_json.orjson is not None:
+        encoders["fast_orjson"] = (micros_per_call, fast_json.document_json, encode_page_fast)
+    else:
+        print("orjson is not installed: fast_orjson skipped")
+
+    print(f"{'encoder':<18} {'us/document':>12} {f'us/page of {args.page_size}':>16}")
+    for name, (timer, one, many) in encoders.items():
+        print(f"{name:<18} {timer(one, doc, args.count):>12.2f} {timer(many, page, page_count):>16.1f}")
+
+    if args.requests:
+        print(f"\nGET /documents/{{id}}, {args.requests} sequential requests")
+        for fast_responses in (False, True):
+            us = asyncio.run(micros_per_request(doc, args.requests, fast_responses))
+            print(f"FAST_JSON_RESPONSES={str(fast_responses).lower():<5} {us:>8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Benchmark suite for API and worker throughput, with a stored baseline to catch regressions.
+
+Drives the real app in-process (httpx ASGI transport) on in-memory adapters plus local
+stand-ins for AWS: S3Storage presigning with fake credentials (no network) and SQSQueue on
+LocalSQSClient (optionally with a per-call delay). Scenarios:
+
+- initiate_upload: POST /documents/initiate-upload
+- enqueue:         POST /documents/{id}/enqueue
+- get_document:    GET /documents/{id}
+- worker:          WorkerPool draining queued jobs (small PDFs through the real pipeline)
+- memory:          bytes held per 100k documents (created and enqueued)
+
+Each scenario runs --repeat times and keeps the median run. Results go to a JSON file. Any
+metric worse than the baseline by more than --tolerance fails the run (exit code 1). Numbers
+only compare on the machine that recorded them, so the first run without a baseline warns and
+records this run as the baseline; with --require-baseline it fails instead (exit code 2), so a
+CI job that lost its baseline can't pass unnoticed.
+
+    python -m benchmarks.suite                          # first run: records the baseline; later runs compare
+    python -m benchmarks.suite --save-baseline          # record a new baseline on this machine
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import httpx
+
+from app.api import deps
+from app.domain.models.document import Document, DocumentStatus
+from app.domain.models.job_message import JobMessage
+from app.infrastructure.persistence.async_documents_repo import AsyncInMemoryDocumentsRepository
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.async_queue import AsyncSQSQueue
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.queue.sqs_queue import SQSQueue
+from app.infrastructure.storage.async_storage import AsyncS3Storage
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.main import app
+from app.services.async_document_service import AsyncDocumentService
+from app.services.document_service import DocumentService
+from app.workers.worker_pool import WorkerPool
+from benchmarks.async_load import SlowSQSClient
+from benchmarks.presign_upload import fake_storage
+from benchmarks.processor_throughput import pdf_blocks
+
+SCENARIOS = ["initiate_upload", "enqueue", "get_document", "worker", "memory"]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Which way is better for each metric; anything not listed is informational only
+HIGHER_IS_BETTER = {"throughput"}
+LOWER_IS_BETTER = {"p50_ms", "p95_ms", "p99_ms", "mb_per_100k_documents"}
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(count: int, seconds: float, latencies: list[float]) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "count": count,
+        "throughput": round(count / seconds, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def make_documents(count: int, status: DocumentStatus) -> list[Document]:
+    now = datetime.now(timezone.utc)
+    return [
+        Document(
+            id=str(uuid.uuid4()),
+            filename=f"scan-{i}.pdf",
+            content_type="application/pdf",
+            s3_key=f"documents/{i}/scan-{i}.pdf",
+            status=status,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+# ---- HTTP scenarios ----
+
+# Fresh adapters for every run, so runs don't see each other's documents
+def make_service(args, documents: list[Document]) -> AsyncDocumentService:
+    repo = InMemoryDocumentsRepository()
+    repo.create_many(documents)
+    queue = SQSQueue(client=SlowSQSClient(args.sqs_latency_ms / 1000), queue_url="local")
+    return AsyncDocumentService(
+        repo=AsyncInMemoryDocumentsRepository(repo),
+        storage=AsyncS3Storage(fake_storage(), max_workers=4),
+        queue=AsyncSQSQueue(queue, max_workers=args.concurrency),
+    )
+
+
+async def fire(requests: list[Callable], concurrency: int) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+    limiter = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(request: Callable) -> None:
+            async with limiter:
+                start = time.perf_counter()
+                response = await request(client)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        # Warm-up (client creation, first presign, route compilation), not measured
+        await one(requests[0])
+        latencies.clear()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(request) for request in requests[1:]))
+        return time.perf_counter() - start, latencies
+
+
+def run_http(args, documents: list[Document], requests: list[Callable]) -> dict:
+    service = make_service(args, documents)
+    app.dependency_overrides[deps.get_async_document_service] = lambda: service
+    try:
+        seconds, latencies = asyncio.run(fire(requests, args.concurrency))
+    finally:
+        app.dependency_overrides.clear()
+    return summarize(len(latencies), seconds, latencies)
+
+
+def bench_initiate_upload(args) -> dict:
+    body = {"filename": "scan.pdf", "content_type": "application/pdf"}
+    requests = [lambda c: c.post("/documents/initiate-upload", json=body)] * (args.requests + 1)
+    return run_http(args, [], requests)
+
+
+def bench_enqueue(args) -> dict:
+    documents = make_documents(args.requests + 1, DocumentStatus.INITIATED)
+    requests = [lambda c, i=d.id: c.post(f"/documents/{i}/enqueue") for d in documents]
+    return run_http(args, documents, requests)
+
+
+def bench_get_document(args) -> dict:
+    documents = make_documents(min(args.requests, 10_000), DocumentStatus.INITIATED)
+    rng = random.Random(42)
+    ids = [rng.choice(documents).id for _ in range(args.requests + 1)]
+    requests = [lambda c, i=i: c.get(f"/documents/{i}") for i in ids]
+    return run_http(args, documents, requests)
+
+
+# ---- Worker ----
+
+# WorkerPool that records how long each job took
+class TimedWorkerPool(WorkerPool):
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.latencies: list[float] = []
+
+    def _run_job(self, job: JobMessage, runner) -> None:
+        start = time.perf_counter()
+        super()._run_job(job, runner)
+        self.latencies.append(time.perf_counter() - start) # list.append is atomic
+
+
+def bench_worker(args) -> dict:
+    repo = InMemoryDocumentsRepository()
+    storage = InMemoryStorage()
+    queue = SQSQueue(client=SlowSQSClient(args.sqs_latency_ms / 1000), queue_url="local")
+    pdf = b"".join(pdf_blocks(64 * 1024))
+
+    documents = make_documents(args.jobs, DocumentStatus.QUEUED)
+    repo.create_many(documents)
+    for document in documents:
+        storage.put_object(document.s3_key, pdf)
+    queue.enqueue_document_processing_batch([(d.id, d.s3_key) for d in documents])
+
+    pool = TimedWorkerPool(
+        repo=repo,
+        queue=queue,
+        concurrency=args.worker_concurrency,
+        storage=storage,
+        report_interval=3600,
+        ack_interval=0.1,
+    )
+    start = time.perf_counter()
+    pool.run(drain=True)
+    seconds = time.perf_counter() - start
+
+    completed = sum(1 for d in documents if repo.get(d.id).status == DocumentStatus.COMPLETED)
+    if completed != len(documents):
+        raise RuntimeError(f"Only {completed}/{len(documents)} jobs completed")
+    return summarize(len(pool.latencies), seconds, pool.latencies)
+
+
+# ---- Memory ----
+
+# Python heap held by documents created and enqueued through the service, scaled to 100k
+def bench_memory(args) -> dict:
+    count = args.memory_documents
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        service = DocumentService(repo=InMemoryDocumentsRepository(), storage=InMemoryStorage(), queue=InMemoryQueue())
+        for i in range(count):
+            document_id, _, _ = service.initiate_upload(f"scan-{i}.pdf", "application/pdf")
+            service.enqueue_processing(document_id)
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return {"count": count, "mb_per_100k_documents": round(held / count * 100_000 / 1024 ** 2, 2)}
+
+
+BENCHMARKS = {
+    "initiate_upload": bench_initiate_upload,
+    "enqueue": bench_enqueue,
+    "get_document": bench_get_document,
+    "worker": bench_worker,
+    "memory": bench_memory,
+}
+
+
+def run_scenario(name: str, args) -> dict:
+    if name == "memory":
+        return BENCHMARKS[name](args) # Deterministic, one run is enough
+    runs = [BENCHMARKS[name](args) for _ in range(args.repeat)]
+    runs.sort(key=lambda r: r["throughput"])
+    return runs[len(runs) // 2]
+
+
+# ---- Results and baseline ----
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=10,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment(args) -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "jobs": args.jobs,
+            "worker_concurrency": args.worker_concurrency,
+            "sqs_latency_ms": args.sqs_latency_ms,
+            "memory_documents": args.memory_documents,
+            "repeat": args.repeat,
+        },
+    }
+
+
+# Returns one line per regression (empty = all good), printing the comparison as it goes
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    print(f"\n{'scenario':<16} {'metric':<22} {'baseline':>12} {'current':>12} {'change':>8}")
+    for scenario, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get(scenario, {}).get(metric)
+            if base is None or metric not in HIGHER_IS_BETTER | LOWER_IS_BETTER or base == 0:
+                continue
+            change = (value - base) / base
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = "  REGRESSION" if worse > tolerance else ""
+            print(f"{scenario:<16} {metric:<22} {base:>12.2f} {value:>12.2f} {change * 100:>7.1f}%{flag}")
+            if flag:
+                regressions.append(f"{scenario}.{metric}: {base:.2f} -> {value:.2f} ({change * 100:+.1f}%)")
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    print(f"{'scenario':<16} {'count':>8} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'MB/100k docs':>13}")
+    for scenario, r in results.items():
+        def cell(key: str, width: int) -> str:
+            return f"{r[key]:>{width}.2f}" if key in r else " " * (width - 1) + "-"
+        print(
+            f"{scenario:<16} {r['count']:>8} {cell('throughput', 10)} {cell('p50_ms', 9)} {cell('p95_ms', 9)} "
+            f"{cell('p99_ms', 9)} {cell('mb_per_100k_documents', 13)}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per HTTP scenario run")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+    parser.add_argument("--jobs", type=int, default=1000, help="Jobs per worker run")
+    parser.add_argument("--worker-concurrency", type=int, default=8)
+    parser.add_argument("--sqs-latency-ms", type=float, default=0.0, help="Delay added to every SQS call")
+    parser.add_argument("--memory-documents", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the median is kept")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write this run's results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing")
+    parser.add_argument("--require-baseline", action="store_true", help="Fail (exit code 2) instead of recording a missing baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = {}
+    for scenario in args.scenarios:
+        print(f"running {scenario}...", file=sys.stderr)
+        results[scenario] = run_scenario(scenario, args)
+
+    report = {"environment": environment(args), "results": results}
+    print_results(results)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        if args.require_baseline:
+            print(f"FAILED: no baseline at {args.baseline}; record one on this machine with --save-baseline")
+            sys.exit(2)
+        print(f"Warning: no baseline at {args.baseline}; this run becomes the baseline, nothing was compared")
+        args.save_baseline = True
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    recorded = baseline.get("environment", {})
+    if recorded.get("settings") != report["environment"]["settings"]:
+        print("Warning: baseline was recorded with different settings; numbers may not be comparable")
+    machine = ("python", "platform", "cpu_count")
+    if any(recorded.get(key) != report["environment"][key] for key in machine):
+        print("Warning: baseline was recorded on a different machine or Python; numbers may not be comparable")
+
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+    if regressions:
+        print(f"\nFAILED: {len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nOK: no metric regressed by more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Upload -> QUEUED latency: clients calling POST /enqueue after their PUT vs storage events and the ingestor.
+
+--clients threads each start and finish --uploads / --clients uploads, each taking --upload-ms
+(InMemoryStorage.put_object stands in for the end of the presigned PUT). In "client" mode every
+client then makes the enqueue call, one --rtt-ms round trip later; a --forget share of them never
+makes it. In the event modes nobody calls enqueue: the finished upload is announced as an S3
+notification, and an UploadIngestor turns the events into jobs in batches ("memory": InMemoryUploadEvents; "sqs": S3 notification JSON through
+LocalSQSClient, received 10 per call). Reported: p50/p99/max from the finished upload to QUEUED,
+queue calls made, and documents still stuck in INITIATED at the end.
+
+    python -m benchmarks.upload_ingest --uploads 5000 --clients 16 --upload-ms 20 --rtt-ms 20 --forget 0.02
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+
+from app.domain.models.document import DocumentStatus
+from app.infrastructure.events.in_memory_upload_events import InMemoryUploadEvents
+from app.infrastructure.events.sqs_upload_events import SQSUploadEvents
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.queue.local_sqs import LocalSQSClient
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.services.document_service import DocumentService
+from app.workers.upload_ingestor import UploadIngestor
+
+EVENTS_QUEUE_URL = "https://sqs.local/s3-events"
+
+
+# Notes when each document reached QUEUED
+class TimedRepository(InMemoryDocumentsRepository):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.queued_at: dict[str, float] = {}
+
+    def transition(self, document_id, expected_status, new_status, **changes):
+        doc = super().transition(document_id, expected_status, new_status, **changes)
+        if doc is not None and new_status == DocumentStatus.QUEUED:
+            self.queued_at[document_id] = time.perf_counter()
+        return doc
+
+
+# Counts queue calls (one per single enqueue, one per batch)
+class CountingQueue(InMemoryQueue):
+    calls = 0
+
+    def enqueue_document_processing(self, *args, **kwargs):
+        self.calls += 1
+        return super().enqueue_document_processing(*args, **kwargs)
+
+    def enqueue_document_processing_batch(self, *args, **kwargs):
+        self.calls += 1
+        return super().enqueue_document_processing_batch(*args, **kwargs)
+
+
+# Storage that also announces each finished upload to SQS, as an S3 bucket notification would
+class NotifyingStorage(InMemoryStorage):
+
+    def __init__(self, sqs: LocalSQSClient) -> None:
+        super().__init__()
+        self._sqs = sqs
+
+    def put_object(self, object_key: str, data: bytes) -> None:
+        super().put_object(object_key, data)
+        record = {"eventName": "ObjectCreated:Put", "s3": {"object": {"key": object_key.replace(" ", "+")}}}
+        self._sqs.send_message(QueueUrl=EVENTS_QUEUE_URL, MessageBody=json.dumps({"Records": [record]}))
+
+
+def run(mode: str, args) -> dict:
+    repo, queue = TimedRepository(), CountingQueue()
+    events = None
+    if mode == "memory":
+        events = InMemoryUploadEvents()
+        storage = InMemoryStorage(events=events)
+    elif mode == "sqs":
+        sqs = LocalSQSClient()
+        events = SQSUploadEvents(client=sqs, queue_url=EVENTS_QUEUE_URL)
+        storage = NotifyingStorage(sqs)
+    else:
+        storage = InMemoryStorage()
+    service = DocumentService(repo, storage, queue)
+
+    ingestor = None
+    if events is not None:
+        ingestor = UploadIngestor(events, service, batch_size=args.batch_size, wait_seconds=1, report_interval=3600)
+        threading.Thread(target=ingestor.run, daemon=True).start()
+
+    uploaded_at: dict[str, float] = {}
+    per_client = args.uploads // args.clients
+
+    def client(n: int) -> None:
+        rng = random.Random(n)
+        for i in range(per_client):
+            document_id, object_key, _ = service.initiate_upload(f"scan {n}-{i}.pdf", "application/pdf")
+            time.sleep(args.upload_ms / 1000)
+            storage.put_object(object_key, b"%PDF-1.4")
+            uploaded_at[document_id] = time.perf_counter()
+            if mode == "client" and rng.random() >= args.forget:
+                time.sleep(args.rtt_ms / 1000) # The client hears the PUT finished, then sends the enqueue request
+                service.enqueue_processing(document_id)
+
+    clients = [threading.Thread(target=client, args=(n,)) for n in range(args.clients)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+
+    # Let the ingestor catch up (at most a few seconds)
+    deadline = time.monotonic() + 5
+    while ingestor is not None and len(repo.queued_at) < len(uploaded_at) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    if ingestor is not None:
+        ingestor.stop()
+
+    latencies = sorted((repo.queued_at[i] - uploaded_at[i]) * 1000 for i in uploaded_at if i in repo.queued_at)
+    return {
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0,
+        "max": latencies[-1] if latencies else 0.0,
+        "queue_calls": queue.calls,
+        "stuck": len(uploaded_at) - len(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--upload-ms", type=float, default=20, help="Time each upload takes")
+    parser.add_argument("--rtt-ms", type=float, default=20, help="Client round trip before the enqueue call")
+    parser.add_argument("--forget", type=float, default=0.02, help="Share of clients that never call enqueue")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--modes", nargs="+", choices=["client", "memory", "sqs"], default=["client", "memory", "sqs"])
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'queue calls':>12} {'stuck':>6}")
+    for mode in args.modes:
+        r = run(mode, args)
+        print(f"{mode:<8} {r['p50']:>8.2f} {r['p99']:>8.2f} {r['max']:>8.2f} {r['queue_calls']:>12} {r['stuck']:>6}")
+
+
+if __name__ == "__main__":
+    main()
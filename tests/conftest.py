@@ -0,0 +1,39 @@
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+# Run from anywhere (`pytest`, `python -m pytest`, an IDE): `app` is imported from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.domain.models.document import Document, DocumentStatus
+from app.infrastructure.persistence.compact_documents_repo import CompactDocumentsRepository
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.persistence.sqlite_documents_repo import SQLiteDocumentsRepository
+
+REPO_BACKENDS = ["memory", "compact", "sqlite"]
+
+
+# A fresh repository of each backend; every one must follow the same DocumentsRepository contract
+@pytest.fixture(params=REPO_BACKENDS)
+def repo(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryDocumentsRepository()
+    if request.param == "compact":
+        return CompactDocumentsRepository()
+    return SQLiteDocumentsRepository(str(tmp_path / "documents.db"))
+
+
+# A document as initiate_upload creates it, in the given status
+def make_document(document_id: str = "doc-1", status: DocumentStatus = DocumentStatus.INITIATED) -> Document:
+    now = datetime.now(timezone.utc)
+    return Document(
+        id=document_id,
+        filename="scan.pdf",
+        content_type="application/pdf",
+        s3_key=f"documents/{document_id}/scan.pdf",
+        status=status,
+        created_at=now,
+        updated_at=now,
+    )
@@ -0,0 +1,195 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_admission_controller, get_async_document_service
+from app.domain.errors import AdmissionRejectedError
+from app.domain.models.document import DocumentStatus
+from app.infrastructure.events.status_broadcaster import StatusBroadcaster
+from app.infrastructure.persistence.async_documents_repo import AsyncInMemoryDocumentsRepository
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.async_queue import AsyncInMemoryQueue
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.storage.async_storage import AsyncInMemoryStorage
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.main import app
+from app.services import admission
+from app.services.admission import AdmissionController, BacklogSnapshot, TokenBucketLimiter
+from app.services.async_document_service import AsyncDocumentService
+from conftest import make_document
+
+
+# time.monotonic() under the test's control
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(admission.time, "monotonic", fake)
+    return fake
+
+
+# BacklogMonitor stand-in that always reports the same snapshot
+class FixedMonitor:
+
+    def __init__(self, snapshot: BacklogSnapshot, fresh: bool = True, interval: float = 5.0) -> None:
+        self._snapshot = snapshot
+        self._fresh = fresh
+        self.interval = interval
+
+    def snapshot(self) -> BacklogSnapshot:
+        return self._snapshot
+
+    def is_fresh(self, snapshot: BacklogSnapshot) -> bool:
+        return self._fresh
+
+
+def backlog(depth: int, processing_rate: float) -> BacklogSnapshot:
+    return BacklogSnapshot(depth=depth, processing_rate=processing_rate, sampled_at=datetime.now(timezone.utc))
+
+
+# ---- TokenBucketLimiter ----
+
+def test_burst_is_admitted_then_the_client_waits_for_a_token(clock):
+    limiter = TokenBucketLimiter(rate=2.0, burst=3)
+
+    assert [limiter.acquire("acme") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("acme") == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert limiter.acquire("acme") == 0.0
+
+
+def test_clients_have_separate_buckets(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=1)
+
+    assert limiter.acquire("acme") == 0.0
+    assert limiter.acquire("acme") > 0
+    assert limiter.acquire("globex") == 0.0
+
+
+def test_batch_is_admitted_whole_and_paid_back_later(clock):
+    limiter = TokenBucketLimiter(rate=10.0, burst=5)
+
+    assert limiter.acquire("acme", jobs=50) == 0.0
+    # 5 - 50 = -45 tokens: the next job needs 46 more, at 10 per second
+    assert limiter.acquire("acme") == pytest.approx(4.6)
+
+    clock.now += 4.6
+    assert limiter.acquire("acme") == 0.0
+
+
+def test_forgotten_client_starts_over_with_a_full_bucket(clock):
+    limiter = TokenBucketLimiter(rate=1.0, burst=1, max_clients=1)
+    limiter.acquire("acme")
+
+    limiter.acquire("globex")
+
+    assert limiter.acquire("acme") == 0.0
+
+
+# ---- AdmissionController ----
+
+def test_client_over_its_rate_is_rejected_with_retry_after(clock):
+    controller = AdmissionController(limiter=TokenBucketLimiter(rate=0.1, burst=1))
+    controller.check_client("acme")
+
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        controller.check_client("acme")
+
+    assert rejected.value.retry_after == pytest.approx(10.0)
+
+
+def test_full_backlog_is_rejected_until_it_drains():
+    controller = AdmissionController(monitor=FixedMonitor(backlog(depth=120, processing_rate=10.0)), max_backlog=100)
+
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        controller.check_backlog()
+
+    # 21 jobs over the limit at 10 per second
+    assert rejected.value.retry_after == pytest.approx(2.1)
+
+
+def test_long_queue_wait_is_rejected():
+    controller = AdmissionController(monitor=FixedMonitor(backlog(depth=600, processing_rate=2.0)), max_queue_wait=60)
+
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        controller.check_backlog()
+
+    assert rejected.value.retry_after == pytest.approx(240.0)
+
+
+def test_retry_after_is_at_least_one_second_and_capped():
+    slow = AdmissionController(monitor=FixedMonitor(backlog(depth=10_000, processing_rate=0.1)), max_queue_wait=1)
+    barely = AdmissionController(monitor=FixedMonitor(backlog(depth=101, processing_rate=1000.0)), max_backlog=100)
+
+    for controller, expected in [(slow, admission.MAX_RETRY_AFTER_SECONDS), (barely, 1.0)]:
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            controller.check_backlog()
+        assert rejected.value.retry_after == expected
+
+
+def test_stale_or_short_backlog_is_admitted():
+    stale = FixedMonitor(backlog(depth=10_000, processing_rate=1.0), fresh=False)
+    short = FixedMonitor(backlog(depth=10, processing_rate=1.0))
+
+    AdmissionController(monitor=stale, max_backlog=100, max_queue_wait=60).check_backlog()
+    AdmissionController(monitor=short, max_backlog=100, max_queue_wait=60).check_backlog()
+
+
+# ---- API: 429 + Retry-After ----
+
+@pytest.fixture
+def api():
+    repo = InMemoryDocumentsRepository()
+    queue = InMemoryQueue(lanes=["interactive", "bulk"])
+    for n in range(3):
+        repo.create(make_document(f"doc-{n}"))
+
+    def serve(controller: AdmissionController) -> TestClient:
+        service = AsyncDocumentService(
+            repo=AsyncInMemoryDocumentsRepository(repo),
+            storage=AsyncInMemoryStorage(InMemoryStorage()),
+            queue=AsyncInMemoryQueue(queue),
+            events=StatusBroadcaster(),
+            admission=controller,
+        )
+        app.dependency_overrides[get_admission_controller] = lambda: controller
+        app.dependency_overrides[get_async_document_service] = lambda: service
+        return TestClient(app)
+
+    yield serve, repo, queue
+    app.dependency_overrides.clear()
+
+
+def test_enqueue_over_the_client_rate_gets_429_with_retry_after(api, clock):
+    serve, repo, queue = api
+    client = serve(AdmissionController(limiter=TokenBucketLimiter(rate=0.25, burst=1)))
+
+    assert client.post("/documents/doc-0/enqueue").status_code == 200
+    response = client.post("/documents/doc-1/enqueue")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "4"
+    assert repo.get("doc-1").status == DocumentStatus.INITIATED
+    assert queue.depth() == 1
+
+
+def test_enqueue_batch_into_a_full_backlog_gets_429_with_retry_after(api):
+    serve, repo, queue = api
+    client = serve(AdmissionController(monitor=FixedMonitor(backlog(depth=50, processing_rate=4.0)), max_backlog=50))
+
+    response = client.post("/documents/enqueue-batch", json={"document_ids": ["doc-0", "doc-1"]})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert "full" in response.json()["detail"]
+    assert queue.depth() == 0
@@ -0,0 +1,49 @@
+import pytest
+
+from app.infrastructure.storage import broker_storage
+from app.infrastructure.storage.broker_storage import BrokerStorage
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+
+KEY = "documents/doc-1/scan.pdf"
+
+
+# BrokerClient stand-in: runs each call on a local storage, as the broker would, and records it
+class LocalClient:
+
+    def __init__(self, storage: InMemoryStorage) -> None:
+        self.storage = storage
+        self.calls = []
+
+    def call(self, target: str, method: str, *args):
+        self.calls.append((method, *args))
+        return getattr(self.storage, method)(*args)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(broker_storage, "READ_CHUNK_SIZE", 4)
+    return LocalClient(InMemoryStorage())
+
+
+def test_object_is_read_in_ranged_chunks(client):
+    client.storage.put_object(KEY, b"0123456789")
+
+    with BrokerStorage(client).open_object(KEY) as stream:
+        data = b"".join(iter(lambda: stream.read(3), b""))
+
+    assert data == b"0123456789"
+    assert [call for call in client.calls if call[0] == "read_object"] == [
+        ("read_object", KEY, 0, 4), ("read_object", KEY, 4, 4), ("read_object", KEY, 8, 4),
+    ]
+
+
+def test_object_of_whole_chunks_ends_with_an_empty_read(client):
+    client.storage.put_object(KEY, b"01234567")
+
+    assert BrokerStorage(client).open_object(KEY).read() == b"01234567"
+    assert client.calls[-1] == ("read_object", KEY, 8, 4)
+
+
+def test_missing_object_fails_at_open(client):
+    with pytest.raises(FileNotFoundError):
+        BrokerStorage(client).open_object(KEY)
@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_async_document_service
+from app.infrastructure.persistence.async_documents_repo import AsyncInMemoryDocumentsRepository
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.async_queue import AsyncInMemoryQueue
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.storage.async_storage import AsyncInMemoryStorage
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.main import app
+from app.services.async_document_service import AsyncDocumentService
+from conftest import make_document
+
+
+@pytest.fixture
+def api():
+    repo = InMemoryDocumentsRepository()
+    service = AsyncDocumentService(
+        repo=AsyncInMemoryDocumentsRepository(repo),
+        storage=AsyncInMemoryStorage(InMemoryStorage()),
+        queue=AsyncInMemoryQueue(InMemoryQueue()),
+    )
+    app.dependency_overrides[get_async_document_service] = lambda: service
+    yield TestClient(app), repo
+    app.dependency_overrides.clear()
+
+
+def test_unchanged_document_answers_304(api):
+    client, repo = api
+    repo.create(make_document())
+    etag = client.get("/documents/doc-1").headers["ETag"]
+
+    response = client.get("/documents/doc-1", headers={"If-None-Match": f'W/{etag}, "other"'})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_write_within_the_same_clock_tick_changes_the_etag(api):
+    client, repo = api
+    created = repo.create(make_document())
+    etag = client.get("/documents/doc-1").headers["ETag"]
+
+    repo.update(created) # Same updated_at, new version
+
+    response = client.get("/documents/doc-1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
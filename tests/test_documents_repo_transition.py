@@ -0,0 +1,118 @@
+import threading
+from dataclasses import replace
+from datetime import timedelta
+
+import pytest
+
+from app.domain.models.document import DocumentStatus
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.workers.processor_stub import process_job
+from conftest import make_document
+
+QUEUED, PROCESSING = DocumentStatus.QUEUED, DocumentStatus.PROCESSING
+
+
+def test_transition_moves_status_and_bumps_version(repo):
+    created = repo.create(make_document())
+
+    moved = repo.transition("doc-1", DocumentStatus.INITIATED, QUEUED)
+
+    assert moved.status == QUEUED
+    assert moved.version == created.version + 1
+    assert moved.updated_at >= created.updated_at
+    assert repo.get("doc-1") == moved
+
+
+def test_transition_applies_changes(repo):
+    repo.create(make_document(status=PROCESSING))
+
+    done = repo.transition("doc-1", PROCESSING, DocumentStatus.COMPLETED, sha256="ab" * 32, page_count=3)
+
+    assert (done.sha256, done.page_count) == ("ab" * 32, 3)
+    assert repo.get("doc-1").page_count == 3
+
+
+def test_lost_compare_and_set_returns_none_and_changes_nothing(repo):
+    repo.create(make_document(status=QUEUED))
+    before = repo.get("doc-1")
+
+    assert repo.transition("doc-1", DocumentStatus.INITIATED, QUEUED) is None
+    assert repo.get("doc-1") == before
+
+
+def test_transition_of_missing_document_returns_none(repo):
+    assert repo.transition("missing", DocumentStatus.INITIATED, QUEUED) is None
+
+
+def test_transition_accepts_several_expected_statuses(repo):
+    repo.create(make_document(status=DocumentStatus.FAILED))
+
+    moved = repo.transition("doc-1", (DocumentStatus.INITIATED, DocumentStatus.FAILED), QUEUED)
+
+    assert moved.status == QUEUED
+
+
+def test_transition_rejects_fields_it_may_not_change(repo):
+    repo.create(make_document())
+
+    with pytest.raises(ValueError):
+        repo.transition("doc-1", DocumentStatus.INITIATED, QUEUED, filename="other.pdf")
+
+
+def test_concurrent_claims_have_exactly_one_winner(repo):
+    repo.create(make_document(status=QUEUED))
+    barrier = threading.Barrier(8)
+    winners = []
+
+    def claim() -> None:
+        barrier.wait()
+        if repo.transition("doc-1", QUEUED, PROCESSING) is not None:
+            winners.append(threading.get_ident())
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(winners) == 1
+    assert repo.get("doc-1").version == 2
+
+
+def test_started_before_only_takes_over_a_stale_claim(repo):
+    repo.create(make_document(status=QUEUED))
+    claimed = repo.transition("doc-1", QUEUED, PROCESSING)
+
+    fresh = repo.transition("doc-1", PROCESSING, PROCESSING, started_before=claimed.started_at)
+    stale = repo.transition("doc-1", PROCESSING, PROCESSING, started_before=claimed.started_at + timedelta(seconds=1))
+
+    assert fresh is None
+    assert stale.version == claimed.version + 1
+    assert stale.started_at > claimed.started_at
+
+
+def test_started_before_does_not_hold_back_queued_documents(repo):
+    repo.create(make_document(status=QUEUED))
+
+    claimed = repo.transition("doc-1", (QUEUED, PROCESSING), PROCESSING, started_before=make_document().created_at)
+
+    assert claimed.status == PROCESSING
+
+
+def test_redelivery_defers_while_the_claim_may_still_be_running(repo):
+    repo.create(make_document(status=QUEUED))
+    claimed = repo.transition("doc-1", QUEUED, PROCESSING)
+
+    assert process_job(repo, "doc-1", attempt=2, visibility_timeout=60) == "deferred"
+    assert process_job(repo, "doc-1", attempt=2) == "deferred"
+    assert repo.get("doc-1") == claimed
+
+
+def test_redelivery_takes_over_a_claim_older_than_the_visibility_timeout(repo):
+    document = make_document(status=PROCESSING)
+    repo.create(replace(document, started_at=document.created_at - timedelta(seconds=120)))
+    storage = InMemoryStorage()
+    storage.put_object(document.s3_key, b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n")
+
+    assert process_job(repo, "doc-1", storage=storage, attempt=2, visibility_timeout=60) == "completed"
+    assert repo.get("doc-1").status == DocumentStatus.COMPLETED
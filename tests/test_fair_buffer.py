@@ -0,0 +1,100 @@
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+
+from app.domain.models.job_message import JobMessage
+from app.infrastructure.queue.fair_buffer import FairJobBuffer, TenantQueue
+
+
+def make_job(n: int, lane: str, tenant: str | None = None) -> JobMessage:
+    return JobMessage(
+        job_id=f"job-{lane}-{n}",
+        document_id=f"doc-{lane}-{n}",
+        s3_key=f"documents/{n}",
+        requested_at=datetime.now(timezone.utc),
+        priority=lane,
+        tenant=tenant,
+    )
+
+
+def test_busy_lanes_get_slots_in_proportion_to_their_weight():
+    buffer = FairJobBuffer({"interactive": 3, "bulk": 1}, capacity_per_lane=100)
+    for n in range(40):
+        buffer.put(make_job(n, "interactive"))
+        buffer.put(make_job(n, "bulk"))
+
+    taken = Counter(buffer.get().priority for _ in range(40))
+
+    assert taken == {"interactive": 30, "bulk": 10}
+
+
+def test_idle_lane_does_not_save_up_credit():
+    buffer = FairJobBuffer({"interactive": 1, "bulk": 1}, capacity_per_lane=100)
+    for n in range(10):
+        buffer.put(make_job(n, "bulk"))
+    for _ in range(10):
+        buffer.get()
+    for n in range(4):
+        buffer.put(make_job(n, "interactive"))
+        buffer.put(make_job(n + 10, "bulk"))
+
+    # With its old pass (0) interactive would take all four; rejoining at bulk's pass it only gets its share
+    assert "bulk" in [buffer.get().priority for _ in range(3)]
+
+
+def test_unknown_lane_goes_to_the_first_one():
+    buffer = FairJobBuffer({"interactive": 1, "bulk": 1}, capacity_per_lane=10)
+
+    assert buffer.lane_of(make_job(0, "express")) == "interactive"
+
+
+def test_wait_for_room_reports_free_capacity():
+    buffer = FairJobBuffer({"interactive": 1}, capacity_per_lane=2)
+    buffer.put(make_job(0, "interactive"))
+    buffer.put(make_job(1, "interactive"))
+
+    assert buffer.wait_for_room("interactive", timeout=0.01) == 0
+    buffer.get()
+    assert buffer.wait_for_room("interactive", timeout=0.01) == 1
+
+
+def test_close_drains_then_returns_none():
+    buffer = FairJobBuffer({"interactive": 1}, capacity_per_lane=10)
+    buffer.put(make_job(0, "interactive"))
+    buffer.close()
+
+    assert buffer.get().job_id == "job-interactive-0"
+    buffer.task_done()
+    assert buffer.get() is None
+    assert buffer.unfinished_tasks == 0
+
+
+def test_close_wakes_a_waiting_slot():
+    buffer = FairJobBuffer({"interactive": 1}, capacity_per_lane=10)
+    results = []
+    slot = threading.Thread(target=lambda: results.append(buffer.get()))
+    slot.start()
+
+    buffer.close()
+    slot.join(timeout=5)
+
+    assert not slot.is_alive()
+    assert results == [None]
+
+
+def test_tenant_queue_puts_a_returned_item_first():
+    tenants = TenantQueue()
+    tenants.append("a", 1)
+    tenants.append("a", 2)
+    tenants.appendleft("a", 0)
+
+    assert [tenants.popleft() for _ in range(len(tenants))] == [0, 1, 2]
+
+
+def test_tenants_take_turns_within_a_lane():
+    buffer = FairJobBuffer({"interactive": 1}, capacity_per_lane=10)
+    for n in range(3):
+        buffer.put(make_job(n, "interactive", tenant="big"))
+    buffer.put(make_job(3, "interactive", tenant="small"))
+
+    assert [buffer.get().tenant for _ in range(4)] == ["big", "small", "big", "big"]
@@ -0,0 +1,119 @@
+import time
+
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+
+LANES = ["interactive", "bulk"]
+SHORT_LEASE = 0.05
+
+
+def make_queue(visibility_timeout: float = 30.0) -> InMemoryQueue:
+    return InMemoryQueue(visibility_timeout=visibility_timeout, lanes=LANES)
+
+
+def test_dequeue_hides_the_message_until_acked():
+    queue = make_queue()
+    queue.enqueue_document_processing("doc-1", "documents/doc-1/a.pdf")
+
+    raw = queue.dequeue()
+
+    assert (queue.depth(), queue.in_flight()) == (0, 1)
+    assert queue.dequeue() is None
+    assert queue.ack(raw["receipt_handle"])
+    assert (queue.depth(), queue.in_flight()) == (0, 0)
+
+
+def test_expired_lease_is_redelivered_with_the_next_attempt_number():
+    queue = make_queue(visibility_timeout=SHORT_LEASE)
+    job_id = queue.enqueue_document_processing("doc-1", "documents/doc-1/a.pdf")
+    [first] = queue.receive_jobs(max_messages=1)
+
+    [second] = queue.receive_jobs(max_messages=1, wait_seconds=2)
+
+    assert (first.job_id, second.job_id) == (job_id, job_id)
+    assert (first.attempt, second.attempt) == (1, 2)
+    assert second.receipt_handle != first.receipt_handle
+
+
+def test_ack_after_the_lease_ran_out_fails():
+    queue = make_queue(visibility_timeout=SHORT_LEASE)
+    queue.enqueue_document_processing("doc-1", "documents/doc-1/a.pdf")
+    [job] = queue.receive_jobs(max_messages=1)
+    time.sleep(SHORT_LEASE * 2)
+
+    assert queue.ack_jobs([job]) == [job]
+    assert queue.depth() == 1
+
+
+def test_redelivery_goes_before_newer_jobs():
+    queue = make_queue(visibility_timeout=SHORT_LEASE)
+    queue.enqueue_document_processing("doc-1", "documents/doc-1/a.pdf")
+    queue.receive_jobs(max_messages=1)
+    queue.enqueue_document_processing("doc-2", "documents/doc-2/a.pdf")
+    time.sleep(SHORT_LEASE * 2)
+
+    assert [job.document_id for job in queue.receive_jobs(max_messages=2)] == ["doc-1", "doc-2"]
+
+
+def test_extended_lease_stays_hidden():
+    queue = make_queue(visibility_timeout=SHORT_LEASE)
+    queue.enqueue_document_processing("doc-1", "documents/doc-1/a.pdf")
+    [job] = queue.receive_jobs(max_messages=1)
+
+    queue.extend_visibility([job], 30)
+    time.sleep(SHORT_LEASE * 2)
+
+    assert queue.receive_jobs(max_messages=1) == []
+    assert queue.ack_jobs([job]) == []
+
+
+def test_released_message_is_redelivered_right_away():
+    queue = make_queue()
+    queue.enqueue_document_processing("doc-1", "documents/doc-1/a.pdf")
+    raw = queue.dequeue()
+
+    assert queue.release(raw["receipt_handle"])
+
+    assert queue.dequeue()["document_id"] == "doc-1"
+    assert not queue.release(raw["receipt_handle"])
+
+
+def test_tenants_take_turns_within_a_lane():
+    queue = make_queue()
+    queue.enqueue_document_processing_batch([(f"big-{n}", f"k/{n}") for n in range(3)], tenant="big")
+    queue.enqueue_document_processing("small-0", "k/s", tenant="small")
+
+    assert [job.document_id for job in queue.receive_jobs(max_messages=4)] == ["big-0", "small-0", "big-1", "big-2"]
+
+
+def test_lanes_are_received_separately():
+    queue = make_queue()
+    queue.enqueue_document_processing("doc-bulk", "k/b", priority="bulk")
+    queue.enqueue_document_processing("doc-default", "k/d")
+
+    assert [job.document_id for job in queue.receive_jobs(lane="bulk")] == ["doc-bulk"]
+    assert (queue.depth("interactive"), queue.depth("bulk")) == (1, 0)
+
+
+def test_release_with_delay_redelivers_later():
+    queue = make_queue()
+    queue.enqueue_document_processing("doc-1", "documents/doc-1/a.pdf")
+    [job] = queue.receive_jobs(max_messages=1)
+
+    queue.release_jobs([job], delay_seconds=SHORT_LEASE)
+
+    assert queue.receive_jobs(max_messages=1) == []
+    [again] = queue.receive_jobs(max_messages=1, wait_seconds=2)
+    assert again.attempt == 2
+
+
+def test_dead_lettered_jobs_leave_the_queue():
+    queue = make_queue()
+    queue.enqueue_document_processing("doc-1", "documents/doc-1/a.pdf", priority="bulk", tenant="acme")
+    [job] = queue.receive_jobs(max_messages=1)
+
+    assert queue.dead_letter_jobs([job], "Giving up after 1 attempts") == []
+
+    [entry] = queue.dead_letters()
+    assert (entry["document_id"], entry["priority"], entry["tenant"], entry["attempts"]) == ("doc-1", "bulk", "acme", 1)
+    assert (queue.depth(), queue.in_flight(), queue.dead_letter_depth()) == (0, 0, 1)
+    assert queue.dead_letter_jobs([job], "again") == [job]
@@ -0,0 +1,110 @@
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from botocore.config import Config
+from botocore.session import Session
+
+from app.infrastructure.aws.presigner import S3PutPresigner
+
+BUCKET = "documents-bucket"
+REGION = "eu-west-1"
+EXPIRES_IN = 300
+KEYS = [
+    "documents/doc-1/scan.pdf",
+    "documents/doc-2/my scan (1).pdf",
+    "documents/doc-3/résumé ünïcode.pdf",
+    "documents/doc-4/a+b=c&d~e;f.pdf",
+]
+
+
+# botocore S3 client with fixed fake credentials (presigning never calls AWS)
+def s3_client(addressing_style: str = "virtual", token: str | None = None):
+    session = Session()
+    session.set_credentials("AKIDEXAMPLE", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY", token)
+    config = Config(signature_version="s3v4", s3={"addressing_style": addressing_style})
+    return session.create_client("s3", region_name=REGION, config=config)
+
+
+def presigner_for(client, template_url: str, template_key: str) -> S3PutPresigner:
+    credentials = client._request_signer._credentials.get_frozen_credentials()
+    return S3PutPresigner.from_template(template_url, template_key, credentials, REGION)
+
+
+def botocore_put(client, key: str, content_type: str) -> str:
+    return client.generate_presigned_url(
+        "put_object",
+        Params={"Bucket": BUCKET, "Key": key, "ContentType": content_type},
+        ExpiresIn=EXPIRES_IN,
+    )
+
+
+def amz_date_of(url: str) -> str:
+    return parse_qs(urlsplit(url).query)["X-Amz-Date"][0]
+
+
+@pytest.mark.parametrize("addressing_style", ["virtual", "path"])
+@pytest.mark.parametrize("key", KEYS)
+@pytest.mark.parametrize("content_type", ["application/pdf", "image/png"])
+def test_put_urls_match_botocore_byte_for_byte(addressing_style, key, content_type):
+    client = s3_client(addressing_style)
+    template = botocore_put(client, "templates/first.pdf", "application/pdf")
+    presigner = presigner_for(client, template, "templates/first.pdf")
+
+    expected = botocore_put(client, key, content_type)
+
+    assert presigner.presign_put(key, content_type, EXPIRES_IN, amz_date=amz_date_of(expected)) == expected
+
+
+def test_session_token_is_signed_into_the_url():
+    client = s3_client(token="session-token/with+chars=")
+    template = botocore_put(client, "templates/first.pdf", "application/pdf")
+    presigner = presigner_for(client, template, "templates/first.pdf")
+
+    expected = botocore_put(client, KEYS[1], "application/pdf")
+
+    assert "X-Amz-Security-Token=" in expected
+    assert presigner.presign_put(KEYS[1], "application/pdf", EXPIRES_IN, amz_date=amz_date_of(expected)) == expected
+
+
+@pytest.mark.parametrize("part_number", [1, 2, 10_000])
+def test_upload_part_urls_match_botocore(part_number):
+    client = s3_client()
+    key, upload_id = KEYS[2], "upload-id/with+slash=="
+
+    def botocore_part(number: int) -> str:
+        return client.generate_presigned_url(
+            "upload_part",
+            Params={"Bucket": BUCKET, "Key": key, "UploadId": upload_id, "PartNumber": number},
+            ExpiresIn=EXPIRES_IN,
+        )
+
+    template = botocore_part(1)
+    presigner = presigner_for(client, template, key)
+    expected = botocore_part(part_number)
+
+    assert presigner.matches(template, key, upload_id=upload_id, part_number=1)
+    assert presigner.presign_upload_part(key, upload_id, part_number, EXPIRES_IN, amz_date=amz_date_of(expected)) == expected
+
+
+def test_matches_reproduces_its_own_template():
+    client = s3_client()
+    template = botocore_put(client, KEYS[1], "application/pdf")
+
+    assert presigner_for(client, template, KEYS[1]).matches(template, KEYS[1], "application/pdf")
+
+
+def test_matches_is_false_when_the_signature_would_differ():
+    client = s3_client()
+    template = botocore_put(client, KEYS[0], "application/pdf")
+    presigner = presigner_for(client, template, KEYS[0])
+
+    assert not presigner.matches(template, KEYS[0], "image/png")
+    assert not presigner.matches(template.replace("X-Amz-Date=", "X-Amz-Nope="), KEYS[0], "application/pdf")
+
+
+def test_template_must_end_with_its_key():
+    client = s3_client()
+    template = botocore_put(client, KEYS[0], "application/pdf")
+
+    with pytest.raises(ValueError):
+        presigner_for(client, template, "documents/other.pdf")
@@ -0,0 +1,101 @@
+from app.domain.errors import UnsupportedContentError
+from app.domain.models.document import DocumentStatus
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.workers.retry_policy import RetryPolicy
+from app.workers.worker_pool import WorkerPool
+from conftest import make_document
+
+NO_BACKOFF = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0)
+
+
+# S3 that never answers: every read fails with a transient error
+class UnreachableStorage(InMemoryStorage):
+
+    def open_object(self, object_key: str):
+        raise ConnectionError("Read timed out")
+
+
+# Claiming the document crashes the job outside process_job's error handling (like running out of memory)
+class CrashingRepository(InMemoryDocumentsRepository):
+
+    def transition(self, document_id: str, expected_status, new_status: DocumentStatus, **changes):
+        if new_status == DocumentStatus.PROCESSING:
+            raise MemoryError("Worker ran out of memory on this document")
+        return super().transition(document_id, expected_status, new_status, **changes)
+
+
+def queued_job(repo) -> InMemoryQueue:
+    document = repo.create(make_document(status=DocumentStatus.QUEUED))
+    queue = InMemoryQueue(lanes=["default"])
+    queue.enqueue_document_processing(document.id, document.s3_key)
+    return queue
+
+
+def run_pool(repo, queue, storage=None):
+    pool = WorkerPool(
+        repo=repo, queue=queue, concurrency=2, poll_interval=0.01, report_interval=3600,
+        ack_interval=0.01, storage=storage or InMemoryStorage(), retry_policy=NO_BACKOFF,
+    )
+    return pool.run(drain=True)
+
+
+def test_transient_errors_are_retried_until_the_last_attempt():
+    policy = RetryPolicy(max_attempts=3)
+
+    assert policy.should_retry(1, ConnectionError())
+    assert policy.should_retry(2, ConnectionError())
+    assert not policy.should_retry(3, ConnectionError())
+
+
+def test_permanent_errors_are_never_retried():
+    policy = RetryPolicy(max_attempts=3)
+
+    assert not policy.retryable(UnsupportedContentError("not a PDF"))
+    assert not policy.should_retry(1, UnsupportedContentError("not a PDF"))
+
+
+def test_exhausted_only_past_max_attempts():
+    policy = RetryPolicy(max_attempts=3)
+
+    assert not policy.exhausted(3)
+    assert policy.exhausted(4)
+
+
+def test_delay_is_jittered_below_the_capped_exponential():
+    policy = RetryPolicy(max_attempts=10, base_delay=2.0, max_delay=30.0)
+
+    for attempt, ceiling in [(1, 2.0), (2, 4.0), (4, 16.0), (5, 30.0), (1000, 30.0)]:
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert all(0.0 <= delay <= ceiling for delay in delays)
+    assert len({policy.delay(3) for _ in range(20)}) > 1
+
+
+def test_job_failing_every_attempt_is_dead_lettered():
+    repo = InMemoryDocumentsRepository()
+    queue = queued_job(repo)
+
+    stats = run_pool(repo, queue, storage=UnreachableStorage())
+
+    assert (stats.retried, stats.dead_lettered, stats.processed) == (2, 1, 0)
+    document = repo.get("doc-1")
+    assert document.status == DocumentStatus.FAILED
+    assert document.last_error.startswith("Gave up after attempt 3")
+    [entry] = queue.dead_letters()
+    assert (entry["document_id"], entry["attempts"]) == ("doc-1", 3)
+    assert (queue.depth(), queue.in_flight()) == (0, 0)
+
+
+def test_job_crashing_every_delivery_is_quarantined():
+    repo = CrashingRepository()
+    queue = queued_job(repo)
+
+    stats = run_pool(repo, queue)
+
+    assert (stats.failed, stats.dead_lettered) == (3, 1)
+    assert repo.get("doc-1").status == DocumentStatus.FAILED
+    [entry] = queue.dead_letters()
+    assert entry["attempts"] == 4
+    assert "crashed the worker" in entry["reason"]
+    assert (queue.depth(), queue.in_flight()) == (0, 0)
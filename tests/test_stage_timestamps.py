@@ -0,0 +1,50 @@
+from app.domain.models.document import DocumentStatus
+from conftest import make_document
+
+QUEUED, PROCESSING = DocumentStatus.QUEUED, DocumentStatus.PROCESSING
+
+
+def test_each_stage_is_stamped_when_entered(repo):
+    repo.create(make_document())
+
+    queued = repo.transition("doc-1", DocumentStatus.INITIATED, QUEUED)
+    started = repo.transition("doc-1", QUEUED, PROCESSING)
+    finished = repo.transition("doc-1", PROCESSING, DocumentStatus.COMPLETED)
+
+    assert queued.queued_at == queued.updated_at and queued.started_at is None
+    assert started.started_at == started.updated_at and started.queued_at == queued.queued_at
+    assert finished.finished_at == finished.updated_at
+    assert set(finished.stage_seconds()) == {"upload", "queue", "processing", "total"}
+
+
+def test_retry_keeps_queued_at_and_clears_started_at(repo):
+    repo.create(make_document())
+    queued_at = repo.transition("doc-1", DocumentStatus.INITIATED, QUEUED).queued_at
+    repo.transition("doc-1", QUEUED, PROCESSING)
+
+    retried = repo.transition("doc-1", PROCESSING, QUEUED, last_error="Read timed out")
+
+    assert retried.queued_at == queued_at
+    assert retried.started_at is None and retried.finished_at is None
+
+
+def test_enqueueing_a_failed_document_again_starts_a_new_trip(repo):
+    repo.create(make_document())
+    first = repo.transition("doc-1", DocumentStatus.INITIATED, QUEUED).queued_at
+    repo.transition("doc-1", QUEUED, PROCESSING)
+    repo.transition("doc-1", PROCESSING, DocumentStatus.FAILED)
+
+    again = repo.transition("doc-1", DocumentStatus.FAILED, QUEUED)
+
+    assert again.queued_at > first
+    assert again.started_at is None and again.finished_at is None
+
+
+def test_back_to_initiated_clears_every_stage(repo):
+    repo.create(make_document())
+    repo.transition("doc-1", DocumentStatus.INITIATED, QUEUED)
+    repo.transition("doc-1", QUEUED, PROCESSING)
+
+    reset = repo.transition("doc-1", PROCESSING, DocumentStatus.INITIATED)
+
+    assert (reset.queued_at, reset.started_at, reset.finished_at) == (None, None, None)
@@ -0,0 +1,94 @@
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_async_document_service
+from app.core.settings import settings
+from app.domain.models.document import DocumentStatus
+from app.infrastructure.events.status_broadcaster import StatusBroadcaster
+from app.infrastructure.persistence.async_documents_repo import AsyncInMemoryDocumentsRepository
+from app.infrastructure.persistence.in_memory_documents_repo import InMemoryDocumentsRepository
+from app.infrastructure.queue.async_queue import AsyncInMemoryQueue
+from app.infrastructure.queue.in_memory_queue import InMemoryQueue
+from app.infrastructure.storage.async_storage import AsyncInMemoryStorage
+from app.infrastructure.storage.in_memory_storage import InMemoryStorage
+from app.main import app
+from app.services.async_document_service import AsyncDocumentService
+from app.workers.processor_stub import process_job
+from app.workers.retry_policy import RetryPolicy
+
+PDF = b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n"
+
+
+@pytest.fixture
+def api():
+    repo = InMemoryDocumentsRepository()
+    storage = InMemoryStorage()
+    service = AsyncDocumentService(
+        repo=AsyncInMemoryDocumentsRepository(repo),
+        storage=AsyncInMemoryStorage(storage),
+        queue=AsyncInMemoryQueue(InMemoryQueue()),
+        events=StatusBroadcaster(),
+    )
+    app.dependency_overrides[get_async_document_service] = lambda: service
+    yield TestClient(app), repo, storage
+    app.dependency_overrides.clear()
+
+
+def initiate(client: TestClient, **extra) -> dict:
+    response = client.post("/documents/initiate-upload", json={"filename": "scan.pdf", "content_type": "application/pdf", **extra})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_uploaded_content_is_processed(api):
+    client, repo, storage = api
+    upload = initiate(client)
+
+    assert upload["upload_url"].endswith(f"/documents/{upload['document_id']}/content")
+    assert client.put(f"/documents/{upload['document_id']}/content", content=PDF).status_code == 204
+    assert client.post(f"/documents/{upload['document_id']}/enqueue").status_code == 200
+
+    assert process_job(repo, upload["document_id"], storage=storage) == "completed"
+    assert repo.get(upload["document_id"]).sha256 == hashlib.sha256(PDF).hexdigest()
+
+
+def test_job_without_an_upload_fails_without_retrying(api):
+    client, repo, storage = api
+    upload = initiate(client)
+    client.post(f"/documents/{upload['document_id']}/enqueue")
+
+    outcome = process_job(repo, upload["document_id"], storage=storage, attempt=1, retry_policy=RetryPolicy(max_attempts=5))
+
+    assert outcome == "failed"
+    assert repo.get(upload["document_id"]).status == DocumentStatus.FAILED
+
+
+def test_content_after_enqueue_is_a_conflict(api):
+    client, repo, storage = api
+    upload = initiate(client)
+    client.put(f"/documents/{upload['document_id']}/content", content=PDF)
+    client.post(f"/documents/{upload['document_id']}/enqueue")
+
+    assert client.put(f"/documents/{upload['document_id']}/content", content=b"other").status_code == 409
+    assert client.put("/documents/nope/content", content=PDF).status_code == 404
+
+
+def test_content_over_the_limit_is_rejected(api, monkeypatch):
+    client, repo, storage = api
+    monkeypatch.setattr(settings, "UPLOAD_CONTENT_MAX_BYTES", 10)
+    upload = initiate(client)
+
+    assert client.put(f"/documents/{upload['document_id']}/content", content=PDF).status_code == 413
+    with pytest.raises(FileNotFoundError):
+        storage.open_object(upload["object_key"])
+
+
+def test_content_must_match_the_sha256_of_the_upload(api):
+    client, repo, storage = api
+    upload = initiate(client, sha256=hashlib.sha256(PDF).hexdigest())
+    url = upload["upload_url"].removeprefix(settings.LOCAL_UPLOAD_BASE_URL)
+
+    assert client.put(url, content=b"not the file").status_code == 422
+    assert client.put(url, content=PDF).status_code == 204